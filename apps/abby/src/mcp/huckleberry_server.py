@@ -7,27 +7,49 @@ Provides MCP tools for logging baby activities to Huckleberry:
 - Diaper changes
 - Growth measurements
 - Activities (burps, etc.)
+
+Only what the MCP handshake needs is imported at startup. The Huckleberry
+client (requests, google-auth, gRPC) is imported and signed in by a
+background warm-up once stdio is up, or on the first tool call with
+HUCKLEBERRY_WARMUP=0. Set STARTUP_TIMING=1 to log a startup phase
+breakdown.
+
+Tool bodies call the blocking client, so they run on a bounded thread pool
+(HUCKLEBERRY_TOOL_WORKERS) and the event loop stays free for other calls
+and pings; TOOL_CONCURRENCY caps how many calls of one tool run at once.
 """
 
+import time
+
+_process_started = time.perf_counter()
+
 import asyncio
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from dotenv import load_dotenv
+if TYPE_CHECKING:
+    from huckleberry_api.api import HuckleberryAPI
+    from huckleberry_api.dedup import DuplicateSuppressor
 
 # Load environment from Abby's .env file
 env_file = Path(__file__).parent.parent.parent / ".env"
 if env_file.exists():
+    from dotenv import load_dotenv
+
     load_dotenv(env_file)
 
 # Add specs folder to path (at project root)
 specs_dir = Path(__file__).parent.parent.parent.parent.parent / "specs"
 sys.path.insert(0, str(specs_dir))
 
-from huckleberry_api.api import HuckleberryAPI
+from startup_timing import StartupTimer
+
+startup_timer = StartupTimer(_process_started)
+startup_timer.mark("environment")
 
 # Configure logging to stderr (stdout is used for MCP protocol)
 logging.basicConfig(
@@ -46,15 +68,21 @@ except ImportError:
     logger.error("mcp not installed. Install with: pip install mcp")
     sys.exit(1)
 
+startup_timer.mark("import mcp")
+
 # Initialize Huckleberry API
-huckleberry_api: HuckleberryAPI | None = None
+huckleberry_api: "HuckleberryAPI | None" = None
 child_uid: str | None = None
 child_name: str = "Baby"
 
+# Logging tools whose repeats within HUCKLEBERRY_DEDUP_WINDOW seconds are answered without a write
+DEDUPLICATED_TOOLS = {"log_sleep", "log_feeding", "log_diaper", "log_activity", "log_growth"}
+duplicate_suppressor: "DuplicateSuppressor | None" = None
+
 
 def init_huckleberry():
     """Initialize Huckleberry API client."""
-    global huckleberry_api, child_uid, child_name
+    global huckleberry_api, child_uid, child_name, duplicate_suppressor
 
     email = os.getenv("HUCKLE_USER_ID")
     password = os.getenv("HUCKLE_PW")
@@ -64,24 +92,139 @@ def init_huckleberry():
 
     logger.info(f"Initializing Huckleberry API for {email}")
 
-    huckleberry_api = HuckleberryAPI(email=email, password=password)
-    huckleberry_api.authenticate()
-
-    logger.info(f"Authenticated - User UID: {huckleberry_api.user_uid}")
+    # Deferred so the MCP handshake does not wait for the client's dependencies
+    from huckleberry_api.api import HuckleberryAPI
+    from huckleberry_api.dedup import DuplicateSuppressor
+    from huckleberry_api.mirror import IntervalMirror
+    from huckleberry_api.token_cache import FileTokenCache
+    from huckleberry_api.write_queue import WriteQueue
+
+    max_workers = int(os.getenv("HUCKLEBERRY_MAX_WORKERS", "8"))
+    # Optional local mirror of interval history (incremental sync instead of full range reads)
+    mirror_path = os.getenv("HUCKLEBERRY_MIRROR_PATH")
+    mirror = IntervalMirror(mirror_path) if mirror_path else None
+    # Optional persistent session cache so a fresh process skips password sign-in
+    token_cache_path = os.getenv("HUCKLEBERRY_TOKEN_CACHE")
+    token_cache = (
+        FileTokenCache(token_cache_path, key=os.getenv("HUCKLEBERRY_TOKEN_CACHE_KEY"))
+        if token_cache_path else None
+    )
+    # Optional durable write queue: log_* tools return once the write is stored
+    # locally and a background thread replays it to Firestore
+    write_queue_path = os.getenv("HUCKLEBERRY_WRITE_QUEUE")
+    write_queue = WriteQueue(write_queue_path) if write_queue_path else None
+    api = HuckleberryAPI(
+        email=email,
+        password=password,
+        max_workers=max_workers,
+        mirror=mirror,
+        token_cache=token_cache,
+        # "rest" skips loading gRPC; listeners (HUCKLEBERRY_LIVE_STATE) need "grpc"
+        transport=os.getenv("HUCKLEBERRY_TRANSPORT", "grpc"),
+        write_queue=write_queue,
+    )
+    try:
+        api.authenticate()
+        # Rotate tokens ahead of expiry so tool calls never wait on a refresh
+        api.start_token_refresher()
 
-    # Get first child
-    children = huckleberry_api.get_children()
-    if not children:
-        raise ValueError("No children found in Huckleberry account")
+        logger.info(f"Authenticated - User UID: {api.user_uid}")
 
-    child_uid = children[0]['uid']
-    child_name = children[0]['name']
-    logger.info(f"Using child: {child_name} (UID: {child_uid})")
+        # All children on the account (one batched read, then cached); HUCKLEBERRY_CHILD
+        # picks one by name or uid, otherwise the child last used in the app
+        children = api.get_children()
+        if not children:
+            raise ValueError("No children found in Huckleberry account")
 
+        wanted = os.getenv("HUCKLEBERRY_CHILD", "").strip()
+        child = next(
+            (c for c in children if wanted and (wanted == c['uid'] or wanted.lower() == c['name'].lower())), None
+        )
+        if child is None:
+            if wanted:
+                logger.warning(f"No child matching HUCKLEBERRY_CHILD={wanted!r}, using {children[0]['name']}")
+            child = children[0]
+        logger.info(f"Found {len(children)} children: {', '.join(c['name'] for c in children)}")
+        logger.info(f"Using child: {child['name']} (UID: {child['uid']})")
+
+        # Optionally keep timer state warm via listeners so timer tools skip a read
+        if os.getenv("HUCKLEBERRY_LIVE_STATE", "").lower() in ("1", "true", "yes"):
+            if api.supports_listeners:
+                api.enable_live_state(child['uid'])
+            else:
+                logger.warning(
+                    "HUCKLEBERRY_LIVE_STATE needs HUCKLEBERRY_TRANSPORT=grpc (listeners); live state is disabled"
+                )
+    except BaseException:
+        # get_children and enable_live_state open snapshot listeners; close() leaves them running
+        api.stop_all_listeners()
+        api.close()
+        raise
+
+    child_uid = child['uid']
+    child_name = child['name']
+    duplicate_suppressor = DuplicateSuppressor(window=float(os.getenv("HUCKLEBERRY_DEDUP_WINDOW", "120")))
+    # Published last: tool calls treat a non-None client as fully initialized
+    huckleberry_api = api
+
+
+def prefetch_recent_activity() -> None:
+    """Read the last day of activity so the first get_recent_activity finds warm connections and caches."""
+    end_timestamp = int(time.time())
+    huckleberry_api.get_calendar_frames(
+        child_uid=child_uid,
+        start_timestamp=end_timestamp - 86400,
+        end_timestamp=end_timestamp,
+        kinds=("sleep", "feed", "diaper"),
+    )
+
+
+async def warm_up() -> None:
+    """Initialize the client and prefetch recent activity in the background.
+
+    Holds init_lock while initializing, so a tool call arriving meanwhile
+    waits for this initialization instead of starting its own. A failure
+    is only logged: the first tool call retries and reports it.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    async with init_lock:
+        if huckleberry_api is not None:
+            return
+        try:
+            await loop.run_in_executor(tool_executor, init_huckleberry)
+        except Exception as e:
+            logger.warning(f"Warm-up failed, retrying on the first tool call: {e}")
+            return
+    try:
+        await loop.run_in_executor(tool_executor, prefetch_recent_activity)
+    except Exception as e:
+        logger.warning(f"Warm-up prefetch failed: {e}")
+        return
+    logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+# Huckleberry is never initialized before the MCP handshake, so the server
+# starts even if Huckleberry is temporarily unavailable. With warm-up
+# (HUCKLEBERRY_WARMUP, on by default) initialization starts in the background
+# once stdio is up; otherwise it waits for the first tool call.
+warmup_enabled = os.getenv("HUCKLEBERRY_WARMUP", "1").lower() not in ("0", "false", "no")
+warmup_task: "asyncio.Task | None" = None
+logger.info(
+    "Huckleberry will be initialized in the background after the handshake starts" if warmup_enabled
+    else "Huckleberry will be initialized on first tool call"
+)
+init_lock = asyncio.Lock()  # Concurrent first calls (and the warm-up) share one initialization
 
-# Don't initialize Huckleberry on startup - do it lazily on first tool call
-# This allows MCP server to start even if Huckleberry is temporarily unavailable
-logger.info("Huckleberry will be initialized on first tool call")
+# Tool bodies (and initialization) block on network I/O: run them off the event loop
+tool_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("HUCKLEBERRY_TOOL_WORKERS", "4")), thread_name_prefix="huckleberry-tool"
+)
+# Calls of one tool running at once; logging tools write one child's timer and
+# prefs documents, so they go one at a time (which also lets the duplicate
+# check see an identical call that was still in flight)
+TOOL_CONCURRENCY = {"get_recent_activity": 2}
+tool_slots: dict[str, asyncio.Semaphore] = {}
 
 # Create MCP server
 server = Server("huckleberry")
@@ -208,229 +351,269 @@ async def list_tools() -> list[Tool]:
     ]
 
 
-@server.call_tool()
-async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls."""
-    logger.info(f"Tool called: {name} with args: {arguments}")
+def run_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Run one tool (blocking, on a tool_executor thread); raises on failure."""
+    if name == "log_sleep":
+        duration_minutes = arguments.get("duration_minutes", 60)
+        notes = arguments.get("notes", "")
 
-    # Lazy initialization of Huckleberry API
-    global huckleberry_api
-    if huckleberry_api is None:
-        try:
-            logger.info("Lazy-initializing Huckleberry API...")
-            init_huckleberry()
-        except Exception as e:
-            logger.error(f"Failed to initialize Huckleberry: {e}")
-            return [TextContent(
-                type="text",
-                text=f"ERROR: Unable to connect to Huckleberry API: {str(e)}"
-            )]
+        logger.info(f"Logging sleep: {duration_minutes} minutes")
 
-    try:
-        if name == "log_sleep":
-            duration_minutes = arguments.get("duration_minutes", 60)
-            notes = arguments.get("notes", "")
+        # Record a sleep that ended now and lasted duration_minutes
+        duration_sec = duration_minutes * 60
+        huckleberry_api.import_intervals(
+            child_uid,
+            [{"type": "sleep", "start": time.time() - duration_sec, "duration": duration_sec, "notes": notes}],
+            update_prefs=True,
+        )
 
-            logger.info(f"Logging sleep: {duration_minutes} minutes")
+        hours = duration_minutes / 60
+        result = f"Sleep logged for {child_name}: {hours:.1f} hours ({duration_minutes} minutes)"
+        if notes:
+            result += f"\nNotes: {notes}"
 
-            # Start and complete sleep session
-            huckleberry_api.start_sleep(child_uid=child_uid)
-            huckleberry_api.complete_sleep(child_uid=child_uid)
+        logger.info("✅ Sleep logged successfully")
 
-            hours = duration_minutes / 60
-            result = f"Sleep logged for {child_name}: {hours:.1f} hours ({duration_minutes} minutes)"
-            if notes:
-                result += f"\nNotes: {notes}"
+        return [TextContent(type="text", text=result)]
 
-            logger.info("✅ Sleep logged successfully")
+    elif name == "log_feeding":
+        amount_oz = arguments.get("amount_oz")
+        feeding_type = arguments.get("feeding_type", "bottle")
+        notes = arguments.get("notes", "")
 
-            return [TextContent(type="text", text=result)]
+        logger.info(f"Logging feeding: {feeding_type}, {amount_oz}oz")
 
-        elif name == "log_feeding":
-            amount_oz = arguments.get("amount_oz")
-            feeding_type = arguments.get("feeding_type", "bottle")
-            notes = arguments.get("notes", "")
+        # Start and complete feeding
+        huckleberry_api.start_feeding(child_uid=child_uid)
+        huckleberry_api.complete_feeding(child_uid=child_uid)
 
-            logger.info(f"Logging feeding: {feeding_type}, {amount_oz}oz")
+        result = f"Feeding logged for {child_name}: {feeding_type}"
+        if amount_oz:
+            result += f" - {amount_oz}oz"
+        if notes:
+            result += f"\nNotes: {notes}"
 
-            # Start and complete feeding
-            huckleberry_api.start_feeding(child_uid=child_uid)
-            huckleberry_api.complete_feeding(child_uid=child_uid)
+        logger.info("✅ Feeding logged successfully")
 
-            result = f"Feeding logged for {child_name}: {feeding_type}"
-            if amount_oz:
-                result += f" - {amount_oz}oz"
-            if notes:
-                result += f"\nNotes: {notes}"
+        return [TextContent(type="text", text=result)]
 
-            logger.info("✅ Feeding logged successfully")
+    elif name == "log_diaper":
+        diaper_type = arguments.get("diaper_type", "pee").lower()
+        notes = arguments.get("notes", "")
 
-            return [TextContent(type="text", text=result)]
+        # Normalize diaper type
+        if diaper_type in ["wet", "pee"]:
+            diaper_type = "pee"
+        elif diaper_type in ["dirty", "poo", "poop"]:
+            diaper_type = "poo"
+        elif diaper_type == "both":
+            diaper_type = "both"
+        else:
+            diaper_type = "dry"
 
-        elif name == "log_diaper":
-            diaper_type = arguments.get("diaper_type", "pee").lower()
-            notes = arguments.get("notes", "")
-
-            # Normalize diaper type
-            if diaper_type in ["wet", "pee"]:
-                diaper_type = "pee"
-            elif diaper_type in ["dirty", "poo", "poop"]:
-                diaper_type = "poo"
-            elif diaper_type == "both":
-                diaper_type = "both"
-            else:
-                diaper_type = "dry"
+        logger.info(f"Logging diaper: {diaper_type}")
 
-            logger.info(f"Logging diaper: {diaper_type}")
+        huckleberry_api.log_diaper(child_uid=child_uid, mode=diaper_type)
 
-            huckleberry_api.log_diaper(child_uid=child_uid, mode=diaper_type)
+        result = f"Diaper change logged for {child_name}: {diaper_type}"
+        if notes:
+            result += f"\nNotes: {notes}"
 
-            result = f"Diaper change logged for {child_name}: {diaper_type}"
-            if notes:
-                result += f"\nNotes: {notes}"
+        logger.info("✅ Diaper logged successfully")
 
-            logger.info("✅ Diaper logged successfully")
+        return [TextContent(type="text", text=result)]
 
-            return [TextContent(type="text", text=result)]
+    elif name == "log_activity":
+        activity = arguments.get("activity", "activity")
+        notes = arguments.get("notes", "")
 
-        elif name == "log_activity":
-            activity = arguments.get("activity", "activity")
-            notes = arguments.get("notes", "")
+        logger.info(f"Logging activity: {activity}")
 
-            logger.info(f"Logging activity: {activity}")
+        # For now, just acknowledge - Huckleberry doesn't have a specific activity endpoint
+        result = f"Activity logged for {child_name}: {activity}"
+        if notes:
+            result += f"\n{notes}"
 
-            # For now, just acknowledge - Huckleberry doesn't have a specific activity endpoint
-            result = f"Activity logged for {child_name}: {activity}"
-            if notes:
-                result += f"\n{notes}"
+        logger.info("✅ Activity logged")
 
-            logger.info("✅ Activity logged")
+        return [TextContent(type="text", text=result)]
 
-            return [TextContent(type="text", text=result)]
+    elif name == "log_growth":
+        weight_lbs = arguments.get("weight_lbs")
+        height_in = arguments.get("height_in")
+        head_in = arguments.get("head_in")
+
+        logger.info(f"Logging growth: weight={weight_lbs}lbs, height={height_in}in, head={head_in}in")
+
+        huckleberry_api.log_growth(
+            child_uid=child_uid,
+            weight=weight_lbs,
+            height=height_in,
+            head=head_in
+        )
+
+        result = f"Growth measurements logged for {child_name}:"
+        if weight_lbs:
+            result += f"\nWeight: {weight_lbs} lbs"
+        if height_in:
+            result += f"\nHeight: {height_in} in"
+        if head_in:
+            result += f"\nHead: {head_in} in"
+
+        logger.info("✅ Growth logged successfully")
+
+        return [TextContent(type="text", text=result)]
+
+    elif name == "get_recent_activity":
+        hours = arguments.get("hours", 24)
+
+        logger.info(f"Fetching recent activity for last {hours} hours")
 
-        elif name == "log_growth":
-            weight_lbs = arguments.get("weight_lbs")
-            height_in = arguments.get("height_in")
-            head_in = arguments.get("head_in")
+        from datetime import datetime, timedelta
 
-            logger.info(f"Logging growth: weight={weight_lbs}lbs, height={height_in}in, head={head_in}in")
+        # Calculate timestamps
+        now = datetime.now()
+        start_time = now - timedelta(hours=hours)
+        start_timestamp = int(start_time.timestamp())
+        end_timestamp = int(now.timestamp())
 
-            huckleberry_api.log_growth(
+        # Fetch data from Huckleberry API (all queries run concurrently)
+        try:
+            fetch_timings: dict[str, float] = {}
+            frames = huckleberry_api.get_calendar_frames(
                 child_uid=child_uid,
-                weight=weight_lbs,
-                height=height_in,
-                head=head_in
+                start_timestamp=start_timestamp,
+                end_timestamp=end_timestamp,
+                kinds=("sleep", "feed", "diaper"),
+                fetch_timings=fetch_timings
+            )
+            sleep_frame = frames["sleep"]
+            feed_frame = frames["feed"]
+            diaper_frame = frames["diaper"]
+
+            logger.info(
+                f"Fetched recent activity in {fetch_timings['total'] * 1000:.0f}ms ("
+                + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in fetch_timings.items() if k != "total")
+                + ")"
             )
 
-            result = f"Growth measurements logged for {child_name}:"
-            if weight_lbs:
-                result += f"\nWeight: {weight_lbs} lbs"
-            if height_in:
-                result += f"\nHeight: {height_in} in"
-            if head_in:
-                result += f"\nHead: {head_in} in"
+            # Build summary (frames are sorted by start, so the last row is the latest)
+            summary_parts = [f"Recent activity for {child_name} (last {hours} hours):"]
+
+            # Sleep summary
+            if len(sleep_frame):
+                total_sleep_mins = int(sleep_frame.total_duration()) // 60
+                time_since_sleep = (now.timestamp() - sleep_frame.start[-1]) / 3600
+                last_sleep_duration = int(sleep_frame.duration[-1]) // 60
+                summary_parts.append(
+                    f"\n🛌 Sleep: {len(sleep_frame)} session(s), total {total_sleep_mins} minutes. "
+                    f"Last nap was {time_since_sleep:.1f} hours ago ({last_sleep_duration} min)."
+                )
+            else:
+                summary_parts.append("\n🛌 Sleep: No sleep recorded recently.")
+
+            # Feeding summary
+            if len(feed_frame):
+                time_since_feed = (now.timestamp() - feed_frame.start[-1]) / 3600
+                summary_parts.append(
+                    f"\n🍼 Feeding: {len(feed_frame)} session(s). Last fed {time_since_feed:.1f} hours ago."
+                )
+            else:
+                summary_parts.append("\n🍼 Feeding: No feedings recorded recently.")
+
+            # Diaper summary
+            if len(diaper_frame):
+                pee_count = diaper_frame.count(modes=("pee", "both"))
+                poo_count = diaper_frame.count(modes=("poo", "both"))
+                time_since_diaper = (now.timestamp() - diaper_frame.start[-1]) / 3600
+                summary_parts.append(
+                    f"\n🧷 Diapers: {len(diaper_frame)} total ({pee_count} wet, {poo_count} dirty). "
+                    f"Last change {time_since_diaper:.1f} hours ago."
+                )
+            else:
+                summary_parts.append("\n🧷 Diapers: No diaper changes recorded recently.")
 
-            logger.info("✅ Growth logged successfully")
+            result = "".join(summary_parts)
+            logger.info("✅ Activity summary generated")
 
             return [TextContent(type="text", text=result)]
 
-        elif name == "get_recent_activity":
-            hours = arguments.get("hours", 24)
+        except Exception as e:
+            logger.error(f"Error fetching activity data: {e}")
+            return [TextContent(type="text", text=f"Unable to fetch recent activity: {str(e)}")]
 
-            logger.info(f"Fetching recent activity for last {hours} hours")
+    else:
+        raise ValueError(f"Unknown tool: {name}")
 
-            import time
-            from datetime import datetime, timedelta
 
-            # Calculate timestamps
-            now = datetime.now()
-            start_time = now - timedelta(hours=hours)
-            start_timestamp = int(start_time.timestamp())
-            end_timestamp = int(now.timestamp())
+def execute_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Run one tool on a tool_executor thread, remembering logging results for duplicate suppression.
 
-            # Fetch data from Huckleberry API
-            try:
-                sleep_data = huckleberry_api.get_sleep_intervals(
-                    child_uid=child_uid,
-                    start_timestamp=start_timestamp,
-                    end_timestamp=end_timestamp
-                )
+    Remembering here rather than in call_tool keeps the result of a call
+    that the client cancelled while it was already writing.
+    """
+    result = run_tool(name, arguments)
+    if name in DEDUPLICATED_TOOLS and duplicate_suppressor is not None:
+        duplicate_suppressor.remember(name, arguments, child_uid, result)
+    return result
 
-                feed_data = huckleberry_api.get_feed_intervals(
-                    child_uid=child_uid,
-                    start_timestamp=start_timestamp,
-                    end_timestamp=end_timestamp
-                )
 
-                diaper_data = huckleberry_api.get_diaper_intervals(
-                    child_uid=child_uid,
-                    start_timestamp=start_timestamp,
-                    end_timestamp=end_timestamp
+@server.call_tool()
+async def call_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Handle tool calls."""
+    logger.info(f"Tool called: {name} with args: {arguments}")
+    loop = asyncio.get_running_loop()
+
+    # Lazy initialization of Huckleberry API
+    if huckleberry_api is None:
+        if init_lock.locked():
+            logger.info("Waiting for the in-flight Huckleberry initialization...")
+        async with init_lock:
+            if huckleberry_api is None:
+                try:
+                    logger.info("Lazy-initializing Huckleberry API...")
+                    await loop.run_in_executor(tool_executor, init_huckleberry)
+                except Exception as e:
+                    logger.error(f"Failed to initialize Huckleberry: {e}")
+                    return [TextContent(
+                        type="text",
+                        text=f"ERROR: Unable to connect to Huckleberry API: {str(e)}"
+                    )]
+
+    slots = tool_slots.get(name)
+    if slots is None:
+        slots = tool_slots[name] = asyncio.Semaphore(TOOL_CONCURRENCY.get(name, 1))
+    await slots.acquire()
+    try:
+        # The voice agent may re-issue a logging call after an interruption:
+        # answer an identical recent call with its original result, no write
+        if name in DEDUPLICATED_TOOLS and duplicate_suppressor is not None:
+            previous = duplicate_suppressor.lookup(name, arguments, child_uid)
+            if previous is not None:
+                logger.info(
+                    f"Suppressed duplicate {name} call ({duplicate_suppressor.suppressed_total} suppressed so far)"
                 )
+                slots.release()
+                return previous
 
-                # Build summary
-                summary_parts = [f"Recent activity for {child_name} (last {hours} hours):"]
-
-                # Sleep summary
-                if sleep_data:
-                    total_sleep_mins = sum(s.get('duration', 0) for s in sleep_data) // 60
-                    last_sleep = sleep_data[-1] if sleep_data else None
-                    if last_sleep:
-                        last_sleep_time = datetime.fromtimestamp(last_sleep['start'])
-                        time_since_sleep = (now - last_sleep_time).total_seconds() / 3600
-                        last_sleep_duration = last_sleep.get('duration', 0) // 60
-                        summary_parts.append(
-                            f"\n🛌 Sleep: {len(sleep_data)} session(s), total {total_sleep_mins} minutes. "
-                            f"Last nap was {time_since_sleep:.1f} hours ago ({last_sleep_duration} min)."
-                        )
-                    else:
-                        summary_parts.append(f"\n🛌 Sleep: {len(sleep_data)} session(s), total {total_sleep_mins} minutes.")
-                else:
-                    summary_parts.append("\n🛌 Sleep: No sleep recorded recently.")
-
-                # Feeding summary
-                if feed_data:
-                    last_feed = feed_data[-1] if feed_data else None
-                    if last_feed:
-                        last_feed_time = datetime.fromtimestamp(last_feed['start'])
-                        time_since_feed = (now - last_feed_time).total_seconds() / 3600
-                        summary_parts.append(
-                            f"\n🍼 Feeding: {len(feed_data)} session(s). Last fed {time_since_feed:.1f} hours ago."
-                        )
-                    else:
-                        summary_parts.append(f"\n🍼 Feeding: {len(feed_data)} session(s).")
-                else:
-                    summary_parts.append("\n🍼 Feeding: No feedings recorded recently.")
-
-                # Diaper summary
-                if diaper_data:
-                    pee_count = sum(1 for d in diaper_data if d.get('mode') in ['pee', 'both'])
-                    poo_count = sum(1 for d in diaper_data if d.get('mode') in ['poo', 'both'])
-                    last_diaper = diaper_data[-1] if diaper_data else None
-                    if last_diaper:
-                        last_diaper_time = datetime.fromtimestamp(last_diaper['start'])
-                        time_since_diaper = (now - last_diaper_time).total_seconds() / 3600
-                        summary_parts.append(
-                            f"\n🧷 Diapers: {len(diaper_data)} total ({pee_count} wet, {poo_count} dirty). "
-                            f"Last change {time_since_diaper:.1f} hours ago."
-                        )
-                    else:
-                        summary_parts.append(f"\n🧷 Diapers: {len(diaper_data)} total ({pee_count} wet, {poo_count} dirty).")
-                else:
-                    summary_parts.append("\n🧷 Diapers: No diaper changes recorded recently.")
-
-                result = "".join(summary_parts)
-                logger.info("✅ Activity summary generated")
-
-                return [TextContent(type="text", text=result)]
-
-            except Exception as e:
-                logger.error(f"Error fetching activity data: {e}")
-                return [TextContent(type="text", text=f"Unable to fetch recent activity: {str(e)}")]
+        future = tool_executor.submit(execute_tool, name, arguments)
+    except BaseException:
+        slots.release()
+        raise
+    # The slot is held until the thread is done, even if the caller stops waiting
+    future.add_done_callback(lambda _future: loop.call_soon_threadsafe(slots.release))
 
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Sent when the MCP client cancels the request: a call still queued
+        # never runs; one already running cannot be interrupted and finishes
+        # in the background with its result discarded
+        if future.cancel():
+            logger.info(f"{name} cancelled before it started")
         else:
-            raise ValueError(f"Unknown tool: {name}")
-
+            logger.info(f"{name} cancelled; the running call finishes in the background")
+        raise
     except Exception as e:
         logger.error(f"Error executing {name}: {e}")
         return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -438,15 +621,24 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
 async def main():
     """Run the MCP server."""
+    global warmup_task
     logger.info("🍓 Starting Huckleberry MCP stdio server...")
     logger.info(f"   Tools: log_sleep, log_feeding, log_diaper, log_activity, log_growth, get_recent_activity")
 
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            startup_timer.mark("stdio ready")
+            startup_timer.report(logger)
+            if warmup_enabled:
+                warmup_task = asyncio.create_task(warm_up())
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        # Drop queued tool calls; running ones finish before the interpreter exits
+        tool_executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
@@ -3,13 +3,28 @@ Huckleberry API Service - REST API for baby activity tracking
 
 Provides HTTP endpoints for logging baby activities to Huckleberry.
 Deployed as a separate Cloud Run service from Abby.
+
+Per-operation client latency, Firestore reads/writes and cache hits are
+exported in the OpenMetrics format at /metrics.
+
+The Huckleberry client (httpx, gRPC) is imported, signed in and pointed at
+a child by a background warm-up task, so the server answers /health
+("starting") as soon as it is up; requests arriving during warm-up wait
+for it. Set STARTUP_TIMING=1 to log a startup phase breakdown.
 """
 
+import time
+
+_process_started = time.perf_counter()
+
+import asyncio
+import functools
+import importlib
 import os
 import sys
 from pathlib import Path
-from typing import Optional
-from fastapi import FastAPI, HTTPException
+from typing import TYPE_CHECKING, Optional
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 import logging
 
@@ -17,7 +32,14 @@ import logging
 specs_dir = Path(__file__).parent.parent.parent / "specs"
 sys.path.insert(0, str(specs_dir))
 
-from huckleberry_api.api import HuckleberryAPI
+from startup_timing import StartupTimer
+
+startup_timer = StartupTimer(_process_started)
+
+if TYPE_CHECKING:
+    from huckleberry_api.async_api import AsyncHuckleberryAPI
+    from huckleberry_api.dedup import DuplicateSuppressor
+    from huckleberry_api.metrics import MetricsCollector
 
 # Configure logging
 logging.basicConfig(
@@ -26,17 +48,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+startup_timer.mark("import fastapi")
+
 app = FastAPI(title="Huckleberry API Service", version="1.0.0")
+startup_timer.mark("create app")
 
 # Global API instance
-huckleberry_api: Optional[HuckleberryAPI] = None
+huckleberry_api: Optional["AsyncHuckleberryAPI"] = None
 child_uid: Optional[str] = None
 child_name: str = "Baby"
+metrics_collector: Optional["MetricsCollector"] = None  # Client operation metrics, served at /metrics
+# Repeats of a logging request within HUCKLEBERRY_DEDUP_WINDOW seconds get the original response
+duplicate_suppressor: Optional["DuplicateSuppressor"] = None
+warmup_task: Optional[asyncio.Task] = None  # Background init_huckleberry, started at startup
+# Logging requests still running, by DuplicateSuppressor fingerprint; repeats wait on them
+requests_in_flight: dict[str, asyncio.Future] = {}
+
 
+async def init_huckleberry():
+    """Initialize Huckleberry API client.
 
-def init_huckleberry():
-    """Initialize Huckleberry API client."""
-    global huckleberry_api, child_uid, child_name
+    The client is published last: a non-None huckleberry_api is signed in
+    and has a child selected.
+    """
+    global huckleberry_api, child_uid, child_name, metrics_collector, duplicate_suppressor
 
     email = os.getenv("HUCKLE_USER_ID")
     password = os.getenv("HUCKLE_PW")
@@ -46,44 +81,120 @@ def init_huckleberry():
 
     logger.info(f"Initializing Huckleberry API for {email}")
 
-    huckleberry_api = HuckleberryAPI(email=email, password=password)
-    huckleberry_api.authenticate()
-
-    logger.info(f"Authenticated - User UID: {huckleberry_api.user_uid}")
-
-    # Get first child
-    children = huckleberry_api.get_children()
-    if not children:
-        raise ValueError("No children found in Huckleberry account")
-
-    child_uid = children[0]['uid']
-    child_name = children[0]['name']
+    # Load the client off the event loop so /health keeps answering meanwhile
+    await asyncio.to_thread(importlib.import_module, "huckleberry_api.async_api")
+    from huckleberry_api.async_api import AsyncHuckleberryAPI
+    from huckleberry_api.dedup import DuplicateSuppressor
+    from huckleberry_api.metrics import MetricsCollector
+    from huckleberry_api.token_cache import FileTokenCache
+
+    startup_timer.mark("import huckleberry_api")
+
+    # Optional persistent session cache so a cold start skips password sign-in
+    token_cache_path = os.getenv("HUCKLEBERRY_TOKEN_CACHE")
+    token_cache = (
+        FileTokenCache(token_cache_path, key=os.getenv("HUCKLEBERRY_TOKEN_CACHE_KEY"))
+        if token_cache_path else None
+    )
+    metrics_collector = MetricsCollector()
+    duplicate_suppressor = DuplicateSuppressor(window=float(os.getenv("HUCKLEBERRY_DEDUP_WINDOW", "120")))
+    api = AsyncHuckleberryAPI(
+        email=email, password=password, token_cache=token_cache, hooks=[metrics_collector]
+    )
+    try:
+        await api.authenticate()
+        # Rotate tokens ahead of expiry so requests never wait on a refresh
+        await api.start_token_refresher()
+        startup_timer.mark("authenticate")
+
+        logger.info(f"Authenticated - User UID: {api.user_uid}")
+
+        # All children on the account (one batched read, then cached); HUCKLEBERRY_CHILD
+        # picks one by name or uid, otherwise the child last used in the app
+        children = await api.get_children()
+        if not children:
+            raise ValueError("No children found in Huckleberry account")
+    except BaseException:
+        await api.close()
+        raise
+
+    wanted = os.getenv("HUCKLEBERRY_CHILD", "").strip()
+    child = next(
+        (c for c in children if wanted and (wanted == c['uid'] or wanted.lower() == c['name'].lower())), None
+    )
+    if child is None:
+        if wanted:
+            logger.warning(f"No child matching HUCKLEBERRY_CHILD={wanted!r}, using {children[0]['name']}")
+        child = children[0]
+
+    child_uid = child['uid']
+    child_name = child['name']
+    startup_timer.mark("get children")
+    logger.info(f"Found {len(children)} children: {', '.join(c['name'] for c in children)}")
     logger.info(f"Using child: {child_name} (UID: {child_uid})")
+    huckleberry_api = api
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize Huckleberry on startup."""
+async def warm_up():
+    """Initialize Huckleberry in the background and log the startup timing once done."""
     try:
-        init_huckleberry()
+        await init_huckleberry()
         logger.info("Huckleberry API initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize Huckleberry: {e}")
         # Don't exit - let health check fail instead
+    startup_timer.mark("warm-up done")
+    startup_timer.report(logger)
+
+
+async def wait_for_warmup():
+    """Let a request that arrives during warm-up wait for it instead of failing."""
+    if warmup_task is not None and not warmup_task.done():
+        await asyncio.shield(warmup_task)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start initializing Huckleberry without holding up the server."""
+    global warmup_task
+    warmup_task = asyncio.create_task(warm_up())
+    startup_timer.mark("serving")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close Huckleberry network clients."""
+    if huckleberry_api is not None:
+        await huckleberry_api.close()
 
 
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
+    """Health check endpoint (ready while warm-up runs; 503 if it failed)."""
     if huckleberry_api is None:
+        if warmup_task is not None and not warmup_task.done():
+            return {"status": "starting"}
         raise HTTPException(status_code=503, detail="Huckleberry API not initialized")
     return {
         "status": "healthy",
         "child": child_name,
-        "child_uid": child_uid
+        "child_uid": child_uid,
+        "client_rebuilds_avoided": huckleberry_api.client_rebuilds_avoided,
+        "duplicates_suppressed": dict(duplicate_suppressor.suppressed) if duplicate_suppressor else {},
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Client operation metrics in the OpenMetrics text format."""
+    if metrics_collector is None:
+        raise HTTPException(status_code=503, detail="Huckleberry API not initialized")
+
+    from huckleberry_api.metrics import OPENMETRICS_CONTENT_TYPE
+
+    return Response(content=metrics_collector.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+
 # Request models
 class LogSleepRequest(BaseModel):
     duration_minutes: int
@@ -112,8 +223,57 @@ class LogGrowthRequest(BaseModel):
     head_in: Optional[float] = None
 
 
+def deduplicated(handler):
+    """Answer a repeat of a recent identical logging request with the original response.
+
+    Voice agents re-issue calls after interruptions; the repeat must not
+    write the event twice. A repeat arriving while the original is still
+    running waits for its response. Failed requests (HTTPException) are
+    not remembered: requests waiting on them get the same error, and later
+    repeats run again.
+    """
+    @functools.wraps(handler)
+    async def wrapper(request: BaseModel):
+        await wait_for_warmup()
+        if duplicate_suppressor is None:
+            return await handler(request)
+        arguments = request.model_dump()
+        previous = duplicate_suppressor.lookup(handler.__name__, arguments, child_uid)
+        if previous is not None:
+            logger.info(
+                f"Suppressed duplicate {handler.__name__} ({duplicate_suppressor.suppressed_total} suppressed so far)"
+            )
+            return previous
+        key = duplicate_suppressor.fingerprint(handler.__name__, arguments, child_uid)
+        running = requests_in_flight.get(key)
+        if running is not None:
+            logger.info(f"Duplicate {handler.__name__} is waiting for the identical request in progress")
+            return await asyncio.shield(running)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome retrieved even if no duplicate ever waits on it
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        requests_in_flight[key] = future
+        try:
+            response = await handler(request)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            duplicate_suppressor.remember(handler.__name__, arguments, child_uid, response)
+            future.set_result(response)
+        finally:
+            del requests_in_flight[key]
+        return response
+    return wrapper
+
+
 # Endpoints
 @app.post("/log-sleep")
+@deduplicated
 async def log_sleep(request: LogSleepRequest):
     """Log a completed sleep session."""
     if not huckleberry_api:
@@ -121,8 +281,13 @@ async def log_sleep(request: LogSleepRequest):
 
     try:
         logger.info(f"Logging sleep: {request.duration_minutes} minutes")
-        huckleberry_api.start_sleep(child_uid=child_uid)
-        huckleberry_api.complete_sleep(child_uid=child_uid)
+        # Record a sleep that ended now and lasted duration_minutes
+        duration_sec = request.duration_minutes * 60
+        await huckleberry_api.import_intervals(
+            child_uid,
+            [{"type": "sleep", "start": time.time() - duration_sec, "duration": duration_sec, "notes": request.notes}],
+            update_prefs=True,
+        )
         return {
             "success": True,
             "message": f"Logged {request.duration_minutes} minute sleep for {child_name}"
@@ -133,6 +298,7 @@ async def log_sleep(request: LogSleepRequest):
 
 
 @app.post("/log-feeding")
+@deduplicated
 async def log_feeding(request: LogFeedingRequest):
     """Log a feeding session."""
     if not huckleberry_api:
@@ -140,7 +306,7 @@ async def log_feeding(request: LogFeedingRequest):
 
     try:
         logger.info(f"Logging feeding: {request.amount_oz}oz {request.feeding_type}")
-        huckleberry_api.log_bottle_feeding(
+        await huckleberry_api.log_bottle_feeding(
             child_uid=child_uid,
             amount_oz=request.amount_oz,
             notes=request.notes
@@ -155,6 +321,7 @@ async def log_feeding(request: LogFeedingRequest):
 
 
 @app.post("/log-diaper")
+@deduplicated
 async def log_diaper(request: LogDiaperRequest):
     """Log a diaper change."""
     if not huckleberry_api:
@@ -162,7 +329,7 @@ async def log_diaper(request: LogDiaperRequest):
 
     try:
         logger.info(f"Logging diaper: {request.diaper_type}")
-        huckleberry_api.log_diaper(
+        await huckleberry_api.log_diaper(
             child_uid=child_uid,
             mode=request.diaper_type,
             notes=request.notes
@@ -177,6 +344,7 @@ async def log_diaper(request: LogDiaperRequest):
 
 
 @app.post("/log-activity")
+@deduplicated
 async def log_activity(request: LogActivityRequest):
     """Log a general activity."""
     if not huckleberry_api:
@@ -184,7 +352,7 @@ async def log_activity(request: LogActivityRequest):
 
     try:
         logger.info(f"Logging activity: {request.activity}")
-        huckleberry_api.log_activity(
+        await huckleberry_api.log_activity(
             child_uid=child_uid,
             activity=request.activity,
             notes=request.notes
@@ -201,16 +369,34 @@ async def log_activity(request: LogActivityRequest):
 @app.get("/recent-activity")
 async def get_recent_activity(hours: int = 24):
     """Get recent activity summary."""
+    await wait_for_warmup()
     if not huckleberry_api:
         raise HTTPException(status_code=503, detail="Huckleberry API not initialized")
 
     try:
         logger.info(f"Fetching recent activity for last {hours} hours")
-        # This would need to be implemented in huckleberry_api
+        end_timestamp = int(time.time())
+        start_timestamp = end_timestamp - hours * 3600
+
+        # Sleep and feed totals are server-side aggregations (one read each);
+        # the diaper count and its wet/dirty split come from one listing
+        (sleep_count, sleep_seconds), (feed_count, feed_seconds), diapers = await asyncio.gather(
+            huckleberry_api.interval_totals(child_uid, "sleep", start_timestamp, end_timestamp),
+            huckleberry_api.interval_totals(child_uid, "feed", start_timestamp, end_timestamp),
+            huckleberry_api.get_interval_frame(child_uid, "diaper", start_timestamp, end_timestamp),
+        )
+        diaper_count = len(diapers)
+        wet_count = diapers.count(modes=("pee", "both"))
+        dirty_count = diapers.count(modes=("poo", "both"))
         return {
             "success": True,
             "message": f"Recent activity for {child_name}",
-            "data": {}  # TODO: Implement in huckleberry_api
+            "data": {
+                "hours": hours,
+                "sleep": {"count": sleep_count, "total_minutes": int(sleep_seconds) // 60},
+                "feed": {"count": feed_count, "total_minutes": int(feed_seconds) // 60},
+                "diaper": {"count": diaper_count, "wet": wet_count, "dirty": dirty_count},
+            },
         }
     except Exception as e:
         logger.error(f"Error fetching recent activity: {e}")
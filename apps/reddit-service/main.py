@@ -3,17 +3,39 @@ Reddit Parenting Tips Service - REST API for fetching parenting tips
 
 Fetches posts from parenting subreddits and provides them to Abby.
 Read-only, no posting or commenting.
+
+praw is imported and the client built by a background warm-up task, so
+the server answers /health ("starting") as soon as it is up; requests
+arriving during warm-up wait for it. Set STARTUP_TIMING=1 to log a
+startup phase breakdown.
 """
 
+import time
+
+_process_started = time.perf_counter()
+
+import asyncio
 import os
 import random
-from typing import List, Optional
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
 from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
-import praw
 from datetime import datetime, timedelta
 import logging
 
+# Add specs folder to path (shared startup timing)
+specs_dir = Path(__file__).parent.parent.parent / "specs"
+sys.path.insert(0, str(specs_dir))
+
+from startup_timing import StartupTimer
+
+startup_timer = StartupTimer(_process_started)
+
+if TYPE_CHECKING:
+    import praw
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,7 +43,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+startup_timer.mark("import fastapi")
+
 app = FastAPI(title="Reddit Parenting Tips Service", version="1.0.0")
+startup_timer.mark("create app")
 
 # Parenting subreddits to monitor (North America + worldwide)
 SUBREDDITS = [
@@ -38,7 +63,8 @@ SUBREDDITS = [
 ]
 
 # Reddit API client
-reddit: Optional[praw.Reddit] = None
+reddit: Optional["praw.Reddit"] = None
+warmup_task: Optional[asyncio.Task] = None  # Background init_reddit, started at startup
 
 # Cache for tips
 tips_cache = {
@@ -61,6 +87,10 @@ def init_reddit():
 
     logger.info(f"Initializing Reddit API client (user agent: {user_agent})")
 
+    import praw
+
+    startup_timer.mark("import praw")
+
     reddit = praw.Reddit(
         client_id=client_id,
         client_secret=client_secret,
@@ -70,21 +100,39 @@ def init_reddit():
     logger.info("✅ Reddit API initialized (read-only mode)")
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize Reddit on startup."""
+async def warm_up():
+    """Initialize Reddit in the background and log the startup timing once done."""
     try:
-        init_reddit()
+        # Off the event loop: importing praw takes long enough to stall /health
+        await asyncio.to_thread(init_reddit)
         logger.info("Reddit service started successfully")
     except Exception as e:
         logger.error(f"Failed to initialize Reddit: {e}")
         # Don't exit - let health check fail instead
+    startup_timer.mark("warm-up done")
+    startup_timer.report(logger)
+
+
+async def wait_for_warmup():
+    """Let a request that arrives during warm-up wait for it instead of failing."""
+    if warmup_task is not None and not warmup_task.done():
+        await asyncio.shield(warmup_task)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start initializing Reddit without holding up the server."""
+    global warmup_task
+    warmup_task = asyncio.create_task(warm_up())
+    startup_timer.mark("serving")
 
 
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
+    """Health check endpoint (ready while warm-up runs; 503 if it failed)."""
     if reddit is None:
+        if warmup_task is not None and not warmup_task.done():
+            return {"status": "starting"}
         raise HTTPException(status_code=503, detail="Reddit API not initialized")
     return {
         "status": "healthy",
@@ -176,6 +224,7 @@ async def get_recent_tips(
     limit: int = Query(20, ge=1, le=100, description="Number of tips to return")
 ):
     """Get recent parenting tips from Reddit."""
+    await wait_for_warmup()
     update_cache_if_needed()
 
     tips = tips_cache["tips"]
@@ -192,6 +241,7 @@ async def get_random_tip(
     category: Optional[str] = Query(None, description="Filter by category")
 ):
     """Get a random parenting tip."""
+    await wait_for_warmup()
     update_cache_if_needed()
 
     tips = tips_cache["tips"]
@@ -215,6 +265,7 @@ async def search_tips(
     limit: int = Query(10, ge=1, le=50, description="Number of results")
 ):
     """Search tips by keyword."""
+    await wait_for_warmup()
     update_cache_if_needed()
 
     query_lower = query.lower()
@@ -229,6 +280,7 @@ async def search_tips(
 @app.get("/categories")
 async def get_categories():
     """Get available categories with counts."""
+    await wait_for_warmup()
     update_cache_if_needed()
 
     categories = {}
@@ -245,6 +297,7 @@ async def get_categories():
 async def refresh_cache():
     """Manually refresh the tips cache."""
     logger.info("Manual cache refresh requested")
+    await wait_for_warmup()
     tips_cache["tips"] = fetch_tips_from_reddit()
     tips_cache["last_updated"] = datetime.now()
 
@@ -1,7 +1,17 @@
 """Huckleberry API client for Python."""
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from .api import HuckleberryAPI
+from .dedup import DuplicateSuppressor
+from .frame import IntervalFrame
+from .instrumentation import OperationHook, OperationStats
+from .metrics import MetricsCollector
+from .mirror import IntervalMirror
+from .multi_cache import MultiEntryCache
+from .token_cache import FileTokenCache, MemoryTokenCache, TokenCache
+from .transport import FirestoreTransport, GrpcTransport, RestTransport
 from .types import (
     ChildData,
     DiaperData,
@@ -15,9 +25,28 @@ from .types import (
     SleepIntervalData,
     SleepTimerData,
 )
+from .write_queue import WriteQueue
+
+if TYPE_CHECKING:
+    from .async_api import AsyncHuckleberryAPI
 
 __all__ = [
     "HuckleberryAPI",
+    "AsyncHuckleberryAPI",
+    "DuplicateSuppressor",
+    "IntervalFrame",
+    "MetricsCollector",
+    "OperationHook",
+    "OperationStats",
+    "IntervalMirror",
+    "MultiEntryCache",
+    "FileTokenCache",
+    "MemoryTokenCache",
+    "TokenCache",
+    "FirestoreTransport",
+    "GrpcTransport",
+    "RestTransport",
+    "WriteQueue",
     "ChildData",
     "DiaperData",
     "DiaperDocumentData",
@@ -30,3 +59,12 @@ __all__ = [
     "SleepIntervalData",
     "SleepTimerData",
 ]
+
+
+def __getattr__(name: str):
+    """Import the async client (and gRPC) only when it is used."""
+    if name == "AsyncHuckleberryAPI":
+        from .async_api import AsyncHuckleberryAPI
+
+        return AsyncHuckleberryAPI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
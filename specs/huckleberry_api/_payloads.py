@@ -0,0 +1,778 @@
+"""Document payloads, decoders and aggregation helpers shared by both clients.
+
+Pure functions over plain dicts: HuckleberryAPI and AsyncHuckleberryAPI
+build the same documents and read them back the same way, and only differ
+in how they talk to Firestore.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, Literal, Mapping, cast
+
+from .frame import frame_row
+from .types import (
+    ChildData,
+    FirebaseDiaperInterval,
+    FirebaseFeedDocument,
+    FirebaseGrowthData,
+    FirebaseSleepDocument,
+    GrowthData,
+    LastDiaperData,
+    LastNursingData,
+    LastSideData,
+    LastSleepData,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Type aliases for known string values
+CollectionName = Literal["sleep", "feed", "health", "diaper"]
+FeedSide = Literal["left", "right"]
+DiaperMode = Literal["pee", "poo", "both", "dry"]
+DiaperAmount = Literal["little", "medium", "big"]
+PooColor = Literal["yellow", "brown", "black", "green", "red", "gray"]
+PooConsistency = Literal["solid", "loose", "runny", "mucousy", "hard", "pebbles", "diarrhea"]
+MeasurementUnits = Literal["metric", "imperial"]
+
+
+# App uses: 0.0 = "little", 50.0 = "medium", 100.0 = "big"
+# Other values are treated as no quantity indicator
+_DIAPER_AMOUNTS: dict[str, float] = {"little": 0.0, "medium": 50.0, "big": 100.0}
+
+
+def _new_session_uuid() -> str:
+    """Generate a unique session UUID (16 hex characters like the app)."""
+    return uuid.uuid4().hex[:16]
+
+
+def _new_interval_id(timestamp: float) -> str:
+    """Create an interval document ID (timestamp in ms + random suffix)."""
+    return f"{int(timestamp * 1000)}-{uuid.uuid4().hex[:20]}"
+
+
+def _sleep_timer_payload(now: float) -> FirebaseSleepDocument:
+    """Build the active sleep timer written by start_sleep.
+
+    Matches the structure from the Huckleberry app.
+    """
+    return {
+        "timer": {
+            "active": True,
+            "paused": False,
+            "timestamp": {"seconds": now},
+            "local_timestamp": now,
+            "timerStartTime": now * 1000,  # Milliseconds timestamp
+            "uuid": _new_session_uuid(),  # Unique session identifier
+            "details": {
+                "startSleepCondition": {
+                    "happy": False,
+                    "longTimeToFallAsleep": False,
+                    "10-20_minutes": False,
+                    "upset": False,
+                    "under_10_minutes": False,
+                },
+                "sleepLocations": {
+                    "car": False,
+                    "nursing": False,
+                    "wornOrHeld": False,
+                    "stroller": False,
+                    "coSleep": False,
+                    "nextToCarer": False,
+                    "onOwnInBed": False,
+                    "bottle": False,
+                    "swing": False,
+                },
+                "endSleepCondition": {
+                    "happy": False,
+                    "wokeUpChild": False,
+                    "upset": False,
+                },
+            },
+        }
+    }
+
+
+def _inactive_sleep_timer(session_uuid: str, now: float) -> dict:
+    """Build the inactive sleep timer (app expects it to remain, not be deleted)."""
+    return {
+        "active": False,
+        "paused": False,
+        "timestamp": {"seconds": now},
+        "timerStartTime": None,
+        "uuid": session_uuid,
+        "local_timestamp": now,
+    }
+
+
+def _sleep_completion(timer: dict, child_uid: str, now: float) -> tuple[int, int] | None:
+    """Compute (start_sec, duration_sec) for completing a sleep timer.
+
+    Returns None if the timer has no usable start time.
+    """
+    timer_start_ms = timer.get("timerStartTime")
+    if not timer_start_ms:
+        # Attempt fallback: reconstruct using timestamp.seconds if available
+        ts_seconds = timer.get("timestamp", {}).get("seconds")
+        if not ts_seconds:
+            _LOGGER.warning("Missing timerStartTime; cannot compute duration for %s", child_uid)
+            return None
+        timer_start_ms = int(float(ts_seconds) * 1000)
+        _LOGGER.warning("timerStartTime missing; falling back to timestamp.seconds for %s", child_uid)
+
+    # If sleep is paused, use timerEndTime as the end time (not current time)
+    if timer.get("paused", False) and "timerEndTime" in timer:
+        end_ms = timer["timerEndTime"]
+        _LOGGER.info("Sleep is paused, using timerEndTime for completion")
+    else:
+        end_ms = now * 1000
+
+    duration_sec = int((end_ms - float(timer_start_ms)) / 1000)
+    start_sec = int(float(timer_start_ms) / 1000)
+    return start_sec, duration_sec
+
+
+def _sleep_interval_payload(interval_id: str, start_sec: int, duration_sec: int, details: dict, now: float) -> dict:
+    """Build a sleep interval document."""
+    return {
+        "_id": interval_id,
+        "start": start_sec,
+        "duration": duration_sec,
+        "offset": -120.0,
+        "end_offset": -120.0,
+        "details": details,
+        "lastUpdated": now,
+    }
+
+
+def _sleep_prefs_update(start_sec: int, duration_sec: int, now: float) -> dict:
+    """Build the prefs.lastSleep update for a recorded sleep."""
+    last_sleep_data: LastSleepData = {
+        "start": start_sec,
+        "duration": duration_sec,
+        "offset": -120.0,
+    }
+    return {
+        "prefs.lastSleep": last_sleep_data,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+
+
+def _sleep_completion_writes(timer: dict, start_sec: int, duration_sec: int, now: float) -> tuple[str, dict, dict]:
+    """Build (interval_id, interval document, sleep doc update) for a completed sleep."""
+    interval_id = _new_session_uuid()
+    interval = _sleep_interval_payload(interval_id, start_sec, duration_sec, timer.get("details", {}), now)
+    update = {
+        "timer": _inactive_sleep_timer(timer.get("uuid", _new_session_uuid()), now),
+        **_sleep_prefs_update(start_sec, duration_sec, now),
+    }
+    return interval_id, interval, update
+
+
+def _feed_timer_payload(now: float, side: FeedSide) -> FirebaseFeedDocument:
+    """Build the active feed timer written by start_feeding."""
+    return {
+        "timer": {
+            "active": True,
+            "paused": False,
+            "timestamp": {"seconds": now},
+            "local_timestamp": now,
+            "feedStartTime": now,
+            "timerStartTime": now,
+            "uuid": _new_session_uuid(),
+            "leftDuration": 0.0,
+            "rightDuration": 0.0,
+            "lastSide": "left",  # Always start with lastSide as left
+            "activeSide": side,  # activeSide indicates which side is currently feeding
+        }
+    }
+
+
+def _inactive_feed_timer(session_uuid: str, now: float) -> dict:
+    """Build the inactive feed timer written by cancel_feeding."""
+    return {
+        "active": False,
+        "paused": False,
+        "timestamp": {"seconds": now},
+        "timerStartTime": None,
+        "uuid": session_uuid,
+        "local_timestamp": now,
+        "leftDuration": 0.0,
+        "rightDuration": 0.0,
+        "lastSide": "left",
+    }
+
+
+def _accumulate_feed_sides(timer: dict, now: float) -> tuple[float, float]:
+    """Add the time elapsed on the active side to the accumulated side durations."""
+    left_duration = timer.get("leftDuration", 0.0)
+    right_duration = timer.get("rightDuration", 0.0)
+    elapsed = now - timer.get("timerStartTime", now)
+
+    if timer.get("activeSide", timer.get("lastSide", "left")) == "left":
+        left_duration += elapsed
+    else:
+        right_duration += elapsed
+    return left_duration, right_duration
+
+
+def _feed_completion_writes(timer: dict, now: float, delete_field: object) -> tuple[str, dict, dict, float]:
+    """Build (interval_id, interval document, feed doc update, total duration) for a completed feeding.
+
+    The caller must have checked that timerStartTime is set.
+    """
+    # timerStartTime is in seconds for feeding
+    timer_start_sec = float(timer["timerStartTime"])
+
+    # Add elapsed time on current side if not paused
+    if not timer.get("paused", False):
+        left_duration, right_duration = _accumulate_feed_sides(timer, now)
+    else:
+        left_duration = timer.get("leftDuration", 0.0)
+        right_duration = timer.get("rightDuration", 0.0)
+
+    # Calculate total duration from accumulated durations
+    total_duration = left_duration + right_duration
+    feed_start_time = timer.get("feedStartTime", timer_start_sec)
+
+    # Determine last side for history
+    last_side_value = timer.get("activeSide", timer.get("lastSide", "right"))
+    if last_side_value == "none":
+        last_side_value = "right" if right_duration >= left_duration else "left"
+
+    interval_id = _new_interval_id(now)
+    interval = _feed_interval_payload(feed_start_time, left_duration, right_duration, last_side_value, now)
+
+    # Update to inactive and save to lastNursing
+    update = {
+        "timer.active": False,
+        "timer.paused": True,
+        "timer.timestamp": {"seconds": now},
+        "timer.local_timestamp": now,
+        "timer.lastSide": last_side_value,
+        "timer.leftDuration": delete_field,  # Remove durations from timer
+        "timer.rightDuration": delete_field,
+        "timer.activeSide": delete_field,  # Remove activeSide
+        **_feed_prefs_update(feed_start_time, left_duration, right_duration, last_side_value, now),
+    }
+    return interval_id, interval, update, total_duration
+
+
+def _feed_interval_payload(start: float, left_duration: float, right_duration: float, last_side: str, now: float) -> dict:
+    """Build a breast feeding interval document.
+
+    left_duration and right_duration are in seconds, like in every other
+    feed document (frames and aggregations rely on it).
+    """
+    return {
+        "mode": "breast",
+        "start": start,
+        "lastSide": last_side,
+        "lastUpdated": now,
+        "leftDuration": left_duration,
+        "rightDuration": right_duration,
+        "offset": -120.0,
+        "end_offset": -120.0,
+    }
+
+
+def _feed_prefs_update(start: float, left_duration: float, right_duration: float, last_side: str, now: float) -> dict:
+    """Build the prefs.lastNursing / prefs.lastSide update for a recorded feeding."""
+    last_nursing_data: LastNursingData = {
+        "mode": "breast",
+        "start": start,
+        "duration": left_duration + right_duration,
+        "leftDuration": left_duration,
+        "rightDuration": right_duration,
+        "offset": -120.0,
+    }
+    last_side_data: LastSideData = {
+        "start": start,
+        "lastSide": last_side,
+    }
+    return {
+        "prefs.lastNursing": last_nursing_data,
+        "prefs.lastSide": last_side_data,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+
+
+def _diaper_interval_payload(
+    now: float, mode: DiaperMode,
+    pee_amount: DiaperAmount | None, poo_amount: DiaperAmount | None,
+    color: PooColor | None, consistency: PooConsistency | None,
+    diaper_rash: bool, notes: str | None,
+    start: float | None = None,
+) -> FirebaseDiaperInterval:
+    """Build a diaper interval document (matching app behavior - minimal fields by default).
+
+    start defaults to now; set it to record a past change.
+    """
+    interval_data: FirebaseDiaperInterval = {
+        "start": now if start is None else start,
+        "lastUpdated": now,
+        "mode": mode,
+        "offset": -120.0,  # Timezone offset (adjust as needed)
+    }
+
+    # Add quantity field if amounts are specified
+    quantity = {}
+    if pee_amount and pee_amount in _DIAPER_AMOUNTS:
+        quantity["pee"] = _DIAPER_AMOUNTS[pee_amount]
+    if poo_amount and poo_amount in _DIAPER_AMOUNTS:
+        quantity["poo"] = _DIAPER_AMOUNTS[poo_amount]
+    if quantity:
+        interval_data["quantity"] = quantity
+
+    # Add optional fields if provided
+    if color:
+        interval_data["color"] = color
+    if consistency:
+        interval_data["consistency"] = consistency
+    if diaper_rash:
+        interval_data["diaperRash"] = True  # type: ignore # Not in TypedDict yet
+    if notes:
+        interval_data["notes"] = notes  # type: ignore # Not in TypedDict yet
+    return interval_data
+
+
+def _diaper_prefs_update(now: float, mode: DiaperMode, start: float | None = None) -> dict:
+    """Build the prefs.lastDiaper update for a logged diaper change."""
+    last_diaper_data: LastDiaperData = {
+        "start": now if start is None else start,
+        "mode": mode,
+        "offset": -120.0,
+    }
+    return {
+        "prefs.lastDiaper": last_diaper_data,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+
+
+def _growth_entry_payload(
+    now: float, interval_id: str,
+    weight: float | None, height: float | None, head: float | None,
+    units: MeasurementUnits,
+    start: float | None = None,
+) -> FirebaseGrowthData:
+    """Build a growth entry matching Huckleberry app structure (start defaults to now)."""
+    growth_entry: FirebaseGrowthData = {
+        "_id": interval_id,  # type: ignore # _id is not in TypedDict but Firestore accepts it
+        "type": "health",
+        "mode": "growth",
+        "start": now if start is None else start,
+        "lastUpdated": now,
+        "offset": -120.0,  # Timezone offset (adjust as needed)
+        "isNight": False,
+        "multientry_key": None,
+    }
+
+    # Add measurements with proper unit fields (matches app structure)
+    if units == "metric":
+        if weight is not None:
+            growth_entry["weight"] = float(weight)
+            growth_entry["weightUnits"] = "kg"
+        if height is not None:
+            growth_entry["height"] = float(height)
+            growth_entry["heightUnits"] = "cm"
+        if head is not None:
+            growth_entry["head"] = float(head)
+            growth_entry["headUnits"] = "hcm"  # App uses "hcm" for head circumference
+    else:  # imperial
+        if weight is not None:
+            growth_entry["weight"] = float(weight)
+            growth_entry["weightUnits"] = "lbs"
+        if height is not None:
+            growth_entry["height"] = float(height)
+            growth_entry["heightUnits"] = "in"
+        if head is not None:
+            growth_entry["head"] = float(head)
+            growth_entry["headUnits"] = "hin"  # Head in inches
+    return growth_entry
+
+
+def _growth_prefs_update(growth_entry: FirebaseGrowthData, now: float) -> dict:
+    """Build the prefs.lastGrowthEntry update (matches Huckleberry app structure)."""
+    return {
+        "prefs.lastGrowthEntry": growth_entry,
+        "prefs.timestamp": {"seconds": now},
+        "prefs.local_timestamp": now,
+    }
+
+
+def _growth_data_from_entry(last_growth: dict | None) -> GrowthData:
+    """Convert prefs.lastGrowthEntry into GrowthData (default units when empty)."""
+    if not last_growth:
+        return {
+            "weight_units": "kg",
+            "height_units": "cm",
+            "head_units": "hcm",
+        }
+    return {
+        "weight": last_growth.get("weight"),
+        "height": last_growth.get("height"),
+        "head": last_growth.get("head"),
+        "weight_units": last_growth.get("weightUnits", "kg"),
+        "height_units": last_growth.get("heightUnits", "cm"),
+        "head_units": last_growth.get("headUnits", "hcm"),
+        "timestamp_sec": last_growth.get("start"),
+    }
+
+
+def _child_ids(user_data: dict) -> list[str]:
+    """Child ids linked to a users/{uid} document, lastChild first.
+
+    childList entries are {"cid": ...} maps (plain ids are accepted too);
+    accounts without a childList fall back to lastChild alone.
+    """
+    child_ids = [user_data["lastChild"]] if user_data.get("lastChild") else []
+    for entry in user_data.get("childList") or ():
+        child_id = entry.get("cid") if isinstance(entry, dict) else entry
+        if child_id and child_id not in child_ids:
+            child_ids.append(child_id)
+    return child_ids
+
+
+def _child_from_document(child_id: str, child_data: dict) -> ChildData:
+    """Convert a childs/{child_id} document into ChildData."""
+    # Name may appear as 'childsName' in some documents
+    display_name = child_data.get("name") or child_data.get("childsName") or "Unknown"
+
+    return {
+        "uid": child_id,
+        "name": display_name,
+        "birthday": child_data.get("birthdate"),
+        "picture": child_data.get("picture"),
+        "gender": child_data.get("gender"),
+        "color": child_data.get("color"),
+        "created_at": child_data.get("createdAt"),
+        "night_start_min": child_data.get("nightStart"),
+        "morning_cutoff_min": child_data.get("morningCutoff"),
+        "expected_naps": child_data.get("naps"),
+        "categories": child_data.get("categories"),
+    }
+
+
+def _decode_sleep_interval(data: dict, is_multi: bool) -> dict:
+    """Decode a sleep interval (regular doc or multi-entry item)."""
+    return {
+        "start": data["start"],
+        "duration": data.get("duration", 0),
+    }
+
+
+def _decode_feed_interval(data: dict, is_multi: bool) -> dict:
+    """Decode a feed interval.
+
+    Side durations are in seconds, in regular docs and multi-entry items alike.
+    """
+    return {
+        "start": data["start"],
+        "leftDuration": data.get("leftDuration", 0),
+        "rightDuration": data.get("rightDuration", 0),
+        "is_multi_entry": is_multi,
+    }
+
+
+def _decode_diaper_interval(data: dict, is_multi: bool) -> dict:
+    """Decode a diaper interval with optional details."""
+    event = {
+        "start": data["start"],
+        "mode": data.get("mode", "unknown"),
+    }
+    # Add optional fields if present
+    if "pooColor" in data:
+        event["pooColor"] = data["pooColor"]
+    if "pooConsistency" in data:
+        event["pooConsistency"] = data["pooConsistency"]
+    if "amount" in data:
+        event["amount"] = data["amount"]
+    return event
+
+
+def _decode_health_entry(data: dict, is_multi: bool) -> dict:
+    """Decode a health entry with optional measurement fields."""
+    event = {"start": data["start"]}
+    if "weight" in data:
+        event["weight"] = data["weight"]
+    if "height" in data:
+        event["height"] = data["height"]
+    if "head" in data:
+        event["head"] = data["head"]
+    return event
+
+
+# Event type -> (collection, subcollection, decoder, log label) for interval range queries.
+# Health uses "data" subcollection, not "intervals".
+IntervalKind = Literal["sleep", "feed", "diaper", "health"]
+_INTERVAL_SOURCES: dict[str, tuple[CollectionName, str, Callable[[dict, bool], dict], str]] = {
+    "sleep": ("sleep", "intervals", _decode_sleep_interval, "sleep intervals"),
+    "feed": ("feed", "intervals", _decode_feed_interval, "feed intervals"),
+    "diaper": ("diaper", "intervals", _decode_diaper_interval, "diaper intervals"),
+    "health": ("health", "data", _decode_health_entry, "health entries"),
+}
+
+
+# Fields each decoder reads; range reads download only these unless told otherwise
+_DECODED_FIELDS: dict[str, tuple[str, ...]] = {
+    "sleep": ("start", "duration"),
+    "feed": ("start", "leftDuration", "rightDuration"),
+    "diaper": ("start", "mode", "pooColor", "pooConsistency", "amount"),
+    "health": ("start", "weight", "height", "head"),
+}
+# Fields frame_row reads
+_FRAME_FIELDS: tuple[str, ...] = ("start", "duration", "mode", "leftDuration", "rightDuration")
+
+
+def _mirror_fields(kind: IntervalKind) -> list[str]:
+    """Document fields the interval mirror stores: what decoders and frames read, plus the watermark."""
+    return list(dict.fromkeys(("start", "multi", "lastUpdated", *_DECODED_FIELDS[kind], *_FRAME_FIELDS)))
+
+
+def _mirror_covers(kind: IntervalKind, fields: Iterable[str] | None) -> bool:
+    """Return True if a range read of fields can be served from the interval mirror."""
+    return fields is None or {path.split(".")[0] for path in fields} <= set(_mirror_fields(kind))
+
+
+def _projection(kind: IntervalKind, fields: Iterable[str] | None, columnar: bool = False) -> list[str]:
+    """Document fields to download for a range read (start and multi are always included)."""
+    if columnar:
+        requested: Iterable[str] = _FRAME_FIELDS
+    else:
+        requested = _DECODED_FIELDS[kind] if fields is None else fields
+    return list(dict.fromkeys(("start", "multi", *requested)))
+
+
+def _decode_with_fields(
+    decode: Callable[[dict, bool], dict], extra: tuple[str, ...], data: dict, is_multi: bool
+) -> dict:
+    """Decode an interval and pass through requested top-level fields the decoder does not produce."""
+    event = decode(data, is_multi)
+    for key in extra:
+        if key in data and key not in event:
+            event[key] = data[key]
+    return event
+
+
+def _interval_decoder(
+    kind: IntervalKind, fields: Iterable[str] | None, columnar: bool = False
+) -> Callable[[dict, bool], Any]:
+    """Return the row decoder for a range read of one kind."""
+    if columnar:
+        return partial(frame_row, kind)
+    decode = _INTERVAL_SOURCES[kind][2]
+    if fields is None:
+        return decode
+    extra = tuple(dict.fromkeys(path.split(".")[0] for path in fields))
+    return partial(_decode_with_fields, decode, extra)
+
+
+# Import record type -> interval kind it is written to
+_IMPORT_KINDS: dict[str, IntervalKind] = {
+    "sleep": "sleep",
+    "feed": "feed",
+    "diaper": "diaper",
+    "growth": "health",
+}
+
+# Firestore's limit on writes per commit
+MAX_BATCH_WRITES = 500
+
+
+def _record_time(value: Any, field: str) -> float:
+    """Parse a record timestamp: Unix seconds or ISO 8601 (naive = local time)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.strip():
+        text = value.strip()
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+        except ValueError as err:
+            raise ValueError(f"invalid {field} {value!r}") from err
+    raise ValueError(f"missing {field}")
+
+
+def _record_number(record: Mapping[str, Any], field: str) -> float | None:
+    """Read an optional numeric record field (empty CSV cells count as missing)."""
+    value = record.get(field)
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"invalid {field} {value!r}") from err
+
+
+def _record_duration(record: Mapping[str, Any], start: float) -> float:
+    """Duration in seconds from 'duration' or 'end'."""
+    duration = _record_number(record, "duration")
+    if duration is None and record.get("end") not in (None, ""):
+        duration = _record_time(record["end"], "end") - start
+    if duration is None:
+        raise ValueError("missing duration (or end)")
+    if duration < 0:
+        raise ValueError("negative duration")
+    return duration
+
+
+def _import_document(record: Mapping[str, Any], now: float) -> tuple[IntervalKind, str, dict, dict]:
+    """Build (kind, document id, interval document, prefs update) for one import record.
+
+    The document id is derived from the record content, so importing the
+    same record again overwrites the same document instead of duplicating it.
+    """
+    record_type = str(record.get("type", "")).strip().lower()
+    if record_type not in _IMPORT_KINDS:
+        raise ValueError(f"unknown record type {record.get('type')!r}")
+    kind = _IMPORT_KINDS[record_type]
+    start = _record_time(record.get("start"), "start")
+    notes = record.get("notes") or None
+
+    digest = hashlib.sha1(json.dumps(dict(record), sort_keys=True, default=str).encode()).hexdigest()
+    doc_id = f"{int(start * 1000)}-{digest[:20]}"
+
+    if record_type == "sleep":
+        start_sec = int(start)
+        duration_sec = int(_record_duration(record, start))
+        document = _sleep_interval_payload(doc_id, start_sec, duration_sec, {}, now)
+        if notes:
+            document["notes"] = notes
+        return kind, doc_id, document, _sleep_prefs_update(start_sec, duration_sec, now)
+
+    if record_type == "feed":
+        mode = record.get("mode") or "breast"
+        if mode != "breast":
+            raise ValueError(f"unsupported feed mode {mode!r} (only breast feeds can be imported)")
+        # Side durations are imported, like they are stored, in seconds
+        left = _record_number(record, "left_duration")
+        right = _record_number(record, "right_duration")
+        if left is None and right is None:
+            side = record.get("side") or "left"
+            if side not in ("left", "right"):
+                raise ValueError(f"invalid side {side!r}")
+            duration = _record_duration(record, start)
+            left, right = (duration, 0.0) if side == "left" else (0.0, duration)
+        left, right = left or 0.0, right or 0.0
+        last_side = record.get("side") or ("right" if right >= left else "left")
+        document = _feed_interval_payload(start, left, right, last_side, now)
+        if notes:
+            document["notes"] = notes
+        return kind, doc_id, document, _feed_prefs_update(start, left, right, last_side, now)
+
+    if record_type == "diaper":
+        mode = record.get("mode")
+        if mode not in ("pee", "poo", "both", "dry"):
+            raise ValueError(f"invalid diaper mode {mode!r}")
+        document = _diaper_interval_payload(
+            now, mode,
+            record.get("pee_amount") or None, record.get("poo_amount") or None,
+            record.get("color") or None, record.get("consistency") or None,
+            str(record.get("diaper_rash", "")).lower() in ("1", "true", "yes"),
+            notes, start=start,
+        )
+        return kind, doc_id, cast(dict, document), _diaper_prefs_update(now, mode, start=start)
+
+    weight, height, head = (_record_number(record, field) for field in ("weight", "height", "head"))
+    if weight is None and height is None and head is None:
+        raise ValueError("growth record needs weight, height or head")
+    units = record.get("units") or "metric"
+    if units not in ("metric", "imperial"):
+        raise ValueError(f"invalid units {units!r}")
+    entry = _growth_entry_payload(now, doc_id, weight, height, head, units, start=start)
+    return kind, doc_id, cast(dict, entry), _growth_prefs_update(entry, now)
+
+
+def _import_chunks(
+    records: Iterable[Mapping[str, Any]], chunk_size: int, skip: int, now: float
+) -> Iterator[list[tuple[IntervalKind, str, dict, dict]]]:
+    """Convert import records into chunks of at most chunk_size documents.
+
+    The first skip records are passed over (already imported). Errors name
+    the 1-based record number.
+    """
+    if not 0 < chunk_size <= MAX_BATCH_WRITES:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_BATCH_WRITES}")
+
+    chunk: list[tuple[IntervalKind, str, dict, dict]] = []
+    for number, record in enumerate(records, start=1):
+        if number <= skip:
+            continue
+        try:
+            chunk.append(_import_document(record, now))
+        except ValueError as err:
+            raise ValueError(f"record {number}: {err}") from err
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _track_latest_prefs(
+    latest: dict[IntervalKind, tuple[float, dict]], documents: Iterable[tuple[IntervalKind, str, dict, dict]]
+) -> None:
+    """Keep (start, prefs update) of the latest imported document per kind in latest."""
+    for kind, _doc_id, document, prefs in documents:
+        if kind not in latest or document["start"] >= latest[kind][0]:
+            latest[kind] = (document["start"], prefs)
+
+
+def _latest_prefs_updates(latest: dict[IntervalKind, tuple[float, dict]]) -> dict[IntervalKind, dict]:
+    """Return the prefs update per kind from _track_latest_prefs."""
+    return {kind: prefs for kind, (_start, prefs) in latest.items()}
+
+
+# Default documents per page for the iter_* interval generators
+INTERVAL_PAGE_SIZE = 500
+
+# Interval kind -> numeric fields summed server-side for sum_durations
+_DURATION_FIELDS: dict[str, tuple[str, ...]] = {
+    "sleep": ("duration",),
+    "feed": ("leftDuration", "rightDuration"),
+}
+
+
+def _aggregation_query(query, kind: IntervalKind):
+    """Build a count (plus duration sums for sleep/feed) aggregation over a query."""
+    aggregation = query.count(alias="count")
+    for field in _DURATION_FIELDS.get(kind, ()):
+        aggregation = aggregation.sum(field, alias=field)
+    return aggregation
+
+
+def _aggregation_totals(kind: IntervalKind, results) -> tuple[int, float]:
+    """Turn aggregation results into (count, duration seconds)."""
+    values = {result.alias: result.value for row in results for result in row}
+    seconds = sum(float(values.get(field) or 0) for field in _DURATION_FIELDS.get(kind, ()))
+    return int(values.get("count") or 0), seconds
+
+
+def _tally_intervals(
+    kind: IntervalKind, entries: Iterable[dict], is_multi: bool, modes: Iterable[str] | None
+) -> tuple[int, float]:
+    """Count interval documents or multi-entry items and sum their durations in seconds."""
+    wanted = set(modes) if modes is not None else None
+    count, seconds = 0, 0.0
+    for data in entries:
+        if wanted is not None and data.get("mode") not in wanted:
+            continue
+        count += 1
+        seconds += frame_row(kind, data, is_multi)[1]
+    return count, seconds
+
+
+def _multi_cache_path(kind: IntervalKind, child_uid: str) -> str:
+    """Return the MultiEntryCache key for a child's interval subcollection."""
+    collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+    return f"{collection_name}/{child_uid}/{subcollection}"
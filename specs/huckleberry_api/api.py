@@ -1,42 +1,93 @@
 """API client for Huckleberry."""
 from __future__ import annotations
 
+import contextvars
+import copy
+import heapq
+import json
 import logging
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Callable, Literal, TypeVar, cast
+from functools import wraps
+from typing import Any, Callable, Iterable, Iterator, Literal, Mapping, TypeVar, cast
 
 import requests
 from google.auth.credentials import Credentials
-from google.cloud import firestore
 
-from .const import AUTH_URL, FIREBASE_API_KEY, REFRESH_URL
+from ._payloads import (
+    INTERVAL_PAGE_SIZE,
+    MAX_BATCH_WRITES,
+    _DURATION_FIELDS,
+    _INTERVAL_SOURCES,
+    CollectionName,
+    DiaperAmount,
+    DiaperMode,
+    FeedSide,
+    IntervalKind,
+    MeasurementUnits,
+    PooColor,
+    PooConsistency,
+    _accumulate_feed_sides,
+    _aggregation_query,
+    _aggregation_totals,
+    _child_from_document,
+    _child_ids,
+    _diaper_interval_payload,
+    _diaper_prefs_update,
+    _feed_completion_writes,
+    _feed_timer_payload,
+    _growth_data_from_entry,
+    _growth_entry_payload,
+    _growth_prefs_update,
+    _import_chunks,
+    _inactive_feed_timer,
+    _inactive_sleep_timer,
+    _interval_decoder,
+    _latest_prefs_updates,
+    _mirror_covers,
+    _mirror_fields,
+    _multi_cache_path,
+    _new_interval_id,
+    _new_session_uuid,
+    _projection,
+    _sleep_completion,
+    _sleep_completion_writes,
+    _sleep_timer_payload,
+    _tally_intervals,
+    _track_latest_prefs,
+)
+from .const import (
+    AUTH_URL,
+    CHILDREN_CACHE_TTL,
+    FIREBASE_API_KEY,
+    FIREBASE_PROJECT_ID,
+    MIRROR_SYNC_SKEW,
+    REFRESH_URL,
+    TOKEN_REFRESH_LEAD,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REFRESH_RETRY,
+    WRITE_REPLAY_MAX_DELAY,
+    WRITE_REPLAY_RETRY,
+)
+from .frame import IntervalFrame
+from .instrumentation import OperationHook, instrumented, instrumented_iter, record
+from .mirror import IntervalMirror
+from .multi_cache import MultiEntryCache
+from .token_cache import CachedCredentials, TokenCache
+from .transport import FirestoreTransport, get_transport
 from .types import (
     ChildData,
     DiaperDocumentData,
     FeedDocumentData,
-    FirebaseDiaperInterval,
-    FirebaseFeedDocument,
-    FirebaseGrowthData,
-    FirebaseSleepDocument,
     GrowthData,
     HealthDocumentData,
-    LastDiaperData,
-    LastNursingData,
-    LastSideData,
-    LastSleepData,
     SleepDocumentData,
 )
-
-# Type aliases for known string values
-CollectionName = Literal["sleep", "feed", "health", "diaper"]
-FeedSide = Literal["left", "right"]
-DiaperMode = Literal["pee", "poo", "both", "dry"]
-DiaperAmount = Literal["little", "medium", "big"]
-PooColor = Literal["yellow", "brown", "black", "green", "red", "gray"]
-PooConsistency = Literal["solid", "loose", "runny", "mucousy", "hard", "pebbles", "diarrhea"]
-MeasurementUnits = Literal["metric", "imperial"]
+from .write_queue import QueuedOperation, QueuedWrite, WriteQueue
 
 # Union type for all document data types used in listeners
 DocumentData = SleepDocumentData | FeedDocumentData | HealthDocumentData | DiaperDocumentData
@@ -45,41 +96,192 @@ TDocumentData = TypeVar('TDocumentData', SleepDocumentData, FeedDocumentData, He
 _LOGGER = logging.getLogger(__name__)
 
 
+def _ignore_snapshot(data: dict) -> None:
+    """Listener callback for watches that only feed the live state cache."""
+
+
+def _add_writes(write_batch, client, writes: Iterable[QueuedWrite]) -> None:
+    """Add (op, document path, data) writes to a WriteBatch."""
+    for write in writes:
+        doc_ref = client.document(write.path)
+        if write.op == "set":
+            write_batch.set(doc_ref, write.data)
+        else:
+            write_batch.update(doc_ref, write.data)
+
+
+def _retry_on_stale_state(collection_name: CollectionName):
+    """Re-run a timer operation once if its update-time precondition failed.
+
+    The state it read (usually from the live state cache) was stale; the
+    cached copy is dropped so the retry reads the document from the server.
+
+    Inside batch() the commit (and so the precondition check) only happens
+    when the block exits, after this wrapper has returned: batched writes
+    are not retried, and the failure is raised from the batch() block.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self: HuckleberryAPI, child_uid: str, *args, **kwargs):
+            try:
+                return method(self, child_uid, *args, **kwargs)
+            except self._transport.precondition_errors:
+                _LOGGER.info("%s/%s changed since it was read, retrying", collection_name, child_uid)
+                record(retries=1)
+                self._drop_live_state(f"{collection_name}/{child_uid}")
+                return method(self, child_uid, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class FirebaseTokenCredentials(Credentials):
-    """Custom credentials class for Firebase SDK."""
+    """Custom credentials class for Firebase SDK.
+
+    The token can be rotated in place with update_token(), so a single
+    Firestore client and its gRPC channels survive token refreshes: the
+    auth metadata plugin reads ``token`` on every RPC.
+    """
+
+    def __init__(self, id_token: str, token_source: Callable[[], str | None] | None = None):
+        """Initialize with Firebase ID token.
 
-    def __init__(self, id_token: str):
-        """Initialize with Firebase ID token."""
+        Args:
+            id_token: Current Firebase ID token
+            token_source: Optional callable returning the owner's latest ID
+                token, consulted when google-auth asks for a refresh
+        """
         super().__init__()
         self._id_token = id_token
+        self._token_source = token_source
         self.token = id_token  # Set the token attribute that parent expects
 
+    def update_token(self, id_token: str) -> None:
+        """Swap in a refreshed ID token for all subsequent requests."""
+        self._id_token = id_token
+        self.token = id_token
+
     def refresh(self, request):
-        """Token refresh is handled by HuckleberryAPI.
+        """Pick up the latest token from the owning client.
 
-        This method is required by the Credentials interface but is not used.
-        Token refreshing is managed externally by HuckleberryAPI.refresh_auth_token(),
-        and a new FirebaseTokenCredentials instance is created with the refreshed token.
+        Token refreshing itself is managed by HuckleberryAPI.refresh_auth_token(),
+        which pushes new tokens through update_token(); this only re-reads
+        the token source in case google-auth asks before that happens.
         """
+        if self._token_source is not None:
+            id_token = self._token_source()
+            if id_token:
+                self.update_token(id_token)
 
 
 class HuckleberryAPI:
-    """API client for Huckleberry."""
+    """API client for Huckleberry.
+
+    Safe to share across threads. Sign-in, token refresh and creation of
+    the Firestore client and worker pool are single-flight: concurrent
+    callers that find the token expiring wait for one refresh instead of
+    each issuing their own, and listeners are rolled over once per refresh.
+    Calls holding a fresh token never take the auth lock.
+    """
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        max_workers: int = 8,
+        mirror: IntervalMirror | None = None,
+        multi_cache: MultiEntryCache | None = None,
+        token_cache: TokenCache | None = None,
+        transport: str | FirestoreTransport = "grpc",
+        hooks: Iterable[OperationHook] = (),
+        write_queue: WriteQueue | None = None,
+    ) -> None:
+        """Initialize the API client.
 
-    def __init__(self, email: str, password: str) -> None:
-        """Initialize the API client."""
+        Args:
+            email: Huckleberry account email
+            password: Huckleberry account password
+            max_workers: Worker limit for concurrent range queries
+            mirror: Optional local interval mirror; when set, regular interval
+                range reads sync incrementally and are served from it
+            multi_cache: Cache for multi-entry batch documents (a private one is
+                created if not given; pass one to share it between clients)
+            token_cache: Optional credential cache; authenticate() resumes a
+                cached session before falling back to password sign-in
+            transport: "grpc" (google-cloud-firestore, default) or "rest"
+                (pooled HTTP, no gRPC import; real-time listeners and the
+                live state cache are unavailable)
+            hooks: Instrumentation hooks called with an OperationStats after
+                every public operation (see metrics.MetricsCollector); more
+                can be appended to self.hooks later
+            write_queue: Optional durable write queue; when set, log_diaper,
+                log_growth and import_intervals store their writes locally and
+                return, and a background thread replays them in batched commits
+                (queued events are not visible to reads until replayed)
+        """
         self.email = email
         self.password = password
+        self.max_workers = max_workers
+        self.mirror = mirror
+        self.multi_cache = multi_cache if multi_cache is not None else MultiEntryCache()
+        self._aggregation_fallbacks: set[tuple[str, bool]] = set()  # (kind, mode filter) lacking an index
+        self.token_cache = token_cache
+        self._transport = get_transport(transport)
+        self.hooks: list[OperationHook] = list(hooks)
+        self.write_queue = write_queue
         self.id_token: str | None = None
         self.refresh_token: str | None = None
         self.user_uid: str | None = None
         self.token_expires_at: float | None = None
-        self._firestore_client: firestore.Client | None = None
+        self._firestore_client: Any = None  # firestore.Client or rest.RestFirestoreClient
+        self._credentials: FirebaseTokenCredentials | None = None
+        self.client_rebuilds_avoided = 0  # Token refreshes served by rotating credentials in place
+        self._executor: ThreadPoolExecutor | None = None  # Created on first fan-out
         self._listeners: dict = {}  # Store active listeners
         self._listener_callbacks: dict = {}  # Store callbacks to recreate listeners
-
+        self._listener_update_times: dict = {}  # Last delivered update_time per listener
+        self._refresher: threading.Thread | None = None
+        self._refresher_stop = threading.Event()
+        self._replayer: threading.Thread | None = None  # Write queue replay thread
+        self._replayer_stop = threading.Event()
+        self._replay_wake = threading.Event()  # Set when writes are queued
+        # Lock order: _replay_lock -> _auth_lock -> _listener_lock -> _resource_lock
+        self._replay_lock = threading.Lock()  # One write queue replay at a time
+        self._auth_lock = threading.RLock()  # Re-entrant: a cached-session resume refreshes
+        self._listener_lock = threading.RLock()  # Guards _listeners/_listener_callbacks
+        self._resource_lock = threading.Lock()  # Lazy Firestore client / worker pool creation
+        self._snapshot_lock = threading.Lock()  # Guards _listener_update_times (watch threads)
+        self._batch_state = threading.local()  # Pending WriteBatch of an open batch() block
+        # Live state cache (enable_live_state), guarded by _snapshot_lock:
+        # document path -> (data or None if missing, update_time)
+        self._live_paths: set[str] = set()
+        self._live_state: dict[str, tuple[dict | None, Any]] = {}
+        self._live_min_update: dict[str, Any] = {}  # Commit time our own writes must reach
+        # Children cache (get_children), guarded by _snapshot_lock
+        self._children: list[ChildData] | None = None
+        self._children_sources: dict[str, dict] = {}  # Document path -> data the cache was built from
+        self._children_expires_at = 0.0  # time.monotonic() deadline; inf while listeners watch it
+
+    @instrumented
     def authenticate(self) -> None:
-        """Authenticate with Firebase."""
+        """Authenticate with Firebase.
+
+        With a token cache configured, a cached session for the same account
+        is resumed first: no network call while its ID token is fresh, one
+        refresh call otherwise. Password sign-in is only used when the cache
+        is missing or its refresh token is rejected.
+
+        Writes left in the write queue by an earlier process start replaying.
+        """
+        with self._auth_lock:
+            self._authenticate()
+        if self.write_queue is not None and len(self.write_queue):
+            self._wake_replayer()
+
+    def _authenticate(self) -> None:
+        """Sign in; caller holds _auth_lock."""
+        if self.token_cache is not None and self._resume_cached_session():
+            return
+
         _LOGGER.debug("Authenticating with Huckleberry")
 
         try:
@@ -99,6 +301,7 @@ class HuckleberryAPI:
             self.refresh_token = data["refreshToken"]
             self.user_uid = data["localId"]
             self.token_expires_at = datetime.now().timestamp() + int(data["expiresIn"])
+            self._save_session()
 
             _LOGGER.info("Successfully authenticated with Huckleberry")
         except requests.exceptions.HTTPError as err:
@@ -112,6 +315,57 @@ class HuckleberryAPI:
                     _LOGGER.error("Response: %s", err.response.text)
             raise
 
+    def _resume_cached_session(self) -> bool:
+        """Restore tokens from the token cache, refreshing them if needed.
+
+        Returns:
+            True if a usable session was restored
+        """
+        assert self.token_cache is not None
+        cached = self.token_cache.load()
+        if not cached or cached["email"] != self.email:
+            return False
+
+        self.id_token = cached["id_token"]
+        self.refresh_token = cached["refresh_token"]
+        self.user_uid = cached["user_uid"]
+        self.token_expires_at = cached["token_expires_at"]
+
+        if not self._token_needs_refresh():
+            _LOGGER.info("Resumed cached Huckleberry session")
+            return True
+
+        try:
+            self._refresh_auth_token()
+        except Exception as err:
+            _LOGGER.warning("Cached session could not be refreshed, signing in with password: %s", err)
+            self.id_token = None
+            self.refresh_token = None
+            self.user_uid = None
+            self.token_expires_at = None
+            self.token_cache.clear()
+            return False
+
+        _LOGGER.info("Resumed cached Huckleberry session with a refreshed token")
+        return True
+
+    def _save_session(self) -> None:
+        """Write the current tokens to the token cache (failures are logged, not raised)."""
+        if self.token_cache is None or not (self.id_token and self.refresh_token and self.user_uid):
+            return
+
+        credentials: CachedCredentials = {
+            "email": self.email,
+            "user_uid": self.user_uid,
+            "id_token": self.id_token,
+            "refresh_token": self.refresh_token,
+            "token_expires_at": self.token_expires_at or 0.0,
+        }
+        try:
+            self.token_cache.save(credentials)
+        except Exception as err:
+            _LOGGER.warning("Failed to write token cache: %s", err)
+
     def maintain_session(self) -> None:
         """Ensure the session is valid and refresh token if needed.
 
@@ -120,8 +374,66 @@ class HuckleberryAPI:
         """
         self._ensure_authenticated()
 
+    def start_token_refresher(self, lead_time: float = TOKEN_REFRESH_LEAD) -> None:
+        """Rotate tokens in a background thread ahead of expiry.
+
+        The ID token is refreshed lead_time seconds before it expires, which
+        is earlier than the inline refresh margin, so calls made while the
+        refresher runs never pay refresh latency. Listeners are rolled over
+        make-before-break as part of each refresh. Failed refreshes are
+        retried every TOKEN_REFRESH_RETRY seconds; calls still fall back to
+        the inline refresh if the token gets too close to expiry.
+
+        Args:
+            lead_time: Seconds before expiry at which to refresh
+        """
+        self._ensure_authenticated()
+        with self._auth_lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher_stop.clear()
+            self._refresher = threading.Thread(
+                target=self._run_token_refresher,
+                args=(lead_time,),
+                name="huckleberry-token-refresher",
+                daemon=True,
+            )
+            self._refresher.start()
+
+    def stop_token_refresher(self) -> None:
+        """Stop the background token refresher, if running."""
+        self._refresher_stop.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=TOKEN_REFRESH_RETRY)
+            self._refresher = None
+
+    def _run_token_refresher(self, lead_time: float) -> None:
+        """Background loop: sleep until lead_time before expiry, then refresh."""
+        while True:
+            expires_at = self.token_expires_at or 0.0
+            delay = max(expires_at - lead_time - datetime.now().timestamp(), 0.0)
+            if self._refresher_stop.wait(delay):
+                return
+            try:
+                with self._auth_lock:
+                    # Skip if a call already refreshed inline while we slept
+                    expires_at = self.token_expires_at or 0.0
+                    if datetime.now().timestamp() >= expires_at - lead_time:
+                        self._refresh_auth_token()
+                        _LOGGER.debug("Background token refresh complete")
+            except Exception as err:
+                _LOGGER.warning("Background token refresh failed, retrying in %ss: %s", TOKEN_REFRESH_RETRY, err)
+                if self._refresher_stop.wait(TOKEN_REFRESH_RETRY):
+                    return
+
+    @instrumented
     def refresh_auth_token(self) -> None:
         """Refresh the authentication token."""
+        with self._auth_lock:
+            self._refresh_auth_token()
+
+    def _refresh_auth_token(self) -> None:
+        """Exchange the refresh token and roll listeners over; caller holds _auth_lock."""
         if not self.refresh_token:
             raise ValueError("No refresh token available")
 
@@ -141,48 +453,39 @@ class HuckleberryAPI:
         self.id_token = data["id_token"]
         self.refresh_token = data["refresh_token"]
         self.token_expires_at = datetime.now().timestamp() + int(data["expires_in"])
+        self._save_session()
 
-        # Stop existing listeners (they use the old token)
-        for key, watch in self._listeners.items():
-            try:
-                if hasattr(watch, "unsubscribe") and callable(getattr(watch, "unsubscribe")):
-                    watch.unsubscribe()
-                elif hasattr(watch, "close") and callable(getattr(watch, "close")):
-                    watch.close()
-                _LOGGER.debug("Stopped listener %s before token refresh", key)
-            except Exception as err:
-                _LOGGER.error("Error stopping listener %s before refresh: %s", key, err)
-        self._listeners.clear()
-
-        # Invalidate the Firestore client so it gets recreated with new token
-        self._firestore_client = None
+        # Rotate the token inside the live client instead of rebuilding it,
+        # keeping its gRPC channels and connections warm
+        if self._credentials is not None:
+            self._credentials.update_token(self.id_token)
+            if self._firestore_client is not None:
+                self.client_rebuilds_avoided += 1
 
         _LOGGER.debug("Successfully refreshed authentication token")
 
-        # Recreate all listeners with new token
-        _LOGGER.info("Recreating %d listeners with refreshed token", len(self._listener_callbacks))
-        callbacks_copy = dict(self._listener_callbacks)  # Copy to avoid modification during iteration
-        for key, (listener_type, child_uid, callback) in callbacks_copy.items():
-            try:
-                if listener_type == "sleep":
-                    self.setup_realtime_listener(child_uid, callback)
-                elif listener_type == "feed":
-                    self.setup_feed_listener(child_uid, callback)
-                elif listener_type == "health":
-                    self.setup_health_listener(child_uid, callback)
-                elif listener_type == "diaper":
-                    self.setup_diaper_listener(child_uid, callback)
-                _LOGGER.debug("Recreated %s listener for child %s", listener_type, child_uid)
-            except Exception as err:
-                _LOGGER.error("Error recreating %s listener for child %s: %s", listener_type, child_uid, err)
+        with self._listener_lock:
+            has_listeners = bool(self._listener_callbacks)
+        if has_listeners:
+            self._roll_over_listeners()
+
+    def _token_needs_refresh(self) -> bool:
+        """Return True if the token expires in less than TOKEN_REFRESH_MARGIN seconds."""
+        return bool(
+            self.token_expires_at and datetime.now().timestamp() >= self.token_expires_at - TOKEN_REFRESH_MARGIN
+        )
 
     def _ensure_authenticated(self) -> None:
         """Ensure we have a valid authentication token."""
-        if not self.id_token:
-            self.authenticate()
-        elif self.token_expires_at and datetime.now().timestamp() >= self.token_expires_at - 300:
-            # Refresh if token expires in less than 5 minutes
-            self.refresh_auth_token()
+        if self.id_token and not self._token_needs_refresh():
+            return
+
+        with self._auth_lock:
+            # Another thread may have signed in or refreshed while we waited
+            if not self.id_token:
+                self._authenticate()
+            elif self._token_needs_refresh():
+                self._refresh_auth_token()
 
     def _get_headers(self) -> dict[str, str]:
         """Get headers for API requests."""
@@ -192,32 +495,51 @@ class HuckleberryAPI:
             "Content-Type": "application/json",
         }
 
-    def _get_firestore_client(self) -> firestore.Client:
+    def _get_firestore_client(self) -> Any:
         """Get or create Firestore client."""
         self._ensure_authenticated()
 
-        # Create new client if token changed or client doesn't exist
-        if not self._firestore_client:
-            assert self.id_token is not None, "id_token should be set after authentication"
-            credentials = FirebaseTokenCredentials(self.id_token)
-            self._firestore_client = firestore.Client(
-                project="simpleintervals",
-                credentials=credentials,
-            )
+        # One long-lived client; token refreshes rotate its credentials in place
+        client = self._firestore_client
+        if client is not None:
+            return client
+
+        with self._resource_lock:
+            if self._firestore_client is None:
+                assert self.id_token is not None, "id_token should be set after authentication"
+                self._credentials = FirebaseTokenCredentials(self.id_token, lambda: self.id_token)
+                self._firestore_client = self._transport.create_client(
+                    self._credentials, FIREBASE_PROJECT_ID, pool_size=self.max_workers
+                )
+            return self._firestore_client
+
+    @instrumented
+    def get_children(self, refresh: bool = False) -> list[ChildData]:
+        """Get the children linked to the account.
+
+        Children are listed from the user document's childList, the app's
+        lastChild first (so children[0] is the child last used in the app),
+        and their profiles are fetched in one batched read. The result is
+        cached: snapshot listeners on the user and child documents drop it
+        when any of them changes, or, on transports without listeners, it
+        expires after CHILDREN_CACHE_TTL seconds.
 
-        return self._firestore_client
+        Args:
+            refresh: Read the profiles again even if the cache is valid
+        """
+        if not refresh:
+            cached = self._cached_children()
+            if cached is not None:
+                record(cache_hits=1)
+                return cached
 
-    def get_children(self) -> list[ChildData]:
-        """Get list of children from user profile."""
         _LOGGER.debug("Fetching children list")
 
         try:
-            # Get Firestore client
             db = self._get_firestore_client()
 
-            # Get user document which contains lastChild reference
-            user_ref = db.collection("users").document(self.user_uid)
-            user_doc = user_ref.get()
+            user_doc = db.collection("users").document(self.user_uid).get()
+            record(docs_read=1)
 
             if not user_doc.exists:
                 _LOGGER.error("User document not found")
@@ -228,51 +550,423 @@ class HuckleberryAPI:
                 _LOGGER.error("User document has no data")
                 return []
 
-            child_id = user_data.get("lastChild")
-
-            if not child_id:
-                _LOGGER.warning("No lastChild found in user document")
+            child_ids = _child_ids(user_data)
+            if not child_ids:
+                _LOGGER.warning("No children listed in user document")
                 return []
 
-            # Get child document
-            child_ref = db.collection("childs").document(child_id)
-            child_doc = child_ref.get()
-
-            if not child_doc.exists:
-                _LOGGER.error("Child document not found: %s", child_id)
-                return []
-
-            child_data = child_doc.to_dict()
-            if not child_data:
-                _LOGGER.error("Child document has no data: %s", child_id)
-                return []
-
-            # Name may appear as 'childsName' in some documents
-            display_name = child_data.get("name") or child_data.get("childsName") or "Unknown"
-
-            child: ChildData = {
-                "uid": child_id,
-                "name": display_name,
-                "birthday": child_data.get("birthdate"),
-                "picture": child_data.get("picture"),
-                "gender": child_data.get("gender"),
-                "color": child_data.get("color"),
-                "created_at": child_data.get("createdAt"),
-                "night_start_min": child_data.get("nightStart"),
-                "morning_cutoff_min": child_data.get("morningCutoff"),
-                "expected_naps": child_data.get("naps"),
-                "categories": child_data.get("categories"),
-            }
-
-            children = [child]
+            # Every profile in one round trip
+            refs = [db.collection("childs").document(child_id) for child_id in child_ids]
+            record(docs_read=len(refs))
+            child_docs = {doc.id: doc for doc in db.get_all(refs)}
+
+            children: list[ChildData] = []
+            sources = {f"users/{self.user_uid}": user_data}
+            for child_id in child_ids:
+                child_doc = child_docs.get(child_id)
+                child_data = child_doc.to_dict() if child_doc is not None and child_doc.exists else None
+                if not child_data:
+                    _LOGGER.error("Child document not found: %s", child_id)
+                    continue
+                children.append(_child_from_document(child_id, child_data))
+                sources[f"childs/{child_id}"] = child_data
 
+            self._store_children(children, sources)
             _LOGGER.info("Found %d children", len(children))
-            return children
+            return copy.deepcopy(children)
 
         except Exception as err:
             _LOGGER.error("Failed to get children: %s", err)
             raise
 
+    def get_child(self, child_uid: str) -> ChildData | None:
+        """Profile of one child linked to the account, from the children cache when valid."""
+        for child in self.get_children():
+            if child["uid"] == child_uid:
+                return child
+        return None
+
+    def _cached_children(self) -> list[ChildData] | None:
+        """Return the cached children, or None if the cache is empty, expired or unwatched."""
+        with self._snapshot_lock:
+            children = self._children
+            if children is None or time.monotonic() >= self._children_expires_at:
+                return None
+        if self._transport.supports_listeners:
+            # stop_all_listeners() also stops the watches invalidating the cache
+            with self._listener_lock:
+                if f"users_{self.user_uid}" not in self._listener_callbacks:
+                    return None
+        return copy.deepcopy(children)
+
+    def _store_children(self, children: list[ChildData], sources: dict[str, dict]) -> None:
+        """Cache children read from sources (document path -> data) and watch those documents.
+
+        The cache is stored before new watches open, so a document changed
+        since it was read is caught by its watch's first snapshot.
+        """
+        watched = self._transport.supports_listeners
+        with self._snapshot_lock:
+            self._children = copy.deepcopy(children)
+            self._children_sources = sources
+            self._children_expires_at = float("inf") if watched else time.monotonic() + CHILDREN_CACHE_TTL
+        if not watched:
+            return
+
+        for path in sources:
+            collection_name, document_id = path.split("/")
+            with self._listener_lock:
+                has_listener = f"{collection_name}_{document_id}" in self._listener_callbacks
+            if has_listener:
+                continue
+            try:
+                self._setup_listener(collection_name, document_id, self._children_invalidator(path))
+            except Exception as err:
+                _LOGGER.warning("Not caching children, cannot watch %s: %s", path, err)
+                with self._snapshot_lock:
+                    self._children = None
+                return
+
+    def _children_invalidator(self, path: str) -> Callable[[dict], None]:
+        """Listener callback dropping the children cache when the document at path changes."""
+        def on_change(data: dict) -> None:
+            with self._snapshot_lock:
+                if self._children is not None and self._children_sources.get(path, data) != data:
+                    _LOGGER.debug("Children cache invalidated by a change to %s", path)
+                    self._children = None
+
+        return on_change
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group write operations into one atomic commit.
+
+        Every write made by this client's methods inside the block, on the
+        calling thread, is queued and committed as a single WriteBatch when
+        the block exits; nothing is written if it raises. Nested blocks join
+        the outermost one.
+
+        Reads inside the block do not see queued writes, so operations that
+        depend on each other's result (e.g. start_sleep then complete_sleep)
+        must not share a block. Firestore allows at most 500 writes per batch.
+
+        Timer operations are not retried inside a block: if a timer document
+        changed since it was read, the whole commit fails with the transport's
+        precondition error and nothing is written. The stale cached state is
+        dropped, so running the block again reads the documents afresh.
+
+        Example:
+            with api.batch():
+                api.log_diaper(child_uid, "pee")
+                api.log_growth(child_uid, weight=5.2)
+        """
+        if getattr(self._batch_state, "batch", None) is not None:
+            yield
+            return
+
+        write_batch = self._get_firestore_client().batch()
+        state_paths: set[str] = set()
+        self._batch_state.batch = write_batch
+        self._batch_state.state_paths = state_paths
+        try:
+            yield
+        finally:
+            self._batch_state.batch = None
+            self._batch_state.state_paths = None
+        self._commit(write_batch, state_paths)
+
+    @contextmanager
+    def _writes(self, *state_refs) -> Iterator[Any]:
+        """Yield the WriteBatch one operation should add its writes to.
+
+        Inside batch() this is the caller's pending batch; otherwise a fresh
+        batch that is committed, in one request, when the block exits.
+
+        Args:
+            state_refs: Top-level state documents the operation writes, so the
+                live state cache does not serve them until it has caught up
+        """
+        pending = getattr(self._batch_state, "batch", None)
+        if pending is not None:
+            self._batch_state.state_paths.update(ref.path for ref in state_refs)
+            yield pending
+            return
+
+        write_batch = self._get_firestore_client().batch()
+        yield write_batch
+        self._commit(write_batch, {ref.path for ref in state_refs})
+
+    def _commit(self, write_batch, state_paths: set[str]) -> None:
+        """Commit a WriteBatch and hold back stale live state for written documents."""
+        try:
+            results = write_batch.commit()
+        except self._transport.precondition_errors:
+            # Some state the writes were based on was stale; reread it next time
+            for path in state_paths:
+                self._drop_live_state(path)
+            raise
+        record(docs_written=len(results or ()))
+        if not state_paths:
+            return
+
+        committed_at = max(
+            (result.update_time for result in results or () if result.update_time is not None), default=None
+        )
+        with self._snapshot_lock:
+            for path in state_paths & self._live_paths:
+                if committed_at is None:
+                    self._live_state.pop(path, None)
+                else:
+                    self._live_min_update[path] = committed_at
+
+    def _apply_writes(self, key: str, writes: list[QueuedWrite]) -> None:
+        """Commit one operation's writes atomically, or queue them for replay.
+
+        With a write queue (and outside batch()) the writes are stored under
+        key, which must identify the operation (its interval document id), and
+        the call returns without a network round trip.
+        """
+        state_paths = {write.path for write in writes if write.op == "update"}
+        if self.write_queue is not None and getattr(self._batch_state, "batch", None) is None:
+            if self.write_queue.enqueue(key, writes):
+                for path in state_paths:
+                    self._drop_live_state(path)
+                _LOGGER.debug("Queued write %s for replay", key)
+            self._wake_replayer()
+            return
+
+        client = self._get_firestore_client()
+        with self._writes(*(client.document(path) for path in sorted(state_paths))) as batch:
+            _add_writes(batch, client, writes)
+
+    @instrumented
+    def flush_write_queue(self) -> int:
+        """Replay queued writes now, oldest first, in batched commits.
+
+        Operations are committed whole, up to MAX_BATCH_WRITES writes per
+        commit, and removed from the queue once committed. If a batch is
+        rejected (invalid data, failed precondition), its oldest operation is
+        retried alone so one bad operation cannot hold back the rest; it is
+        parked after WriteQueue.max_attempts such rejections. Network, server
+        and auth errors never count against an operation: the queue stays as
+        it is until Firestore can be reached again.
+
+        Returns:
+            Number of operations replayed
+
+        Raises:
+            The error of a failed commit; unreplayed operations stay queued
+        """
+        if self.write_queue is None:
+            raise ValueError("No write queue configured")
+
+        replayed = 0
+        with self._replay_lock:
+            while True:
+                operations = self.write_queue.pending(MAX_BATCH_WRITES)
+                if not operations:
+                    return replayed
+                try:
+                    self._replay(operations)
+                except Exception as err:
+                    if not self._transport.is_permanent_error(err):
+                        raise  # Outage: keep every operation queued and back off
+                    if len(operations) == 1:
+                        self._reject_queued(operations[0], err)
+                        continue
+                    # Replay the oldest operation alone: it may be the one being rejected
+                    operations = operations[:1]
+                    try:
+                        self._replay(operations)
+                    except Exception as head_err:
+                        if not self._transport.is_permanent_error(head_err):
+                            raise
+                        self._reject_queued(operations[0], head_err)
+                        continue
+                self.write_queue.remove([operation.seq for operation in operations])
+                replayed += len(operations)
+                _LOGGER.info("Replayed %d queued writes (%d left)", len(operations), len(self.write_queue))
+
+    def _reject_queued(self, operation: QueuedOperation, error: Exception) -> None:
+        """Count a permanent replay failure; re-raise it unless the operation is now parked."""
+        assert self.write_queue is not None
+        if not self.write_queue.record_failure(operation.seq, error):
+            raise error
+        record(parked=1)  # The rest of the queue replays without it
+
+    def _replay(self, operations: list[QueuedOperation]) -> None:
+        """Commit queued operations in one WriteBatch."""
+        client = self._get_firestore_client()
+        write_batch = client.batch()
+        state_paths: set[str] = set()
+        for operation in operations:
+            _add_writes(write_batch, client, operation.writes)
+            state_paths.update(write.path for write in operation.writes if write.op == "update")
+        self._commit(write_batch, state_paths)
+
+    def _wake_replayer(self) -> None:
+        """Start the write queue replay thread if needed and signal it."""
+        with self._resource_lock:
+            if self._replayer is None or not self._replayer.is_alive():
+                self._replayer_stop.clear()
+                self._replayer = threading.Thread(
+                    target=self._run_replayer, name="huckleberry-write-replayer", daemon=True
+                )
+                self._replayer.start()
+        self._replay_wake.set()
+
+    def stop_write_replayer(self) -> None:
+        """Stop the background replay thread; queued writes stay in the queue."""
+        self._replayer_stop.set()
+        self._replay_wake.set()
+        replayer, self._replayer = self._replayer, None
+        if replayer is not None:
+            replayer.join(timeout=TOKEN_REFRESH_RETRY)
+
+    def _run_replayer(self) -> None:
+        """Background loop: replay when woken, backing off while commits fail."""
+        delay: float | None = None  # None: wait until writes are queued
+        while True:
+            self._replay_wake.wait(delay)
+            if self._replayer_stop.is_set():
+                return
+            self._replay_wake.clear()
+            try:
+                self.flush_write_queue()
+                delay = None
+            except Exception as err:
+                delay = min(delay * 2, WRITE_REPLAY_MAX_DELAY) if delay else WRITE_REPLAY_RETRY
+                _LOGGER.warning("Replaying queued writes failed, retrying in %ss: %s", delay, err)
+
+    @property
+    def supports_listeners(self) -> bool:
+        """Whether the transport has real-time listeners (setup_*_listener, enable_live_state)."""
+        return self._transport.supports_listeners
+
+    @instrumented
+    def enable_live_state(
+        self,
+        child_uid: str,
+        collections: Iterable[CollectionName] = ("sleep", "feed", "diaper", "health"),
+    ) -> None:
+        """Keep a child's top-level state documents warm in memory.
+
+        Snapshot listeners (the ones set up via setup_*_listener, or internal
+        ones if none exist) keep a copy of each document, and timer operations
+        read timer state from it instead of a blocking get(). Their writes
+        carry an update-time precondition, so a write based on a copy that
+        is behind the server fails and is retried once with a fresh read.
+        After one of our own writes, the copy is bypassed until the listener
+        delivers a snapshot at least as new as that write.
+
+        The cache is seeded with a single batched read. It is dropped by
+        stop_all_listeners() and disable_live_state().
+
+        Args:
+            child_uid: Child unique identifier
+            collections: State documents to keep warm
+
+        Raises:
+            ValueError: The transport has no real-time listeners (see supports_listeners)
+        """
+        if not self._transport.supports_listeners:
+            raise ValueError(
+                f"The live state cache needs real-time listeners, which the {self._transport.name!r} "
+                "transport does not support; use the gRPC transport"
+            )
+        collections = tuple(collections)
+        client = self._get_firestore_client()
+        refs = [client.collection(collection_name).document(child_uid) for collection_name in collections]
+        with self._snapshot_lock:
+            self._live_paths.update(ref.path for ref in refs)
+
+        for collection_name in collections:
+            with self._listener_lock:
+                has_listener = f"{collection_name}_{child_uid}" in self._listener_callbacks
+            if not has_listener:
+                self._setup_listener(collection_name, child_uid, _ignore_snapshot)
+
+        # Existing listeners delivered their first snapshot before the paths
+        # were tracked, so seed every document from one round trip
+        record(docs_read=len(refs))
+        for doc in client.get_all(refs):
+            self._store_live_state(
+                doc.reference.path, doc.to_dict() if doc.exists else None, doc.update_time if doc.exists else None
+            )
+        _LOGGER.info("Live state cache enabled for %s (%s)", child_uid, ", ".join(collections))
+
+    def disable_live_state(self) -> None:
+        """Stop serving timer state from memory and stop cache-only listeners."""
+        with self._snapshot_lock:
+            self._live_paths.clear()
+            self._live_state.clear()
+            self._live_min_update.clear()
+
+        with self._listener_lock:
+            internal = [
+                key for key, (_collection, _child, callback) in self._listener_callbacks.items()
+                if callback is _ignore_snapshot
+            ]
+            watches = [(key, self._listeners.pop(key, None)) for key in internal]
+            for key in internal:
+                del self._listener_callbacks[key]
+        for key, watch in watches:
+            if watch is not None:
+                self._stop_watch(key, watch)
+
+    def _store_live_state(self, path: str, data: dict | None, update_time: Any) -> None:
+        """Record a document snapshot for a tracked path, never going backwards."""
+        with self._snapshot_lock:
+            if path not in self._live_paths:
+                return
+            current = self._live_state.get(path)
+            if current is not None and current[1] is not None and update_time is not None and update_time < current[1]:
+                return
+            self._live_state[path] = (data, update_time)
+
+    def _drop_live_state(self, path: str) -> None:
+        """Forget the cached copy of a document until the next snapshot."""
+        with self._snapshot_lock:
+            self._live_state.pop(path, None)
+
+    def _cached_state(self, path: str) -> tuple[dict | None, Any] | None:
+        """Return (data, update_time) from the live state cache, or None if not usable."""
+        with self._snapshot_lock:
+            entry = self._live_state.get(path)
+            if entry is None:
+                return None
+            data, update_time = entry
+            min_update = self._live_min_update.get(path)
+            if min_update is not None:
+                if update_time is None or update_time < min_update:
+                    return None
+                del self._live_min_update[path]
+        return copy.deepcopy(data), update_time
+
+    def _read_state(self, collection_name: CollectionName, child_uid: str) -> tuple[Any, dict | None, Any]:
+        """Read a top-level state document, from the live state cache when warm.
+
+        Returns:
+            (document reference, data or None if the document does not exist,
+            write option making updates conditional on the state that was read)
+        """
+        client = self._get_firestore_client()
+        doc_ref = client.collection(collection_name).document(child_uid)
+
+        cached = self._cached_state(doc_ref.path)
+        if cached is not None:
+            data, update_time = cached
+            _LOGGER.debug("Read %s from live state cache", doc_ref.path)
+            record(cache_hits=1)
+        else:
+            doc = doc_ref.get(timeout=10.0)
+            record(docs_read=1)
+            data, update_time = (doc.to_dict(), doc.update_time) if doc.exists else (None, None)
+
+        option = client.write_option(last_update_time=update_time) if update_time is not None else None
+        return doc_ref, data, option
+
+    @instrumented
     def start_sleep(self, child_uid: str) -> None:
         """Start sleep tracking for a child."""
         _LOGGER.info("Starting sleep tracking for child %s", child_uid)
@@ -280,67 +974,25 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         sleep_ref = client.collection("sleep").document(child_uid)
 
-        current_time = time.time()
-        current_time_ms = current_time * 1000  # Milliseconds for timerStartTime
-
-        # Generate a unique session UUID (16 hex characters like the app)
-        session_uuid = uuid.uuid4().hex[:16]
-
-        # Update the timer field to mark sleep as active
-        # Match the structure from the Huckleberry app
-        sleep_data: FirebaseSleepDocument = {
-            "timer": {
-                "active": True,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "local_timestamp": current_time,
-                "timerStartTime": current_time_ms,  # Milliseconds timestamp
-                "uuid": session_uuid,  # Unique session identifier
-                "details": {
-                    "startSleepCondition": {
-                        "happy": False,
-                        "longTimeToFallAsleep": False,
-                        "10-20_minutes": False,
-                        "upset": False,
-                        "under_10_minutes": False,
-                    },
-                    "sleepLocations": {
-                        "car": False,
-                        "nursing": False,
-                        "wornOrHeld": False,
-                        "stroller": False,
-                        "coSleep": False,
-                        "nextToCarer": False,
-                        "onOwnInBed": False,
-                        "bottle": False,
-                        "swing": False,
-                    },
-                    "endSleepCondition": {
-                        "happy": False,
-                        "wokeUpChild": False,
-                        "upset": False,
-                    },
-                },
-            }
-        }
-        sleep_ref.set(cast(dict, sleep_data), merge=True)
+        sleep_data = _sleep_timer_payload(time.time())
+        with self._writes(sleep_ref) as batch:
+            batch.set(sleep_ref, cast(dict, sleep_data), merge=True)
 
         _LOGGER.info("Sleep tracking started successfully")
 
+    @instrumented
+    @_retry_on_stale_state("sleep")
     def pause_sleep(self, child_uid: str) -> None:
         """Pause current sleep session without ending it."""
         _LOGGER.info("Pausing sleep for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        sleep_ref = client.collection("sleep").document(child_uid)
-
         # Check if timer is active
-        sleep_doc = sleep_ref.get(timeout=10.0)
-        if not sleep_doc.exists:
+        sleep_ref, sleep_data, option = self._read_state("sleep", child_uid)
+        if sleep_data is None:
             _LOGGER.warning("No sleep document to pause for %s", child_uid)
             return
 
-        timer = sleep_doc.to_dict().get("timer", {})
+        timer = sleep_data.get("timer", {})
         if not timer.get("active", False):
             _LOGGER.info("Sleep is not active for %s, ignoring pause request", child_uid)
             return
@@ -353,30 +1005,30 @@ class HuckleberryAPI:
         timer_end_time_ms = now * 1000  # Convert to milliseconds
 
         # Add timerEndTime field that app uses to show end time when paused
-        sleep_ref.update({
-            "timer.paused": True,
-            "timer.active": True,
-            "timer.timerEndTime": timer_end_time_ms,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-        })
+        with self._writes(sleep_ref) as batch:
+            batch.update(sleep_ref, {
+                "timer.paused": True,
+                "timer.active": True,
+                "timer.timerEndTime": timer_end_time_ms,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+            }, option=option)
 
         _LOGGER.info("Sleep paused for child %s", child_uid)
 
+    @instrumented
+    @_retry_on_stale_state("sleep")
     def resume_sleep(self, child_uid: str) -> None:
         """Resume a paused sleep session."""
         _LOGGER.info("Resuming sleep for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        sleep_ref = client.collection("sleep").document(child_uid)
-
         # Check if timer is active and paused
-        sleep_doc = sleep_ref.get(timeout=10.0)
-        if not sleep_doc.exists:
+        sleep_ref, sleep_data, option = self._read_state("sleep", child_uid)
+        if sleep_data is None:
             _LOGGER.warning("No sleep document to resume for %s", child_uid)
             return
 
-        timer = sleep_doc.to_dict().get("timer", {})
+        timer = sleep_data.get("timer", {})
         if not timer.get("active", False):
             _LOGGER.info("Sleep is not active for %s, ignoring resume request", child_uid)
             return
@@ -386,64 +1038,53 @@ class HuckleberryAPI:
             return
 
         now = time.time()
-        sleep_ref.update({
-            "timer.paused": False,
-            "timer.active": True,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-        })
+        with self._writes(sleep_ref) as batch:
+            batch.update(sleep_ref, {
+                "timer.paused": False,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+            }, option=option)
 
         _LOGGER.info("Sleep resumed for child %s", child_uid)
 
+    @instrumented
+    @_retry_on_stale_state("sleep")
     def cancel_sleep(self, child_uid: str) -> None:
         """Cancel current sleep session without saving an interval."""
         _LOGGER.info("Cancelling current sleep for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        sleep_ref = client.collection("sleep").document(child_uid)
-
         # Check current state
-        doc = sleep_ref.get(timeout=10.0)
-        if doc.exists:
-            timer_data = doc.to_dict()
+        sleep_ref, timer_data, option = self._read_state("sleep", child_uid)
+        if timer_data is not None:
             if timer_data:
                 timer = timer_data.get("timer", {})
                 _LOGGER.info("Current timer state: active=%s, paused=%s", timer.get("active"), timer.get("paused"))
-                session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
+                session_uuid = timer.get("uuid", _new_session_uuid())
             else:
-                session_uuid = uuid.uuid4().hex[:16]
+                session_uuid = _new_session_uuid()
         else:
             _LOGGER.warning("Sleep document does not exist for child %s", child_uid)
-            session_uuid = uuid.uuid4().hex[:16]
+            session_uuid = _new_session_uuid()
 
         # Set timer to inactive (don't delete it - app expects it to remain)
-        current_time = time.time()
-        sleep_ref.update({
-            "timer": {
-                "active": False,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "timerStartTime": None,
-                "uuid": session_uuid,
-                "local_timestamp": current_time,
-            },
-        })
+        with self._writes(sleep_ref) as batch:
+            batch.update(sleep_ref, {"timer": _inactive_sleep_timer(session_uuid, time.time())}, option=option)
 
         _LOGGER.info("Sleep cancelled for child %s", child_uid)
 
+    @instrumented
+    @_retry_on_stale_state("sleep")
     def complete_sleep(self, child_uid: str) -> None:
         """Complete current sleep session and save interval."""
         _LOGGER.info("Completing sleep for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        sleep_ref = client.collection("sleep").document(child_uid)
-
-        sleep_doc = sleep_ref.get(timeout=10.0)
-        if not sleep_doc.exists:
+        sleep_ref, sleep_data, option = self._read_state("sleep", child_uid)
+        if sleep_data is None:
             _LOGGER.warning("No active sleep document to complete for %s", child_uid)
             return
 
-        data = sleep_doc.to_dict() or {}
+        data = sleep_data or {}
         timer = data.get("timer") or {}
 
         # Check if timer is already inactive (already completed)
@@ -451,68 +1092,23 @@ class HuckleberryAPI:
             _LOGGER.info("Sleep already completed for %s, ignoring duplicate request", child_uid)
             return
 
-        timer_start_ms = timer.get("timerStartTime")
-        if not timer_start_ms:
-            # Attempt fallback: reconstruct using timestamp.seconds if available
-            ts_seconds = timer.get("timestamp", {}).get("seconds")
-            if ts_seconds:
-                timer_start_ms = int(float(ts_seconds) * 1000)
-                _LOGGER.warning("timerStartTime missing; falling back to timestamp.seconds for %s", child_uid)
-            else:
-                _LOGGER.warning("Missing timerStartTime; cannot compute duration for %s", child_uid)
-                sleep_ref.update({"timer": firestore.DELETE_FIELD})
-                return
-
-        now_ms = time.time() * 1000
-
-        # If sleep is paused, use timerEndTime as the end time (not current time)
-        if timer.get("paused", False) and "timerEndTime" in timer:
-            end_ms = timer["timerEndTime"]
-            _LOGGER.info("Sleep is paused, using timerEndTime for completion")
-        else:
-            end_ms = now_ms
-
-        duration_sec = int((end_ms - float(timer_start_ms)) / 1000)
-        start_sec = int(float(timer_start_ms) / 1000)
-
-        intervals_ref = sleep_ref.collection("intervals")
-        interval_id = uuid.uuid4().hex[:16]
-        intervals_ref.document(interval_id).set({
-            "_id": interval_id,
-            "start": start_sec,
-            "duration": duration_sec,
-            "offset": -120.0,
-            "end_offset": -120.0,
-            "details": timer.get("details", {}),
-            "lastUpdated": time.time(),
-        })
-
-        # Set timer to inactive (match stop_sleep behavior)
-        current_time = time.time()
-        session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
-
-        last_sleep_data: LastSleepData = {
-            "start": start_sec,
-            "duration": duration_sec,
-            "offset": -120.0,
-        }
+        now = time.time()
+        completion = _sleep_completion(timer, child_uid, now)
+        if completion is None:
+            with self._writes(sleep_ref) as batch:
+                batch.update(sleep_ref, {"timer": self._transport.delete_field}, option=option)
+            return
+        start_sec, duration_sec = completion
 
-        sleep_ref.update({
-            "timer": {
-                "active": False,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "timerStartTime": None,
-                "uuid": session_uuid,
-                "local_timestamp": current_time,
-            },
-            "prefs.lastSleep": last_sleep_data,
-            "prefs.timestamp": {"seconds": current_time},
-            "prefs.local_timestamp": current_time,
-        })
+        # Interval and inactive timer (match stop_sleep behavior) commit atomically
+        interval_id, interval, update = _sleep_completion_writes(timer, start_sec, duration_sec, now)
+        with self._writes(sleep_ref) as batch:
+            batch.set(sleep_ref.collection("intervals").document(interval_id), interval)
+            batch.update(sleep_ref, update, option=option)
 
         _LOGGER.info("Sleep completed for child %s (duration %ss)", child_uid, duration_sec)
 
+    @instrumented
     def start_feeding(self, child_uid: str, side: FeedSide = "left") -> None:
         """Start feeding tracking."""
         _LOGGER.info("Starting feeding for child %s on %s side", child_uid, side)
@@ -520,42 +1116,23 @@ class HuckleberryAPI:
         client = self._get_firestore_client()
         feed_ref = client.collection("feed").document(child_uid)
 
-        current_time = time.time()
-
-        session_uuid = uuid.uuid4().hex[:16]
-
-        feed_data: FirebaseFeedDocument = {
-            "timer": {
-                "active": True,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "local_timestamp": current_time,
-                "feedStartTime": current_time,
-                "timerStartTime": current_time,
-                "uuid": session_uuid,
-                "leftDuration": 0.0,
-                "rightDuration": 0.0,
-                "lastSide": "left",  # Always start with lastSide as left
-                "activeSide": side,  # activeSide indicates which side is currently feeding
-            }
-        }
-        feed_ref.set(cast(dict, feed_data), merge=True)
+        feed_data = _feed_timer_payload(time.time(), side)
+        with self._writes(feed_ref) as batch:
+            batch.set(feed_ref, cast(dict, feed_data), merge=True)
 
         _LOGGER.info("Feeding started on %s side", side)
 
+    @instrumented
+    @_retry_on_stale_state("feed")
     def pause_feeding(self, child_uid: str) -> None:
         """Pause current feeding session."""
         _LOGGER.info("Pausing feeding for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        feed_ref = client.collection("feed").document(child_uid)
-
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
+        feed_ref, timer_data, option = self._read_state("feed", child_uid)
+        if timer_data is None:
             _LOGGER.warning("Feed document not found")
             return
 
-        timer_data = doc.to_dict()
         if not timer_data:
             _LOGGER.warning("Feed document has no data")
             return
@@ -573,46 +1150,34 @@ class HuckleberryAPI:
 
         # Calculate elapsed time and accumulate to current side
         now = time.time()
-        timer_start = timer.get("timerStartTime", now)
-        elapsed = now - timer_start
-
-        left_duration = timer.get("leftDuration", 0.0)
-        right_duration = timer.get("rightDuration", 0.0)
-
-        if current_side == "left":
-            left_duration += elapsed
-        else:
-            right_duration += elapsed
-
-        feed_ref.update({
-            "timer.paused": True,
-            "timer.active": True,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-            "timer.leftDuration": left_duration,
-            "timer.rightDuration": right_duration,
-            "timer.lastSide": current_side,
-        })
-
-        # Remove activeSide when paused
-        from google.cloud.firestore import DELETE_FIELD
-        feed_ref.update({"timer.activeSide": DELETE_FIELD})
+        left_duration, right_duration = _accumulate_feed_sides(timer, now)
+
+        # Remove activeSide when paused, in the same write
+        with self._writes(feed_ref) as batch:
+            batch.update(feed_ref, {
+                "timer.paused": True,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.leftDuration": left_duration,
+                "timer.rightDuration": right_duration,
+                "timer.lastSide": current_side,
+                "timer.activeSide": self._transport.delete_field,
+            }, option=option)
 
         _LOGGER.info("Feeding paused (L:%ss R:%ss)", left_duration, right_duration)
 
+    @instrumented
+    @_retry_on_stale_state("feed")
     def resume_feeding(self, child_uid: str, side: FeedSide | None = None) -> None:
         """Resume paused feeding session."""
         _LOGGER.info("Resuming feeding for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        feed_ref = client.collection("feed").document(child_uid)
-
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
+        feed_ref, timer_data, option = self._read_state("feed", child_uid)
+        if timer_data is None:
             _LOGGER.warning("Feed document not found")
             return
 
-        timer_data = doc.to_dict()
         if not timer_data:
             _LOGGER.warning("Feed document has no data")
             return
@@ -631,31 +1196,30 @@ class HuckleberryAPI:
 
         now = time.time()
 
-        feed_ref.update({
-            "timer.paused": False,
-            "timer.active": True,
-            "timer.timestamp": {"seconds": now},
-            "timer.local_timestamp": now,
-            "timer.timerStartTime": now,  # Reset timer start time on resume
-            "timer.activeSide": side,
-            "timer.lastSide": "none",  # Set to none during transition
-        })
+        with self._writes(feed_ref) as batch:
+            batch.update(feed_ref, {
+                "timer.paused": False,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.timerStartTime": now,  # Reset timer start time on resume
+                "timer.activeSide": side,
+                "timer.lastSide": "none",  # Set to none during transition
+            }, option=option)
 
         _LOGGER.info("Feeding resumed on %s", side)
 
+    @instrumented
+    @_retry_on_stale_state("feed")
     def switch_feeding_side(self, child_uid: str) -> None:
         """Switch feeding side (left <-> right)."""
         _LOGGER.info("Switching feeding side for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        feed_ref = client.collection("feed").document(child_uid)
-
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
+        feed_ref, timer_data, option = self._read_state("feed", child_uid)
+        if timer_data is None:
             _LOGGER.warning("Feed document not found")
             return
 
-        timer_data = doc.to_dict()
         if not timer_data:
             _LOGGER.warning("Feed document has no data")
             return
@@ -670,19 +1234,14 @@ class HuckleberryAPI:
         is_paused = timer.get("paused", False)
 
         now = time.time()
-        left_duration = timer.get("leftDuration", 0.0)
-        right_duration = timer.get("rightDuration", 0.0)
 
         # Only accumulate duration if NOT paused
         if not is_paused:
             # Calculate duration since timer started and accumulate to current side
-            timer_start = timer.get("timerStartTime", now)
-            elapsed = now - timer_start
-
-            if current_side == "left":
-                left_duration += elapsed
-            else:
-                right_duration += elapsed
+            left_duration, right_duration = _accumulate_feed_sides(timer, now)
+        else:
+            left_duration = timer.get("leftDuration", 0.0)
+            right_duration = timer.get("rightDuration", 0.0)
 
         update_data = {
             "timer.paused": False,  # Switching always resumes
@@ -695,58 +1254,44 @@ class HuckleberryAPI:
             "timer.rightDuration": right_duration,
         }
 
-        feed_ref.update(update_data)
+        with self._writes(feed_ref) as batch:
+            batch.update(feed_ref, update_data, option=option)
 
         _LOGGER.info("Switched from %s to %s (L:%ss R:%ss)", current_side, new_side, left_duration, right_duration)
 
+    @instrumented
+    @_retry_on_stale_state("feed")
     def cancel_feeding(self, child_uid: str) -> None:
         """Cancel current feeding without saving."""
         _LOGGER.info("Cancelling feeding for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        feed_ref = client.collection("feed").document(child_uid)
-
-        doc = feed_ref.get(timeout=10.0)
-        if doc.exists:
-            timer_data = doc.to_dict()
+        feed_ref, timer_data, option = self._read_state("feed", child_uid)
+        if timer_data is not None:
             if timer_data:
                 timer = timer_data.get("timer", {})
-                session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
+                session_uuid = timer.get("uuid", _new_session_uuid())
             else:
-                session_uuid = uuid.uuid4().hex[:16]
+                session_uuid = _new_session_uuid()
         else:
-            session_uuid = uuid.uuid4().hex[:16]
+            session_uuid = _new_session_uuid()
 
-        current_time = time.time()
-        feed_ref.update({
-            "timer": {
-                "active": False,
-                "paused": False,
-                "timestamp": {"seconds": current_time},
-                "timerStartTime": None,
-                "uuid": session_uuid,
-                "local_timestamp": current_time,
-                "leftDuration": 0.0,
-                "rightDuration": 0.0,
-                "lastSide": "left",
-            },
-        })
+        with self._writes(feed_ref) as batch:
+            batch.update(feed_ref, {"timer": _inactive_feed_timer(session_uuid, time.time())}, option=option)
 
         _LOGGER.info("Feeding cancelled")
 
+    @instrumented
+    @_retry_on_stale_state("feed")
     def complete_feeding(self, child_uid: str) -> None:
         """Complete current feeding and save to history."""
         _LOGGER.info("Completing feeding for child %s", child_uid)
 
-        client = self._get_firestore_client()
-        feed_ref = client.collection("feed").document(child_uid)
-
-        doc = feed_ref.get(timeout=10.0)
-        if not doc.exists:
+        feed_ref, feed_data, option = self._read_state("feed", child_uid)
+        if feed_data is None:
             _LOGGER.warning("No active feed document to complete")
             return
 
-        data = doc.to_dict() or {}
+        data = feed_data or {}
         timer = data.get("timer") or {}
 
         # Check if timer is already inactive (already completed)
@@ -760,90 +1305,26 @@ class HuckleberryAPI:
             return
 
         now_time = time.time()
-        # timerStartTime is in seconds for feeding
-        timer_start_sec = float(timer_start)
-
-        left_duration = timer.get("leftDuration", 0.0)
-        right_duration = timer.get("rightDuration", 0.0)
-
-        # Add elapsed time on current side if not paused
-        if not timer.get("paused", False):
-            elapsed = now_time - timer_start_sec
-            current_side = timer.get("activeSide", timer.get("lastSide", "left"))
-
-            if current_side == "left":
-                left_duration += elapsed
-            else:
-                right_duration += elapsed
-
-        # Calculate total duration from accumulated durations
-        total_duration = left_duration + right_duration
-
-        session_uuid = timer.get("uuid", uuid.uuid4().hex[:16])
-        feed_start_time = timer.get("feedStartTime", timer_start_sec)
-
-        # Determine last side for history
-        last_side_value = timer.get("activeSide", timer.get("lastSide", "right"))
-        if last_side_value == "none":
-            last_side_value = "right" if right_duration >= left_duration else "left"
-
-        from google.cloud.firestore import DELETE_FIELD
-
-        # Create interval document ID (format: timestamp-random)
-        interval_id = f"{int(now_time * 1000)}-{uuid.uuid4().hex[:20]}"
-
-        # Create interval document for history (feed/{child_uid}/intervals)
-        feed_intervals_ref = feed_ref.collection("intervals").document(interval_id)
+        interval_id, interval, update, total_duration = _feed_completion_writes(
+            timer, now_time, self._transport.delete_field
+        )
 
+        # History interval (feed/{child_uid}/intervals) and timer reset commit atomically
         try:
-            feed_intervals_ref.set({
-                "mode": "breast",
-                "start": feed_start_time,
-                "lastSide": last_side_value,
-                "lastUpdated": now_time,
-                "leftDuration": left_duration,
-                "rightDuration": right_duration,
-                "offset": -120.0,
-                "end_offset": -120.0,
-            })
-            _LOGGER.info("Created feeding interval entry: %s", interval_id)
+            with self._writes(feed_ref) as batch:
+                batch.set(feed_ref.collection("intervals").document(interval_id), interval)
+                batch.update(feed_ref, update, option=option)
         except Exception as err:
-            _LOGGER.error("Failed to create feeding interval entry: %s", err)
-
-        last_nursing_data: LastNursingData = {
-            "mode": "breast",
-            "start": feed_start_time,
-            "duration": total_duration,
-            "leftDuration": left_duration,
-            "rightDuration": right_duration,
-            "offset": -120.0,
-        }
-
-        last_side_data: LastSideData = {
-            "start": feed_start_time,
-            "lastSide": last_side_value,
-        }
+            _LOGGER.error("Failed to complete feeding %s: %s", interval_id, err)
+            raise
 
-        # Update to inactive and save to lastNursing
-        feed_ref.update({
-            "timer.active": False,
-            "timer.paused": True,
-            "timer.timestamp": {"seconds": now_time},
-            "timer.local_timestamp": now_time,
-            "timer.lastSide": last_side_value,
-            "timer.leftDuration": DELETE_FIELD,  # Remove durations from timer
-            "timer.rightDuration": DELETE_FIELD,
-            "timer.activeSide": DELETE_FIELD,  # Remove activeSide
-            "prefs.lastNursing": last_nursing_data,
-            "prefs.lastSide": last_side_data,
-            "prefs.timestamp": {"seconds": now_time},
-            "prefs.local_timestamp": now_time,
-        })
-
-        _LOGGER.info("Feeding completed (total duration %ss, L:%ss R:%ss)", total_duration, left_duration, right_duration)
+        _LOGGER.info(
+            "Feeding completed (total duration %ss, L:%ss R:%ss)",
+            total_duration, interval["leftDuration"], interval["rightDuration"],
+        )
 
     def _setup_listener(
-        self, collection_name: CollectionName, child_uid: str, callback: Callable[[TDocumentData], None]
+        self, collection_name: str, child_uid: str, callback: Callable[[TDocumentData], None]
     ) -> None:
         """Set up real-time listener for a Firestore document.
 
@@ -851,30 +1332,104 @@ class HuckleberryAPI:
 
         Args:
             collection_name: Name of the Firestore collection (e.g., 'sleep', 'feed', 'health', 'diaper')
-            child_uid: Child unique identifier
+            child_uid: Document id (the child's uid, or the user's uid for 'users')
             callback: Function to call when document changes, receives document data of the appropriate type
         """
+        if not self._transport.supports_listeners:
+            raise ValueError(f"Real-time listeners require the gRPC transport, not {self._transport.name!r}")
         _LOGGER.info("Setting up real-time listener for %s/%s", collection_name, child_uid)
 
+        # Resolve the client (and any pending refresh) before taking the listener lock
         client = self._get_firestore_client()
+        listener_key = f"{collection_name}_{child_uid}"
+        with self._listener_lock:
+            previous = self._listeners.pop(listener_key, None)
+            if previous is not None:
+                self._stop_watch(listener_key, previous)
+            with self._snapshot_lock:
+                self._listener_update_times.pop(listener_key, None)
+
+            self._listeners[listener_key] = self._watch_document(client, collection_name, child_uid, callback)
+            # Store callback for recreation after token refresh
+            self._listener_callbacks[listener_key] = (collection_name, child_uid, callback)
+
+        _LOGGER.info("Real-time %s listener active for child %s", collection_name, child_uid)
+
+    def _watch_document(
+        self,
+        client: Any,
+        collection_name: str,
+        child_uid: str,
+        callback: Callable[[TDocumentData], None],
+    ):
+        """Start a snapshot watch on one document and return its handle.
+
+        Snapshots whose update_time was already delivered for this listener
+        are dropped, so a replacement watch opened during a rollover does not
+        repeat the document state the old watch already reported.
+        """
+        listener_key = f"{collection_name}_{child_uid}"
         doc_ref = client.collection(collection_name).document(child_uid)
+        state_path = f"{collection_name}/{child_uid}"
 
-        # Create snapshot listener
         def on_snapshot(doc_snapshot, changes, read_time):
             """Handle snapshot updates."""
             for doc in doc_snapshot:
-                if doc.exists:
-                    _LOGGER.debug("Real-time %s update received for child %s", collection_name, child_uid)
-                    callback(doc.to_dict())
+                self._store_live_state(
+                    state_path, doc.to_dict() if doc.exists else None, getattr(doc, "update_time", None)
+                )
+                if not doc.exists:
+                    continue
+                update_time = getattr(doc, "update_time", None)
+                with self._snapshot_lock:
+                    if update_time is not None and self._listener_update_times.get(listener_key) == update_time:
+                        continue
+                    self._listener_update_times[listener_key] = update_time
+                _LOGGER.debug("Real-time %s update received for child %s", collection_name, child_uid)
+                callback(doc.to_dict())
 
-        # Start listening and store the unsubscribe function
-        unsubscribe = doc_ref.on_snapshot(on_snapshot)
-        listener_key = f"{collection_name}_{child_uid}"
-        self._listeners[listener_key] = unsubscribe
-        # Store callback for recreation after token refresh
-        self._listener_callbacks[listener_key] = (collection_name, child_uid, callback)
+        return doc_ref.on_snapshot(on_snapshot)
 
-        _LOGGER.info("Real-time %s listener active for child %s", collection_name, child_uid)
+    @staticmethod
+    def _stop_watch(key: str, watch) -> None:
+        """Stop one snapshot watch, logging rather than raising on failure."""
+        try:
+            if hasattr(watch, "unsubscribe") and callable(getattr(watch, "unsubscribe")):
+                watch.unsubscribe()
+            elif hasattr(watch, "close") and callable(getattr(watch, "close")):
+                watch.close()
+            else:
+                _LOGGER.debug("Listener %s object has no unsubscribe/close", key)
+            _LOGGER.debug("Stopped listener: %s", key)
+        except Exception as err:
+            _LOGGER.error("Error stopping listener %s: %s", key, err)
+
+    def _roll_over_listeners(self) -> None:
+        """Move every listener onto the current token, make-before-break.
+
+        Replacement watches are opened with the new token first; each old
+        watch is stopped only once its replacement is up, so no update
+        window is left uncovered. If a replacement cannot be opened the old
+        watch is kept running until the next refresh.
+        """
+        client = self._get_firestore_client()
+        retired = []
+        with self._listener_lock:
+            _LOGGER.info("Rolling over %d listeners onto refreshed token", len(self._listener_callbacks))
+            for key, (collection_name, child_uid, callback) in list(self._listener_callbacks.items()):
+                try:
+                    watch = self._watch_document(client, collection_name, child_uid, callback)
+                except Exception as err:
+                    _LOGGER.error("Error recreating %s listener for child %s: %s", collection_name, child_uid, err)
+                    continue
+                previous = self._listeners.get(key)
+                self._listeners[key] = watch
+                if previous is not None:
+                    retired.append((key, previous))
+                _LOGGER.debug("Recreated %s listener for child %s", collection_name, child_uid)
+
+        for key, watch in retired:
+            self._stop_watch(key, watch)
 
     def setup_realtime_listener(
         self, child_uid: str, callback: Callable[[SleepDocumentData], None]
@@ -903,20 +1458,20 @@ class HuckleberryAPI:
     def stop_all_listeners(self) -> None:
         """Stop all active real-time listeners."""
         _LOGGER.info("Stopping all real-time listeners")
-        for key, watch in self._listeners.items():
-            try:
-                if hasattr(watch, "unsubscribe") and callable(getattr(watch, "unsubscribe")):
-                    watch.unsubscribe()
-                elif hasattr(watch, "close") and callable(getattr(watch, "close")):
-                    watch.close()
-                else:
-                    _LOGGER.debug("Listener %s object has no unsubscribe/close", key)
-                _LOGGER.debug("Stopped listener: %s", key)
-            except Exception as err:
-                _LOGGER.error("Error stopping listener %s: %s", key, err)
-        self._listeners.clear()
-        self._listener_callbacks.clear()
-
+        with self._listener_lock:
+            listeners = dict(self._listeners)
+            self._listeners.clear()
+            self._listener_callbacks.clear()
+        for key, watch in listeners.items():
+            self._stop_watch(key, watch)
+        with self._snapshot_lock:
+            self._listener_update_times.clear()
+            # Nothing keeps the live state cache current any more
+            self._live_paths.clear()
+            self._live_state.clear()
+            self._live_min_update.clear()
+
+    @instrumented
     def log_diaper(self, child_uid: str, mode: DiaperMode,
                    pee_amount: DiaperAmount | None = None, poo_amount: DiaperAmount | None = None,
                    color: PooColor | None = None, consistency: PooConsistency | None = None,
@@ -936,72 +1491,25 @@ class HuckleberryAPI:
         """
         _LOGGER.info("Logging diaper change for child %s: mode=%s", child_uid, mode)
 
-        client = self._get_firestore_client()
-        diaper_ref = client.collection("diaper").document(child_uid)
-
         current_time = time.time()
+        interval_id = _new_interval_id(current_time)
+        interval_data = _diaper_interval_payload(
+            current_time, mode, pee_amount, poo_amount, color, consistency, diaper_rash, notes
+        )
 
-        # Create interval ID (timestamp in ms + random suffix)
-        interval_timestamp_ms = int(current_time * 1000)
-        interval_id = f"{interval_timestamp_ms}-{uuid.uuid4().hex[:20]}"
-
-        # Build interval data (matching app behavior - minimal fields by default)
-        interval_data: FirebaseDiaperInterval = {
-            "start": current_time,
-            "lastUpdated": current_time,
-            "mode": mode,
-            "offset": -120.0,  # Timezone offset (adjust as needed)
-        }
-
-        # Add quantity field if amounts are specified
-        # App uses: 0.0 = "little", 50.0 = "medium", 100.0 = "big"
-        # Other values are treated as no quantity indicator
-        amount_map = {"little": 0.0, "medium": 50.0, "big": 100.0}
-        quantity = {}
-        if pee_amount and pee_amount in amount_map:
-            quantity["pee"] = amount_map[pee_amount]
-        if poo_amount and poo_amount in amount_map:
-            quantity["poo"] = amount_map[poo_amount]
-        if quantity:
-            interval_data["quantity"] = quantity
-
-        # Add optional fields if provided
-        if color:
-            interval_data["color"] = color
-        if consistency:
-            interval_data["consistency"] = consistency
-        if diaper_rash:
-            interval_data["diaperRash"] = True  # type: ignore # Not in TypedDict yet
-        if notes:
-            interval_data["notes"] = notes  # type: ignore # Not in TypedDict yet
-
-        # Create interval document in subcollection
-        try:
-            diaper_ref.collection("intervals").document(interval_id).set(cast(dict, interval_data))
-            _LOGGER.info("Created diaper interval: %s", interval_id)
-        except Exception as err:
-            _LOGGER.error("Failed to create diaper interval: %s", err)
-            raise
-
-        # Update prefs.lastDiaper
+        # Interval document in subcollection and prefs.lastDiaper commit atomically
         try:
-            last_diaper_data: LastDiaperData = {
-                "start": current_time,
-                "mode": mode,
-                "offset": -120.0,
-            }
-            diaper_ref.update({
-                "prefs.lastDiaper": last_diaper_data,
-                "prefs.timestamp": {"seconds": current_time},
-                "prefs.local_timestamp": current_time,
-            })
-            _LOGGER.info("Updated lastDiaper prefs")
+            self._apply_writes(interval_id, [
+                QueuedWrite("set", f"diaper/{child_uid}/intervals/{interval_id}", cast(dict, interval_data)),
+                QueuedWrite("update", f"diaper/{child_uid}", _diaper_prefs_update(current_time, mode)),
+            ])
         except Exception as err:
-            _LOGGER.error("Failed to update diaper prefs: %s", err)
+            _LOGGER.error("Failed to log diaper interval %s: %s", interval_id, err)
             raise
 
         _LOGGER.info("Diaper change logged successfully")
 
+    @instrumented
     def log_growth(self, child_uid: str, weight: float | None = None, height: float | None = None,
                    head: float | None = None, units: MeasurementUnits = "metric") -> None:
         """
@@ -1019,72 +1527,105 @@ class HuckleberryAPI:
         if not any([weight, height, head]):
             raise ValueError("At least one measurement (weight, height, or head) is required")
 
-        client = self._get_firestore_client()
-        health_ref = client.collection("health").document(child_uid)
-
         current_time = time.time()
+        interval_id = _new_interval_id(current_time)
+        growth_entry = _growth_entry_payload(current_time, interval_id, weight, height, head, units)
 
-        # Create interval ID (timestamp in ms + random suffix)
-        interval_timestamp_ms = int(current_time * 1000)
-        interval_id = f"{interval_timestamp_ms}-{uuid.uuid4().hex[:20]}"
-
-        # Build growth entry matching Huckleberry app structure
-        growth_entry: FirebaseGrowthData = {
-            "_id": interval_id,  # type: ignore # _id is not in TypedDict but Firestore accepts it
-            "type": "health",
-            "mode": "growth",
-            "start": current_time,
-            "lastUpdated": current_time,
-            "offset": -120.0,  # Timezone offset (adjust as needed)
-            "isNight": False,
-            "multientry_key": None,
-        }
-
-        # Add measurements with proper unit fields (matches app structure)
-        if units == "metric":
-            if weight is not None:
-                growth_entry["weight"] = float(weight)
-                growth_entry["weightUnits"] = "kg"
-            if height is not None:
-                growth_entry["height"] = float(height)
-                growth_entry["heightUnits"] = "cm"
-            if head is not None:
-                growth_entry["head"] = float(head)
-                growth_entry["headUnits"] = "hcm"  # App uses "hcm" for head circumference
-        else:  # imperial
-            if weight is not None:
-                growth_entry["weight"] = float(weight)
-                growth_entry["weightUnits"] = "lbs"
-            if height is not None:
-                growth_entry["height"] = float(height)
-                growth_entry["heightUnits"] = "in"
-            if head is not None:
-                growth_entry["head"] = float(head)
-                growth_entry["headUnits"] = "hin"  # Head in inches
-
-        # Create interval document in health/{child_uid}/data subcollection
-        # (Health uses "data" subcollection, not "intervals" like other trackers)
-        health_data_ref = health_ref.collection("data").document(interval_id)
-
-        try:
-            health_data_ref.set(cast(dict, growth_entry))
-            _LOGGER.info("Created growth data entry in subcollection: %s", interval_id)
-        except Exception as err:
-            _LOGGER.error("Failed to create growth data entry: %s", err)
-            # Continue to update prefs even if subcollection write fails
-
-        # Update prefs.lastGrowthEntry and timestamps (matches Huckleberry app structure)
+        # Entry in the health/{child_uid}/data subcollection (health uses "data",
+        # not "intervals" like other trackers) and prefs.lastGrowthEntry/timestamps
+        # (matches Huckleberry app structure) commit atomically
         try:
-            health_ref.update({
-                "prefs.lastGrowthEntry": growth_entry,
-                "prefs.timestamp": {"seconds": current_time},
-                "prefs.local_timestamp": current_time,
-            })
+            self._apply_writes(interval_id, [
+                QueuedWrite("set", f"health/{child_uid}/data/{interval_id}", cast(dict, growth_entry)),
+                QueuedWrite("update", f"health/{child_uid}", _growth_prefs_update(growth_entry, current_time)),
+            ])
             _LOGGER.info("Growth data logged successfully")
         except Exception as err:
             _LOGGER.error("Failed to log growth data: %s", err)
             raise
 
+    @instrumented
+    def import_intervals(
+        self,
+        child_uid: str,
+        records: Iterable[Mapping[str, Any]],
+        chunk_size: int = MAX_BATCH_WRITES,
+        skip: int = 0,
+        progress: Callable[[int], None] | None = None,
+        update_prefs: bool = False,
+    ) -> int:
+        """Write past sleep, feed, diaper and growth records in bulk.
+
+        Each record is a mapping with a 'type' ('sleep', 'feed', 'diaper',
+        'growth') and an explicit 'start' (Unix seconds or ISO 8601; naive
+        times are local). Sleeps need 'duration' (seconds) or 'end'; breast
+        feeds need 'left_duration'/'right_duration' (seconds) or 'duration'
+        (or 'end') plus 'side'; diapers need 'mode'; growth records need
+        'weight', 'height' and/or 'head' with optional 'units'. Optional
+        'notes' are kept.
+
+        Records are committed in WriteBatches of chunk_size documents. Document
+        ids are derived from the record content, so re-importing a file
+        overwrites rather than duplicates; to resume an interrupted import
+        pass the count reported by progress as skip. With a write queue the
+        records are queued (one chunk per transaction) and replayed in the
+        background, and progress reports queued records.
+
+        Args:
+            child_uid: Child unique identifier
+            records: Import records, e.g. from bulk_import.load_records()
+            chunk_size: Documents per commit (at most 500)
+            skip: Number of leading records to pass over (already imported)
+            progress: Called after each commit with the number of records
+                committed so far, including skipped ones
+            update_prefs: Also point prefs.last* at the latest imported record
+                of each kind; only use when the records are the newest events
+
+        Returns:
+            Number of records written
+
+        Raises:
+            ValueError: A record is invalid (records before it are committed)
+        """
+        queue = self.write_queue
+        client = self._get_firestore_client() if queue is None else None
+        now = time.time()
+        committed = skip
+        latest: dict[IntervalKind, tuple[float, dict]] = {}  # Only filled with update_prefs
+        last_doc_id = ""
+
+        for chunk in _import_chunks(records, chunk_size, skip, now):
+            operations = []
+            for kind, doc_id, document, _prefs in chunk:
+                collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+                path = f"{collection_name}/{child_uid}/{subcollection}/{doc_id}"
+                operations.append((doc_id, [QueuedWrite("set", path, document)]))
+            if queue is not None:
+                queue.enqueue_many(operations)
+                self._wake_replayer()
+            else:
+                write_batch = client.batch()
+                _add_writes(write_batch, client, (write for _doc_id, writes in operations for write in writes))
+                write_batch.commit()
+                record(docs_written=len(chunk))
+
+            committed += len(chunk)
+            _LOGGER.info("Imported %d records for child %s", committed, child_uid)
+            if update_prefs:
+                _track_latest_prefs(latest, chunk)
+                last_doc_id = chunk[-1][1]
+            if progress is not None:
+                progress(committed)
+
+        if latest:
+            self._apply_writes(f"{last_doc_id}:prefs", [
+                QueuedWrite("update", f"{_INTERVAL_SOURCES[kind][0]}/{child_uid}", prefs)
+                for kind, prefs in _latest_prefs_updates(latest).items()
+            ])
+
+        return committed - skip
+
+    @instrumented
     def get_growth_data(self, child_uid: str) -> GrowthData:
         """
         Get the latest growth measurements for a child.
@@ -1100,306 +1641,507 @@ class HuckleberryAPI:
 
         try:
             doc = health_ref.get()
-            if not doc.exists:
-                return {
-                    "weight_units": "kg",
-                    "height_units": "cm",
-                    "head_units": "hcm",
-                }
-
-            health_data = doc.to_dict()
+            record(docs_read=1)
+            health_data = doc.to_dict() if doc.exists else None
             if not health_data:
-                return {
-                    "weight_units": "kg",
-                    "height_units": "cm",
-                    "head_units": "hcm",
-                }
-
-            last_growth = health_data.get("prefs", {}).get("lastGrowthEntry", {})
-
-            if not last_growth:
-                return {
-                    "weight_units": "kg",
-                    "height_units": "cm",
-                    "head_units": "hcm",
-                }
-
-            result: GrowthData = {
-                "weight": last_growth.get("weight"),
-                "height": last_growth.get("height"),
-                "head": last_growth.get("head"),
-                "weight_units": last_growth.get("weightUnits", "kg"),
-                "height_units": last_growth.get("heightUnits", "cm"),
-                "head_units": last_growth.get("headUnits", "hcm"),
-                "timestamp_sec": last_growth.get("start"),
-            }
-            return result
+                return _growth_data_from_entry(None)
+
+            return _growth_data_from_entry(health_data.get("prefs", {}).get("lastGrowthEntry", {}))
         except Exception as err:
             _LOGGER.error("Failed to get growth data: %s", err)
-            return {
-                "weight_units": "kg",
-                "height_units": "cm",
-                "head_units": "hcm",
-            }
+            return _growth_data_from_entry(None)
 
+    @instrumented
     def get_calendar_events(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        kinds: Iterable[IntervalKind] = ("sleep", "feed", "diaper", "health"),
+        fetch_timings: dict[str, float] | None = None,
+        fields: Iterable[str] | None = None,
     ) -> dict[str, list[dict]]:
         """
         Fetch all calendar events (sleep, feed, diaper, health) for a date range.
 
+        The regular and multi-entry queries of every requested kind run
+        concurrently on the client's worker pool, so latency is bounded by the
+        slowest single query rather than the sum.
+
         Args:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            kinds: Event types to fetch (default: all four)
+            fetch_timings: Optional dict filled with per-query wall time in seconds
+                (e.g. 'sleep.regular', 'sleep.multi') plus 'total'
+            fields: Document fields to download (field paths, e.g. 'details.sleepLocations').
+                Default: only the fields the event dicts are built from. Requested
+                fields the event dicts do not already carry are added to them;
+                event fields left out of the request read as missing.
 
         Returns:
             Dictionary with event type keys and lists of event dicts
         """
-        return {
-            "sleep": self.get_sleep_intervals(child_uid, start_timestamp, end_timestamp),
-            "feed": self.get_feed_intervals(child_uid, start_timestamp, end_timestamp),
-            "diaper": self.get_diaper_intervals(child_uid, start_timestamp, end_timestamp),
-            "health": self.get_health_entries(child_uid, start_timestamp, end_timestamp),
-        }
+        return self._fetch_intervals(
+            list(kinds), child_uid, start_timestamp, end_timestamp, fetch_timings, fields=fields
+        )
 
-    def get_sleep_intervals(
+    @instrumented
+    def get_calendar_frames(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
-    ) -> list[dict]:
+        kinds: Iterable[IntervalKind] = ("sleep", "feed", "diaper", "health"),
+        fetch_timings: dict[str, float] | None = None,
+    ) -> dict[str, IntervalFrame]:
         """
-        Fetch sleep intervals from Firestore for a date range.
+        Fetch calendar events as columnar IntervalFrames instead of dicts.
+
+        Rows are decoded straight into columns in one pass, sorted by start,
+        with every duration normalized to seconds. Only the fields the columns
+        are built from are downloaded.
 
         Args:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            kinds: Event types to fetch (default: all four)
+            fetch_timings: Optional dict filled with per-query wall time in seconds
 
         Returns:
-            List of sleep interval dicts with 'start' and 'duration' fields
+            Dictionary with event type keys and IntervalFrame values
         """
-        events = []
+        return self._fetch_intervals(
+            list(kinds), child_uid, start_timestamp, end_timestamp, fetch_timings, columnar=True
+        )
+
+    @instrumented
+    def get_interval_frame(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+    ) -> IntervalFrame:
+        """Fetch one event kind for a date range as an IntervalFrame."""
+        return self.get_calendar_frames(child_uid, start_timestamp, end_timestamp, kinds=(kind,))[kind]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the worker pool used for query fan-out."""
+        with self._resource_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="huckleberry-query"
+                )
+            return self._executor
+
+    def _submit(self, fn: Callable[..., Any], *args: Any):
+        """Run fn on the worker pool, counted toward the calling operation's stats."""
+        return self._get_executor().submit(contextvars.copy_context().run, fn, *args)
+
+    def close(self) -> None:
+        """Stop the token refresher and write replayer and shut down the query worker pool."""
+        self.stop_token_refresher()
+        self.stop_write_replayer()
+        with self._resource_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    @instrumented
+    def sync_mirror(self, child_uid: str, kinds: Iterable[IntervalKind] = ("sleep", "feed", "diaper", "health")) -> int:
+        """Bring the local interval mirror up to date for a child.
+
+        Returns:
+            Number of documents written to the mirror
+        """
+        if self.mirror is None:
+            raise ValueError("No interval mirror configured")
+
         client = self._get_firestore_client()
-        sleep_ref = client.collection("sleep").document(child_uid)
-        intervals_ref = sleep_ref.collection("intervals")
+        written = 0
+        for kind in kinds:
+            collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+            intervals_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
+            written += self._sync_mirror(intervals_ref, kind, child_uid)
+        return written
+
+    def _sync_mirror(self, intervals_ref, kind: IntervalKind, child_uid: str) -> int:
+        """Pull documents changed since the mirror watermark into the mirror.
+
+        The first sync reads every regular document (the start filter leaves
+        out multi-entry documents); later syncs read documents with
+        lastUpdated >= watermark - MIRROR_SYNC_SKEW. lastUpdated is stamped by
+        the writing client, so the margin catches writes from clocks running
+        behind; upserts make the overlap idempotent. Both reads download only
+        the mirrored fields.
+        """
+        assert self.mirror is not None
+        field_filter = self._transport.field_filter
+        watermark = self.mirror.watermark(child_uid, kind)
+        if watermark is None:
+            query = intervals_ref.where(filter=field_filter("start", ">=", 0))
+        else:
+            query = intervals_ref.where(
+                filter=field_filter("lastUpdated", ">=", watermark - MIRROR_SYNC_SKEW)
+            ).order_by("lastUpdated")
+        query = query.select(_mirror_fields(kind))
+
+        synced_at = time.time()
+        written = self.mirror.apply(
+            child_uid, kind, ((doc.id, doc.to_dict()) for doc in query.stream()), synced_at
+        )
+        record(docs_read=max(written, 1))
+        _LOGGER.debug("Mirrored %d %s for child %s (watermark %s)", written, _INTERVAL_SOURCES[kind][3], child_uid, watermark)
+        return written
+
+    def _query_regular(
+        self, intervals_ref, kind: IntervalKind, child_uid: str, start_timestamp: int, end_timestamp: int,
+        decode: Callable[[dict, bool], Any], fields: list[str],
+    ) -> list:
+        """Query 1: regular documents with date filtering, downloading only fields."""
+        if self.mirror is not None and _mirror_covers(kind, fields):
+            self._sync_mirror(intervals_ref, kind, child_uid)
+            rows = self.mirror.range(child_uid, kind, start_timestamp, end_timestamp)
+            events = [decode(data, False) for data in rows]
+            record(cache_hits=len(events))
+            return events
 
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                events.append({
-                    "start": data["start"],
-                    "duration": data.get("duration", 0),
-                })
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
+        events = []
+        regular_docs = intervals_ref.where(
+            filter=self._transport.field_filter("start", ">=", start_timestamp)
+        ).where(
+            filter=self._transport.field_filter("start", "<", end_timestamp)
+        ).order_by("start").select(fields).stream()
+
+        read = 0
+        for doc in regular_docs:
+            read += 1
+            data = doc.to_dict()
+            if not data or data.get("multi"):
+                continue  # Skip multi-entry docs from this query
+            events.append(decode(data, False))
+        record(docs_read=max(read, 1))  # An empty result is billed as one read
+        return events
 
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
+    def _query_multi(
+        self, intervals_ref, kind: IntervalKind, child_uid: str, start_timestamp: int, end_timestamp: int,
+        decode: Callable[[dict, bool], Any], fields: list[str],
+    ) -> list:
+        """Query 2: multi-entry documents (can't filter by nested start field).
 
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
+        Lists the multi-entry documents with a minimal projection, re-downloads
+        only those whose update_time changed, and decodes just the cached
+        entries inside the window. The documents are cached whole, whatever
+        fields this read needs, so fields is not applied to them.
+        """
+        path = self._refresh_multi_cache(intervals_ref, kind, child_uid)
+        return [decode(entry, True) for entry in self.multi_cache.entries_in_range(path, start_timestamp, end_timestamp)]
+
+    def _refresh_multi_cache(self, intervals_ref, kind: IntervalKind, child_uid: str) -> str:
+        """Bring the cached multi-entry documents of one kind up to date and return their cache path."""
+        listing = {
+            doc.id: doc.update_time
+            for doc in intervals_ref.where(
+                filter=self._transport.field_filter("multi", "==", True)
+            ).select(["multi"]).stream()
+        }
 
-                    events.append({
-                        "start": entry_start,
-                        "duration": entry.get("duration", 0),
-                    })
+        path = _multi_cache_path(kind, child_uid)
+        stale = self.multi_cache.stale_ids(path, listing)
+        record(docs_read=max(len(listing), 1) + len(stale), cache_hits=len(listing) - len(stale))
+        if stale:
+            client = self._get_firestore_client()
+            for doc in client.get_all([intervals_ref.document(doc_id) for doc_id in stale]):
+                if doc.exists:
+                    self.multi_cache.store(path, doc.id, doc.update_time, doc.to_dict())
+        return path
 
-        except Exception as err:
-            _LOGGER.error("Error fetching sleep intervals: %s", err)
+    @instrumented
+    def count_intervals(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+        modes: Iterable[str] | None = None,
+    ) -> int:
+        """
+        Count events of one kind in a date range without downloading them.
 
-        return events
+        Regular documents are counted by a Firestore aggregation query (one
+        read per 1000 matching documents); multi-entry documents are counted
+        from the multi-entry cache.
 
-    def get_feed_intervals(
+        Args:
+            child_uid: Child unique identifier
+            kind: Event type ('sleep', 'feed', 'diaper', 'health')
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            modes: Only count events with one of these modes (e.g. ('pee', 'both'))
+
+        Returns:
+            Number of events
+        """
+        return self.interval_totals(child_uid, kind, start_timestamp, end_timestamp, modes)[0]
+
+    @instrumented
+    def sum_durations(
         self,
         child_uid: str,
+        kind: Literal["sleep", "feed"],
         start_timestamp: int,
         end_timestamp: int,
-    ) -> list[dict]:
+        modes: Iterable[str] | None = None,
+    ) -> float:
         """
-        Fetch feeding intervals from Firestore for a date range.
+        Total duration in seconds of sleeps or feeds in a date range.
+
+        Computed like count_intervals, with Firestore sum aggregations over
+        the regular documents. Feed totals are left + right side time.
 
         Args:
             child_uid: Child unique identifier
+            kind: 'sleep' or 'feed'
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            modes: Only include events with one of these modes (e.g. ('breast',))
 
         Returns:
-            List of feed interval dicts with 'start', 'leftDuration', 'rightDuration' fields
+            Total duration in seconds
         """
-        events = []
-        client = self._get_firestore_client()
-        feed_ref = client.collection("feed").document(child_uid)
-        intervals_ref = feed_ref.collection("intervals")
+        if kind not in _DURATION_FIELDS:
+            raise ValueError(f"{kind} events have no duration")
+        return self.interval_totals(child_uid, kind, start_timestamp, end_timestamp, modes)[1]
 
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                # Regular doc: durations are in minutes
-                events.append({
-                    "start": data["start"],
-                    "leftDuration": data.get("leftDuration", 0),
-                    "rightDuration": data.get("rightDuration", 0),
-                    "is_multi_entry": False,
-                })
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
+    @instrumented
+    def interval_totals(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+        modes: Iterable[str] | None = None,
+    ) -> tuple[int, float]:
+        """
+        Count events of one kind in a date range and total their durations.
 
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
+        One aggregation query answers both, so summaries needing the count
+        and the total of the same kind should use this rather than calling
+        count_intervals and sum_durations.
 
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
+        Args:
+            child_uid: Child unique identifier
+            kind: Event type ('sleep', 'feed', 'diaper', 'health')
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            modes: Only include events with one of these modes
 
-                    # Multi-entry: durations are in SECONDS
-                    events.append({
-                        "start": entry_start,
-                        "leftDuration": entry.get("leftDuration", 0),
-                        "rightDuration": entry.get("rightDuration", 0),
-                        "is_multi_entry": True,
-                    })
+        Returns:
+            (number of events, total duration in seconds; 0 for instant events)
+        """
+        modes = tuple(modes) if modes is not None else None
+        client = self._get_firestore_client()
+        collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+        intervals_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
 
-        except Exception as err:
-            _LOGGER.error("Error fetching feed intervals: %s", err)
+        regular = self._submit(
+            self._aggregate_regular, intervals_ref, kind, child_uid, start_timestamp, end_timestamp, modes
+        )
+        path = self._refresh_multi_cache(intervals_ref, kind, child_uid)
+        multi_count, multi_seconds = _tally_intervals(
+            kind, self.multi_cache.entries_in_range(path, start_timestamp, end_timestamp), True, modes
+        )
+        regular_count, regular_seconds = regular.result()
+        return regular_count + multi_count, regular_seconds + multi_seconds
+
+    def _aggregate_regular(
+        self, intervals_ref, kind: IntervalKind, child_uid: str, start_timestamp: int, end_timestamp: int,
+        modes: tuple[str, ...] | None,
+    ) -> tuple[int, float]:
+        """(count, duration seconds) of regular documents via an aggregation query.
+
+        Mode filters combine an equality filter with the start range, which
+        needs a composite index; if the project lacks it the documents are
+        streamed and tallied locally instead (remembered per kind).
+        """
+        if self.mirror is not None:
+            self._sync_mirror(intervals_ref, kind, child_uid)
+            return _tally_intervals(
+                kind, self.mirror.range(child_uid, kind, start_timestamp, end_timestamp), False, modes
+            )
 
-        return events
+        field_filter = self._transport.field_filter
+        query = intervals_ref.where(
+            filter=field_filter("start", ">=", start_timestamp)
+        ).where(
+            filter=field_filter("start", "<", end_timestamp)
+        )
+        filtered = query.where(filter=field_filter("mode", "in", list(modes))) if modes else query
 
-    def get_diaper_intervals(
+        fallback_key = (kind, bool(modes))
+        if fallback_key not in self._aggregation_fallbacks:
+            try:
+                count, seconds = _aggregation_totals(kind, _aggregation_query(filtered, kind).get())
+                record(docs_read=1 + count // 1000)  # Billed per 1000 index entries
+                return count, seconds
+            except Exception as err:
+                if not self._transport.is_missing_index(err):
+                    raise
+                _LOGGER.warning(
+                    "Aggregation over %s unavailable (%s), counting documents instead", _INTERVAL_SOURCES[kind][3], err
+                )
+                self._aggregation_fallbacks.add(fallback_key)
+
+        documents = [doc.to_dict() or {} for doc in query.select(_projection(kind, None, columnar=True)).stream()]
+        record(docs_read=max(len(documents), 1))
+        return _tally_intervals(kind, (data for data in documents if not data.get("multi")), False, modes)
+
+    def _fetch_intervals(
+        self,
+        kinds: list[IntervalKind],
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        fetch_timings: dict[str, float] | None = None,
+        columnar: bool = False,
+        fields: Iterable[str] | None = None,
+    ) -> dict[str, Any]:
+        """Run the regular and multi-entry queries for each kind concurrently.
+
+        All queries are submitted to the worker pool at once (never nested), so
+        a small pool degrades to partial serialization instead of deadlocking.
+        A failed query is logged and contributes no events, as before.
+        """
+        # Resolve auth and the client once, on the calling thread
+        client = self._get_firestore_client()
+        fetch_started = time.perf_counter()
+        fields = tuple(fields) if fields is not None else None
+        decoders = {kind: _interval_decoder(kind, fields, columnar) for kind in kinds}
+        projections = {kind: _projection(kind, fields, columnar) for kind in kinds}
+
+        def timed(kind: IntervalKind, part: str, query: Callable[..., list[dict]], intervals_ref) -> tuple[list[dict], float]:
+            query_started = time.perf_counter()
+            try:
+                events = query(
+                    intervals_ref, kind, child_uid, start_timestamp, end_timestamp, decoders[kind], projections[kind]
+                )
+            except Exception as err:
+                _LOGGER.error("Error fetching %s (%s query): %s", _INTERVAL_SOURCES[kind][3], part, err)
+                events = []
+            return events, time.perf_counter() - query_started
+
+        futures = {}
+        for kind in kinds:
+            collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+            intervals_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
+            futures[(kind, "regular")] = self._submit(timed, kind, "regular", self._query_regular, intervals_ref)
+            futures[(kind, "multi")] = self._submit(timed, kind, "multi", self._query_multi, intervals_ref)
+
+        results: dict[str, list] = {kind: [] for kind in kinds}
+        timings: dict[str, float] = {}
+        for (kind, part), future in futures.items():
+            events, elapsed = future.result()
+            results[kind].extend(events)
+            timings[f"{kind}.{part}"] = elapsed
+        timings["total"] = time.perf_counter() - fetch_started
+
+        _LOGGER.debug("Fetched %s in %.3fs (%s)", ", ".join(kinds), timings["total"], timings)
+        if fetch_timings is not None:
+            fetch_timings.update(timings)
+        if columnar:
+            return {kind: IntervalFrame(kind, rows) for kind, rows in results.items()}
+        return results
+
+    def _get_intervals(
+        self,
+        kind: IntervalKind,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Fetch decoded interval events of one kind for a date range."""
+        return self._fetch_intervals([kind], child_uid, start_timestamp, end_timestamp, fields=fields)[kind]
+
+    @instrumented
+    def get_sleep_intervals(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        fields: Iterable[str] | None = None,
     ) -> list[dict]:
         """
-        Fetch diaper intervals from Firestore for a date range.
+        Fetch sleep intervals from Firestore for a date range.
 
         Args:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            fields: Document fields to download (default: the returned ones),
+                see get_calendar_events
 
         Returns:
-            List of diaper interval dicts with 'start', 'mode', and optional details
+            List of sleep interval dicts with 'start' and 'duration' fields
         """
-        events = []
-        client = self._get_firestore_client()
-        diaper_ref = client.collection("diaper").document(child_uid)
-        intervals_ref = diaper_ref.collection("intervals")
+        return self._get_intervals("sleep", child_uid, start_timestamp, end_timestamp, fields)
 
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                event = {
-                    "start": data["start"],
-                    "mode": data.get("mode", "unknown"),
-                }
-                # Add optional fields if present
-                if "pooColor" in data:
-                    event["pooColor"] = data["pooColor"]
-                if "pooConsistency" in data:
-                    event["pooConsistency"] = data["pooConsistency"]
-                if "amount" in data:
-                    event["amount"] = data["amount"]
-                events.append(event)
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = intervals_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
+    @instrumented
+    def get_feed_intervals(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """
+        Fetch feeding intervals from Firestore for a date range.
 
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
+        Args:
+            child_uid: Child unique identifier
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            fields: Document fields to download (default: the returned ones),
+                see get_calendar_events
 
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
+        Returns:
+            List of feed interval dicts with 'start', 'leftDuration', 'rightDuration' fields
+        """
+        return self._get_intervals("feed", child_uid, start_timestamp, end_timestamp, fields)
 
-                    event = {
-                        "start": entry_start,
-                        "mode": entry.get("mode", "unknown"),
-                    }
-                    # Add optional fields if present
-                    if "pooColor" in entry:
-                        event["pooColor"] = entry["pooColor"]
-                    if "pooConsistency" in entry:
-                        event["pooConsistency"] = entry["pooConsistency"]
-                    if "amount" in entry:
-                        event["amount"] = entry["amount"]
-                    events.append(event)
+    @instrumented
+    def get_diaper_intervals(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """
+        Fetch diaper intervals from Firestore for a date range.
 
-        except Exception as err:
-            _LOGGER.error("Error fetching diaper intervals: %s", err)
+        Args:
+            child_uid: Child unique identifier
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            fields: Document fields to download (default: the returned ones),
+                see get_calendar_events
 
-        return events
+        Returns:
+            List of diaper interval dicts with 'start', 'mode', and optional details
+        """
+        return self._get_intervals("diaper", child_uid, start_timestamp, end_timestamp, fields)
 
+    @instrumented
     def get_health_entries(
         self,
         child_uid: str,
         start_timestamp: int,
         end_timestamp: int,
+        fields: Iterable[str] | None = None,
     ) -> list[dict]:
         """
         Fetch health/growth entries from Firestore for a date range.
@@ -1408,69 +2150,133 @@ class HuckleberryAPI:
             child_uid: Child unique identifier
             start_timestamp: Start of range (Unix timestamp in seconds)
             end_timestamp: End of range (Unix timestamp in seconds)
+            fields: Document fields to download (default: the returned ones),
+                see get_calendar_events
 
         Returns:
             List of health entry dicts with 'start' and optional measurement fields
         """
-        events = []
-        client = self._get_firestore_client()
-        health_ref = client.collection("health").document(child_uid)
-        # Health uses "data" subcollection, not "intervals"
-        data_ref = health_ref.collection("data")
+        return self._get_intervals("health", child_uid, start_timestamp, end_timestamp, fields)
 
-        try:
-            # Query 1: Get regular documents with date filtering
-            regular_docs = data_ref.where(
-                filter=firestore.FieldFilter("start", ">=", start_timestamp)
-            ).where(
-                filter=firestore.FieldFilter("start", "<", end_timestamp)
-            ).order_by("start").stream()
-
-            for doc in regular_docs:
-                data = doc.to_dict()
-                if not data or data.get("multi"):
-                    continue  # Skip multi-entry docs from this query
-
-                event = {"start": data["start"]}
-                # Add optional measurement fields if present
-                if "weight" in data:
-                    event["weight"] = data["weight"]
-                if "height" in data:
-                    event["height"] = data["height"]
-                if "head" in data:
-                    event["head"] = data["head"]
-                events.append(event)
-
-            # Query 2: Get multi-entry documents (can't filter by nested start field)
-            multi_docs = data_ref.where(
-                filter=firestore.FieldFilter("multi", "==", True)
-            ).stream()
-
-            for doc in multi_docs:
-                data = doc.to_dict()
-                if not data or not isinstance(data.get("data"), dict):
-                    continue
+    @instrumented_iter
+    def iter_intervals(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator[dict]:
+        """
+        Stream decoded events of one kind for a date range, in start order.
 
-                # Iterate through batched entries and filter by date
-                for entry_id, entry in data["data"].items():
-                    if not isinstance(entry, dict) or "start" not in entry:
-                        continue
+        Regular documents are read page_size at a time with start_after
+        cursors (the next page is fetched while the current one is being
+        consumed), so memory stays bounded by two pages however long the
+        range is. Multi-entry items, which live in the multi-entry cache
+        anyway, are streamed from it in start order and merged in.
 
-                    entry_start = entry["start"]
-                    if not (start_timestamp <= entry_start < end_timestamp):
-                        continue
+        Unlike get_*_intervals, errors are raised, never turned into a
+        shortened result.
 
-                    event = {"start": entry_start}
-                    # Add optional measurement fields if present
-                    if "weight" in entry:
-                        event["weight"] = entry["weight"]
-                    if "height" in entry:
-                        event["height"] = entry["height"]
-                    if "head" in entry:
-                        event["head"] = entry["head"]
-                    events.append(event)
+        Args:
+            child_uid: Child unique identifier
+            kind: Event type ('sleep', 'feed', 'diaper', 'health')
+            start_timestamp: Start of range (Unix timestamp in seconds)
+            end_timestamp: End of range (Unix timestamp in seconds)
+            page_size: Documents per Firestore request
+            fields: Document fields to download (default: the returned ones),
+                see get_calendar_events
 
-        except Exception as err:
-            _LOGGER.error("Error fetching health entries: %s", err)
+        Yields:
+            Event dicts, decoded as by the matching get_*_intervals method
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        client = self._get_firestore_client()
+        collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+        intervals_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
+        fields = tuple(fields) if fields is not None else None
+        decode = _interval_decoder(kind, fields)
+
+        path = self._refresh_multi_cache(intervals_ref, kind, child_uid)
+        multi = self.multi_cache.sorted_entries_in_range(path, start_timestamp, end_timestamp)
+        if self.mirror is not None and _mirror_covers(kind, fields):
+            self._sync_mirror(intervals_ref, kind, child_uid)
+            regular = self.mirror.iter_range(child_uid, kind, start_timestamp, end_timestamp, page_size)
+        else:
+            regular = self._iter_regular(
+                intervals_ref, start_timestamp, end_timestamp, page_size, _projection(kind, fields)
+            )
 
-        return events
+        merged = heapq.merge(
+            ((data["start"], False, data) for data in regular),
+            ((entry["start"], True, entry) for entry in multi),
+            key=lambda item: (item[0], item[1]),
+        )
+        for _start, is_multi, data in merged:
+            yield decode(data, is_multi)
+
+    def _iter_regular(
+        self, intervals_ref, start_timestamp: int, end_timestamp: int, page_size: int, fields: list[str]
+    ) -> Iterator[dict]:
+        """Yield regular interval documents (projected to fields) in start order, one page per request."""
+        field_filter = self._transport.field_filter
+        query = intervals_ref.where(
+            filter=field_filter("start", ">=", start_timestamp)
+        ).where(
+            filter=field_filter("start", "<", end_timestamp)
+        ).order_by("start").select(fields).limit(page_size)
+
+        def fetch(cursor) -> list:
+            page = query.start_after(cursor) if cursor is not None else query
+            docs = list(page.stream())
+            record(docs_read=max(len(docs), 1))  # An empty page is billed as one read
+            return docs
+
+        pending = self._submit(fetch, None)
+        try:
+            while pending is not None:
+                docs = pending.result()
+                # Prefetch the next page while this one is consumed
+                pending = self._submit(fetch, docs[-1]) if len(docs) == page_size else None
+                for doc in docs:
+                    data = doc.to_dict()
+                    if data and not data.get("multi"):
+                        yield data
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    @instrumented_iter
+    def iter_sleep_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator[dict]:
+        """Stream sleep intervals for a date range in start order. See iter_intervals."""
+        return self.iter_intervals(child_uid, "sleep", start_timestamp, end_timestamp, page_size, fields)
+
+    @instrumented_iter
+    def iter_feed_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator[dict]:
+        """Stream feeding intervals for a date range in start order. See iter_intervals."""
+        return self.iter_intervals(child_uid, "feed", start_timestamp, end_timestamp, page_size, fields)
+
+    @instrumented_iter
+    def iter_diaper_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator[dict]:
+        """Stream diaper intervals for a date range in start order. See iter_intervals."""
+        return self.iter_intervals(child_uid, "diaper", start_timestamp, end_timestamp, page_size, fields)
+
+    @instrumented_iter
+    def iter_health_entries(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator[dict]:
+        """Stream health/growth entries for a date range in start order. See iter_intervals."""
+        return self.iter_intervals(child_uid, "health", start_timestamp, end_timestamp, page_size, fields)
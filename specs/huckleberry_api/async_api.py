@@ -0,0 +1,1226 @@
+"""Asyncio API client for Huckleberry."""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import copy
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Iterable, Literal, Mapping, cast
+
+import httpx
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud import firestore
+
+from ._payloads import (
+    INTERVAL_PAGE_SIZE,
+    MAX_BATCH_WRITES,
+    _DURATION_FIELDS,
+    _INTERVAL_SOURCES,
+    DiaperAmount,
+    DiaperMode,
+    FeedSide,
+    IntervalKind,
+    MeasurementUnits,
+    PooColor,
+    PooConsistency,
+    _accumulate_feed_sides,
+    _aggregation_query,
+    _aggregation_totals,
+    _child_from_document,
+    _child_ids,
+    _diaper_interval_payload,
+    _diaper_prefs_update,
+    _feed_completion_writes,
+    _feed_timer_payload,
+    _growth_data_from_entry,
+    _growth_entry_payload,
+    _growth_prefs_update,
+    _import_chunks,
+    _inactive_feed_timer,
+    _inactive_sleep_timer,
+    _interval_decoder,
+    _latest_prefs_updates,
+    _multi_cache_path,
+    _new_interval_id,
+    _new_session_uuid,
+    _projection,
+    _sleep_completion,
+    _sleep_completion_writes,
+    _sleep_timer_payload,
+    _tally_intervals,
+    _track_latest_prefs,
+)
+from .api import FirebaseTokenCredentials
+from .const import (
+    AUTH_URL,
+    CHILDREN_CACHE_TTL,
+    FIREBASE_API_KEY,
+    FIREBASE_PROJECT_ID,
+    REFRESH_URL,
+    TOKEN_REFRESH_LEAD,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REFRESH_RETRY,
+)
+from .frame import IntervalFrame
+from .instrumentation import OperationHook, instrumented_async, record
+from .multi_cache import MultiEntryCache
+from .token_cache import CachedCredentials, TokenCache
+from .transport import is_grpc_missing_index
+from .types import ChildData, GrowthData
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncHuckleberryAPI:
+    """Asyncio API client for Huckleberry.
+
+    Mirrors HuckleberryAPI method for method, but every network call is a
+    coroutine backed by firestore.AsyncClient and httpx.AsyncClient, so one
+    event loop can serve many concurrent calls without blocking.
+
+    Real-time listeners are not available here: the Firestore watch stream is
+    only exposed by the sync client. Use HuckleberryAPI for listeners.
+    """
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        max_concurrency: int = 8,
+        multi_cache: MultiEntryCache | None = None,
+        token_cache: TokenCache | None = None,
+        hooks: Iterable[OperationHook] = (),
+    ) -> None:
+        """Initialize the API client.
+
+        Args:
+            email: Huckleberry account email
+            password: Huckleberry account password
+            max_concurrency: Limit on concurrently running range queries
+            multi_cache: Cache for multi-entry batch documents (created if not given)
+            token_cache: Optional credential cache, see HuckleberryAPI
+            hooks: Instrumentation hooks, see HuckleberryAPI
+        """
+        self.email = email
+        self.password = password
+        self.max_concurrency = max_concurrency
+        self.multi_cache = multi_cache if multi_cache is not None else MultiEntryCache()
+        self._aggregation_fallbacks: set[tuple[str, bool]] = set()  # (kind, mode filter) lacking an index
+        self.token_cache = token_cache
+        self.hooks: list[OperationHook] = list(hooks)
+        self.id_token: str | None = None
+        self.refresh_token: str | None = None
+        self.user_uid: str | None = None
+        self.token_expires_at: float | None = None
+        self._firestore_client: firestore.AsyncClient | None = None
+        self._credentials: FirebaseTokenCredentials | None = None
+        self.client_rebuilds_avoided = 0  # Token refreshes served by rotating credentials in place
+        self._http_client: httpx.AsyncClient | None = None
+        # Serializes sign-in/refresh so concurrent calls share one token fetch
+        self._auth_lock = asyncio.Lock()
+        self._query_semaphore = asyncio.Semaphore(max_concurrency)
+        self._refresher: asyncio.Task | None = None
+        self._pending_batch: contextvars.ContextVar[Any] = contextvars.ContextVar(
+            f"huckleberry_batch_{id(self)}", default=None
+        )
+        self._children: list[ChildData] | None = None  # get_children cache
+        self._children_expires_at = 0.0  # time.monotonic() deadline of the cache
+
+    async def __aenter__(self) -> AsyncHuckleberryAPI:
+        """Enter async context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close network clients on context exit."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Stop the token refresher, close the HTTP client and drop the Firestore client."""
+        await self.stop_token_refresher()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        self._firestore_client = None
+        self._credentials = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client used for auth calls."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=10)
+        return self._http_client
+
+    @instrumented_async
+    async def authenticate(self) -> None:
+        """Authenticate with Firebase.
+
+        With a token cache configured, a cached session for the same account
+        is resumed first: no network call while its ID token is fresh, one
+        refresh call otherwise. Password sign-in is only used when the cache
+        is missing or its refresh token is rejected.
+        """
+        if self.token_cache is not None and await self._resume_cached_session():
+            return
+
+        _LOGGER.debug("Authenticating with Huckleberry")
+
+        try:
+            response = await self._get_http_client().post(
+                f"{AUTH_URL}?key={FIREBASE_API_KEY}",
+                json={
+                    "email": self.email,
+                    "password": self.password,
+                    "returnSecureToken": True,
+                },
+            )
+            response.raise_for_status()
+
+            data = response.json()
+            self.id_token = data["idToken"]
+            self.refresh_token = data["refreshToken"]
+            self.user_uid = data["localId"]
+            self.token_expires_at = datetime.now().timestamp() + int(data["expiresIn"])
+            self._save_session()
+
+            _LOGGER.info("Successfully authenticated with Huckleberry")
+        except httpx.HTTPStatusError as err:
+            _LOGGER.error("Authentication failed: %s", err)
+            try:
+                error_data = err.response.json()
+                error_message = error_data.get("error", {}).get("message", "Unknown error")
+                _LOGGER.error("Firebase error: %s", error_message)
+            except Exception:
+                _LOGGER.error("Response: %s", err.response.text)
+            raise
+
+    async def _resume_cached_session(self) -> bool:
+        """Restore tokens from the token cache, refreshing them if needed.
+
+        Returns:
+            True if a usable session was restored
+        """
+        assert self.token_cache is not None
+        cached = self.token_cache.load()
+        if not cached or cached["email"] != self.email:
+            return False
+
+        self.id_token = cached["id_token"]
+        self.refresh_token = cached["refresh_token"]
+        self.user_uid = cached["user_uid"]
+        self.token_expires_at = cached["token_expires_at"]
+
+        if not self._token_needs_refresh():
+            _LOGGER.info("Resumed cached Huckleberry session")
+            return True
+
+        try:
+            await self.refresh_auth_token()
+        except Exception as err:
+            _LOGGER.warning("Cached session could not be refreshed, signing in with password: %s", err)
+            self.id_token = None
+            self.refresh_token = None
+            self.user_uid = None
+            self.token_expires_at = None
+            self.token_cache.clear()
+            return False
+
+        _LOGGER.info("Resumed cached Huckleberry session with a refreshed token")
+        return True
+
+    def _save_session(self) -> None:
+        """Write the current tokens to the token cache (failures are logged, not raised)."""
+        if self.token_cache is None or not (self.id_token and self.refresh_token and self.user_uid):
+            return
+
+        credentials: CachedCredentials = {
+            "email": self.email,
+            "user_uid": self.user_uid,
+            "id_token": self.id_token,
+            "refresh_token": self.refresh_token,
+            "token_expires_at": self.token_expires_at or 0.0,
+        }
+        try:
+            self.token_cache.save(credentials)
+        except Exception as err:
+            _LOGGER.warning("Failed to write token cache: %s", err)
+
+    async def maintain_session(self) -> None:
+        """Ensure the session is valid and refresh token if needed."""
+        await self._ensure_authenticated()
+
+    async def start_token_refresher(self, lead_time: float = TOKEN_REFRESH_LEAD) -> None:
+        """Rotate tokens in a background task ahead of expiry.
+
+        See HuckleberryAPI.start_token_refresher. The refresh takes the auth
+        lock, so calls racing it wait for the new token instead of issuing
+        their own refresh.
+
+        Args:
+            lead_time: Seconds before expiry at which to refresh
+        """
+        if self._refresher is not None and not self._refresher.done():
+            return
+        await self._ensure_authenticated()
+        self._refresher = asyncio.create_task(
+            self._run_token_refresher(lead_time), name="huckleberry-token-refresher"
+        )
+
+    async def stop_token_refresher(self) -> None:
+        """Cancel the background token refresher, if running."""
+        if self._refresher is None:
+            return
+        self._refresher.cancel()
+        try:
+            await self._refresher
+        except asyncio.CancelledError:
+            pass
+        self._refresher = None
+
+    async def _run_token_refresher(self, lead_time: float) -> None:
+        """Background loop: sleep until lead_time before expiry, then refresh."""
+        while True:
+            expires_at = self.token_expires_at or 0.0
+            await asyncio.sleep(max(expires_at - lead_time - datetime.now().timestamp(), 0.0))
+            try:
+                async with self._auth_lock:
+                    # Skip if a call already refreshed inline while we slept
+                    expires_at = self.token_expires_at or 0.0
+                    if datetime.now().timestamp() >= expires_at - lead_time:
+                        await self.refresh_auth_token()
+                        _LOGGER.debug("Background token refresh complete")
+            except Exception as err:
+                _LOGGER.warning("Background token refresh failed, retrying in %ss: %s", TOKEN_REFRESH_RETRY, err)
+                await asyncio.sleep(TOKEN_REFRESH_RETRY)
+
+    @instrumented_async
+    async def refresh_auth_token(self) -> None:
+        """Refresh the authentication token."""
+        if not self.refresh_token:
+            raise ValueError("No refresh token available")
+
+        _LOGGER.debug("Refreshing authentication token")
+
+        response = await self._get_http_client().post(
+            f"{REFRESH_URL}?key={FIREBASE_API_KEY}",
+            json={
+                "grant_type": "refresh_token",
+                "refresh_token": self.refresh_token,
+            },
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        self.id_token = data["id_token"]
+        self.refresh_token = data["refresh_token"]
+        self.token_expires_at = datetime.now().timestamp() + int(data["expires_in"])
+        self._save_session()
+
+        # Rotate the token inside the live client instead of rebuilding it
+        if self._credentials is not None:
+            self._credentials.update_token(self.id_token)
+            if self._firestore_client is not None:
+                self.client_rebuilds_avoided += 1
+
+        _LOGGER.debug("Successfully refreshed authentication token")
+
+    def _token_needs_refresh(self) -> bool:
+        """Return True if the token expires in less than TOKEN_REFRESH_MARGIN seconds."""
+        return bool(
+            self.token_expires_at and datetime.now().timestamp() >= self.token_expires_at - TOKEN_REFRESH_MARGIN
+        )
+
+    async def _ensure_authenticated(self) -> None:
+        """Ensure we have a valid authentication token."""
+        if self.id_token and not self._token_needs_refresh():
+            return
+
+        async with self._auth_lock:
+            # Another task may have refreshed while we waited for the lock
+            if not self.id_token:
+                await self.authenticate()
+            elif self._token_needs_refresh():
+                await self.refresh_auth_token()
+
+    async def _get_firestore_client(self) -> firestore.AsyncClient:
+        """Get or create async Firestore client."""
+        await self._ensure_authenticated()
+
+        if not self._firestore_client:
+            assert self.id_token is not None, "id_token should be set after authentication"
+            self._credentials = FirebaseTokenCredentials(self.id_token, lambda: self.id_token)
+            self._firestore_client = firestore.AsyncClient(
+                project=FIREBASE_PROJECT_ID,
+                credentials=self._credentials,
+            )
+
+        return self._firestore_client
+
+    @instrumented_async
+    async def get_children(self, refresh: bool = False) -> list[ChildData]:
+        """Get the children linked to the account.
+
+        Lists the user document's childList, the app's lastChild first, and
+        fetches every profile in one batched read. Without snapshot listeners
+        to invalidate it, the result is cached for CHILDREN_CACHE_TTL seconds.
+
+        Args:
+            refresh: Read the profiles again even if the cache is valid
+        """
+        if not refresh and self._children is not None and time.monotonic() < self._children_expires_at:
+            record(cache_hits=1)
+            return copy.deepcopy(self._children)
+
+        _LOGGER.debug("Fetching children list")
+
+        try:
+            db = await self._get_firestore_client()
+
+            user_doc = await db.collection("users").document(self.user_uid).get()
+            record(docs_read=1)
+            if not user_doc.exists:
+                _LOGGER.error("User document not found")
+                return []
+
+            user_data = user_doc.to_dict()
+            if not user_data:
+                _LOGGER.error("User document has no data")
+                return []
+
+            child_ids = _child_ids(user_data)
+            if not child_ids:
+                _LOGGER.warning("No children listed in user document")
+                return []
+
+            # Every profile in one round trip
+            refs = [db.collection("childs").document(child_id) for child_id in child_ids]
+            record(docs_read=len(refs))
+            child_docs = {doc.id: doc async for doc in db.get_all(refs)}
+
+            children: list[ChildData] = []
+            for child_id in child_ids:
+                child_doc = child_docs.get(child_id)
+                child_data = child_doc.to_dict() if child_doc is not None and child_doc.exists else None
+                if not child_data:
+                    _LOGGER.error("Child document not found: %s", child_id)
+                    continue
+                children.append(_child_from_document(child_id, child_data))
+
+            self._children = children
+            self._children_expires_at = time.monotonic() + CHILDREN_CACHE_TTL
+            _LOGGER.info("Found %d children", len(children))
+            return copy.deepcopy(children)
+
+        except Exception as err:
+            _LOGGER.error("Failed to get children: %s", err)
+            raise
+
+    async def get_child(self, child_uid: str) -> ChildData | None:
+        """Profile of one child linked to the account, from the children cache when valid."""
+        for child in await self.get_children():
+            if child["uid"] == child_uid:
+                return child
+        return None
+
+    async def _get_timer(self, collection_name: str, child_uid: str) -> tuple[firestore.AsyncDocumentReference, dict | None]:
+        """Read a sleep/feed document and return (reference, document data or None)."""
+        client = await self._get_firestore_client()
+        doc_ref = client.collection(collection_name).document(child_uid)
+        doc = await doc_ref.get(timeout=10.0)
+        record(docs_read=1)
+        return doc_ref, (doc.to_dict() if doc.exists else None)
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[None]:
+        """Group write operations into one atomic commit.
+
+        See HuckleberryAPI.batch. Queued writes are tracked per task (context
+        variable), so concurrent tasks do not join each other's batch. A
+        failed commit is not retried; nothing in the block is written.
+
+        Example:
+            async with api.batch():
+                await api.log_diaper(child_uid, "pee")
+                await api.log_growth(child_uid, weight=5.2)
+        """
+        if self._pending_batch.get() is not None:
+            yield
+            return
+
+        write_batch = (await self._get_firestore_client()).batch()
+        token = self._pending_batch.set(write_batch)
+        try:
+            yield
+        finally:
+            self._pending_batch.reset(token)
+        record(docs_written=len(await write_batch.commit() or ()))
+
+    @asynccontextmanager
+    async def _writes(self) -> AsyncIterator[Any]:
+        """Yield the WriteBatch one operation should add its writes to."""
+        pending = self._pending_batch.get()
+        if pending is not None:
+            yield pending
+            return
+
+        write_batch = (await self._get_firestore_client()).batch()
+        yield write_batch
+        record(docs_written=len(await write_batch.commit() or ()))
+
+    @instrumented_async
+    async def start_sleep(self, child_uid: str) -> None:
+        """Start sleep tracking for a child."""
+        _LOGGER.info("Starting sleep tracking for child %s", child_uid)
+
+        client = await self._get_firestore_client()
+        sleep_ref = client.collection("sleep").document(child_uid)
+        async with self._writes() as batch:
+            batch.set(sleep_ref, cast(dict, _sleep_timer_payload(time.time())), merge=True)
+
+        _LOGGER.info("Sleep tracking started successfully")
+
+    @instrumented_async
+    async def pause_sleep(self, child_uid: str) -> None:
+        """Pause current sleep session without ending it."""
+        _LOGGER.info("Pausing sleep for child %s", child_uid)
+
+        sleep_ref, data = await self._get_timer("sleep", child_uid)
+        if data is None:
+            _LOGGER.warning("No sleep document to pause for %s", child_uid)
+            return
+
+        timer = data.get("timer", {})
+        if not timer.get("active", False):
+            _LOGGER.info("Sleep is not active for %s, ignoring pause request", child_uid)
+            return
+        if timer.get("paused", False):
+            _LOGGER.info("Sleep is already paused for %s", child_uid)
+            return
+
+        now = time.time()
+        async with self._writes() as batch:
+            batch.update(sleep_ref, {
+                "timer.paused": True,
+                "timer.active": True,
+                "timer.timerEndTime": now * 1000,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+            })
+
+        _LOGGER.info("Sleep paused for child %s", child_uid)
+
+    @instrumented_async
+    async def resume_sleep(self, child_uid: str) -> None:
+        """Resume a paused sleep session."""
+        _LOGGER.info("Resuming sleep for child %s", child_uid)
+
+        sleep_ref, data = await self._get_timer("sleep", child_uid)
+        if data is None:
+            _LOGGER.warning("No sleep document to resume for %s", child_uid)
+            return
+
+        timer = data.get("timer", {})
+        if not timer.get("active", False):
+            _LOGGER.info("Sleep is not active for %s, ignoring resume request", child_uid)
+            return
+        if not timer.get("paused", False):
+            _LOGGER.info("Sleep is not paused for %s, ignoring resume request", child_uid)
+            return
+
+        now = time.time()
+        async with self._writes() as batch:
+            batch.update(sleep_ref, {
+                "timer.paused": False,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+            })
+
+        _LOGGER.info("Sleep resumed for child %s", child_uid)
+
+    @instrumented_async
+    async def cancel_sleep(self, child_uid: str) -> None:
+        """Cancel current sleep session without saving an interval."""
+        _LOGGER.info("Cancelling current sleep for child %s", child_uid)
+
+        sleep_ref, data = await self._get_timer("sleep", child_uid)
+        if data is None:
+            _LOGGER.warning("Sleep document does not exist for child %s", child_uid)
+        timer = (data or {}).get("timer", {})
+        session_uuid = timer.get("uuid", _new_session_uuid())
+
+        async with self._writes() as batch:
+            batch.update(sleep_ref, {"timer": _inactive_sleep_timer(session_uuid, time.time())})
+
+        _LOGGER.info("Sleep cancelled for child %s", child_uid)
+
+    @instrumented_async
+    async def complete_sleep(self, child_uid: str) -> None:
+        """Complete current sleep session and save interval."""
+        _LOGGER.info("Completing sleep for child %s", child_uid)
+
+        sleep_ref, data = await self._get_timer("sleep", child_uid)
+        if data is None:
+            _LOGGER.warning("No active sleep document to complete for %s", child_uid)
+            return
+
+        timer = data.get("timer") or {}
+        if not timer.get("active", False):
+            _LOGGER.info("Sleep already completed for %s, ignoring duplicate request", child_uid)
+            return
+
+        now = time.time()
+        completion = _sleep_completion(timer, child_uid, now)
+        if completion is None:
+            async with self._writes() as batch:
+                batch.update(sleep_ref, {"timer": firestore.DELETE_FIELD})
+            return
+        start_sec, duration_sec = completion
+
+        # Interval and inactive timer commit atomically
+        interval_id, interval, update = _sleep_completion_writes(timer, start_sec, duration_sec, now)
+        async with self._writes() as batch:
+            batch.set(sleep_ref.collection("intervals").document(interval_id), interval)
+            batch.update(sleep_ref, update)
+
+        _LOGGER.info("Sleep completed for child %s (duration %ss)", child_uid, duration_sec)
+
+    @instrumented_async
+    async def start_feeding(self, child_uid: str, side: FeedSide = "left") -> None:
+        """Start feeding tracking."""
+        _LOGGER.info("Starting feeding for child %s on %s side", child_uid, side)
+
+        client = await self._get_firestore_client()
+        feed_ref = client.collection("feed").document(child_uid)
+        async with self._writes() as batch:
+            batch.set(feed_ref, cast(dict, _feed_timer_payload(time.time(), side)), merge=True)
+
+        _LOGGER.info("Feeding started on %s side", side)
+
+    @instrumented_async
+    async def pause_feeding(self, child_uid: str) -> None:
+        """Pause current feeding session."""
+        _LOGGER.info("Pausing feeding for child %s", child_uid)
+
+        feed_ref, data = await self._get_timer("feed", child_uid)
+        if not data:
+            _LOGGER.warning("Feed document not found")
+            return
+
+        timer = data.get("timer", {})
+        if not timer.get("active", False):
+            _LOGGER.info("Feeding is not active for %s, ignoring pause request", child_uid)
+            return
+        if timer.get("paused", False):
+            _LOGGER.info("Feeding is already paused for %s", child_uid)
+            return
+        current_side = timer.get("activeSide", timer.get("lastSide", "left"))
+
+        now = time.time()
+        left_duration, right_duration = _accumulate_feed_sides(timer, now)
+
+        async with self._writes() as batch:
+            batch.update(feed_ref, {
+                "timer.paused": True,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.leftDuration": left_duration,
+                "timer.rightDuration": right_duration,
+                "timer.lastSide": current_side,
+                # Remove activeSide when paused
+                "timer.activeSide": firestore.DELETE_FIELD,
+            })
+
+        _LOGGER.info("Feeding paused (L:%ss R:%ss)", left_duration, right_duration)
+
+    @instrumented_async
+    async def resume_feeding(self, child_uid: str, side: FeedSide | None = None) -> None:
+        """Resume paused feeding session."""
+        _LOGGER.info("Resuming feeding for child %s", child_uid)
+
+        feed_ref, data = await self._get_timer("feed", child_uid)
+        if not data:
+            _LOGGER.warning("Feed document not found")
+            return
+
+        timer = data.get("timer", {})
+        if not timer.get("active", False):
+            _LOGGER.info("Feeding is not active for %s, ignoring resume request", child_uid)
+            return
+        if not timer.get("paused", False):
+            _LOGGER.info("Feeding is not paused for %s, ignoring resume request", child_uid)
+            return
+        if side is None:
+            side = timer.get("lastSide", "left")
+
+        now = time.time()
+        async with self._writes() as batch:
+            batch.update(feed_ref, {
+                "timer.paused": False,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.timerStartTime": now,  # Reset timer start time on resume
+                "timer.activeSide": side,
+                "timer.lastSide": "none",  # Set to none during transition
+            })
+
+        _LOGGER.info("Feeding resumed on %s", side)
+
+    @instrumented_async
+    async def switch_feeding_side(self, child_uid: str) -> None:
+        """Switch feeding side (left <-> right)."""
+        _LOGGER.info("Switching feeding side for child %s", child_uid)
+
+        feed_ref, data = await self._get_timer("feed", child_uid)
+        if not data:
+            _LOGGER.warning("Feed document not found")
+            return
+
+        timer = data.get("timer", {})
+        if not timer.get("active", False):
+            _LOGGER.info("Feeding is not active for %s, ignoring switch request", child_uid)
+            return
+        current_side = timer.get("activeSide", timer.get("lastSide", "left"))
+        new_side = "right" if current_side == "left" else "left"
+
+        now = time.time()
+        # Only accumulate duration if NOT paused
+        if not timer.get("paused", False):
+            left_duration, right_duration = _accumulate_feed_sides(timer, now)
+        else:
+            left_duration = timer.get("leftDuration", 0.0)
+            right_duration = timer.get("rightDuration", 0.0)
+
+        async with self._writes() as batch:
+            batch.update(feed_ref, {
+                "timer.paused": False,  # Switching always resumes
+                "timer.lastSide": "none",  # Set to none during transition
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.timerStartTime": now,  # Always reset timer start time
+                "timer.activeSide": new_side,  # Always set active side
+                "timer.leftDuration": left_duration,
+                "timer.rightDuration": right_duration,
+            })
+
+        _LOGGER.info("Switched from %s to %s (L:%ss R:%ss)", current_side, new_side, left_duration, right_duration)
+
+    @instrumented_async
+    async def cancel_feeding(self, child_uid: str) -> None:
+        """Cancel current feeding without saving."""
+        _LOGGER.info("Cancelling feeding for child %s", child_uid)
+
+        feed_ref, data = await self._get_timer("feed", child_uid)
+        timer = (data or {}).get("timer", {})
+        session_uuid = timer.get("uuid", _new_session_uuid())
+
+        async with self._writes() as batch:
+            batch.update(feed_ref, {"timer": _inactive_feed_timer(session_uuid, time.time())})
+
+        _LOGGER.info("Feeding cancelled")
+
+    @instrumented_async
+    async def complete_feeding(self, child_uid: str) -> None:
+        """Complete current feeding and save to history."""
+        _LOGGER.info("Completing feeding for child %s", child_uid)
+
+        feed_ref, data = await self._get_timer("feed", child_uid)
+        if data is None:
+            _LOGGER.warning("No active feed document to complete")
+            return
+
+        timer = data.get("timer") or {}
+        if not timer.get("active", False):
+            _LOGGER.info("Feeding already completed for %s, ignoring duplicate request", child_uid)
+            return
+        if not timer.get("timerStartTime"):
+            _LOGGER.warning("Missing timerStartTime for feeding")
+            return
+
+        interval_id, interval, update, total_duration = _feed_completion_writes(
+            timer, time.time(), firestore.DELETE_FIELD
+        )
+
+        # History interval and timer reset commit atomically
+        try:
+            async with self._writes() as batch:
+                batch.set(feed_ref.collection("intervals").document(interval_id), interval)
+                batch.update(feed_ref, update)
+        except Exception as err:
+            _LOGGER.error("Failed to complete feeding %s: %s", interval_id, err)
+            raise
+
+        _LOGGER.info(
+            "Feeding completed (total duration %ss, L:%ss R:%ss)",
+            total_duration, interval["leftDuration"], interval["rightDuration"],
+        )
+
+    @instrumented_async
+    async def log_diaper(self, child_uid: str, mode: DiaperMode,
+                         pee_amount: DiaperAmount | None = None, poo_amount: DiaperAmount | None = None,
+                         color: PooColor | None = None, consistency: PooConsistency | None = None,
+                         diaper_rash: bool = False, notes: str | None = None) -> None:
+        """Log a diaper change. See HuckleberryAPI.log_diaper for arguments."""
+        _LOGGER.info("Logging diaper change for child %s: mode=%s", child_uid, mode)
+
+        client = await self._get_firestore_client()
+        diaper_ref = client.collection("diaper").document(child_uid)
+
+        current_time = time.time()
+        interval_id = _new_interval_id(current_time)
+        interval_data = _diaper_interval_payload(
+            current_time, mode, pee_amount, poo_amount, color, consistency, diaper_rash, notes
+        )
+
+        # Interval and prefs.lastDiaper commit atomically
+        try:
+            async with self._writes() as batch:
+                batch.set(diaper_ref.collection("intervals").document(interval_id), cast(dict, interval_data))
+                batch.update(diaper_ref, _diaper_prefs_update(current_time, mode))
+        except Exception as err:
+            _LOGGER.error("Failed to log diaper interval %s: %s", interval_id, err)
+            raise
+
+        _LOGGER.info("Diaper change logged successfully")
+
+    @instrumented_async
+    async def log_growth(self, child_uid: str, weight: float | None = None, height: float | None = None,
+                         head: float | None = None, units: MeasurementUnits = "metric") -> None:
+        """Log growth measurements. See HuckleberryAPI.log_growth for arguments."""
+        _LOGGER.info("Logging growth data for child %s", child_uid)
+
+        if not any([weight, height, head]):
+            raise ValueError("At least one measurement (weight, height, or head) is required")
+
+        client = await self._get_firestore_client()
+        health_ref = client.collection("health").document(child_uid)
+
+        current_time = time.time()
+        interval_id = _new_interval_id(current_time)
+        growth_entry = _growth_entry_payload(current_time, interval_id, weight, height, head, units)
+
+        # Entry and prefs.lastGrowthEntry commit atomically
+        try:
+            async with self._writes() as batch:
+                batch.set(health_ref.collection("data").document(interval_id), cast(dict, growth_entry))
+                batch.update(health_ref, _growth_prefs_update(growth_entry, current_time))
+            _LOGGER.info("Growth data logged successfully")
+        except Exception as err:
+            _LOGGER.error("Failed to log growth data: %s", err)
+            raise
+
+    @instrumented_async
+    async def import_intervals(
+        self,
+        child_uid: str,
+        records: Iterable[Mapping[str, Any]],
+        chunk_size: int = MAX_BATCH_WRITES,
+        skip: int = 0,
+        progress: Callable[[int], None] | None = None,
+        update_prefs: bool = False,
+    ) -> int:
+        """Write past records in bulk. See HuckleberryAPI.import_intervals."""
+        client = await self._get_firestore_client()
+        now = time.time()
+        committed = skip
+        latest: dict[IntervalKind, tuple[float, dict]] = {}  # Only filled with update_prefs
+
+        for chunk in _import_chunks(records, chunk_size, skip, now):
+            write_batch = client.batch()
+            for kind, doc_id, document, _prefs in chunk:
+                collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+                doc_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
+                write_batch.set(doc_ref.document(doc_id), document)
+            await write_batch.commit()
+            record(docs_written=len(chunk))
+
+            committed += len(chunk)
+            _LOGGER.info("Imported %d records for child %s", committed, child_uid)
+            if update_prefs:
+                _track_latest_prefs(latest, chunk)
+            if progress is not None:
+                progress(committed)
+
+        if latest:
+            async with self._writes() as batch:
+                for kind, prefs in _latest_prefs_updates(latest).items():
+                    batch.update(client.collection(_INTERVAL_SOURCES[kind][0]).document(child_uid), prefs)
+
+        return committed - skip
+
+    @instrumented_async
+    async def get_growth_data(self, child_uid: str) -> GrowthData:
+        """Get the latest growth measurements for a child."""
+        client = await self._get_firestore_client()
+
+        try:
+            doc = await client.collection("health").document(child_uid).get()
+            record(docs_read=1)
+            health_data = doc.to_dict() if doc.exists else None
+            if not health_data:
+                return _growth_data_from_entry(None)
+
+            return _growth_data_from_entry(health_data.get("prefs", {}).get("lastGrowthEntry", {}))
+        except Exception as err:
+            _LOGGER.error("Failed to get growth data: %s", err)
+            return _growth_data_from_entry(None)
+
+    @instrumented_async
+    async def get_calendar_events(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        kinds: Iterable[IntervalKind] = ("sleep", "feed", "diaper", "health"),
+        fetch_timings: dict[str, float] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> dict[str, list[dict]]:
+        """Fetch all calendar events (sleep, feed, diaper, health) for a date range.
+
+        See HuckleberryAPI.get_calendar_events; queries run concurrently, at
+        most max_concurrency at a time.
+        """
+        return await self._fetch_intervals(
+            list(kinds), child_uid, start_timestamp, end_timestamp, fetch_timings, fields=fields
+        )
+
+    @instrumented_async
+    async def get_calendar_frames(
+        self,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        kinds: Iterable[IntervalKind] = ("sleep", "feed", "diaper", "health"),
+        fetch_timings: dict[str, float] | None = None,
+    ) -> dict[str, IntervalFrame]:
+        """Fetch calendar events as columnar IntervalFrames. See HuckleberryAPI.get_calendar_frames."""
+        return await self._fetch_intervals(
+            list(kinds), child_uid, start_timestamp, end_timestamp, fetch_timings, columnar=True
+        )
+
+    @instrumented_async
+    async def get_interval_frame(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+    ) -> IntervalFrame:
+        """Fetch one event kind for a date range as an IntervalFrame."""
+        return (await self.get_calendar_frames(child_uid, start_timestamp, end_timestamp, kinds=(kind,)))[kind]
+
+    async def _query_regular(
+        self, intervals_ref, kind: IntervalKind, child_uid: str, start_timestamp: int, end_timestamp: int,
+        decode: Callable[[dict, bool], Any], fields: list[str],
+    ) -> list:
+        """Query 1: regular documents with date filtering, downloading only fields."""
+        events = []
+        read = 0
+        async for doc in intervals_ref.where(
+            filter=firestore.FieldFilter("start", ">=", start_timestamp)
+        ).where(
+            filter=firestore.FieldFilter("start", "<", end_timestamp)
+        ).order_by("start").select(fields).stream():
+            read += 1
+            data = doc.to_dict()
+            if not data or data.get("multi"):
+                continue  # Skip multi-entry docs from this query
+            events.append(decode(data, False))
+        record(docs_read=max(read, 1))  # An empty result is billed as one read
+        return events
+
+    async def _query_multi(
+        self, intervals_ref, kind: IntervalKind, child_uid: str, start_timestamp: int, end_timestamp: int,
+        decode: Callable[[dict, bool], Any], fields: list[str],
+    ) -> list:
+        """Query 2: multi-entry documents, served through the multi-entry cache (cached whole)."""
+        path = await self._refresh_multi_cache(intervals_ref, kind, child_uid)
+        return [decode(entry, True) for entry in self.multi_cache.entries_in_range(path, start_timestamp, end_timestamp)]
+
+    async def _refresh_multi_cache(self, intervals_ref, kind: IntervalKind, child_uid: str) -> str:
+        """Bring the cached multi-entry documents of one kind up to date and return their cache path."""
+        listing = {}
+        async for doc in intervals_ref.where(
+            filter=firestore.FieldFilter("multi", "==", True)
+        ).select(["multi"]).stream():
+            listing[doc.id] = doc.update_time
+
+        path = _multi_cache_path(kind, child_uid)
+        stale = self.multi_cache.stale_ids(path, listing)
+        record(docs_read=max(len(listing), 1) + len(stale), cache_hits=len(listing) - len(stale))
+        if stale:
+            client = await self._get_firestore_client()
+            async for doc in client.get_all([intervals_ref.document(doc_id) for doc_id in stale]):
+                if doc.exists:
+                    self.multi_cache.store(path, doc.id, doc.update_time, doc.to_dict())
+        return path
+
+    @instrumented_async
+    async def count_intervals(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+        modes: Iterable[str] | None = None,
+    ) -> int:
+        """Count events of one kind in a date range. See HuckleberryAPI.count_intervals."""
+        return (await self.interval_totals(child_uid, kind, start_timestamp, end_timestamp, modes))[0]
+
+    @instrumented_async
+    async def sum_durations(
+        self,
+        child_uid: str,
+        kind: Literal["sleep", "feed"],
+        start_timestamp: int,
+        end_timestamp: int,
+        modes: Iterable[str] | None = None,
+    ) -> float:
+        """Total sleep or feed seconds in a date range. See HuckleberryAPI.sum_durations."""
+        if kind not in _DURATION_FIELDS:
+            raise ValueError(f"{kind} events have no duration")
+        return (await self.interval_totals(child_uid, kind, start_timestamp, end_timestamp, modes))[1]
+
+    @instrumented_async
+    async def interval_totals(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+        modes: Iterable[str] | None = None,
+    ) -> tuple[int, float]:
+        """Count and total seconds of one kind in a date range. See HuckleberryAPI.interval_totals."""
+        modes = tuple(modes) if modes is not None else None
+        client = await self._get_firestore_client()
+        collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+        intervals_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
+
+        async def multi() -> tuple[int, float]:
+            async with self._query_semaphore:
+                path = await self._refresh_multi_cache(intervals_ref, kind, child_uid)
+            return _tally_intervals(
+                kind, self.multi_cache.entries_in_range(path, start_timestamp, end_timestamp), True, modes
+            )
+
+        async def regular() -> tuple[int, float]:
+            async with self._query_semaphore:
+                return await self._aggregate_regular(intervals_ref, kind, start_timestamp, end_timestamp, modes)
+
+        (regular_count, regular_seconds), (multi_count, multi_seconds) = await asyncio.gather(regular(), multi())
+        return regular_count + multi_count, regular_seconds + multi_seconds
+
+    async def _aggregate_regular(
+        self, intervals_ref, kind: IntervalKind, start_timestamp: int, end_timestamp: int,
+        modes: tuple[str, ...] | None,
+    ) -> tuple[int, float]:
+        """(count, duration seconds) of regular documents. See HuckleberryAPI._aggregate_regular."""
+        query = intervals_ref.where(
+            filter=firestore.FieldFilter("start", ">=", start_timestamp)
+        ).where(
+            filter=firestore.FieldFilter("start", "<", end_timestamp)
+        )
+        filtered = query.where(filter=firestore.FieldFilter("mode", "in", list(modes))) if modes else query
+
+        fallback_key = (kind, bool(modes))
+        if fallback_key not in self._aggregation_fallbacks:
+            try:
+                count, seconds = _aggregation_totals(kind, await _aggregation_query(filtered, kind).get())
+                record(docs_read=1 + count // 1000)  # Billed per 1000 index entries
+                return count, seconds
+            except FailedPrecondition as err:
+                if not is_grpc_missing_index(err):
+                    raise
+                _LOGGER.warning(
+                    "Aggregation over %s unavailable (%s), counting documents instead", _INTERVAL_SOURCES[kind][3], err
+                )
+                self._aggregation_fallbacks.add(fallback_key)
+
+        projected = query.select(_projection(kind, None, columnar=True))
+        documents = [doc.to_dict() or {} async for doc in projected.stream()]
+        record(docs_read=max(len(documents), 1))
+        return _tally_intervals(kind, (data for data in documents if not data.get("multi")), False, modes)
+
+    async def _fetch_intervals(
+        self,
+        kinds: list[IntervalKind],
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        fetch_timings: dict[str, float] | None = None,
+        columnar: bool = False,
+        fields: Iterable[str] | None = None,
+    ) -> dict[str, Any]:
+        """Run the regular and multi-entry queries for each kind concurrently."""
+        client = await self._get_firestore_client()
+        fetch_started = time.perf_counter()
+        fields = tuple(fields) if fields is not None else None
+        decoders = {kind: _interval_decoder(kind, fields, columnar) for kind in kinds}
+        projections = {kind: _projection(kind, fields, columnar) for kind in kinds}
+
+        async def timed(kind: IntervalKind, part: str, query, intervals_ref) -> tuple[list[dict], float]:
+            async with self._query_semaphore:
+                query_started = time.perf_counter()
+                try:
+                    events = await query(
+                        intervals_ref, kind, child_uid, start_timestamp, end_timestamp, decoders[kind], projections[kind]
+                    )
+                except Exception as err:
+                    _LOGGER.error("Error fetching %s (%s query): %s", _INTERVAL_SOURCES[kind][3], part, err)
+                    events = []
+                return events, time.perf_counter() - query_started
+
+        keys = []
+        tasks = []
+        for kind in kinds:
+            collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+            intervals_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
+            for part, query in (("regular", self._query_regular), ("multi", self._query_multi)):
+                keys.append((kind, part))
+                tasks.append(timed(kind, part, query, intervals_ref))
+
+        results: dict[str, list] = {kind: [] for kind in kinds}
+        timings: dict[str, float] = {}
+        for (kind, part), (events, elapsed) in zip(keys, await asyncio.gather(*tasks)):
+            results[kind].extend(events)
+            timings[f"{kind}.{part}"] = elapsed
+        timings["total"] = time.perf_counter() - fetch_started
+
+        _LOGGER.debug("Fetched %s in %.3fs (%s)", ", ".join(kinds), timings["total"], timings)
+        if fetch_timings is not None:
+            fetch_timings.update(timings)
+        if columnar:
+            return {kind: IntervalFrame(kind, rows) for kind, rows in results.items()}
+        return results
+
+    async def _get_intervals(
+        self,
+        kind: IntervalKind,
+        child_uid: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Fetch decoded interval events of one kind for a date range."""
+        return (await self._fetch_intervals([kind], child_uid, start_timestamp, end_timestamp, fields=fields))[kind]
+
+    @instrumented_async
+    async def get_sleep_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, fields: Iterable[str] | None = None
+    ) -> list[dict]:
+        """Fetch sleep intervals for a date range."""
+        return await self._get_intervals("sleep", child_uid, start_timestamp, end_timestamp, fields)
+
+    @instrumented_async
+    async def get_feed_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, fields: Iterable[str] | None = None
+    ) -> list[dict]:
+        """Fetch feeding intervals for a date range."""
+        return await self._get_intervals("feed", child_uid, start_timestamp, end_timestamp, fields)
+
+    @instrumented_async
+    async def get_diaper_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, fields: Iterable[str] | None = None
+    ) -> list[dict]:
+        """Fetch diaper intervals for a date range."""
+        return await self._get_intervals("diaper", child_uid, start_timestamp, end_timestamp, fields)
+
+    @instrumented_async
+    async def get_health_entries(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, fields: Iterable[str] | None = None
+    ) -> list[dict]:
+        """Fetch health/growth entries for a date range."""
+        return await self._get_intervals("health", child_uid, start_timestamp, end_timestamp, fields)
+
+    async def iter_intervals(
+        self,
+        child_uid: str,
+        kind: IntervalKind,
+        start_timestamp: int,
+        end_timestamp: int,
+        page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream decoded events of one kind in start order. See HuckleberryAPI.iter_intervals."""
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        client = await self._get_firestore_client()
+        collection_name, subcollection, _decode, _label = _INTERVAL_SOURCES[kind]
+        intervals_ref = client.collection(collection_name).document(child_uid).collection(subcollection)
+        fields = tuple(fields) if fields is not None else None
+        decode = _interval_decoder(kind, fields)
+
+        path = await self._refresh_multi_cache(intervals_ref, kind, child_uid)
+        multi = self.multi_cache.sorted_entries_in_range(path, start_timestamp, end_timestamp)
+        next_multi = next(multi, None)
+        regular = self._iter_regular(
+            intervals_ref, start_timestamp, end_timestamp, page_size, _projection(kind, fields)
+        )
+        async for data in regular:
+            while next_multi is not None and next_multi["start"] < data["start"]:
+                yield decode(next_multi, True)
+                next_multi = next(multi, None)
+            yield decode(data, False)
+        while next_multi is not None:
+            yield decode(next_multi, True)
+            next_multi = next(multi, None)
+
+    async def _iter_regular(
+        self, intervals_ref, start_timestamp: int, end_timestamp: int, page_size: int, fields: list[str]
+    ) -> AsyncIterator[dict]:
+        """Yield regular interval documents (projected to fields) in start order, one page per request."""
+        query = intervals_ref.where(
+            filter=firestore.FieldFilter("start", ">=", start_timestamp)
+        ).where(
+            filter=firestore.FieldFilter("start", "<", end_timestamp)
+        ).order_by("start").select(fields).limit(page_size)
+
+        async def fetch(cursor) -> list:
+            page = query.start_after(cursor) if cursor is not None else query
+            async with self._query_semaphore:
+                return [doc async for doc in page.stream()]
+
+        pending: asyncio.Task | None = asyncio.ensure_future(fetch(None))
+        try:
+            while pending is not None:
+                docs = await pending
+                # Prefetch the next page while this one is consumed
+                pending = asyncio.ensure_future(fetch(docs[-1])) if len(docs) == page_size else None
+                for doc in docs:
+                    data = doc.to_dict()
+                    if data and not data.get("multi"):
+                        yield data
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def iter_sleep_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream sleep intervals for a date range in start order."""
+        return self.iter_intervals(child_uid, "sleep", start_timestamp, end_timestamp, page_size, fields)
+
+    def iter_feed_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream feeding intervals for a date range in start order."""
+        return self.iter_intervals(child_uid, "feed", start_timestamp, end_timestamp, page_size, fields)
+
+    def iter_diaper_intervals(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream diaper intervals for a date range in start order."""
+        return self.iter_intervals(child_uid, "diaper", start_timestamp, end_timestamp, page_size, fields)
+
+    def iter_health_entries(
+        self, child_uid: str, start_timestamp: int, end_timestamp: int, page_size: int = INTERVAL_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream health/growth entries for a date range in start order."""
+        return self.iter_intervals(child_uid, "health", start_timestamp, end_timestamp, page_size, fields)
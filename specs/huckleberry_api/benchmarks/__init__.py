@@ -0,0 +1 @@
+"""Benchmarks for the Huckleberry API client (run each module with python -m)."""
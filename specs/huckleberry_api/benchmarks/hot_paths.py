@@ -0,0 +1,245 @@
+"""Read and write hot paths against the in-memory Firestore fake.
+
+Usage:
+    python -m huckleberry_api.benchmarks.hot_paths [--rtt 0.03] [--jitter 0.2]
+        [--iterations 50] [--years 2] [--case get_sleep_intervals[30d]]
+        [--save results.json] [--baseline results.json --max-regression 0.2]
+
+Seeds a FakeFirestore with a synthetic multi-year history (multi-entry
+documents included) and times, on a fresh client per case:
+
+- get_calendar_events and each get_*_intervals over 1d / 30d / 1y windows
+- the MCP server's get_recent_activity tool end to end (skipped when the
+  mcp package is not installed)
+- the timer write cycle start_sleep -> complete_sleep
+
+Every fake RPC sleeps --rtt seconds (normally distributed with relative
+--jitter), so concurrent fan-out overlaps round trips the way it does on
+the network. The fake runs in process: its filtering and copying cost is
+part of the timings, which makes absolute numbers a floor, not a forecast.
+
+Per case the report has p50/p99 latency of the warm calls, the first
+(cold) call, round trips and documents read/written per call, and the
+peak Python memory allocated during one call (tracemalloc). With
+--baseline, the exit status is 1 if a case's p50 got slower than
+--max-regression or it needs more round trips than before, so it can
+gate CI.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from ..fake_firestore import FakeFirestore, offline_api
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_MCP_SERVER = os.path.join(_REPO_ROOT, "apps", "abby", "src", "mcp", "huckleberry_server.py")
+
+_USER_UID = "bench-user"
+WINDOWS = {"1d": 86400, "30d": 30 * 86400, "1y": 365 * 86400}
+
+# A case runs one call: (api, child uid, now) -> None
+Case = Callable[..., None]
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _window_case(method: str, seconds: int) -> Case:
+    def run(api, child_uid: str, now: float) -> None:
+        getattr(api, method)(child_uid, int(now - seconds), int(now))
+
+    return run
+
+
+def _write_cycle(api, child_uid: str, now: float) -> None:
+    api.start_sleep(child_uid)
+    api.complete_sleep(child_uid)
+
+
+def _load_mcp_server():
+    """Import the MCP server module, or return None if its dependencies are missing."""
+    spec = importlib.util.spec_from_file_location("huckleberry_mcp_server", _MCP_SERVER)
+    module = importlib.util.module_from_spec(spec)
+    logging.disable(logging.INFO)  # The server logs its startup at INFO to stderr
+    try:
+        spec.loader.exec_module(module)
+    except (ImportError, SystemExit):  # The server exits when mcp is not installed
+        return None
+    finally:
+        logging.disable(logging.NOTSET)
+    logging.getLogger().setLevel(logging.WARNING)
+    return module
+
+
+def _recent_activity_case(server, loop: asyncio.AbstractEventLoop) -> Case:
+    def run(api, child_uid: str, now: float) -> None:
+        server.huckleberry_api = api
+        server.child_uid = child_uid
+        server.child_name = "Bench"
+        content = loop.run_until_complete(server.call_tool("get_recent_activity", {"hours": 24}))
+        if content and content[0].text.startswith(("Error", "ERROR")):
+            raise RuntimeError(content[0].text)
+
+    return run
+
+
+def build_cases(loop: asyncio.AbstractEventLoop) -> tuple[dict[str, Case], list[str]]:
+    """All benchmark cases by name, plus the names of cases that cannot run here."""
+    cases: dict[str, Case] = {}
+    for label, seconds in WINDOWS.items():
+        cases[f"get_calendar_events[{label}]"] = _window_case("get_calendar_events", seconds)
+    for method in ("get_sleep_intervals", "get_feed_intervals", "get_diaper_intervals"):
+        for label, seconds in WINDOWS.items():
+            cases[f"{method}[{label}]"] = _window_case(method, seconds)
+    server = _load_mcp_server()
+    skipped = []
+    if server is not None:
+        cases["mcp:get_recent_activity"] = _recent_activity_case(server, loop)
+    else:
+        skipped.append("mcp:get_recent_activity")
+    cases["start_sleep->complete_sleep"] = _write_cycle
+    return cases, skipped
+
+
+def _backend(rtt: float, jitter: float, years: float, seed: int, now: float) -> tuple[FakeFirestore, str]:
+    rng = random.Random(seed)
+    latency = (lambda: max(0.0, rng.gauss(rtt, rtt * jitter))) if jitter > 0 else rtt
+    backend = FakeFirestore(latency=latency)
+    child_uid = backend.seed_account(_USER_UID, ["Bench"])[0]
+    backend.seed_history(child_uid, days=int(years * 365), end=now, seed=seed)
+    return backend, child_uid
+
+
+def measure(case: Case, backend: FakeFirestore, child_uid: str, iterations: int, max_workers: int) -> dict:
+    """Time one case on a fresh client: a cold call, warm calls, and one call under tracemalloc."""
+    api = offline_api(backend, _USER_UID, max_workers=max_workers)
+    try:
+        started = time.perf_counter()
+        case(api, child_uid, time.time())
+        cold = time.perf_counter() - started
+
+        samples, round_trips, docs_read, docs_written = [], [], [], []
+        for _ in range(iterations):
+            backend.reset_stats()
+            started = time.perf_counter()
+            case(api, child_uid, time.time())
+            samples.append(time.perf_counter() - started)
+            stats = backend.stats()
+            round_trips.append(stats["round_trips"])
+            docs_read.append(stats["docs_read"])
+            docs_written.append(stats["docs_written"])
+
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            case(api, child_uid, time.time())
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+    finally:
+        api.close()
+
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 2),
+        "cold_ms": round(cold * 1000, 2),
+        "round_trips": statistics.median(round_trips),
+        "docs_read": statistics.median(docs_read),
+        "docs_written": statistics.median(docs_written),
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _regressions(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    failures = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if result["p50_ms"] > previous["p50_ms"] * (1 + max_regression):
+            failures.append(f"{name}: {result['p50_ms']}ms vs baseline {previous['p50_ms']}ms")
+        if result["round_trips"] > previous["round_trips"]:
+            failures.append(f"{name}: {result['round_trips']} round trips vs baseline {previous['round_trips']}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the hot path benchmark."""
+    parser = argparse.ArgumentParser(description="Time the client's hot paths against a simulated backend.")
+    parser.add_argument("--rtt", type=float, default=0.03, help="Seconds per simulated round trip")
+    parser.add_argument("--jitter", type=float, default=0.0, help="RTT standard deviation relative to --rtt")
+    parser.add_argument("--iterations", type=int, default=50, help="Warm calls per case")
+    parser.add_argument("--years", type=float, default=2.0, help="Years of synthetic history")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for history and jitter")
+    parser.add_argument("--max-workers", type=int, default=8, help="Client thread pool size")
+    parser.add_argument("--case", action="append", help="Limit to one case (repeatable)")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier with --save")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.new_event_loop()
+    try:
+        cases, skipped = build_cases(loop)
+        unknown = set(args.case or ()) - set(cases) - set(skipped)
+        if unknown:
+            parser.error(f"unknown case(s): {', '.join(sorted(unknown))}; choose from {', '.join(cases)}")
+        backend, child_uid = _backend(args.rtt, args.jitter, args.years, args.seed, time.time())
+        results = {
+            name: measure(case, backend, child_uid, args.iterations, args.max_workers)
+            for name, case in cases.items()
+            if not args.case or name in args.case
+        }
+    finally:
+        loop.close()
+
+    report = {
+        "commit": _commit(),
+        "config": {
+            "rtt_s": args.rtt, "jitter": args.jitter, "iterations": args.iterations,
+            "years": args.years, "seed": args.seed, "max_workers": args.max_workers,
+            "python": sys.version.split()[0],
+        },
+        "skipped": skipped,
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as results_file:
+            json.dump(report, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            failures = _regressions(results, json.load(baseline_file).get("results", {}), args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Cold-start benchmark for the Python entry points.
+
+Usage:
+    python -m huckleberry_api.benchmarks.startup [--runs 5] [--importtime]
+        [--save results.json] [--baseline results.json --max-regression 0.2]
+
+Measures, in fresh processes, the time from spawn until:
+
+- mcp: the Huckleberry MCP server answers the MCP ``initialize`` request
+- huckleberry-service / reddit-service: ``GET /health`` gets an HTTP
+  response (200 needs credentials in the environment; without them the
+  services answer 503 once startup has finished, which is what is timed)
+
+--importtime runs the processes with ``-X importtime`` and adds the
+slowest top-level imports (cumulative) to the report. With --baseline,
+the exit status is 1 if any entry point's median got slower than the
+baseline by more than --max-regression, so it can gate CI.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+ENTRY_POINTS = {
+    "mcp": os.path.join(_REPO_ROOT, "apps", "abby", "src", "mcp", "huckleberry_server.py"),
+    "huckleberry-service": os.path.join(_REPO_ROOT, "apps", "huckleberry-service", "main.py"),
+    "reddit-service": os.path.join(_REPO_ROOT, "apps", "reddit-service", "main.py"),
+}
+
+_INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-benchmark", "version": "1.0"},
+    },
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _time_mcp_handshake(command: list[str], env: dict, stderr, timeout: float) -> tuple[float, str]:
+    """Spawn the MCP server and time its answer to initialize."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr, text=True
+    )
+    try:
+        process.stdin.write(json.dumps(_INITIALIZE) + "\n")
+        process.stdin.flush()
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            line = process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"MCP server exited with status {process.wait()} before the handshake")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("id") == 1:
+                return time.perf_counter() - started, "error" if "error" in message else "ok"
+        raise TimeoutError("No initialize response")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def _time_health(command: list[str], env: dict, stderr, timeout: float) -> tuple[float, str]:
+    """Spawn an HTTP service and time its first /health response."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env={**env, "PORT": str(port)}, stdout=subprocess.DEVNULL, stderr=stderr)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Service exited with status {process.returncode} before becoming healthy")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    return time.perf_counter() - started, str(response.status)
+            except urllib.error.HTTPError as err:
+                return time.perf_counter() - started, str(err.code)
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.01)
+        raise TimeoutError("No /health response")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def _slowest_imports(stderr_path: str, top: int) -> list[tuple[str, float]]:
+    """Parse -X importtime output into (top-level package, cumulative ms), slowest first."""
+    totals: dict[str, float] = {}
+    with open(stderr_path, encoding="utf-8", errors="replace") as stderr_file:
+        for line in stderr_file:
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            if name.startswith("  ") or not cumulative_us.strip().isdigit():
+                continue  # Nested import, already counted in its parent; or the header
+            package = name.strip().split(".")[0]
+            totals[package] = totals.get(package, 0.0) + int(cumulative_us) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def measure(name: str, runs: int, importtime: bool, timeout: float) -> dict:
+    """Time one entry point over several fresh processes."""
+    script = ENTRY_POINTS[name]
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), script]
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    timer = _time_mcp_handshake if name == "mcp" else _time_health
+
+    samples, outcomes = [], []
+    imports: list[tuple[str, float]] = []
+    for _ in range(runs):
+        with tempfile.NamedTemporaryFile("w+", suffix=".log", delete=False) as stderr:
+            stderr_path = stderr.name
+            elapsed, outcome = timer(command, env, stderr, timeout)
+        samples.append(elapsed)
+        outcomes.append(outcome)
+        if importtime:
+            imports = _slowest_imports(stderr_path, top=15)
+        os.unlink(stderr_path)
+
+    result = {
+        "p50_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "outcomes": sorted(set(outcomes)),
+    }
+    if importtime:
+        result["slowest_imports_ms"] = {package: round(ms, 1) for package, ms in imports}
+    return result
+
+
+def _regressions(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    failures = []
+    for name, result in results.items():
+        previous = baseline.get(name, {}).get("p50_ms")
+        if previous and result["p50_ms"] > previous * (1 + max_regression):
+            failures.append(f"{name}: {result['p50_ms']}ms vs baseline {previous}ms")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the startup benchmark."""
+    parser = argparse.ArgumentParser(description="Time to MCP handshake / health-ready for the Python entry points.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per entry point")
+    parser.add_argument("--entry-point", action="append", choices=sorted(ENTRY_POINTS), help="Limit to one entry point")
+    parser.add_argument("--importtime", action="store_true", help="Add a -X importtime breakdown")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for each process")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier with --save")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = {
+        name: measure(name, args.runs, args.importtime, args.timeout)
+        for name in args.entry_point or ENTRY_POINTS
+    }
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            failures = _regressions(results, json.load(baseline_file), args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Compare the gRPC and REST Firestore transports.
+
+Usage:
+    python -m huckleberry_api.benchmarks.transport [--runs 5] [--calls 20]
+
+Startup: each run is a fresh interpreter that imports the API module and
+builds a HuckleberryAPI plus its Firestore client (no network), so the
+numbers include module imports, which is what a spawned MCP server or a
+Cloud Run cold start pays.
+
+Per-call latency: with HUCKLE_USER_ID / HUCKLE_PW set, each transport
+authenticates once and then times a state document read and a one-day
+sleep interval query against the real backend.
+
+Results are printed as one JSON object.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Runs in a fresh interpreter; prints "<import seconds> <construct seconds>"
+_STARTUP_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from huckleberry_api.api import FirebaseTokenCredentials, HuckleberryAPI
+imported = time.perf_counter()
+api = HuckleberryAPI("bench@example.com", "unused", transport=sys.argv[1])
+api._transport.create_client(FirebaseTokenCredentials("unused"), "simpleintervals", pool_size=api.max_workers)
+built = time.perf_counter()
+print(imported - start, built - imported)
+"""
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    """Milliseconds summary of a list of second timings."""
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+    }
+
+
+def measure_startup(transport: str, runs: int) -> dict:
+    """Time import and client construction in fresh interpreters."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [_PACKAGE_ROOT, os.getenv("PYTHONPATH")]))}
+    imports, builds, totals = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SNIPPET, transport],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        totals.append(time.perf_counter() - started)
+        imported, built = (float(value) for value in output.split())
+        imports.append(imported)
+        builds.append(built)
+    return {"import": _summary(imports), "construct": _summary(builds), "process": _summary(totals)}
+
+
+def measure_calls(transport: str, calls: int, email: str, password: str) -> dict:
+    """Time warm per-call latency against the live backend."""
+    from huckleberry_api.api import HuckleberryAPI
+
+    api = HuckleberryAPI(email=email, password=password, transport=transport)
+    try:
+        api.authenticate()
+        child_uid = api.get_children()[0]["uid"]
+        client = api._get_firestore_client()
+        state_ref = client.collection("sleep").document(child_uid)
+        end = int(time.time())
+        api.get_sleep_intervals(child_uid, end - 86400, end)  # Warm up connections
+
+        reads, queries = [], []
+        for _ in range(calls):
+            started = time.perf_counter()
+            state_ref.get()
+            reads.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            api.get_sleep_intervals(child_uid, end - 86400, end)
+            queries.append(time.perf_counter() - started)
+    finally:
+        api.close()
+    return {"document_get": _summary(reads), "sleep_intervals_1d": _summary(queries)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the transport benchmark."""
+    parser = argparse.ArgumentParser(description="Compare gRPC and REST Firestore transports.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per transport")
+    parser.add_argument("--calls", type=int, default=20, help="Timed calls per transport (needs credentials)")
+    parser.add_argument("--transport", action="append", choices=["grpc", "rest"], help="Limit to one transport")
+    args = parser.parse_args(argv)
+
+    email = os.getenv("HUCKLE_USER_ID")
+    password = os.getenv("HUCKLE_PW")
+    results: dict[str, dict] = {}
+    for transport in args.transport or ["grpc", "rest"]:
+        results[transport] = {"startup": measure_startup(transport, args.runs)}
+        if email and password:
+            results[transport]["calls"] = measure_calls(transport, args.calls, email, password)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
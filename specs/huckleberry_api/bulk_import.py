@@ -0,0 +1,145 @@
+"""Bulk import of historical records from CSV or JSONL files.
+
+Usage:
+    python -m huckleberry_api.bulk_import records.csv [--child CHILD_UID]
+
+Credentials are read from HUCKLE_USER_ID / HUCKLE_PW. Progress is written
+to a checkpoint file after every committed batch, so re-running the same
+command after an interruption resumes where it stopped.
+
+CSV files need a header row; JSONL files hold one JSON object per line.
+Field names are those accepted by HuckleberryAPI.import_intervals, e.g.:
+
+    type,start,duration,side,mode,weight,units,notes
+    sleep,2024-05-01T13:05:00,5400,,,,,nap in crib
+    feed,2024-05-01T15:00:00,900,left,,,,
+    diaper,2024-05-01T15:20:00,,,pee,,,
+    growth,2024-05-02T10:00:00,,,,5.4,metric,
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from typing import Any, Iterator
+
+from .api import MAX_BATCH_WRITES, HuckleberryAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def load_records(path: str) -> Iterator[dict[str, Any]]:
+    """Yield import records from a .csv or .jsonl/.ndjson file.
+
+    Blank CSV cells and blank JSONL lines are skipped.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as records_file:
+        if extension == ".csv":
+            for row in csv.DictReader(records_file):
+                yield {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        elif extension in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(records_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as err:
+                    raise ValueError(f"{path}:{line_number}: {err}") from err
+                if not isinstance(record, dict):
+                    raise ValueError(f"{path}:{line_number}: expected a JSON object")
+                yield record
+        else:
+            raise ValueError(f"Unsupported file type {extension!r} (use .csv or .jsonl)")
+
+
+def _read_checkpoint(path: str, source: str) -> int:
+    """Return the number of records already committed for source."""
+    try:
+        with open(path, encoding="utf-8") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as err:
+        _LOGGER.warning("Ignoring unreadable checkpoint %s: %s", path, err)
+        return 0
+    if checkpoint.get("source") != os.path.abspath(source):
+        _LOGGER.warning("Checkpoint %s belongs to %s, starting from the beginning", path, checkpoint.get("source"))
+        return 0
+    return int(checkpoint.get("committed", 0))
+
+
+def _write_checkpoint(path: str, source: str, committed: int) -> None:
+    """Atomically record the number of committed records."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as checkpoint_file:
+        json.dump({"source": os.path.abspath(source), "committed": committed}, checkpoint_file)
+    os.replace(tmp_path, path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the bulk import command line."""
+    parser = argparse.ArgumentParser(description="Import historical Huckleberry records from CSV or JSONL.")
+    parser.add_argument("file", help="Records file (.csv or .jsonl)")
+    parser.add_argument("--child", help="Child UID (default: first child on the account)")
+    parser.add_argument("--chunk-size", type=int, default=MAX_BATCH_WRITES, help="Records per commit (max 500)")
+    parser.add_argument("--checkpoint", help="Progress file (default: <file>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and import everything")
+    parser.add_argument(
+        "--update-prefs", action="store_true",
+        help="Point the app's 'last' sleep/feed/diaper/growth at the newest imported records",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    email = os.getenv("HUCKLE_USER_ID")
+    password = os.getenv("HUCKLE_PW")
+    if not email or not password:
+        parser.error("Missing HUCKLE_USER_ID or HUCKLE_PW in environment")
+
+    checkpoint = args.checkpoint or f"{args.file}.checkpoint"
+    skip = 0 if args.restart else _read_checkpoint(checkpoint, args.file)
+    if skip:
+        _LOGGER.info("Resuming after %d already imported records", skip)
+
+    api = HuckleberryAPI(email=email, password=password)
+    try:
+        api.authenticate()
+        child_uid = args.child
+        if not child_uid:
+            children = api.get_children()
+            if not children:
+                parser.error("No children found in Huckleberry account")
+            child_uid = children[0]["uid"]
+
+        def progress(committed: int) -> None:
+            _write_checkpoint(checkpoint, args.file, committed)
+            print(f"\r{committed} records imported", end="", file=sys.stderr, flush=True)
+
+        try:
+            written = api.import_intervals(
+                child_uid,
+                load_records(args.file),
+                chunk_size=args.chunk_size,
+                skip=skip,
+                progress=progress,
+                update_prefs=args.update_prefs,
+            )
+        except ValueError as err:
+            print(file=sys.stderr)
+            _LOGGER.error("Import stopped: %s (fix the record and re-run to resume)", err)
+            return 1
+    finally:
+        api.close()
+
+    print(file=sys.stderr)
+    _LOGGER.info("Imported %d records into child %s", written, child_uid)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
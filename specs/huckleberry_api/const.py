@@ -10,3 +10,19 @@ FIREBASE_APP_ID: Final = "1:219218185774:android:a3e215cc246b92b0"
 AUTH_URL: Final = "https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword"
 REFRESH_URL: Final = "https://securetoken.googleapis.com/v1/token"
 FIRESTORE_BASE_URL: Final = f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents"
+
+# Token lifetime handling (seconds)
+TOKEN_REFRESH_MARGIN: Final = 300  # Calls refresh inline once the ID token is this close to expiry
+TOKEN_REFRESH_LEAD: Final = 600  # The background refresher rotates tokens this long before expiry
+TOKEN_REFRESH_RETRY: Final = 30  # Background refresher back-off after a failed refresh
+
+# Write queue replay back-off after a failed commit (seconds, doubling up to the max)
+WRITE_REPLAY_RETRY: Final = 5
+WRITE_REPLAY_MAX_DELAY: Final = 300
+
+# Incremental mirror syncs re-read documents this far behind the watermark, so writes
+# stamped by a client whose clock runs slow are still picked up (seconds)
+MIRROR_SYNC_SKEW: Final = 900
+
+# Child profile cache lifetime without snapshot listeners to invalidate it (seconds)
+CHILDREN_CACHE_TTL: Final = 600
@@ -0,0 +1,104 @@
+"""Suppression of repeated logging calls within a time window."""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Mapping
+
+
+def _normalize(value: Any) -> Any:
+    """Canonical form of a call argument: trimmed lower-case text, whole floats as ints, no empty values."""
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, Mapping):
+        return {
+            str(key): _normalize(item) for key, item in value.items()
+            if item is not None and item != ""
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+class DuplicateSuppressor:
+    """Remembers the results of recent logging calls by fingerprint.
+
+    A fingerprint covers the tool (or endpoint) name, the normalized
+    arguments and the child, so a voice agent re-issuing the same call after
+    an interruption gets the first call's result back instead of writing the
+    event again. Fingerprints expire after window seconds; the same event
+    logged again later is written normally.
+
+    Only successful results should be remembered; failed calls are retried.
+    Safe to share across threads.
+    """
+
+    def __init__(self, window: float = 120.0, max_entries: int = 1024) -> None:
+        """Initialize an empty suppressor.
+
+        Args:
+            window: Seconds a call's result is reused for identical calls (0 disables)
+            max_entries: Remembered calls kept at most (oldest dropped first)
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results: OrderedDict[str, tuple[float, Any]] = OrderedDict()  # fingerprint -> (expires at, result)
+        self.suppressed: dict[str, int] = {}  # Suppressed duplicates per tool
+
+    @property
+    def suppressed_total(self) -> int:
+        """Duplicates suppressed across all tools."""
+        with self._lock:
+            return sum(self.suppressed.values())
+
+    @staticmethod
+    def fingerprint(tool: str, arguments: Mapping[str, Any] | None, child_uid: str | None) -> str:
+        """Stable hash of a call: tool, normalized arguments and child."""
+        canonical = json.dumps(
+            [tool, _normalize(dict(arguments or {})), child_uid], sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def lookup(self, tool: str, arguments: Mapping[str, Any] | None, child_uid: str | None) -> Any | None:
+        """Return the remembered result of an identical recent call, or None.
+
+        A hit is counted as a suppressed duplicate.
+        """
+        if self.window <= 0:
+            return None
+        key = self.fingerprint(tool, arguments, child_uid)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            self.suppressed[tool] = self.suppressed.get(tool, 0) + 1
+            return entry[1]
+
+    def remember(self, tool: str, arguments: Mapping[str, Any] | None, child_uid: str | None, result: Any) -> None:
+        """Record the result of a successful call."""
+        if self.window <= 0:
+            return
+        key = self.fingerprint(tool, arguments, child_uid)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._results[key] = (now + self.window, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def _expire(self, now: float) -> None:
+        """Drop expired results; caller holds _lock."""
+        while self._results:
+            key, (expires_at, _result) = next(iter(self._results.items()))
+            if expires_at > now:
+                return
+            del self._results[key]
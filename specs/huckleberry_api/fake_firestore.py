@@ -0,0 +1,1028 @@
+"""In-memory Firestore stand-in for offline tests and benchmarks.
+
+Implements the subset of the google-cloud-firestore Client surface that
+HuckleberryAPI uses: documents and subcollections, where / order_by /
+select / limit / start_after / stream, count and sum aggregations,
+get_all, WriteBatch with dotted-path updates, DELETE_FIELD and
+update-time preconditions, and on_snapshot listeners. Every RPC costs one
+injected round trip, and the backend counts round trips and documents
+read and written, so a benchmark can report them.
+
+    backend = FakeFirestore(latency=0.02)
+    child_uid = backend.seed_account("user-1", ["Abby"])[0]
+    backend.seed_history(child_uid, days=365)
+    api = offline_api(backend, "user-1")
+    api.get_sleep_intervals(child_uid, start, end)
+
+FakeAsyncClient (offline_async_api) exposes the same database through the
+firestore.AsyncClient surface that AsyncHuckleberryAPI uses.
+
+Not modelled: transactions, collection group queries, OR filters,
+descending cursors over multiple fields, and server-side index
+requirements (except the composite index for aggregations combining an
+equality filter with a range, see missing_indexes).
+"""
+from __future__ import annotations
+
+import copy
+import datetime as dt
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator
+
+from .rest import DELETE_FIELD, FieldFilter, MissingIndex, PreconditionFailed, is_permanent_error
+from .transport import FirestoreTransport
+
+_RANGE_OPS = {"<", "<=", ">", ">=", "!="}
+_MISSING = object()
+
+
+class NotFound(Exception):
+    """update() of a document that does not exist."""
+
+
+def _get_path(data: dict, field_path: str) -> Any:
+    value: Any = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_path(data: dict, field_path: str, value: Any) -> None:
+    *parents, leaf = field_path.split(".")
+    for part in parents:
+        child = data.get(part)
+        if not isinstance(child, dict):
+            child = data[part] = {}
+        data = child
+    if value is DELETE_FIELD:
+        data.pop(leaf, None)
+    else:
+        data[leaf] = copy.deepcopy(value)
+
+
+def _merge(target: dict, source: dict) -> None:
+    for key, value in source.items():
+        if value is DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def _project(data: dict, field_paths: Iterable[str] | None) -> dict:
+    if field_paths is None:
+        return copy.deepcopy(data)
+    projected: dict = {}
+    for field_path in field_paths:
+        value = _get_path(data, field_path)
+        if value is not _MISSING:
+            _set_path(projected, field_path, value)
+    return projected
+
+
+def _sort_key(value: Any) -> tuple:
+    """Firestore cross-type ordering: null < bool < number < timestamp < string < others."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, dt.datetime):
+        return (3, value.timestamp())
+    if isinstance(value, str):
+        return (4, value)
+    return (5, repr(value))
+
+
+def _matches(value: Any, op: str, expected: Any) -> bool:
+    if value is _MISSING:
+        return False
+    if op == "==":
+        return value == expected
+    if op == "!=":
+        return value != expected and value is not None
+    if op == "in":
+        return value in expected
+    if op == "not-in":
+        return value not in expected and value is not None
+    if op == "array_contains":
+        return isinstance(value, list) and expected in value
+    if op == "array_contains_any":
+        return isinstance(value, list) and any(item in value for item in expected)
+    if _sort_key(value)[0] != _sort_key(expected)[0]:
+        return False  # Range filters only match values of the same type
+    return {
+        "<": value < expected,
+        "<=": value <= expected,
+        ">": value > expected,
+        ">=": value >= expected,
+    }[op]
+
+
+class _StoredDocument:
+    __slots__ = ("data", "create_time", "update_time")
+
+    def __init__(self, data: dict, create_time: dt.datetime, update_time: dt.datetime) -> None:
+        self.data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+
+class FakeDocumentSnapshot:
+    """Point-in-time copy of a document (or of its absence)."""
+
+    def __init__(
+        self,
+        reference: FakeDocumentReference,
+        data: dict | None,
+        create_time: dt.datetime | None = None,
+        update_time: dt.datetime | None = None,
+        read_time: dt.datetime | None = None,
+    ) -> None:
+        self.reference = reference
+        self._data = data
+        self.exists = data is not None
+        self.create_time = create_time
+        self.update_time = update_time
+        self.read_time = read_time
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    def to_dict(self) -> dict | None:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        value = _get_path(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class FakeWriteResult:
+    """Result of one write in a commit."""
+
+    def __init__(self, update_time: dt.datetime) -> None:
+        self.update_time = update_time
+
+
+class FakeAggregationResult:
+    """One aggregation value."""
+
+    def __init__(self, alias: str, value: Any, read_time: dt.datetime) -> None:
+        self.alias = alias
+        self.value = value
+        self.read_time = read_time
+
+
+class FakeAggregationQuery:
+    """count()/sum() over a query; get() returns [[FakeAggregationResult, ...]] like the real client."""
+
+    def __init__(self, query: FakeQuery) -> None:
+        self._query = query
+        self._aggregations: list[tuple[str, str, str | None]] = []  # (alias, kind, field)
+
+    def count(self, alias: str | None = None) -> FakeAggregationQuery:
+        self._aggregations.append((alias or f"field_{len(self._aggregations) + 1}", "count", None))
+        return self
+
+    def sum(self, field_path: str, alias: str | None = None) -> FakeAggregationQuery:
+        self._aggregations.append((alias or f"field_{len(self._aggregations) + 1}", "sum", field_path))
+        return self
+
+    def get(self, timeout: float | None = None, **_kwargs) -> list[list[FakeAggregationResult]]:
+        backend = self._query._client._backend
+        backend._check_aggregation_index(self._query._filters)
+        backend._round_trip()
+        documents = self._query._run()
+        backend._count_reads(1 + len(documents) // 1000)
+        read_time = backend._now()
+        results = []
+        for alias, kind, field_path in self._aggregations:
+            if kind == "count":
+                value: Any = len(documents)
+            else:
+                values = [_get_path(stored.data, field_path) for _path, stored in documents]
+                value = sum(
+                    number for number in values if isinstance(number, (int, float)) and not isinstance(number, bool)
+                )
+            results.append(FakeAggregationResult(alias, value, read_time))
+        return [results]
+
+
+class FakeQuery:
+    """Immutable query over one collection."""
+
+    def __init__(
+        self,
+        client: FakeClient,
+        path: str,
+        filters: tuple = (),
+        orders: tuple = (),
+        fields: tuple[str, ...] | None = None,
+        limit: int | None = None,
+        cursor: tuple | None = None,
+    ) -> None:
+        self._client = client
+        self._path = path
+        self._filters = filters  # (field_path, op, value)
+        self._orders = orders  # (field_path, descending)
+        self._fields = fields
+        self._limit = limit
+        self._cursor = cursor  # (values, document path or None)
+
+    def _with(self, **changes) -> FakeQuery:
+        parts = {
+            "filters": self._filters, "orders": self._orders, "fields": self._fields,
+            "limit": self._limit, "cursor": self._cursor,
+        }
+        parts.update(changes)
+        return FakeQuery(self._client, self._path, **parts)
+
+    def where(
+        self, field_path: str | None = None, op_string: str | None = None, value: Any = None,
+        filter: FieldFilter | None = None,
+    ) -> FakeQuery:
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._with(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> FakeQuery:
+        return self._with(orders=self._orders + ((field_path, direction.upper() == "DESCENDING"),))
+
+    def select(self, field_paths: Iterable[str]) -> FakeQuery:
+        return self._with(fields=tuple(field_paths))
+
+    def limit(self, count: int) -> FakeQuery:
+        return self._with(limit=count)
+
+    def start_after(self, document_fields: FakeDocumentSnapshot | dict) -> FakeQuery:
+        if isinstance(document_fields, FakeDocumentSnapshot):
+            data = self._client._backend._documents.get(document_fields.reference.path)
+            source = data.data if data is not None else (document_fields.to_dict() or {})
+            values = tuple(_get_path(source, field_path) for field_path, _desc in self._effective_orders())
+            return self._with(cursor=(values, document_fields.reference.path))
+        values = tuple(_get_path(document_fields, field_path) for field_path, _desc in self._effective_orders())
+        return self._with(cursor=(values, None))
+
+    def count(self, alias: str | None = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self).count(alias)
+
+    def sum(self, field_path: str, alias: str | None = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self).sum(field_path, alias)
+
+    def _effective_orders(self) -> tuple:
+        """Explicit orders, preceded by the first range-filtered field if not ordered on (like Firestore)."""
+        ordered = {field_path for field_path, _desc in self._orders}
+        for field_path, op, _value in self._filters:
+            if op in _RANGE_OPS and field_path not in ordered:
+                return ((field_path, False),) + self._orders
+        return self._orders
+
+    def _run(self) -> list[tuple[str, _StoredDocument]]:
+        """Matching (path, document) pairs in query order, after cursor and limit."""
+        backend = self._client._backend
+        orders = self._effective_orders()
+        with backend._lock:
+            candidates = list(backend._collections.get(self._path, {}).items())
+        matched = []
+        for doc_id, stored in candidates:
+            data = stored.data
+            if not all(_matches(_get_path(data, field_path), op, value) for field_path, op, value in self._filters):
+                continue
+            keys = []
+            for field_path, _desc in orders:
+                value = _get_path(data, field_path)
+                if value is _MISSING:
+                    break  # Documents lacking an order_by field are excluded
+                keys.append(_sort_key(value))
+            else:
+                matched.append((tuple(keys), f"{self._path}/{doc_id}", stored))
+
+        # Ties break on document name
+        matched.sort(key=lambda item: (tuple(
+            _Reversed(key) if desc else key for key, (_field, desc) in zip(item[0], orders)
+        ), item[1]))
+
+        if self._cursor is not None:
+            values, cursor_path = self._cursor
+            cursor_keys = tuple(_sort_key(value) for value in values)
+            directions = [desc for _field, desc in orders]
+
+            def after(item) -> bool:
+                for key, cursor_key, desc in zip(item[0], cursor_keys, directions):
+                    if key != cursor_key:
+                        return (key < cursor_key) if desc else (key > cursor_key)
+                return cursor_path is not None and item[1] > cursor_path
+
+            matched = [item for item in matched if after(item)]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        return [(path, stored) for _keys, path, stored in matched]
+
+    def stream(self, timeout: float | None = None, **_kwargs) -> Iterator[FakeDocumentSnapshot]:
+        backend = self._client._backend
+        backend._round_trip()
+        documents = self._run()
+        backend._count_reads(max(len(documents), 1))
+        read_time = backend._now()
+        for path, stored in documents:
+            yield FakeDocumentSnapshot(
+                self._client.document(path), _project(stored.data, self._fields),
+                stored.create_time, stored.update_time, read_time,
+            )
+
+    def get(self, timeout: float | None = None, **_kwargs) -> list[FakeDocumentSnapshot]:
+        return list(self.stream(timeout=timeout))
+
+
+class _Reversed:
+    """Sort key wrapper inverting the order (descending order_by)."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __lt__(self, other: _Reversed) -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reversed) and other.key == self.key
+
+
+class FakeCollectionReference(FakeQuery):
+    """A collection (query over all its documents)."""
+
+    def __init__(self, client: FakeClient, path: str) -> None:
+        super().__init__(client, path)
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, document_id: str | None = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, f"{self._path}/{document_id or uuid.uuid4().hex[:20]}")
+
+
+class FakeWatch:
+    """Handle of an on_snapshot listener."""
+
+    def __init__(self, backend: FakeFirestore, path: str, callback: Callable) -> None:
+        self._backend = backend
+        self._path = path
+        self._callback = callback
+
+    def unsubscribe(self) -> None:
+        with self._backend._lock:
+            watches = self._backend._watches.get(self._path, [])
+            if self in watches:
+                watches.remove(self)
+
+
+class FakeDocumentReference:
+    """A document path."""
+
+    def __init__(self, client: FakeClient, path: str) -> None:
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FakeDocumentReference) and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def collection(self, collection_id: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def get(self, field_paths: Iterable[str] | None = None, timeout: float | None = None, **_kwargs):
+        backend = self._client._backend
+        backend._round_trip()
+        backend._count_reads(1)
+        return backend._snapshot(self, field_paths)
+
+    def set(self, document_data: dict, merge: bool = False) -> FakeWriteResult:
+        write_batch = self._client.batch()
+        write_batch.set(self, document_data, merge=merge)
+        return write_batch.commit()[0]
+
+    def update(self, field_updates: dict, option: dict | None = None) -> FakeWriteResult:
+        write_batch = self._client.batch()
+        write_batch.update(self, field_updates, option=option)
+        return write_batch.commit()[0]
+
+    def delete(self, option: dict | None = None) -> None:
+        write_batch = self._client.batch()
+        write_batch.delete(self, option=option)
+        write_batch.commit()
+
+    def on_snapshot(self, callback: Callable) -> FakeWatch:
+        """Call callback([snapshot], changes, read_time) now and after every change, on a dispatcher thread."""
+        backend = self._client._backend
+        watch = FakeWatch(backend, self.path, callback)
+        with backend._lock:
+            backend._watches.setdefault(self.path, []).append(watch)
+            snapshot = backend._snapshot(self, None)
+        backend._deliver(watch, snapshot)
+        return watch
+
+
+class FakeWriteBatch:
+    """Writes committed atomically, with one shared update time."""
+
+    def __init__(self, client: FakeClient) -> None:
+        self._client = client
+        self._writes: list[tuple[str, FakeDocumentReference, Any, Any]] = []  # (op, ref, data, option or merge)
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def set(self, reference: FakeDocumentReference, document_data: dict, merge: bool = False) -> None:
+        self._writes.append(("set", reference, copy.deepcopy(document_data), merge))
+
+    def update(self, reference: FakeDocumentReference, field_updates: dict, option: dict | None = None) -> None:
+        self._writes.append(("update", reference, dict(field_updates), option))
+
+    def delete(self, reference: FakeDocumentReference, option: dict | None = None) -> None:
+        self._writes.append(("delete", reference, None, option))
+
+    def commit(self, timeout: float | None = None, **_kwargs) -> list[FakeWriteResult]:
+        backend = self._client._backend
+        backend._round_trip()
+        return backend._commit(self._writes)
+
+
+class FakeClient:
+    """Client surface (firestore.Client subset) over a FakeFirestore backend."""
+
+    def __init__(self, backend: FakeFirestore) -> None:
+        self._backend = backend
+
+    def collection(self, path: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, path)
+
+    def document(self, path: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self, path)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    @staticmethod
+    def write_option(last_update_time: dt.datetime | None = None, exists: bool | None = None) -> dict:
+        if last_update_time is not None:
+            return {"last_update_time": last_update_time}
+        return {"exists": exists}
+
+    def get_all(
+        self, references: Iterable[FakeDocumentReference], field_paths: Iterable[str] | None = None, **_kwargs
+    ) -> Iterator[FakeDocumentSnapshot]:
+        references = list(references)
+        self._backend._round_trip()
+        self._backend._count_reads(len(references))
+        for reference in references:
+            yield self._backend._snapshot(reference, field_paths)
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+# -- firestore.AsyncClient surface ------------------------------------------
+
+
+def _from_grpc(value: Any) -> Any:
+    """Replace google.cloud.firestore.DELETE_FIELD (used by AsyncHuckleberryAPI) with rest.DELETE_FIELD."""
+    from google.cloud import firestore
+
+    if value is firestore.DELETE_FIELD:
+        return DELETE_FIELD
+    if isinstance(value, dict):
+        return {key: _from_grpc(item) for key, item in value.items()}
+    return value
+
+
+class FakeAsyncAggregationQuery:
+    """FakeAggregationQuery with an awaitable get()."""
+
+    def __init__(self, query: FakeAggregationQuery) -> None:
+        self._query = query
+
+    def count(self, alias: str | None = None) -> FakeAsyncAggregationQuery:
+        self._query.count(alias)
+        return self
+
+    def sum(self, field_path: str, alias: str | None = None) -> FakeAsyncAggregationQuery:
+        self._query.sum(field_path, alias)
+        return self
+
+    async def get(self, timeout: float | None = None, **_kwargs) -> list[list[FakeAggregationResult]]:
+        """Run the aggregation; a missing index raises FailedPrecondition, as over gRPC."""
+        try:
+            return self._query.get(timeout=timeout)
+        except MissingIndex as err:
+            from google.api_core.exceptions import FailedPrecondition
+
+            raise FailedPrecondition(str(err).partition(": ")[2]) from err
+
+
+class FakeAsyncQuery:
+    """FakeQuery with an async stream() and awaitable get()."""
+
+    def __init__(self, query: FakeQuery) -> None:
+        self._query = query
+
+    def where(self, *args, **kwargs) -> FakeAsyncQuery:
+        return FakeAsyncQuery(self._query.where(*args, **kwargs))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> FakeAsyncQuery:
+        return FakeAsyncQuery(self._query.order_by(field_path, direction))
+
+    def select(self, field_paths: Iterable[str]) -> FakeAsyncQuery:
+        return FakeAsyncQuery(self._query.select(field_paths))
+
+    def limit(self, count: int) -> FakeAsyncQuery:
+        return FakeAsyncQuery(self._query.limit(count))
+
+    def start_after(self, document_fields: FakeDocumentSnapshot | dict) -> FakeAsyncQuery:
+        return FakeAsyncQuery(self._query.start_after(document_fields))
+
+    def count(self, alias: str | None = None) -> FakeAsyncAggregationQuery:
+        return FakeAsyncAggregationQuery(self._query.count(alias))
+
+    def sum(self, field_path: str, alias: str | None = None) -> FakeAsyncAggregationQuery:
+        return FakeAsyncAggregationQuery(self._query.sum(field_path, alias))
+
+    async def stream(self, timeout: float | None = None, **_kwargs) -> AsyncIterator[FakeDocumentSnapshot]:
+        for snapshot in self._query.stream(timeout=timeout):
+            yield snapshot
+
+    async def get(self, timeout: float | None = None, **_kwargs) -> list[FakeDocumentSnapshot]:
+        return self._query.get(timeout=timeout)
+
+
+class FakeAsyncCollectionReference(FakeAsyncQuery):
+    """FakeCollectionReference whose documents are FakeAsyncDocumentReferences."""
+
+    def __init__(self, collection: FakeCollectionReference) -> None:
+        super().__init__(collection)
+        self.id = collection.id
+
+    def document(self, document_id: str | None = None) -> FakeAsyncDocumentReference:
+        return FakeAsyncDocumentReference(self._query.document(document_id))
+
+
+class FakeAsyncDocumentReference:
+    """FakeDocumentReference with awaitable reads and writes."""
+
+    def __init__(self, reference: FakeDocumentReference) -> None:
+        self._reference = reference
+        self.path = reference.path
+        self.id = reference.id
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FakeAsyncDocumentReference) and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def collection(self, collection_id: str) -> FakeAsyncCollectionReference:
+        return FakeAsyncCollectionReference(self._reference.collection(collection_id))
+
+    async def get(self, field_paths: Iterable[str] | None = None, timeout: float | None = None, **_kwargs):
+        return self._reference.get(field_paths, timeout=timeout)
+
+    async def set(self, document_data: dict, merge: bool = False) -> FakeWriteResult:
+        return self._reference.set(_from_grpc(document_data), merge=merge)
+
+    async def update(self, field_updates: dict, option: dict | None = None) -> FakeWriteResult:
+        return self._reference.update(_from_grpc(field_updates), option=option)
+
+    async def delete(self, option: dict | None = None) -> None:
+        self._reference.delete(option=option)
+
+
+class FakeAsyncWriteBatch:
+    """FakeWriteBatch taking FakeAsyncDocumentReferences, with an awaitable commit()."""
+
+    def __init__(self, write_batch: FakeWriteBatch) -> None:
+        self._batch = write_batch
+
+    def __len__(self) -> int:
+        return len(self._batch)
+
+    def set(self, reference: FakeAsyncDocumentReference, document_data: dict, merge: bool = False) -> None:
+        self._batch.set(reference._reference, _from_grpc(document_data), merge=merge)
+
+    def update(self, reference: FakeAsyncDocumentReference, field_updates: dict, option: dict | None = None) -> None:
+        self._batch.update(reference._reference, _from_grpc(field_updates), option=option)
+
+    def delete(self, reference: FakeAsyncDocumentReference, option: dict | None = None) -> None:
+        self._batch.delete(reference._reference, option=option)
+
+    async def commit(self, timeout: float | None = None, **_kwargs) -> list[FakeWriteResult]:
+        return self._batch.commit(timeout=timeout)
+
+
+class FakeAsyncClient:
+    """firestore.AsyncClient surface (the subset AsyncHuckleberryAPI uses) over a FakeFirestore.
+
+    RPCs run inline on the event loop; injected latency blocks it.
+    """
+
+    def __init__(self, backend: FakeFirestore) -> None:
+        self._client = FakeClient(backend)
+
+    def collection(self, path: str) -> FakeAsyncCollectionReference:
+        return FakeAsyncCollectionReference(self._client.collection(path))
+
+    def document(self, path: str) -> FakeAsyncDocumentReference:
+        return FakeAsyncDocumentReference(self._client.document(path))
+
+    def batch(self) -> FakeAsyncWriteBatch:
+        return FakeAsyncWriteBatch(self._client.batch())
+
+    write_option = staticmethod(FakeClient.write_option)
+
+    async def get_all(
+        self, references: Iterable[FakeAsyncDocumentReference], field_paths: Iterable[str] | None = None, **_kwargs
+    ) -> AsyncIterator[FakeDocumentSnapshot]:
+        for snapshot in self._client.get_all([reference._reference for reference in references], field_paths):
+            yield snapshot
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class FakeFirestore:
+    """The shared in-memory database behind any number of FakeClients.
+
+    Safe to use from several threads; listener callbacks run on one
+    dispatcher thread, in commit order, like the real client's watch thread.
+    """
+
+    def __init__(
+        self,
+        latency: float | Callable[[], float] = 0.0,
+        missing_indexes: bool = False,
+    ) -> None:
+        """Initialize an empty database.
+
+        Args:
+            latency: Seconds added to every RPC (a callable is sampled per RPC,
+                e.g. lambda: random.gauss(0.03, 0.005) for jittered RTT)
+            missing_indexes: Reject aggregations that combine an equality/in
+                filter with a range filter on another field, like a project
+                without the composite index
+        """
+        self.latency = latency
+        self.missing_indexes = missing_indexes
+        self._lock = threading.RLock()
+        self._documents: dict[str, _StoredDocument] = {}
+        self._collections: dict[str, dict[str, _StoredDocument]] = {}  # collection path -> {id: document}
+        self._watches: dict[str, list[FakeWatch]] = {}
+        self._clock = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+        self._deliveries: queue.Queue = queue.Queue()
+        self._dispatcher: threading.Thread | None = None
+        self.round_trips = 0
+        self.docs_read = 0
+        self.docs_written = 0
+
+    # -- Statistics ------------------------------------------------------
+
+    def reset_stats(self) -> None:
+        """Zero the round trip and document counters."""
+        with self._lock:
+            self.round_trips = 0
+            self.docs_read = 0
+            self.docs_written = 0
+
+    def stats(self) -> dict[str, int]:
+        """Round trips and documents read/written since the last reset_stats()."""
+        with self._lock:
+            return {"round_trips": self.round_trips, "docs_read": self.docs_read, "docs_written": self.docs_written}
+
+    def _round_trip(self) -> None:
+        with self._lock:
+            self.round_trips += 1
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+    def _count_reads(self, count: int) -> None:
+        with self._lock:
+            self.docs_read += count
+
+    def _now(self) -> dt.datetime:
+        """Strictly increasing commit clock (wall time, bumped by 1us on ties)."""
+        with self._lock:
+            now = dt.datetime.now(dt.timezone.utc)
+            self._clock = now if now > self._clock else self._clock + dt.timedelta(microseconds=1)
+            return self._clock
+
+    # -- Reads and writes ------------------------------------------------
+
+    def _snapshot(
+        self, reference: FakeDocumentReference, field_paths: Iterable[str] | None
+    ) -> FakeDocumentSnapshot:
+        with self._lock:
+            stored = self._documents.get(reference.path)
+            if stored is None:
+                return FakeDocumentSnapshot(reference, None, read_time=self._now())
+            return FakeDocumentSnapshot(
+                reference, _project(stored.data, field_paths), stored.create_time, stored.update_time, self._now()
+            )
+
+    def _check_aggregation_index(self, filters: tuple) -> None:
+        if not self.missing_indexes:
+            return
+        equality = {field_path for field_path, op, _value in filters if op not in _RANGE_OPS}
+        ranges = {field_path for field_path, op, _value in filters if op in _RANGE_OPS}
+        if equality and ranges and equality != ranges:
+            raise MissingIndex(400, "FAILED_PRECONDITION", "The query requires an index.")
+
+    def _store(self, path: str, data: dict, update_time: dt.datetime) -> None:
+        """Write a document; caller holds _lock."""
+        stored = self._documents.get(path)
+        if stored is None:
+            stored = _StoredDocument(data, update_time, update_time)
+            self._documents[path] = stored
+            parent, doc_id = path.rsplit("/", 1)
+            self._collections.setdefault(parent, {})[doc_id] = stored
+        else:
+            stored.data = data
+            stored.update_time = update_time
+
+    def _remove(self, path: str) -> None:
+        """Delete a document; caller holds _lock."""
+        if self._documents.pop(path, None) is not None:
+            parent, doc_id = path.rsplit("/", 1)
+            self._collections.get(parent, {}).pop(doc_id, None)
+
+    def _commit(self, writes: list[tuple[str, FakeDocumentReference, Any, Any]]) -> list[FakeWriteResult]:
+        with self._lock:
+            # Check every precondition before applying anything (atomic batch)
+            for op, reference, _data, option in writes:
+                stored = self._documents.get(reference.path)
+                if op == "update" and stored is None:
+                    raise NotFound(f"No document to update: {reference.path}")
+                if isinstance(option, dict):
+                    expected = option.get("last_update_time")
+                    if expected is not None and (stored is None or stored.update_time != expected):
+                        raise PreconditionFailed(f"{reference.path} was modified since {expected}")
+                    if option.get("exists") is not None and option["exists"] != (stored is not None):
+                        raise PreconditionFailed(f"{reference.path} existence precondition failed")
+
+            update_time = self._now()
+            changed: list[FakeDocumentReference] = []
+            for op, reference, data, option in writes:
+                stored = self._documents.get(reference.path)
+                if op == "delete":
+                    self._remove(reference.path)
+                elif op == "set":
+                    if option is True and stored is not None:  # merge=True
+                        merged = copy.deepcopy(stored.data)
+                        _merge(merged, data)
+                        data = merged
+                    else:
+                        data = {key: value for key, value in data.items() if value is not DELETE_FIELD}
+                    self._store(reference.path, data, update_time)
+                else:
+                    updated = copy.deepcopy(stored.data)
+                    for field_path, value in data.items():
+                        _set_path(updated, field_path, value)
+                    self._store(reference.path, updated, update_time)
+                changed.append(reference)
+            self.docs_written += len(writes)
+
+            deliveries = [
+                (watch, self._snapshot(reference, None))
+                for reference in changed
+                for watch in self._watches.get(reference.path, ())
+            ]
+        for watch, snapshot in deliveries:
+            self._deliver(watch, snapshot)
+        return [FakeWriteResult(update_time) for _write in writes]
+
+    def _deliver(self, watch: FakeWatch, snapshot: FakeDocumentSnapshot) -> None:
+        with self._lock:
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, name="fake-firestore-watch", daemon=True
+                )
+                self._dispatcher.start()
+        self._deliveries.put((watch, snapshot))
+
+    def _dispatch(self) -> None:
+        while True:
+            watch, snapshot = self._deliveries.get()
+            with self._lock:
+                active = watch in self._watches.get(watch._path, ())
+            if active:
+                try:
+                    watch._callback([snapshot], [], snapshot.read_time)
+                except Exception:  # The real watch thread survives callback errors too
+                    pass
+            self._deliveries.task_done()
+
+    def wait_for_listeners(self) -> None:
+        """Block until every pending snapshot has been delivered."""
+        self._deliveries.join()
+
+    # -- Seeding ---------------------------------------------------------
+
+    def put(self, path: str, data: dict) -> None:
+        """Write a document directly (no round trip, not counted, no listeners)."""
+        with self._lock:
+            self._store(path, copy.deepcopy(data), self._now())
+
+    def seed_account(self, user_uid: str, child_names: Iterable[str] = ("Baby",)) -> list[str]:
+        """Create a user with children and empty tracker documents.
+
+        The user document lists every child in childList and points
+        lastChild at the first one.
+
+        Returns:
+            The child ids, in the given order
+        """
+        child_uids = []
+        for index, name in enumerate(child_names):
+            child_uid = f"{user_uid}-child-{index + 1}"
+            child_uids.append(child_uid)
+            self.put(f"childs/{child_uid}", {
+                "childsName": name,
+                "birthdate": "2023-01-01",
+                "gender": "F" if index % 2 == 0 else "M",
+                "createdAt": 1672531200,
+                "nightStart": 1140,
+                "morningCutoff": 420,
+                "naps": 2,
+            })
+            for collection_name in ("sleep", "feed", "diaper", "health"):
+                self.put(f"{collection_name}/{child_uid}", {"prefs": {}})
+        self.put(f"users/{user_uid}", {
+            "lastChild": child_uids[0] if child_uids else None,
+            "childList": [{"cid": child_uid, "nickname": name} for child_uid, name in zip(child_uids, child_names)],
+        })
+        return child_uids
+
+    def seed_history(
+        self,
+        child_uid: str,
+        days: int = 365,
+        end: float | None = None,
+        seed: int = 0,
+        multi_fraction: float = 0.1,
+    ) -> dict[str, int]:
+        """Fill a child's interval subcollections with a synthetic history.
+
+        Each day gets about 3 sleeps, 8 feeds and 7 diaper changes, and each
+        week one growth entry. About multi_fraction of each month's events
+        are stored the way the app batches them: inside one multi-entry
+        document per kind and month. Feed side durations are in seconds.
+
+        Args:
+            child_uid: Child the history belongs to
+            days: Days of history, ending at end
+            end: Unix time of the newest event (default now)
+            seed: Random seed, so histories are reproducible
+            multi_fraction: Share of events stored in multi-entry documents
+
+        Returns:
+            Number of events per kind
+        """
+        rng = random.Random(seed)
+        end = time.time() if end is None else end
+        start = end - days * 86400
+        counts = {"sleep": 0, "feed": 0, "diaper": 0, "health": 0}
+        multi: dict[tuple[str, str], dict] = {}  # (kind, month) -> entries
+
+        def add(kind: str, event: dict) -> None:
+            counts[kind] += 1
+            collection_name, subcollection = ("health", "data") if kind == "health" else (kind, "intervals")
+            event_id = f"{int(event['start'] * 1000)}-{rng.getrandbits(80):020x}"
+            if rng.random() < multi_fraction:
+                month = time.strftime("%Y%m", time.gmtime(event["start"]))
+                multi.setdefault((kind, month), {})[event_id] = event
+            else:
+                self._store(f"{collection_name}/{child_uid}/{subcollection}/{event_id}", event, update_time)
+
+        with self._lock:
+            update_time = self._now()
+            day = start
+            while day < end:
+                for hour in sorted(rng.sample(range(24), 3)):
+                    event_start = day + hour * 3600 + rng.randrange(3600)
+                    duration = rng.randrange(1200, 4 * 3600) if hour < 19 else rng.randrange(4 * 3600, 9 * 3600)
+                    add("sleep", {"start": event_start, "duration": duration, "offset": -120.0,
+                                  "end_offset": -120.0, "lastUpdated": event_start + duration, "details": {}})
+                for hour in range(0, 24, 3):
+                    event_start = day + hour * 3600 + rng.randrange(3600)
+                    if rng.random() < 0.7:
+                        left, right = rng.randrange(3, 20) * 60, rng.randrange(0, 20) * 60
+                        add("feed", {"start": event_start, "mode": "breast", "leftDuration": left,
+                                     "rightDuration": right, "lastSide": "left" if left >= right else "right",
+                                     "offset": -120.0, "lastUpdated": event_start})
+                    else:
+                        add("feed", {"start": event_start, "mode": "bottle", "leftDuration": 0, "rightDuration": 0,
+                                     "amount": rng.randrange(60, 180), "offset": -120.0,
+                                     "lastUpdated": event_start})
+                for _change in range(7):
+                    event_start = day + rng.randrange(86400)
+                    add("diaper", {"start": event_start, "mode": rng.choice(("pee", "pee", "poo", "both", "dry")),
+                                   "offset": -120.0, "lastUpdated": event_start})
+                if int((day - start) // 86400) % 7 == 0:
+                    add("health", {"start": day + 43200, "type": "health", "mode": "growth",
+                                   "weight": round(3.5 + (day - start) / 86400 * 0.02, 2), "weightUnits": "kg",
+                                   "lastUpdated": day + 43200})
+                day += 86400
+
+            for (kind, month), entries in multi.items():
+                collection_name, subcollection = ("health", "data") if kind == "health" else (kind, "intervals")
+                self._store(
+                    f"{collection_name}/{child_uid}/{subcollection}/multi-{month}",
+                    {"multi": True, "data": entries, "lastUpdated": max(entry["start"] for entry in entries.values())},
+                    update_time,
+                )
+        return counts
+
+
+class FakeTransport(FirestoreTransport):
+    """Transport whose clients all share one FakeFirestore backend."""
+
+    name = "fake"
+    supports_listeners = True
+
+    def __init__(self, backend: FakeFirestore | None = None) -> None:
+        """Initialize the transport with a backend (a fresh empty one if not given)."""
+        self.backend = backend if backend is not None else FakeFirestore()
+
+    def create_client(self, credentials, project: str, pool_size: int) -> FakeClient:
+        """Return a FakeClient."""
+        return FakeClient(self.backend)
+
+    @property
+    def delete_field(self) -> Any:
+        """rest.DELETE_FIELD."""
+        return DELETE_FIELD
+
+    @property
+    def field_filter(self) -> Any:
+        """rest.FieldFilter."""
+        return FieldFilter
+
+    @property
+    def precondition_errors(self) -> tuple[type[BaseException], ...]:
+        """rest.PreconditionFailed."""
+        return (PreconditionFailed,)
+
+    def is_permanent_error(self, error: BaseException) -> bool:
+        """Failed preconditions and updates of missing documents."""
+        return isinstance(error, NotFound) or is_permanent_error(error)
+
+    def is_missing_index(self, error: BaseException) -> bool:
+        """rest.MissingIndex."""
+        return isinstance(error, MissingIndex)
+
+
+def offline_api(backend: FakeFirestore, user_uid: str, **kwargs):
+    """A HuckleberryAPI signed in to backend without any network call.
+
+    Args:
+        backend: Database to talk to
+        user_uid: Account the client acts as (see FakeFirestore.seed_account)
+        kwargs: Further HuckleberryAPI arguments (max_workers, mirror, hooks, ...)
+    """
+    from .api import HuckleberryAPI
+
+    api = HuckleberryAPI(f"{user_uid}@example.com", "offline", transport=FakeTransport(backend), **kwargs)
+    api.id_token = "offline"
+    api.refresh_token = "offline"
+    api.user_uid = user_uid
+    api.token_expires_at = time.time() + 10 * 365 * 86400  # Never refreshes
+    return api
+
+
+def offline_async_api(backend: FakeFirestore, user_uid: str, **kwargs):
+    """An AsyncHuckleberryAPI signed in to backend without any network call.
+
+    Args:
+        backend: Database to talk to
+        user_uid: Account the client acts as (see FakeFirestore.seed_account)
+        kwargs: Further AsyncHuckleberryAPI arguments (max_concurrency, hooks, ...)
+    """
+    from .async_api import AsyncHuckleberryAPI
+
+    api = AsyncHuckleberryAPI(f"{user_uid}@example.com", "offline", **kwargs)
+    api.id_token = "offline"
+    api.refresh_token = "offline"
+    api.user_uid = user_uid
+    api.token_expires_at = time.time() + 10 * 365 * 86400  # Never refreshes
+    api._firestore_client = FakeAsyncClient(backend)
+    return api
@@ -0,0 +1,151 @@
+"""Columnar interval query results."""
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to stdlib arrays
+    np = None
+
+# Per-kind mode codes stored in IntervalFrame.mode (0 = unknown / not applicable)
+MODE_CODES: dict[str, dict[str, int]] = {
+    "sleep": {},
+    "feed": {"breast": 1, "bottle": 2, "solids": 3},
+    "diaper": {"pee": 1, "poo": 2, "both": 3, "dry": 4},
+    "health": {"growth": 1},
+}
+
+# (start, duration_sec, mode_code, left_sec, right_sec)
+FrameRow = tuple[float, float, int, float, float]
+
+
+def _number(value) -> float:
+    """Coerce a Firestore field to float (missing/non-numeric -> 0.0)."""
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def frame_row(kind: str, data: dict, is_multi: bool) -> FrameRow:
+    """Decode one interval document or multi-entry item into a frame row."""
+    start = float(data["start"])
+    mode = MODE_CODES[kind].get(data.get("mode"), 0)
+
+    if kind == "feed":
+        # Side durations are seconds in regular and multi-entry documents alike
+        left = _number(data.get("leftDuration"))
+        right = _number(data.get("rightDuration"))
+        return start, left + right, mode, left, right
+    if kind == "sleep":
+        return start, _number(data.get("duration")), mode, 0.0, 0.0
+    # Diapers and health entries are instant events
+    return start, 0.0, mode, 0.0, 0.0
+
+
+class IntervalFrame:
+    """Column-oriented interval results for one event kind.
+
+    Columns are NumPy arrays when NumPy is installed, otherwise
+    ``array.array`` instances. Rows are sorted by start; all times and
+    durations are in seconds.
+
+    Attributes:
+        kind: Event kind ('sleep', 'feed', 'diaper', 'health')
+        start: Interval start (Unix seconds)
+        end: Interval end (start + duration)
+        duration: Duration in seconds (0 for instant events)
+        mode: Mode code, see MODE_CODES[kind]
+        left_duration: Left side seconds (feeds only)
+        right_duration: Right side seconds (feeds only)
+    """
+
+    def __init__(self, kind: str, rows: Iterable[FrameRow]) -> None:
+        """Build columns from decoded rows."""
+        self.kind = kind
+        ordered = sorted(rows)
+        columns = list(zip(*ordered)) if ordered else [(), (), (), (), ()]
+        starts, durations, modes, lefts, rights = columns
+
+        if np is not None:
+            self.start = np.asarray(starts, dtype=np.float64)
+            self.duration = np.asarray(durations, dtype=np.float64)
+            self.mode = np.asarray(modes, dtype=np.int8)
+            self.left_duration = np.asarray(lefts, dtype=np.float64)
+            self.right_duration = np.asarray(rights, dtype=np.float64)
+            self.end = self.start + self.duration
+        else:
+            self.start = array("d", starts)
+            self.duration = array("d", durations)
+            self.mode = array("b", modes)
+            self.left_duration = array("d", lefts)
+            self.right_duration = array("d", rights)
+            self.end = array("d", (s + d for s, d in zip(starts, durations)))
+
+    def __len__(self) -> int:
+        """Return the number of intervals."""
+        return len(self.start)
+
+    def __repr__(self) -> str:
+        """Return a short description."""
+        return f"IntervalFrame(kind={self.kind!r}, rows={len(self)})"
+
+    def _mode_mask_codes(self, modes: Sequence[str]) -> set[int]:
+        """Translate mode names to codes for this kind."""
+        codes = MODE_CODES[self.kind]
+        return {codes[mode] for mode in modes if mode in codes}
+
+    def total_duration(self) -> float:
+        """Return the summed duration in seconds."""
+        return float(self.duration.sum()) if np is not None else float(sum(self.duration))
+
+    def count(self, modes: Sequence[str] | None = None) -> int:
+        """Count intervals, optionally only those with one of the given modes."""
+        if modes is None:
+            return len(self)
+        codes = self._mode_mask_codes(modes)
+        if np is not None:
+            return int(np.isin(self.mode, list(codes)).sum())
+        return sum(1 for mode in self.mode if mode in codes)
+
+    def gaps(self):
+        """Return the gaps in seconds between each interval end and the next start."""
+        if np is not None:
+            return self.start[1:] - self.end[:-1]
+        return array("d", (self.start[i + 1] - self.end[i] for i in range(len(self) - 1)))
+
+    def daily_totals(self, utc_offset_sec: float = 0.0) -> dict[int, float]:
+        """Sum durations per day.
+
+        Args:
+            utc_offset_sec: Offset added to start times before bucketing, so
+                days follow local midnight
+
+        Returns:
+            Mapping of day start (Unix seconds, local midnight) to summed seconds
+        """
+        if np is not None:
+            days = ((self.start + utc_offset_sec) // 86400).astype(np.int64)
+            unique_days, inverse = np.unique(days, return_inverse=True)
+            sums = np.bincount(inverse, weights=self.duration, minlength=len(unique_days))
+            return {int(day) * 86400 - int(utc_offset_sec): float(total) for day, total in zip(unique_days, sums)}
+
+        totals: dict[int, float] = {}
+        for start, duration in zip(self.start, self.duration):
+            day = int((start + utc_offset_sec) // 86400) * 86400 - int(utc_offset_sec)
+            totals[day] = totals.get(day, 0.0) + duration
+        return totals
+
+    def to_records(self) -> list[dict]:
+        """Return rows as dicts (start, end, duration, mode, left_duration, right_duration)."""
+        names = {code: name for name, code in MODE_CODES[self.kind].items()}
+        return [
+            {
+                "start": float(self.start[i]),
+                "end": float(self.end[i]),
+                "duration": float(self.duration[i]),
+                "mode": names.get(int(self.mode[i]), "unknown"),
+                "left_duration": float(self.left_duration[i]),
+                "right_duration": float(self.right_duration[i]),
+            }
+            for i in range(len(self))
+        ]
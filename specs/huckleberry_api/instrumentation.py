@@ -0,0 +1,196 @@
+"""Per-operation instrumentation hooks for the Huckleberry clients.
+
+Each public client operation (start_sleep, complete_feeding,
+get_sleep_intervals, ...) wrapped by ``instrumented`` reports one
+OperationStats to the client's hooks when it returns or raises. Internal
+code adds to the running operation's counters with record(); the counters
+live in a context variable, so work fanned out to worker threads (submitted
+through contextvars.copy_context().run) or to asyncio tasks is attributed
+to the operation that started it.
+
+Generators (iter_intervals, ...) wrapped by ``instrumented_iter`` report
+once they are exhausted or closed. Nested operations (get_interval_frame
+calling get_calendar_frames) are reported once, under the outermost name.
+With no hooks registered an operation costs one attribute check.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Callable, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OperationStats(NamedTuple):
+    """What one client operation cost."""
+
+    operation: str  # Method name, e.g. "complete_sleep"
+    duration: float  # Wall time in seconds
+    docs_read: int  # Firestore documents read (aggregations: one per 1000 counted)
+    docs_written: int  # Firestore documents written
+    bytes_received: int  # Response bytes (REST transport only; gRPC reports 0)
+    retries: int  # Operation re-runs after a stale-state precondition failure
+    cache_hits: int  # Reads served from the live state, multi-entry or mirror caches
+    parked: int  # Queued writes parked after failing to replay (flush_write_queue)
+    error: str | None  # Exception class name if the operation raised
+
+
+OperationHook = Callable[[OperationStats], None]
+
+
+class _Counters:
+    """Mutable counters of the running operation (shared with its worker threads)."""
+
+    __slots__ = ("lock", "docs_read", "docs_written", "bytes_received", "retries", "cache_hits", "parked")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.docs_read = 0
+        self.docs_written = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.parked = 0
+
+
+_current: contextvars.ContextVar[_Counters | None] = contextvars.ContextVar(
+    "huckleberry_operation", default=None
+)
+
+
+def record(
+    docs_read: int = 0,
+    docs_written: int = 0,
+    bytes_received: int = 0,
+    retries: int = 0,
+    cache_hits: int = 0,
+    parked: int = 0,
+) -> None:
+    """Add to the counters of the running operation (no-op outside one)."""
+    counters = _current.get()
+    if counters is None:
+        return
+    with counters.lock:
+        counters.docs_read += docs_read
+        counters.docs_written += docs_written
+        counters.bytes_received += bytes_received
+        counters.retries += retries
+        counters.cache_hits += cache_hits
+        counters.parked += parked
+
+
+def _begin(hooks: list[OperationHook]) -> tuple[_Counters, contextvars.Token] | None:
+    if not hooks or _current.get() is not None:
+        return None
+    counters = _Counters()
+    return counters, _current.set(counters)
+
+
+def _finish(
+    hooks: list[OperationHook], operation: str, started: float, counters: _Counters, error: str | None
+) -> None:
+    stats = OperationStats(
+        operation=operation,
+        duration=time.perf_counter() - started,
+        docs_read=counters.docs_read,
+        docs_written=counters.docs_written,
+        bytes_received=counters.bytes_received,
+        retries=counters.retries,
+        cache_hits=counters.cache_hits,
+        parked=counters.parked,
+        error=error,
+    )
+    for hook in list(hooks):
+        try:
+            hook(stats)
+        except Exception:
+            _LOGGER.exception("Instrumentation hook %r failed", hook)
+
+
+def instrumented(method):
+    """Report a client method's stats to ``self.hooks``."""
+    operation = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        begun = _begin(self.hooks)
+        if begun is None:
+            return method(self, *args, **kwargs)
+        counters, token = begun
+        started = time.perf_counter()
+        error = None
+        try:
+            return method(self, *args, **kwargs)
+        except BaseException as err:
+            error = type(err).__name__
+            raise
+        finally:
+            _current.reset(token)
+            _finish(self.hooks, operation, started, counters, error)
+    return wrapper
+
+
+def instrumented_iter(method):
+    """Report a client generator method's stats to ``self.hooks`` once it is exhausted or closed.
+
+    The generator is stepped inside its own copy of the context, so work
+    done producing items (and fanned out from there) is counted, while
+    whatever the caller does between items is not. The reported duration
+    runs from the first item requested to the last.
+    """
+    operation = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.hooks or _current.get() is not None:
+            yield from method(self, *args, **kwargs)
+            return
+        counters = _Counters()
+        context = contextvars.copy_context()
+        context.run(_current.set, counters)
+        iterator = method(self, *args, **kwargs)
+        started = time.perf_counter()
+        error = None
+        try:
+            while True:
+                try:
+                    item = context.run(next, iterator)
+                except StopIteration:
+                    return
+                yield item
+        except GeneratorExit:
+            raise  # Closed early by the caller, not a failure
+        except BaseException as err:
+            error = type(err).__name__
+            raise
+        finally:
+            context.run(iterator.close)
+            _finish(self.hooks, operation, started, counters, error)
+    return wrapper
+
+
+def instrumented_async(method):
+    """Report an async client method's stats to ``self.hooks``."""
+    operation = method.__name__
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        begun = _begin(self.hooks)
+        if begun is None:
+            return await method(self, *args, **kwargs)
+        counters, token = begun
+        started = time.perf_counter()
+        error = None
+        try:
+            return await method(self, *args, **kwargs)
+        except BaseException as err:
+            error = type(err).__name__
+            raise
+        finally:
+            _current.reset(token)
+            _finish(self.hooks, operation, started, counters, error)
+    return wrapper
@@ -0,0 +1,148 @@
+"""In-process latency histograms and an OpenMetrics exporter.
+
+A MetricsCollector is an instrumentation hook:
+
+    collector = MetricsCollector()
+    api = HuckleberryAPI(email, password, hooks=[collector])
+    ...
+    text = collector.render()  # Serve with OPENMETRICS_CONTENT_TYPE
+
+Per operation it keeps a cumulative latency histogram and totals of
+documents read/written, response bytes, retries, cache hits, parked
+queued writes and errors.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Iterable
+
+from .instrumentation import OperationStats
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Seconds; spans a warm cache hit to a cold multi-year range read
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+_COUNTERS = (
+    ("docs_read", "documents_read", "Firestore documents read."),
+    ("docs_written", "documents_written", "Firestore documents written."),
+    ("bytes_received", "response_bytes", "Firestore response bytes (REST transport)."),
+    ("retries", "retries", "Operation re-runs after stale timer state."),
+    ("cache_hits", "cache_hits", "Reads served from local caches."),
+    ("parked", "writes_parked", "Queued writes parked after failing to replay."),
+)
+
+
+class _OperationMetrics:
+    """Histogram and totals of one operation."""
+
+    __slots__ = ("bucket_counts", "count", "total", "errors", "totals")
+
+    def __init__(self, buckets: int) -> None:
+        self.bucket_counts = [0] * (buckets + 1)  # Last slot: above the largest bound
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.totals = dict.fromkeys((attr for attr, _name, _help in _COUNTERS), 0)
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsCollector:
+    """Thread-safe instrumentation hook aggregating OperationStats.
+
+    Histograms are cumulative since creation (or reset()); quantiles are
+    estimated from bucket counts by whatever scrapes render().
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, prefix: str = "huckleberry") -> None:
+        """Initialize an empty collector.
+
+        Args:
+            buckets: Latency bucket upper bounds in seconds
+            prefix: Metric name prefix, in place of "huckleberry"
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._operations: dict[str, _OperationMetrics] = {}
+
+    def __call__(self, stats: OperationStats) -> None:
+        """Record one operation (the hook entry point)."""
+        index = bisect.bisect_left(self.buckets, stats.duration)
+        with self._lock:
+            metrics = self._operations.get(stats.operation)
+            if metrics is None:
+                metrics = self._operations[stats.operation] = _OperationMetrics(len(self.buckets))
+            metrics.bucket_counts[index] += 1
+            metrics.count += 1
+            metrics.total += stats.duration
+            if stats.error is not None:
+                metrics.errors += 1
+            for attr in metrics.totals:
+                metrics.totals[attr] += getattr(stats, attr)
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._operations.clear()
+
+    def snapshot(self) -> dict[str, dict]:
+        """Per-operation counts, latency sum, buckets and totals as plain dicts."""
+        with self._lock:
+            return {
+                operation: {
+                    "count": metrics.count,
+                    "sum_seconds": metrics.total,
+                    "errors": metrics.errors,
+                    "buckets": dict(zip((*self.buckets, float("inf")), metrics.bucket_counts)),
+                    **metrics.totals,
+                }
+                for operation, metrics in sorted(self._operations.items())
+            }
+
+    def render(self) -> str:
+        """Render all metrics in the OpenMetrics text format."""
+        with self._lock:
+            operations = [
+                (_escape(name), metrics.count, metrics.total, metrics.errors,
+                 list(metrics.bucket_counts), dict(metrics.totals))
+                for name, metrics in sorted(self._operations.items())
+            ]
+
+        duration = f"{self.prefix}_operation_duration_seconds"
+        lines = [
+            f"# TYPE {duration} histogram",
+            f"# UNIT {duration} seconds",
+            f"# HELP {duration} Client operation latency.",
+        ]
+        for name, count, total, _errors, bucket_counts, _totals in operations:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'{duration}_bucket{{operation="{name}",le="{_format_float(bound)}"}} {cumulative}')
+            lines.append(f'{duration}_count{{operation="{name}"}} {count}')
+            lines.append(f'{duration}_sum{{operation="{name}"}} {_format_float(total)}')
+
+        errors = f"{self.prefix}_operation_errors"
+        lines += [f"# TYPE {errors} counter", f"# HELP {errors} Client operations that raised."]
+        for name, _count, _total, error_count, _bucket_counts, _totals in operations:
+            lines.append(f'{errors}_total{{operation="{name}"}} {error_count}')
+
+        for attr, suffix, help_text in _COUNTERS:
+            metric = f"{self.prefix}_{suffix}"
+            lines += [f"# TYPE {metric} counter", f"# HELP {metric} {help_text}"]
+            for name, _count, _total, _errors, _bucket_counts, totals in operations:
+                lines.append(f'{metric}_total{{operation="{name}"}} {totals[attr]}')
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
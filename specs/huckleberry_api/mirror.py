@@ -0,0 +1,160 @@
+"""Local SQLite mirror of Huckleberry interval history."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Iterable, Iterator
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS intervals (
+    child_uid TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    start REAL NOT NULL,
+    last_updated REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (child_uid, kind, doc_id)
+);
+CREATE INDEX IF NOT EXISTS intervals_by_start ON intervals (child_uid, kind, start);
+CREATE TABLE IF NOT EXISTS watermarks (
+    child_uid TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    last_updated REAL NOT NULL,
+    PRIMARY KEY (child_uid, kind)
+);
+"""
+
+
+class IntervalMirror:
+    """Persistent local mirror of regular interval documents.
+
+    One row per interval document, keyed by (child, kind, document id) and
+    indexed by start time. A per-(child, kind) watermark holds the highest
+    lastUpdated seen (never past the local time of the sync), so
+    HuckleberryAPI only has to ask Firestore for documents changed since
+    the last sync, less a margin for clients whose clocks run behind.
+
+    Multi-entry batch documents are not stored here; they are still read
+    through the regular multi-entry query path.
+
+    Deletions made in the app are not detected by a watermark sync; call
+    reset() for a child to force a full re-read.
+
+    Safe to share across threads.
+    """
+
+    def __init__(self, path: str | os.PathLike = ":memory:") -> None:
+        """Open (or create) the mirror database at path."""
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def watermark(self, child_uid: str, kind: str) -> float | None:
+        """Return the highest lastUpdated mirrored for (child, kind), or None before the first sync."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_updated FROM watermarks WHERE child_uid = ? AND kind = ?",
+                (child_uid, kind),
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply(self, child_uid: str, kind: str, documents: Iterable[tuple[str, dict]], synced_at: float) -> int:
+        """Upsert interval documents and advance the watermark.
+
+        Args:
+            child_uid: Child unique identifier
+            kind: Interval kind ('sleep', 'feed', 'diaper', 'health')
+            documents: (document id, document data) pairs; multi-entry docs are skipped
+            synced_at: Local time the read started; a lastUpdated stamped by a
+                client whose clock runs ahead does not move the watermark past it
+
+        Returns:
+            Number of documents written
+        """
+        rows = []
+        watermark = self.watermark(child_uid, kind)
+        for doc_id, data in documents:
+            if not data or data.get("multi") or "start" not in data:
+                continue
+            last_updated = data.get("lastUpdated")
+            if isinstance(last_updated, (int, float)):
+                watermark = last_updated if watermark is None else max(watermark, last_updated)
+            else:
+                last_updated = None
+            rows.append((child_uid, kind, doc_id, float(data["start"]), last_updated, json.dumps(data, default=str)))
+
+        if watermark is None:
+            watermark = 0.0  # Synced, but nothing timestamped yet
+        watermark = min(watermark, synced_at)
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO intervals (child_uid, kind, doc_id, start, last_updated, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (child_uid, kind, last_updated) VALUES (?, ?, ?)",
+                (child_uid, kind, watermark),
+            )
+        return len(rows)
+
+    def range(self, child_uid: str, kind: str, start_timestamp: float, end_timestamp: float) -> list[dict]:
+        """Return mirrored documents with start_timestamp <= start < end_timestamp, ordered by start."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM intervals WHERE child_uid = ? AND kind = ? AND start >= ? AND start < ? "
+                "ORDER BY start",
+                (child_uid, kind, start_timestamp, end_timestamp),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_range(
+        self, child_uid: str, kind: str, start_timestamp: float, end_timestamp: float, page_size: int = 500
+    ) -> Iterator[dict]:
+        """Yield mirrored documents in start order, reading page_size rows at a time.
+
+        Pages are keyed on (start, document id), so the lock is only held
+        while a page is read and memory stays bounded by one page.
+        """
+        cursor: tuple[float, str] | None = None
+        while True:
+            with self._lock:
+                if cursor is None:
+                    rows = self._conn.execute(
+                        "SELECT start, doc_id, data FROM intervals WHERE child_uid = ? AND kind = ? "
+                        "AND start >= ? AND start < ? ORDER BY start, doc_id LIMIT ?",
+                        (child_uid, kind, start_timestamp, end_timestamp, page_size),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT start, doc_id, data FROM intervals WHERE child_uid = ? AND kind = ? "
+                        "AND (start > ? OR (start = ? AND doc_id > ?)) AND start < ? ORDER BY start, doc_id LIMIT ?",
+                        (child_uid, kind, cursor[0], cursor[0], cursor[1], end_timestamp, page_size),
+                    ).fetchall()
+            for _start, _doc_id, data in rows:
+                yield json.loads(data)
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1][0], rows[-1][1])
+
+    def reset(self, child_uid: str, kind: str | None = None) -> None:
+        """Drop mirrored rows and watermarks for a child (optionally a single kind)."""
+        where, params = ("child_uid = ?", (child_uid,)) if kind is None else (
+            "child_uid = ? AND kind = ?", (child_uid, kind)
+        )
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM intervals WHERE {where}", params)
+            self._conn.execute(f"DELETE FROM watermarks WHERE {where}", params)
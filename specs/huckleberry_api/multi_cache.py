@@ -0,0 +1,118 @@
+"""Cache of multi-entry (batched) interval documents."""
+from __future__ import annotations
+
+import bisect
+import heapq
+import threading
+from itertools import islice
+from typing import Any, Iterator, NamedTuple
+
+
+class CachedMultiDocument(NamedTuple):
+    """A decoded multi-entry document with a sorted per-entry start index."""
+
+    update_time: Any
+    min_start: float
+    max_start: float
+    starts: list[float]  # Sorted entry start times
+    entries: list[dict]  # Entries in the same order as starts
+
+
+def index_multi_document(update_time: Any, data: dict | None) -> CachedMultiDocument:
+    """Build the sorted entry index for a multi-entry document."""
+    entries = []
+    if data and isinstance(data.get("data"), dict):
+        entries = [
+            entry for entry in data["data"].values()
+            if isinstance(entry, dict) and isinstance(entry.get("start"), (int, float))
+        ]
+    entries.sort(key=lambda entry: entry["start"])
+    starts = [float(entry["start"]) for entry in entries]
+    return CachedMultiDocument(
+        update_time=update_time,
+        min_start=starts[0] if starts else float("inf"),
+        max_start=starts[-1] if starts else float("-inf"),
+        starts=starts,
+        entries=entries,
+    )
+
+
+class MultiEntryCache:
+    """In-memory cache of multi-entry documents per intervals subcollection.
+
+    Documents are keyed by id and validated against their Firestore
+    update_time, so only new or changed batch documents are re-downloaded.
+    Each cached document keeps its min/max entry start, letting range reads
+    skip documents that do not overlap the window, and a sorted start index
+    so only the entries inside the window are handed to the decoder.
+
+    Safe to share across threads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._documents: dict[str, dict[str, CachedMultiDocument]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stale_ids(self, path: str, listing: dict[str, Any]) -> list[str]:
+        """Reconcile the cache with a {doc_id: update_time} listing.
+
+        Drops documents that no longer exist and returns the ids whose
+        content must be (re)fetched.
+        """
+        with self._lock:
+            cached = self._documents.setdefault(path, {})
+            for doc_id in list(cached):
+                if doc_id not in listing:
+                    del cached[doc_id]
+
+            stale = [
+                doc_id for doc_id, update_time in listing.items()
+                if doc_id not in cached or cached[doc_id].update_time != update_time
+            ]
+            self.misses += len(stale)
+            self.hits += len(listing) - len(stale)
+            return stale
+
+    def store(self, path: str, doc_id: str, update_time: Any, data: dict | None) -> None:
+        """Index and cache one multi-entry document."""
+        document = index_multi_document(update_time, data)
+        with self._lock:
+            self._documents.setdefault(path, {})[doc_id] = document
+
+    def entries_in_range(self, path: str, start_timestamp: float, end_timestamp: float) -> Iterator[dict]:
+        """Yield cached entries with start_timestamp <= start < end_timestamp."""
+        with self._lock:
+            documents = list(self._documents.get(path, {}).values())
+
+        for document in documents:
+            if document.max_start < start_timestamp or document.min_start >= end_timestamp:
+                continue
+            low = bisect.bisect_left(document.starts, start_timestamp)
+            high = bisect.bisect_left(document.starts, end_timestamp)
+            yield from document.entries[low:high]
+
+    def sorted_entries_in_range(self, path: str, start_timestamp: float, end_timestamp: float) -> Iterator[dict]:
+        """Yield cached entries with start_timestamp <= start < end_timestamp, in start order.
+
+        Each document's entries are already sorted, so they are merged
+        lazily rather than collected and sorted.
+        """
+        with self._lock:
+            documents = list(self._documents.get(path, {}).values())
+
+        runs = []
+        for document in documents:
+            if document.max_start < start_timestamp or document.min_start >= end_timestamp:
+                continue
+            low = bisect.bisect_left(document.starts, start_timestamp)
+            high = bisect.bisect_left(document.starts, end_timestamp)
+            runs.append(islice(document.entries, low, high))
+        return heapq.merge(*runs, key=lambda entry: entry["start"])
+
+    def clear(self) -> None:
+        """Drop every cached document."""
+        with self._lock:
+            self._documents.clear()
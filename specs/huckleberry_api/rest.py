@@ -0,0 +1,637 @@
+"""Firestore REST transport.
+
+A small synchronous client for the Firestore v1 REST API that implements
+the subset of the google-cloud-firestore Client surface HuckleberryAPI
+uses: document get/set/update, structured queries (where / order_by /
+select / limit / start_after), count / sum aggregations, batchGet and
+batched commits with update-time preconditions. Requests share one
+pooled requests.Session and read the bearer token from the credentials
+on every call, so in-place token rotation works the same as with the
+gRPC client.
+
+Importing this module does not load gRPC or google-cloud-firestore, which
+keeps process startup fast. Real-time listeners are not available.
+"""
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import functools
+import re
+from typing import Any, Iterable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .const import FIRESTORE_BASE_URL
+from .instrumentation import record
+
+# Resource names in request bodies are relative to the API root
+_API_ROOT, _, _DOCUMENTS = FIRESTORE_BASE_URL.partition("/projects/")
+_DOCUMENTS = f"projects/{_DOCUMENTS}"
+
+_OPERATORS = {
+    "<": "LESS_THAN",
+    "<=": "LESS_THAN_OR_EQUAL",
+    ">": "GREATER_THAN",
+    ">=": "GREATER_THAN_OR_EQUAL",
+    "==": "EQUAL",
+    "!=": "NOT_EQUAL",
+    "in": "IN",
+    "not-in": "NOT_IN",
+    "array_contains": "ARRAY_CONTAINS",
+    "array_contains_any": "ARRAY_CONTAINS_ANY",
+}
+
+_SIMPLE_SEGMENT = re.compile(r"^[A-Za-z_][A-Za-z_0-9]*$")
+_RFC3339 = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d{1,9}))?(Z|[+-]\d{2}:\d{2})$")
+
+
+class _DeleteField:
+    """Sentinel marking a field for deletion in update()."""
+
+    def __repr__(self) -> str:
+        return "DELETE_FIELD"
+
+
+DELETE_FIELD = _DeleteField()
+
+
+class PreconditionFailed(Exception):
+    """A write precondition (document exists / last update time) did not hold."""
+
+
+class FirestoreRestError(Exception):
+    """Non-precondition error returned by the Firestore REST API."""
+
+    def __init__(self, status_code: int, status: str, message: str) -> None:
+        """Initialize from an API error response."""
+        super().__init__(f"{status_code} {status}: {message}")
+        self.status_code = status_code
+        self.status = status
+
+
+class MissingIndex(FirestoreRestError):
+    """A query needs a composite index that has not been created."""
+
+
+# API error statuses that retrying the same request cannot get past
+_PERMANENT_STATUSES = frozenset({"INVALID_ARGUMENT", "NOT_FOUND", "ALREADY_EXISTS", "OUT_OF_RANGE", "FAILED_PRECONDITION"})
+
+
+def is_missing_index_message(message: str) -> bool:
+    """Return True if a FAILED_PRECONDITION message asks for a composite index."""
+    return "index" in message.lower()
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """Return True for errors a retry of the same write cannot get past."""
+    if isinstance(error, PreconditionFailed):
+        return True
+    return isinstance(error, FirestoreRestError) and error.status in _PERMANENT_STATUSES
+
+
+@functools.total_ordering
+class Timestamp:
+    """RFC 3339 timestamp with nanosecond precision.
+
+    Kept as text so it round-trips exactly into update-time preconditions,
+    and ordered by its (seconds, nanos) value.
+    """
+
+    __slots__ = ("text", "_key")
+
+    def __init__(self, text: str) -> None:
+        """Parse an RFC 3339 timestamp as returned by the API."""
+        match = _RFC3339.match(text)
+        if not match:
+            raise ValueError(f"invalid timestamp {text!r}")
+        base, fraction, zone = match.groups()
+        moment = dt.datetime.fromisoformat(base + ("+00:00" if zone == "Z" else zone))
+        self.text = text
+        self._key = (int(moment.timestamp()), int((fraction or "").ljust(9, "0")))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Timestamp) and self._key == other._key
+
+    def __lt__(self, other: Timestamp) -> bool:
+        return self._key < other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Timestamp({self.text!r})"
+
+    def timestamp(self) -> float:
+        """Return Unix seconds as a float."""
+        return self._key[0] + self._key[1] / 1e9
+
+
+class FieldFilter:
+    """Single-field query filter (same signature as firestore.FieldFilter)."""
+
+    def __init__(self, field_path: str, op_string: str, value: Any) -> None:
+        """Initialize the filter."""
+        if op_string not in _OPERATORS:
+            raise ValueError(f"unsupported operator {op_string!r}")
+        self.field_path = field_path
+        self.op_string = op_string
+        self.value = value
+
+    def to_json(self) -> dict:
+        """Encode as a REST fieldFilter."""
+        return {
+            "fieldFilter": {
+                "field": {"fieldPath": _quote_path(self.field_path)},
+                "op": _OPERATORS[self.op_string],
+                "value": encode_value(self.value),
+            }
+        }
+
+
+def _quote_path(field_path: str) -> str:
+    """Backtick-quote dotted field path segments that are not simple identifiers."""
+    return ".".join(
+        segment if _SIMPLE_SEGMENT.match(segment) else "`" + segment.replace("\\", "\\\\").replace("`", "\\`") + "`"
+        for segment in field_path.split(".")
+    )
+
+
+def encode_value(value: Any) -> dict:
+    """Encode a Python value as a Firestore REST Value."""
+    if value is None:
+        return {"nullValue": None}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"integerValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    if isinstance(value, bytes):
+        return {"bytesValue": base64.b64encode(value).decode()}
+    if isinstance(value, Timestamp):
+        return {"timestampValue": value.text}
+    if isinstance(value, dt.datetime):
+        moment = value if value.tzinfo else value.replace(tzinfo=dt.timezone.utc)
+        return {"timestampValue": moment.astimezone(dt.timezone.utc).isoformat().replace("+00:00", "Z")}
+    if isinstance(value, dict):
+        return {"mapValue": {"fields": {key: encode_value(item) for key, item in value.items()}}}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [encode_value(item) for item in value]}}
+    raise TypeError(f"cannot encode {type(value).__name__} for Firestore")
+
+
+def decode_value(value: dict) -> Any:
+    """Decode a Firestore REST Value into a Python value."""
+    if "stringValue" in value:
+        return value["stringValue"]
+    if "integerValue" in value:
+        return int(value["integerValue"])
+    if "doubleValue" in value:
+        return float(value["doubleValue"])
+    if "booleanValue" in value:
+        return value["booleanValue"]
+    if "mapValue" in value:
+        return decode_fields(value["mapValue"].get("fields", {}))
+    if "arrayValue" in value:
+        return [decode_value(item) for item in value["arrayValue"].get("values", [])]
+    if "timestampValue" in value:
+        return Timestamp(value["timestampValue"])
+    if "bytesValue" in value:
+        return base64.b64decode(value["bytesValue"])
+    if "referenceValue" in value:
+        return value["referenceValue"]
+    if "geoPointValue" in value:
+        return dict(value["geoPointValue"])
+    return None  # nullValue
+
+
+def decode_fields(fields: dict) -> dict:
+    """Decode a REST fields map into a dict."""
+    return {key: decode_value(value) for key, value in fields.items()}
+
+
+def _leaf_paths(data: dict, prefix: str = "") -> Iterator[str]:
+    """Yield the dotted paths of all leaves of a nested dict (merge mask)."""
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            yield from _leaf_paths(value, path + ".")
+        else:
+            yield path
+
+
+def _nest(field_updates: dict) -> dict:
+    """Expand {'a.b': 1} update paths into nested fields, dropping deletions."""
+    nested: dict = {}
+    for path, value in field_updates.items():
+        if value is DELETE_FIELD:
+            continue
+        target = nested
+        *parents, leaf = path.split(".")
+        for segment in parents:
+            target = target.setdefault(segment, {})
+        target[leaf] = value
+    return nested
+
+
+class DocumentSnapshot:
+    """Result of a document read."""
+
+    def __init__(self, reference: DocumentReference, payload: dict | None, read_time: Timestamp | None = None):
+        """Initialize from a REST Document (None if missing)."""
+        self.reference = reference
+        self.exists = payload is not None
+        self._fields = (payload or {}).get("fields", {})
+        self.update_time = Timestamp(payload["updateTime"]) if payload and "updateTime" in payload else None
+        self.create_time = Timestamp(payload["createTime"]) if payload and "createTime" in payload else None
+        self.read_time = read_time
+
+    @property
+    def id(self) -> str:
+        """Document id."""
+        return self.reference.id
+
+    def to_dict(self) -> dict | None:
+        """Return document data, or None if the document does not exist."""
+        return decode_fields(self._fields) if self.exists else None
+
+    def get(self, field_path: str) -> Any:
+        """Return one (dotted) field value."""
+        value: Any = self.to_dict()
+        for segment in field_path.split("."):
+            value = value[segment]
+        return value
+
+
+class WriteResult:
+    """Result of one committed write."""
+
+    def __init__(self, update_time: Timestamp | None) -> None:
+        """Initialize with the write's update time."""
+        self.update_time = update_time
+
+
+class _Query:
+    """Immutable structured query over one collection."""
+
+    def __init__(self, client: RestFirestoreClient, parent: str, collection_id: str, spec: dict | None = None):
+        """Initialize a query (spec holds where/orderBy/select/limit parts)."""
+        self._client = client
+        self._parent = parent
+        self._collection_id = collection_id
+        self._spec = spec or {}
+
+    def _with(self, **parts) -> _Query:
+        return _Query(self._client, self._parent, self._collection_id, {**self._spec, **parts})
+
+    def where(self, field_path: str | None = None, op_string: str | None = None, value: Any = None,
+              *, filter: FieldFilter | None = None) -> _Query:
+        """Add a filter (ANDed with existing ones)."""
+        if filter is None:
+            filter = FieldFilter(field_path, op_string, value)  # type: ignore[arg-type]
+        return self._with(filters=[*self._spec.get("filters", []), filter])
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> _Query:
+        """Add an ordering."""
+        return self._with(order=[*self._spec.get("order", []), (field_path, direction)])
+
+    def select(self, field_paths: Iterable[str]) -> _Query:
+        """Project results to the given fields."""
+        return self._with(select=list(field_paths))
+
+    def limit(self, count: int) -> _Query:
+        """Limit the number of results."""
+        return self._with(limit=count)
+
+    def start_after(self, document_fields: DocumentSnapshot | dict) -> _Query:
+        """Resume after a document (snapshot) or after the given order_by field values."""
+        return self._with(start_after=document_fields)
+
+    def _structured_query(self) -> dict:
+        query: dict = {"from": [{"collectionId": self._collection_id}]}
+        filters = [flt.to_json() for flt in self._spec.get("filters", [])]
+        if len(filters) == 1:
+            query["where"] = filters[0]
+        elif filters:
+            query["where"] = {"compositeFilter": {"op": "AND", "filters": filters}}
+        order = list(self._spec.get("order", []))
+        cursor = self._spec.get("start_after")
+        if cursor is not None:
+            if isinstance(cursor, DocumentSnapshot):
+                values = [encode_value(cursor.get(path)) for path, _direction in order]
+                # Snapshot cursors break ties on the document name, as the SDK does
+                order.append(("__name__", order[-1][1] if order else "ASCENDING"))
+                values.append({"referenceValue": cursor.reference._name})
+            else:
+                values = [encode_value(cursor[path]) for path, _direction in order]
+            query["startAt"] = {"values": values, "before": False}
+        if order:
+            query["orderBy"] = [
+                {"field": {"fieldPath": _quote_path(path)}, "direction": direction.upper()}
+                for path, direction in order
+            ]
+        if "select" in self._spec:
+            query["select"] = {"fields": [{"fieldPath": _quote_path(path)} for path in self._spec["select"]]}
+        if "limit" in self._spec:
+            query["limit"] = self._spec["limit"]
+        return query
+
+    def count(self, alias: str | None = None) -> AggregationQuery:
+        """Count matching documents server-side."""
+        return AggregationQuery(self).count(alias)
+
+    def sum(self, field_path: str, alias: str | None = None) -> AggregationQuery:
+        """Sum a numeric field over matching documents server-side."""
+        return AggregationQuery(self).sum(field_path, alias)
+
+    @property
+    def _parent_name(self) -> str:
+        return f"{_DOCUMENTS}/{self._parent}" if self._parent else _DOCUMENTS
+
+    def stream(self, timeout: float | None = None) -> Iterator[DocumentSnapshot]:
+        """Run the query and yield matching documents."""
+        results = self._client._post(
+            f"{self._parent_name}:runQuery", {"structuredQuery": self._structured_query()}, timeout
+        )
+        for result in results:
+            document = result.get("document")
+            if document:
+                reference = self._client._reference_from_name(document["name"])
+                yield DocumentSnapshot(reference, document)
+
+    def get(self, timeout: float | None = None) -> list[DocumentSnapshot]:
+        """Run the query and return all matching documents."""
+        return list(self.stream(timeout=timeout))
+
+
+class AggregationResult:
+    """One aggregated value."""
+
+    def __init__(self, alias: str, value: Any, read_time: Timestamp | None = None) -> None:
+        """Initialize the result."""
+        self.alias = alias
+        self.value = value
+        self.read_time = read_time
+
+
+class AggregationQuery:
+    """Count / sum aggregations over a query, run with runAggregationQuery."""
+
+    def __init__(self, query: _Query) -> None:
+        """Initialize with the query to aggregate over."""
+        self._query = query
+        self._aggregations: list[dict] = []
+
+    def _add(self, alias: str | None, aggregation: dict) -> AggregationQuery:
+        aggregation["alias"] = alias or f"field_{len(self._aggregations) + 1}"
+        self._aggregations.append(aggregation)
+        return self
+
+    def count(self, alias: str | None = None) -> AggregationQuery:
+        """Add a document count."""
+        return self._add(alias, {"count": {}})
+
+    def sum(self, field_path: str, alias: str | None = None) -> AggregationQuery:
+        """Add a sum of a numeric field."""
+        return self._add(alias, {"sum": {"field": {"fieldPath": _quote_path(field_path)}}})
+
+    def get(self, timeout: float | None = None) -> list[list[AggregationResult]]:
+        """Run the aggregation (one result row, as in google-cloud-firestore)."""
+        body = {
+            "structuredAggregationQuery": {
+                "structuredQuery": self._query._structured_query(),
+                "aggregations": self._aggregations,
+            }
+        }
+        rows = []
+        for response in self._query._client._post(f"{self._query._parent_name}:runAggregationQuery", body, timeout):
+            if "result" not in response:
+                continue
+            read_time = Timestamp(response["readTime"]) if "readTime" in response else None
+            rows.append([
+                AggregationResult(alias, decode_value(value), read_time)
+                for alias, value in response["result"].get("aggregateFields", {}).items()
+            ])
+        return rows
+
+
+class CollectionReference(_Query):
+    """Reference to a (sub)collection."""
+
+    def __init__(self, client: RestFirestoreClient, path: str) -> None:
+        """Initialize from a slash-separated collection path."""
+        parent, _, collection_id = path.rpartition("/")
+        super().__init__(client, parent, collection_id)
+        self.path = path
+        self.id = collection_id
+
+    def document(self, document_id: str) -> DocumentReference:
+        """Return a reference to a document in this collection."""
+        return DocumentReference(self._client, f"{self.path}/{document_id}")
+
+
+class DocumentReference:
+    """Reference to a single document."""
+
+    def __init__(self, client: RestFirestoreClient, path: str) -> None:
+        """Initialize from a slash-separated document path."""
+        self._client = client
+        self.path = path
+        self.id = path.rpartition("/")[2]
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    @property
+    def _name(self) -> str:
+        return f"{_DOCUMENTS}/{self.path}"
+
+    def collection(self, collection_id: str) -> CollectionReference:
+        """Return a subcollection reference."""
+        return CollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def get(self, field_paths: Iterable[str] | None = None, timeout: float | None = None) -> DocumentSnapshot:
+        """Read the document."""
+        params = [("mask.fieldPaths", _quote_path(path)) for path in field_paths or ()]
+        payload = self._client._get(self._name, params, timeout)
+        return DocumentSnapshot(self, payload)
+
+    def set(self, document_data: dict, merge: bool = False) -> WriteResult:
+        """Create or overwrite (or merge into) the document."""
+        batch = self._client.batch()
+        batch.set(self, document_data, merge=merge)
+        return batch.commit()[0]
+
+    def update(self, field_updates: dict, option: dict | None = None) -> WriteResult:
+        """Update fields of an existing document."""
+        batch = self._client.batch()
+        batch.update(self, field_updates, option=option)
+        return batch.commit()[0]
+
+    def delete(self) -> None:
+        """Delete the document."""
+        batch = self._client.batch()
+        batch.delete(self)
+        batch.commit()
+
+    def on_snapshot(self, callback):
+        """Real-time listeners are only available with the gRPC transport (raises ValueError)."""
+        raise ValueError("Real-time listeners require the gRPC transport, not 'rest'")
+
+
+class WriteBatch:
+    """Writes committed together in one commit request."""
+
+    def __init__(self, client: RestFirestoreClient) -> None:
+        """Initialize an empty batch."""
+        self._client = client
+        self._writes: list[dict] = []
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def set(self, reference: DocumentReference, document_data: dict, merge: bool = False) -> None:
+        """Queue a set (merge=True only touches the given leaf fields)."""
+        write: dict = {"update": {"name": reference._name, "fields": encode_value(document_data)["mapValue"]["fields"]}}
+        if merge:
+            write["updateMask"] = {"fieldPaths": [_quote_path(path) for path in _leaf_paths(document_data)]}
+        self._writes.append(write)
+
+    def update(self, reference: DocumentReference, field_updates: dict, option: dict | None = None) -> None:
+        """Queue an update of dotted field paths (DELETE_FIELD removes a field)."""
+        self._writes.append({
+            "update": {"name": reference._name, "fields": encode_value(_nest(field_updates))["mapValue"]["fields"]},
+            "updateMask": {"fieldPaths": [_quote_path(path) for path in field_updates]},
+            "currentDocument": option or {"exists": True},
+        })
+
+    def delete(self, reference: DocumentReference, option: dict | None = None) -> None:
+        """Queue a delete."""
+        write: dict = {"delete": reference._name}
+        if option:
+            write["currentDocument"] = option
+        self._writes.append(write)
+
+    def commit(self, timeout: float | None = None) -> list[WriteResult]:
+        """Commit all queued writes atomically."""
+        if not self._writes:
+            return []
+        response = self._client._post(f"{_DOCUMENTS}:commit", {"writes": self._writes}, timeout)
+        self._writes = []
+        return [
+            WriteResult(Timestamp(result["updateTime"]) if "updateTime" in result else None)
+            for result in response.get("writeResults", [])
+        ]
+
+
+class RestFirestoreClient:
+    """Firestore client speaking the v1 REST API over a pooled HTTP session."""
+
+    def __init__(self, credentials, base_url: str = _API_ROOT, pool_size: int = 10) -> None:
+        """Initialize the client.
+
+        Args:
+            credentials: Object with a ``token`` attribute (read per request)
+            base_url: API root, e.g. an emulator address
+            pool_size: HTTP connections kept open for reuse
+        """
+        self._credentials = credentials
+        self._base_url = base_url.rstrip("/")
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._session.close()
+
+    def collection(self, path: str) -> CollectionReference:
+        """Return a collection reference."""
+        return CollectionReference(self, path)
+
+    def document(self, path: str) -> DocumentReference:
+        """Return a document reference."""
+        return DocumentReference(self, path)
+
+    def batch(self) -> WriteBatch:
+        """Return a new write batch."""
+        return WriteBatch(self)
+
+    @staticmethod
+    def write_option(last_update_time: Timestamp | None = None, exists: bool | None = None) -> dict:
+        """Build a write precondition for update()."""
+        if last_update_time is not None:
+            return {"updateTime": str(last_update_time)}
+        return {"exists": bool(exists)}
+
+    def get_all(
+        self, references: Iterable[DocumentReference], field_paths: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[DocumentSnapshot]:
+        """Read several documents in one batchGet request."""
+        by_name = {reference._name: reference for reference in references}
+        if not by_name:
+            return
+        body: dict = {"documents": list(by_name)}
+        if field_paths is not None:
+            body["mask"] = {"fieldPaths": [_quote_path(path) for path in field_paths]}
+        for result in self._post(f"{_DOCUMENTS}:batchGet", body, timeout):
+            if "found" in result:
+                document = result["found"]
+                yield DocumentSnapshot(by_name[document["name"]], document)
+            elif "missing" in result:
+                yield DocumentSnapshot(by_name[result["missing"]], None)
+
+    def _reference_from_name(self, name: str) -> DocumentReference:
+        return DocumentReference(self, name[len(_DOCUMENTS) + 1:])
+
+    def _headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self._credentials.token}"}
+
+    def _get(self, name: str, params: list, timeout: float | None) -> dict | None:
+        response = self._session.get(
+            f"{self._base_url}/{name}", params=params, headers=self._headers(), timeout=timeout or 30
+        )
+        record(bytes_received=len(response.content))
+        if response.status_code == 404:
+            return None
+        self._raise_for_error(response)
+        return response.json()
+
+    def _post(self, path: str, body: dict, timeout: float | None) -> Any:
+        response = self._session.post(
+            f"{self._base_url}/{path}", json=body, headers=self._headers(), timeout=timeout or 30
+        )
+        record(bytes_received=len(response.content))
+        self._raise_for_error(response)
+        return response.json()
+
+    @staticmethod
+    def _raise_for_error(response: requests.Response) -> None:
+        if response.status_code < 400:
+            return
+        try:
+            error = response.json()
+            error = (error[0] if isinstance(error, list) else error).get("error", {})
+        except ValueError:
+            error = {}
+        status = error.get("status", "")
+        message = error.get("message", response.text)
+        if status == "FAILED_PRECONDITION" and response.request.method == "POST":
+            if response.request.url.endswith(":commit"):
+                # Commit preconditions (update time / exists) did not hold
+                raise PreconditionFailed(message)
+            if is_missing_index_message(message):
+                raise MissingIndex(response.status_code, status, message)
+        raise FirestoreRestError(response.status_code, status, message)
@@ -0,0 +1,181 @@
+"""Shared fixtures: an in-memory Firestore with signed-in clients, and the app entry points.
+
+Run from the repository root or specs/:
+
+    python -m pytest specs/huckleberry_api/tests
+"""
+import asyncio
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+# Import huckleberry_api from specs/, as the apps do
+sys.path.insert(0, str(REPO_ROOT / "specs"))
+
+from huckleberry_api import api as api_module  # noqa: E402
+from huckleberry_api.const import AUTH_URL, REFRESH_URL  # noqa: E402
+from huckleberry_api.dedup import DuplicateSuppressor  # noqa: E402
+from huckleberry_api.fake_firestore import FakeFirestore, FakeTransport, offline_api, offline_async_api  # noqa: E402
+
+USER_UID = "user-1"
+
+
+@pytest.fixture
+def backend() -> FakeFirestore:
+    """An empty in-memory database."""
+    return FakeFirestore()
+
+
+@pytest.fixture
+def child_uid(backend: FakeFirestore) -> str:
+    """The only child of USER_UID, with empty tracker documents."""
+    return backend.seed_account(USER_UID, ["Abby"])[0]
+
+
+@pytest.fixture
+def make_api(backend: FakeFirestore, child_uid: str):
+    """Create HuckleberryAPIs signed in to backend as USER_UID (closed after the test).
+
+    Keyword arguments are passed to HuckleberryAPI (hooks, write_queue, ...).
+    """
+    clients = []
+
+    def make(**kwargs):
+        client = offline_api(backend, USER_UID, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def api(make_api):
+    """A HuckleberryAPI signed in to backend as USER_UID."""
+    return make_api()
+
+
+@pytest.fixture
+def async_api(backend: FakeFirestore, child_uid: str):
+    """An AsyncHuckleberryAPI signed in to backend as USER_UID (closed after the test)."""
+    client = offline_async_api(backend, USER_UID)
+    yield client
+    asyncio.run(client.close())
+
+
+class FakeIdentity:
+    """Firebase Auth for USER_UID: password sign-in and token refresh, counted.
+
+    Tokens are numbered in issue order ("id-1", "refresh-1", ...) and live
+    for expires_in seconds. Set rejected_refresh_tokens to fail refreshes,
+    and latency (seconds) to make concurrent calls overlap.
+    """
+
+    def __init__(self) -> None:
+        self.sign_ins = 0
+        self.refreshes = 0
+        self.issued = 0
+        self.expires_in = 3600
+        self.latency = 0.0
+        self.rejected_refresh_tokens: set[str] = set()
+
+    def post(self, url: str, json: dict | None = None, timeout: float | None = None) -> requests.Response:
+        """Stand-in for requests.post."""
+        time.sleep(self.latency)
+        if url.startswith(AUTH_URL):
+            self.sign_ins += 1
+            self.issued += 1
+            return self._response(200, {
+                "idToken": f"id-{self.issued}",
+                "refreshToken": f"refresh-{self.issued}",
+                "localId": USER_UID,
+                "expiresIn": str(self.expires_in),
+            })
+        if url.startswith(REFRESH_URL):
+            self.refreshes += 1
+            if json["refresh_token"] in self.rejected_refresh_tokens:
+                return self._response(400, {"error": {"message": "INVALID_REFRESH_TOKEN"}})
+            self.issued += 1
+            return self._response(200, {
+                "id_token": f"id-{self.issued}",
+                "refresh_token": f"refresh-{self.issued}",
+                "user_id": USER_UID,
+                "expires_in": str(self.expires_in),
+            })
+        raise AssertionError(f"Unexpected POST {url}")
+
+    @staticmethod
+    def _response(status: int, body: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(body).encode()
+        return response
+
+
+@pytest.fixture
+def identity(monkeypatch) -> FakeIdentity:
+    """Fake Firebase Auth endpoints, used by HuckleberryAPI sign-in and refresh."""
+    fake = FakeIdentity()
+    monkeypatch.setattr(api_module.requests, "post", fake.post)
+    return fake
+
+
+@pytest.fixture
+def offline_transports(backend: FakeFirestore, monkeypatch) -> None:
+    """Resolve transport names to backend, so clients built by name (as the apps do) stay offline.
+
+    "rest" keeps its real limitation: no real-time listeners.
+    """
+    def get_transport(transport):
+        fake = FakeTransport(backend)
+        if transport == "rest":
+            fake.supports_listeners = False
+        return fake
+
+    monkeypatch.setattr(api_module, "get_transport", get_transport)
+
+
+def _load_entry_point(name: str, relative_path: str):
+    """Import a script (not part of a package) as a fresh module."""
+    spec = importlib.util.spec_from_file_location(name, REPO_ROOT / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def service(backend: FakeFirestore, child_uid: str):
+    """apps/huckleberry-service, signed in to backend (startup events not run)."""
+    module = _load_entry_point("huckleberry_service", "apps/huckleberry-service/main.py")
+    module.huckleberry_api = offline_async_api(backend, USER_UID)
+    module.child_uid = child_uid
+    module.duplicate_suppressor = DuplicateSuppressor()
+    return module
+
+
+@pytest.fixture
+def mcp_server(monkeypatch):
+    """apps/abby's Huckleberry MCP server module, not yet initialized (no warm-up)."""
+    monkeypatch.setenv("HUCKLEBERRY_WARMUP", "0")
+    module = _load_entry_point("huckleberry_server", "apps/abby/src/mcp/huckleberry_server.py")
+    yield module
+    module.tool_executor.shutdown(wait=True)
+    if module.huckleberry_api is not None:
+        module.huckleberry_api.close()
+
+
+@pytest.fixture
+def signed_in_mcp_server(mcp_server, make_api, child_uid: str):
+    """The MCP server module with a client signed in to backend, as init_huckleberry leaves it."""
+    mcp_server.huckleberry_api = make_api()
+    mcp_server.child_uid = child_uid
+    mcp_server.duplicate_suppressor = DuplicateSuppressor()
+    return mcp_server
@@ -0,0 +1,73 @@
+"""Count and duration aggregations, and the fallback when a composite index is missing."""
+import asyncio
+import logging
+import time
+
+import pytest
+
+from huckleberry_api.rest import FirestoreRestError
+
+MODES = ("poo", "both")
+
+
+@pytest.fixture
+def window(backend, child_uid):
+    """Two weeks of history, some of it in multi-entry documents."""
+    end = time.time()
+    backend.seed_history(child_uid, days=14, end=end, multi_fraction=0.3)
+    return int(end) - 15 * 86400, int(end) + 1
+
+
+@pytest.fixture
+def expected(api, child_uid, window):
+    """(all diapers, poo/both diapers, feed seconds) counted from the listings."""
+    diapers = api.get_diaper_intervals(child_uid, *window)
+    feeds = api.get_feed_intervals(child_uid, *window)
+    return (
+        len(diapers),
+        sum(diaper["mode"] in MODES for diaper in diapers),
+        sum(feed["leftDuration"] + feed["rightDuration"] for feed in feeds),
+    )
+
+
+def test_totals_match_listings(api, child_uid, window, expected):
+    diapers, dirty, feed_seconds = expected
+
+    assert api.count_intervals(child_uid, "diaper", *window) == diapers
+    assert api.count_intervals(child_uid, "diaper", *window, modes=MODES) == dirty
+    assert api.sum_durations(child_uid, "feed", *window) == pytest.approx(feed_seconds)
+    assert api._aggregation_fallbacks == set()
+
+
+def test_missing_index_falls_back_once(api, backend, child_uid, window, expected, caplog):
+    backend.missing_indexes = True
+
+    with caplog.at_level(logging.WARNING, logger="huckleberry_api.api"):
+        first = api.count_intervals(child_uid, "diaper", *window, modes=MODES)
+        second = api.count_intervals(child_uid, "diaper", *window, modes=MODES)
+
+    assert first == second == expected[1]
+    assert caplog.text.count("counting documents instead") == 1
+    assert api._aggregation_fallbacks == {("diaper", True)}
+    assert api.count_intervals(child_uid, "diaper", *window) == expected[0]  # No mode filter, no index needed
+    assert api._aggregation_fallbacks == {("diaper", True)}
+
+
+def test_other_errors_are_raised(api, backend, child_uid, window, monkeypatch):
+    def unavailable(_filters):
+        raise FirestoreRestError(503, "UNAVAILABLE", "try again")
+
+    monkeypatch.setattr(backend, "_check_aggregation_index", unavailable)
+
+    with pytest.raises(FirestoreRestError):
+        api.count_intervals(child_uid, "diaper", *window, modes=MODES)
+    assert api._aggregation_fallbacks == set()
+
+
+def test_async_missing_index_falls_back(async_api, backend, child_uid, window, expected):
+    backend.missing_indexes = True
+
+    count, _seconds = asyncio.run(async_api.interval_totals(child_uid, "diaper", *window, modes=MODES))
+
+    assert count == expected[1]
+    assert async_api._aggregation_fallbacks == {("diaper", True)}
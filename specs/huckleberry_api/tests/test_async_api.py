@@ -0,0 +1,97 @@
+"""AsyncHuckleberryAPI against the same data as HuckleberryAPI."""
+import asyncio
+import time
+
+import pytest
+
+DAYS = 14
+
+
+@pytest.fixture
+def window(backend, child_uid):
+    """Two weeks of history, some of it in multi-entry documents."""
+    end = time.time()
+    backend.seed_history(child_uid, days=DAYS, end=end, multi_fraction=0.3)
+    return int(end) - (DAYS + 1) * 86400, int(end) + 3600
+
+
+def _by_start(items):
+    return sorted(items, key=lambda item: item["start"])
+
+
+def test_children_match(async_api, api):
+    assert asyncio.run(async_api.get_children()) == api.get_children()
+
+
+@pytest.mark.parametrize("kind", ["sleep", "feed", "diaper", "health"])
+def test_range_reads_match(async_api, api, child_uid, window, kind):
+    listing = {
+        "sleep": (api.get_sleep_intervals, async_api.get_sleep_intervals),
+        "feed": (api.get_feed_intervals, async_api.get_feed_intervals),
+        "diaper": (api.get_diaper_intervals, async_api.get_diaper_intervals),
+        "health": (api.get_health_entries, async_api.get_health_entries),
+    }
+    sync_read, async_read = listing[kind]
+
+    assert _by_start(asyncio.run(async_read(child_uid, *window))) == _by_start(sync_read(child_uid, *window))
+
+
+@pytest.mark.parametrize("kind", ["sleep", "feed", "diaper"])
+def test_totals_match(async_api, api, child_uid, window, kind):
+    async_count, async_seconds = asyncio.run(async_api.interval_totals(child_uid, kind, *window))
+    count, seconds = api.interval_totals(child_uid, kind, *window)
+
+    assert async_count == count
+    assert async_seconds == pytest.approx(seconds)
+
+
+def test_iter_intervals_in_start_order(async_api, api, child_uid, window):
+    async def collect():
+        return [item async for item in async_api.iter_intervals(child_uid, "feed", *window, page_size=7)]
+
+    streamed = asyncio.run(collect())
+
+    assert [item["start"] for item in streamed] == sorted(
+        item["start"] for item in api.get_feed_intervals(child_uid, *window)
+    )
+
+
+def test_timers_write_what_the_sync_client_reads(async_api, api, child_uid):
+    async def sessions():
+        await async_api.start_sleep(child_uid)
+        await async_api.pause_sleep(child_uid)
+        await async_api.resume_sleep(child_uid)
+        await async_api.complete_sleep(child_uid)
+        await async_api.start_feeding(child_uid, side="left")
+        await async_api.switch_feeding_side(child_uid)
+        await async_api.complete_feeding(child_uid)
+        await async_api.log_diaper(child_uid, "both")
+
+    started = int(time.time())
+    asyncio.run(sessions())
+    window = (started - 60, started + 60)
+
+    assert len(api.get_sleep_intervals(child_uid, *window)) == 1
+    assert len(api.get_feed_intervals(child_uid, *window)) == 1
+    assert [diaper["mode"] for diaper in api.get_diaper_intervals(child_uid, *window)] == ["both"]
+    sleep = api._get_firestore_client().collection("sleep").document(child_uid).get().to_dict()
+    assert sleep["timer"]["active"] is False
+
+
+def test_growth_round_trip(async_api, api, child_uid):
+    asyncio.run(async_api.log_growth(child_uid, weight=4.2, height=55.0))
+
+    assert asyncio.run(async_api.get_growth_data(child_uid)) == api.get_growth_data(child_uid)
+    assert api.get_growth_data(child_uid)["weight"] == 4.2
+
+
+def test_batch_commits_once(async_api, api, child_uid):
+    async def log_two():
+        async with async_api.batch():
+            await async_api.log_diaper(child_uid, "pee")
+            await async_api.log_diaper(child_uid, "poo")
+            assert api.get_diaper_intervals(child_uid, 0, 2**31) == []  # Nothing written yet
+
+    asyncio.run(log_two())
+
+    assert len(api.get_diaper_intervals(child_uid, 0, 2**31)) == 2
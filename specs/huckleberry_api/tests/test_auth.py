@@ -0,0 +1,135 @@
+"""Sign-in and token refresh against a fake Firebase Auth endpoint.
+
+Covers the background refresher, listener rollover, credential rotation and
+single-flight authentication across threads.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from huckleberry_api.api import FirebaseTokenCredentials, HuckleberryAPI
+
+
+@pytest.fixture
+def signed_in(identity, offline_transports, child_uid):
+    """Create authenticated HuckleberryAPIs on the gRPC (listener-capable) transport."""
+    clients = []
+
+    def sign_in(**kwargs):
+        client = HuckleberryAPI("parent@example.com", "secret", **kwargs)
+        clients.append(client)
+        client.authenticate()
+        return client
+
+    yield sign_in
+    for client in clients:
+        client.stop_all_listeners()
+        client.close()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_background_refresher_rotates_ahead_of_expiry(signed_in, identity):
+    api = signed_in()
+
+    api.start_token_refresher(lead_time=identity.expires_in - 0.2)
+    _wait_for(lambda: identity.refreshes >= 1)
+    api.stop_token_refresher()
+
+    assert identity.sign_ins == 1
+    assert api.id_token != "id-1"
+    assert api.token_expires_at > time.time() + identity.expires_in - 60
+
+
+def test_stopped_refresher_leaves_tokens_alone(signed_in, identity):
+    api = signed_in()
+
+    api.start_token_refresher()  # Default lead: the token has an hour left
+    api.stop_token_refresher()
+
+    assert identity.refreshes == 0
+    assert api.id_token == "id-1"
+
+
+def test_refresh_rolls_listeners_over(signed_in, backend, child_uid):
+    api = signed_in()
+    seen = []
+    api.setup_realtime_listener(child_uid, seen.append)
+    backend.wait_for_listeners()
+    key = f"sleep_{child_uid}"
+    previous = api._listeners[key]
+
+    api.refresh_auth_token()
+    backend.wait_for_listeners()
+
+    assert api._listeners[key] is not previous
+    assert backend._watches[f"sleep/{child_uid}"] == [api._listeners[key]]  # The old watch is stopped
+    seen.clear()
+    api.start_sleep(child_uid)
+    backend.wait_for_listeners()
+    assert len(seen) == 1
+    assert seen[0]["timer"]["active"] is True
+
+
+def test_refresh_rotates_credentials_in_place(signed_in):
+    api = signed_in()
+    client = api._get_firestore_client()
+    children = api.get_children()
+
+    api.refresh_auth_token()
+
+    assert api._get_firestore_client() is client
+    assert api._credentials.token == api.id_token == "id-2"
+    assert api.client_rebuilds_avoided == 1
+    assert api.get_children(refresh=True) == children
+
+
+def test_expiring_token_is_refreshed_inline_on_the_same_client(signed_in, identity):
+    api = signed_in()
+    client = api._get_firestore_client()
+    api.token_expires_at = time.time() + 10  # Inside TOKEN_REFRESH_MARGIN
+
+    assert api._get_firestore_client() is client
+    assert identity.refreshes == 1
+    assert api._credentials.token == "id-2"
+
+
+def test_credentials_pick_up_the_owner_token():
+    tokens = ["id-1"]
+    credentials = FirebaseTokenCredentials("id-1", lambda: tokens[-1])
+    tokens.append("id-2")
+
+    credentials.refresh(request=None)
+
+    assert credentials.token == "id-2"
+
+
+def test_concurrent_calls_share_one_refresh(signed_in, identity):
+    api = signed_in()
+    api.token_expires_at = time.time() + 10  # Inside TOKEN_REFRESH_MARGIN
+    identity.latency = 0.05
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        children = list(pool.map(lambda _call: api.get_children(refresh=True), range(8)))
+
+    assert identity.refreshes == 1
+    assert all(result == children[0] for result in children)
+
+
+def test_concurrent_first_calls_sign_in_once(identity, offline_transports, child_uid):
+    api = HuckleberryAPI("parent@example.com", "secret")
+    identity.latency = 0.05
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _call: api._get_firestore_client(), range(8)))
+    finally:
+        api.close()
+
+    assert identity.sign_ins == 1
+    assert identity.refreshes == 0
@@ -0,0 +1,116 @@
+"""Child discovery: every child on the account, one batched profile read, cached."""
+import asyncio
+import logging
+
+import pytest
+
+from huckleberry_api import api as api_module
+from huckleberry_api.api import HuckleberryAPI
+
+USER_UID = "user-1"
+
+
+@pytest.fixture
+def siblings(backend, child_uid):
+    """Ada, Ben and Cy on USER_UID's account, Ben last used in the app."""
+    uids = backend.seed_account(USER_UID, ["Ada", "Ben", "Cy"])
+    backend.put(f"users/{USER_UID}", {"lastChild": uids[1], "childList": [{"cid": uid} for uid in uids]})
+    backend.reset_stats()
+    return uids
+
+
+@pytest.fixture
+def rest_api(identity, offline_transports, siblings):
+    """A HuckleberryAPI on the REST transport (no listeners), signed in to backend."""
+    client = HuckleberryAPI("parent@example.com", "secret", transport="rest")
+    client.authenticate()
+    yield client
+    client.close()
+
+
+def test_every_child_last_used_first(api, backend, siblings):
+    children = api.get_children()
+
+    assert [child["uid"] for child in children] == [siblings[1], siblings[0], siblings[2]]
+    assert [child["name"] for child in children] == ["Ben", "Ada", "Cy"]
+    assert backend.stats()["round_trips"] == 2  # User document, then all profiles in one batch
+    assert api.get_child(siblings[2])["name"] == "Cy"
+    assert api.get_child("someone-else") is None
+
+
+def test_account_without_child_list_uses_last_child(api, backend, siblings):
+    backend.put(f"users/{USER_UID}", {"lastChild": siblings[2]})
+
+    assert [child["name"] for child in api.get_children()] == ["Cy"]
+
+
+def test_missing_profile_is_skipped(api, backend, siblings, caplog):
+    backend.put(f"users/{USER_UID}", {"lastChild": siblings[0], "childList": [{"cid": "gone"}, siblings[2]]})
+
+    with caplog.at_level(logging.ERROR, logger="huckleberry_api.api"):
+        children = api.get_children()
+
+    assert [child["name"] for child in children] == ["Ada", "Cy"]
+    assert "Child document not found: gone" in caplog.text
+
+
+def test_cached_until_a_watched_document_changes(api, make_api, backend, siblings):
+    assert api.get_children()[0]["name"] == "Ben"
+    backend.wait_for_listeners()
+    backend.reset_stats()
+
+    assert api.get_children()[0]["name"] == "Ben"
+    assert backend.stats()["round_trips"] == 0
+
+    other = make_api()._get_firestore_client()
+    other.collection("childs").document(siblings[1]).update({"childsName": "Benjamin"})
+    backend.wait_for_listeners()
+
+    assert api.get_children()[0]["name"] == "Benjamin"
+
+
+def test_stopped_listeners_disable_the_cache(api, backend, siblings):
+    api.get_children()
+    api.stop_all_listeners()
+    backend.reset_stats()
+
+    api.get_children()
+
+    assert backend.stats()["round_trips"] == 2
+
+
+def test_rest_cache_expires(rest_api, backend, monkeypatch):
+    rest_api.get_children()
+    backend.reset_stats()
+    rest_api.get_children()
+    assert backend.stats()["round_trips"] == 0
+
+    monkeypatch.setattr(api_module, "CHILDREN_CACHE_TTL", -1)
+    rest_api.get_children(refresh=True)  # Stored already expired
+    rest_api.get_children()
+
+    assert backend.stats()["round_trips"] == 4
+
+
+def test_async_children_are_cached(async_api, backend, siblings):
+    first = asyncio.run(async_api.get_children())
+    backend.reset_stats()
+
+    assert asyncio.run(async_api.get_children()) == first
+    assert [child["name"] for child in first] == ["Ben", "Ada", "Cy"]
+    assert backend.stats()["round_trips"] == 0
+
+
+@pytest.mark.parametrize(("wanted", "expected"), [("cy", "Cy"), ("user-1-child-1", "Ada"), ("", "Ben"), ("Zed", "Ben")])
+def test_mcp_server_picks_the_configured_child(
+    mcp_server, identity, offline_transports, siblings, monkeypatch, wanted, expected
+):
+    monkeypatch.setenv("HUCKLE_USER_ID", "parent@example.com")
+    monkeypatch.setenv("HUCKLE_PW", "secret")
+    monkeypatch.setenv("HUCKLEBERRY_TRANSPORT", "rest")
+    monkeypatch.setenv("HUCKLEBERRY_CHILD", wanted)
+
+    mcp_server.init_huckleberry()
+
+    assert mcp_server.child_name == expected
+    assert mcp_server.child_uid == siblings[["Ada", "Ben", "Cy"].index(expected)]
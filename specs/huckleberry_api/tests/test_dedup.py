@@ -0,0 +1,162 @@
+"""Duplicate suppression: DuplicateSuppressor, the service's deduplicated endpoints, the MCP call_tool path."""
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from huckleberry_api.dedup import DuplicateSuppressor
+
+
+def _diaper_count(api, child_uid):
+    return len(api.get_diaper_intervals(child_uid, 0, 2**31))
+
+
+def _delay(monkeypatch, target, name, seconds):
+    """Make target.name (a coroutine method) wait before running, so requests overlap."""
+    original = getattr(target, name)
+
+    async def delayed(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(target, name, delayed)
+
+
+# -- DuplicateSuppressor -----------------------------------------------------
+
+
+def test_fingerprint_normalizes_arguments():
+    fingerprint = DuplicateSuppressor.fingerprint
+
+    assert fingerprint("log_feed", {"amount": 4.0, "side": "Left", "notes": ""}, "c1") == (
+        fingerprint("log_feed", {"side": "left", "amount": 4}, "c1")
+    )
+    assert fingerprint("log_feed", {"amount": 4}, "c1") != fingerprint("log_feed", {"amount": 4}, "c2")
+    assert fingerprint("log_feed", {"amount": 4}, "c1") != fingerprint("log_bottle", {"amount": 4}, "c1")
+
+
+def test_results_expire_after_the_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    suppressor = DuplicateSuppressor(window=120)
+    suppressor.remember("log_diaper", {"mode": "pee"}, "c1", "done")
+
+    assert suppressor.lookup("log_diaper", {"mode": "pee"}, "c1") == "done"
+    now[0] += 121
+    assert suppressor.lookup("log_diaper", {"mode": "pee"}, "c1") is None
+    assert suppressor.suppressed == {"log_diaper": 1}
+
+
+def test_zero_window_disables():
+    suppressor = DuplicateSuppressor(window=0)
+    suppressor.remember("log_diaper", {"mode": "pee"}, "c1", "done")
+
+    assert suppressor.lookup("log_diaper", {"mode": "pee"}, "c1") is None
+
+
+def test_oldest_results_are_dropped():
+    suppressor = DuplicateSuppressor(window=120, max_entries=2)
+    for mode in ("pee", "poo", "both"):
+        suppressor.remember("log_diaper", {"mode": mode}, "c1", mode)
+
+    assert suppressor.lookup("log_diaper", {"mode": "pee"}, "c1") is None
+    assert suppressor.lookup("log_diaper", {"mode": "both"}, "c1") == "both"
+
+
+# -- huckleberry-service -----------------------------------------------------
+
+
+def test_service_repeat_is_not_written(service, api, child_uid):
+    client = TestClient(service.app)
+
+    first = client.post("/log-diaper", json={"diaper_type": "pee"})
+    repeat = client.post("/log-diaper", json={"diaper_type": "pee", "notes": ""})
+
+    assert first.status_code == repeat.status_code == 200
+    assert repeat.json() == first.json()
+    assert _diaper_count(api, child_uid) == 1
+    assert service.duplicate_suppressor.suppressed == {"log_diaper": 1}
+
+
+def test_service_overlapping_repeat_waits_for_the_original(service, api, child_uid, monkeypatch):
+    _delay(monkeypatch, service.huckleberry_api, "log_diaper", 0.05)
+
+    async def send_twice():
+        transport = httpx.ASGITransport(app=service.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://service") as client:
+            return await asyncio.gather(
+                client.post("/log-diaper", json={"diaper_type": "poo"}),
+                client.post("/log-diaper", json={"diaper_type": "poo"}),
+            )
+
+    first, repeat = asyncio.run(send_twice())
+
+    assert first.status_code == repeat.status_code == 200
+    assert repeat.json() == first.json()
+    assert _diaper_count(api, child_uid) == 1
+    assert service.requests_in_flight == {}
+
+
+def test_service_failed_request_runs_again(service, api, child_uid, monkeypatch):
+    original = service.huckleberry_api.log_diaper
+    outcomes = [ConnectionError("Firestore unreachable")]
+
+    async def flaky(*args, **kwargs):
+        if outcomes:
+            raise outcomes.pop()
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(service.huckleberry_api, "log_diaper", flaky)
+    client = TestClient(service.app)
+
+    assert client.post("/log-diaper", json={"diaper_type": "pee"}).status_code == 500
+    assert client.post("/log-diaper", json={"diaper_type": "pee"}).status_code == 200
+    assert _diaper_count(api, child_uid) == 1
+    assert service.requests_in_flight == {}
+
+
+# -- MCP server --------------------------------------------------------------
+
+
+def test_mcp_repeat_is_not_written(signed_in_mcp_server, api, child_uid):
+    server = signed_in_mcp_server
+
+    async def call_twice():
+        first = await server.call_tool("log_diaper", {"diaper_type": "wet"})
+        return first, await server.call_tool("log_diaper", {"diaper_type": "wet"})
+
+    first, repeat = asyncio.run(call_twice())
+
+    assert repeat == first
+    assert _diaper_count(api, child_uid) == 1
+    assert server.duplicate_suppressor.suppressed == {"log_diaper": 1}
+
+
+def test_mcp_overlapping_repeat_is_not_written(signed_in_mcp_server, api, child_uid):
+    server = signed_in_mcp_server
+
+    async def call_twice():
+        return await asyncio.gather(
+            server.call_tool("log_diaper", {"diaper_type": "both"}),
+            server.call_tool("log_diaper", {"diaper_type": "both"}),
+        )
+
+    first, repeat = asyncio.run(call_twice())
+
+    assert repeat == first
+    assert _diaper_count(api, child_uid) == 1
+
+
+@pytest.mark.parametrize("arguments", [{"diaper_type": "poo"}, {"diaper_type": "wet", "notes": "rash"}])
+def test_mcp_different_calls_are_written(signed_in_mcp_server, api, child_uid, arguments):
+    server = signed_in_mcp_server
+
+    async def call_both():
+        await server.call_tool("log_diaper", {"diaper_type": "wet"})
+        await server.call_tool("log_diaper", arguments)
+
+    asyncio.run(call_both())
+
+    assert _diaper_count(api, child_uid) == 2
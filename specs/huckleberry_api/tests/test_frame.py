@@ -0,0 +1,95 @@
+"""IntervalFrame columns and summaries, with and without NumPy; columnar range reads."""
+import time
+
+import pytest
+
+from huckleberry_api import frame
+from huckleberry_api.frame import IntervalFrame, frame_row
+
+DAY = 86400
+
+
+@pytest.fixture(params=["numpy", "stdlib"])
+def columns(request, monkeypatch):
+    """Run once with NumPy columns and once with array.array columns."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(frame, "np", None)
+    return request.param
+
+
+def _sleeps():
+    return IntervalFrame("sleep", [
+        frame_row("sleep", {"start": 2 * DAY + 3600, "duration": 1800}, False),
+        frame_row("sleep", {"start": DAY + 100, "duration": 600}, False),
+        frame_row("sleep", {"start": DAY + 1000, "duration": 300}, True),
+    ])
+
+
+def test_rows_are_sorted_by_start(columns):
+    sleeps = _sleeps()
+
+    assert list(sleeps.start) == [DAY + 100, DAY + 1000, 2 * DAY + 3600]
+    assert list(sleeps.end) == [DAY + 700, DAY + 1300, 2 * DAY + 5400]
+    assert list(sleeps.gaps()) == [300, DAY + 3600 - 1300]
+
+
+def test_summaries(columns):
+    sleeps = _sleeps()
+
+    assert len(sleeps) == 3
+    assert sleeps.total_duration() == 2700
+    assert sleeps.daily_totals() == {DAY: 900, 2 * DAY: 1800}
+
+
+def test_daily_totals_follow_local_midnight(columns):
+    sleeps = IntervalFrame("sleep", [frame_row("sleep", {"start": DAY + 3600, "duration": 60}, False)])
+
+    # One hour after UTC midnight is still the previous day two hours west of UTC
+    assert sleeps.daily_totals(utc_offset_sec=-7200) == {7200: 60}
+
+
+def test_modes_and_feed_sides(columns):
+    diapers = IntervalFrame("diaper", [
+        frame_row("diaper", {"start": 10, "mode": "pee"}, False),
+        frame_row("diaper", {"start": 20, "mode": "both"}, False),
+        frame_row("diaper", {"start": 30, "mode": "mystery"}, True),
+    ])
+    feeds = IntervalFrame("feed", [frame_row("feed", {"start": 10, "leftDuration": 300, "rightDuration": 120}, False)])
+
+    assert diapers.count(["pee", "both"]) == 2
+    assert diapers.count(["dry"]) == 0
+    assert [record["mode"] for record in diapers.to_records()] == ["pee", "both", "unknown"]
+    assert feeds.to_records() == [{
+        "start": 10.0, "end": 430.0, "duration": 420.0, "mode": "unknown",
+        "left_duration": 300.0, "right_duration": 120.0,
+    }]
+
+
+def test_empty_frame(columns):
+    empty = IntervalFrame("feed", [])
+
+    assert len(empty) == 0
+    assert empty.total_duration() == 0
+    assert empty.daily_totals() == {}
+    assert list(empty.gaps()) == []
+
+
+def test_frames_match_interval_listings(api, backend, child_uid):
+    end = time.time()
+    backend.seed_history(child_uid, days=14, end=end, multi_fraction=0.3)
+    window = (int(end) - 15 * DAY, int(end) + 1)
+
+    frames = api.get_calendar_frames(child_uid, *window, kinds=("sleep", "feed", "diaper"))
+
+    sleeps = api.get_sleep_intervals(child_uid, *window)
+    feeds = api.get_feed_intervals(child_uid, *window)
+    diapers = api.get_diaper_intervals(child_uid, *window)
+    assert list(frames["sleep"].start) == sorted(sleep["start"] for sleep in sleeps)
+    assert frames["sleep"].total_duration() == pytest.approx(sum(sleep["duration"] for sleep in sleeps))
+    assert frames["feed"].total_duration() == pytest.approx(
+        sum(feed["leftDuration"] + feed["rightDuration"] for feed in feeds)
+    )
+    assert frames["diaper"].count(["poo", "both"]) == sum(diaper["mode"] in ("poo", "both") for diaper in diapers)
+    assert len(api.get_interval_frame(child_uid, "diaper", *window)) == len(diapers)
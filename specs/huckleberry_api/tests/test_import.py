@@ -0,0 +1,102 @@
+"""import_intervals round trip, and feed durations in seconds on every path."""
+import asyncio
+import time
+
+import pytest
+
+START = 1_700_000_000
+RECORDS = [
+    {"type": "feed", "start": START, "left_duration": 600, "right_duration": 300},
+    {"type": "sleep", "start": START + 3600, "duration": 5400},
+    {"type": "diaper", "start": START + 7200, "mode": "both"},
+]
+
+
+def test_import_round_trip(api, child_uid):
+    assert api.import_intervals(child_uid, RECORDS) == 3
+
+    end = START + 86400
+    assert api.get_feed_intervals(child_uid, START, end) == [
+        {"start": START, "leftDuration": 600, "rightDuration": 300, "is_multi_entry": False}
+    ]
+    assert api.get_sleep_intervals(child_uid, START, end) == [{"start": START + 3600, "duration": 5400}]
+    assert api.get_diaper_intervals(child_uid, START, end) == [{"start": START + 7200, "mode": "both"}]
+
+
+def test_reimport_overwrites(api, child_uid):
+    api.import_intervals(child_uid, RECORDS)
+    api.import_intervals(child_uid, RECORDS)
+
+    assert api.count_intervals(child_uid, "feed", START, START + 86400) == 1
+    assert api.count_intervals(child_uid, "diaper", START, START + 86400) == 1
+
+
+def test_invalid_record_is_rejected(api, child_uid):
+    with pytest.raises(ValueError):
+        api.import_intervals(child_uid, [{"type": "diaper", "start": START}])  # No mode
+
+
+def test_imported_feed_seconds(api, child_uid):
+    api.import_intervals(child_uid, RECORDS)
+    end = START + 86400
+
+    assert api.interval_totals(child_uid, "feed", START, end) == (1, 900)
+    assert api.get_interval_frame(child_uid, "feed", START, end).total_duration() == 900
+
+
+def test_completed_feed_seconds(api, child_uid, monkeypatch):
+    started = time.time()
+    monkeypatch.setattr(time, "time", lambda: started)
+    api.start_feeding(child_uid, side="left")
+    monkeypatch.setattr(time, "time", lambda: started + 600)
+    api.complete_feeding(child_uid)
+
+    window = (int(started) - 60, int(started) + 60)
+    (feed,) = api.get_feed_intervals(child_uid, *window)
+    assert feed["leftDuration"] + feed["rightDuration"] == pytest.approx(600)
+    assert api.interval_totals(child_uid, "feed", *window)[1] == pytest.approx(600)
+    assert api.get_interval_frame(child_uid, "feed", *window).total_duration() == pytest.approx(600)
+
+
+def test_seeded_feed_seconds(api, backend, child_uid):
+    end = time.time()
+    backend.seed_history(child_uid, days=14, end=end, multi_fraction=0)
+    window = (int(end) - 15 * 86400, int(end) + 1)
+
+    feeds = api.get_feed_intervals(child_uid, *window)
+    seconds = sum(feed["leftDuration"] + feed["rightDuration"] for feed in feeds)
+    assert 3 * 60 * len(feeds) <= seconds <= 40 * 60 * len(feeds)  # Minutes per feed, not hours
+    assert api.interval_totals(child_uid, "feed", *window) == (len(feeds), pytest.approx(seconds))
+
+
+PREFS_RECORDS = [
+    {"type": "diaper", "start": START + 7200, "mode": "poo"},
+    {"type": "sleep", "start": START, "duration": 600},
+    {"type": "diaper", "start": START + 3600, "mode": "pee"},  # Older than the first diaper, in a later chunk
+    {"type": "sleep", "start": START + 86400, "duration": 1200},
+]
+
+
+def _last_diaper(api, child_uid):
+    return api._get_firestore_client().collection("diaper").document(child_uid).get().to_dict()["prefs"]["lastDiaper"]
+
+
+def _last_sleep_start(api, child_uid):
+    sleep = api._get_firestore_client().collection("sleep").document(child_uid).get().to_dict()
+    return sleep["prefs"]["lastSleep"]["start"]
+
+
+def test_update_prefs_points_at_latest_record(api, child_uid):
+    api.import_intervals(child_uid, PREFS_RECORDS, chunk_size=2, update_prefs=True)
+
+    assert _last_diaper(api, child_uid)["start"] == START + 7200
+    assert _last_diaper(api, child_uid)["mode"] == "poo"
+    assert _last_sleep_start(api, child_uid) == START + 86400
+
+
+def test_async_update_prefs_points_at_latest_record(async_api, api, child_uid):
+    imported = asyncio.run(async_api.import_intervals(child_uid, PREFS_RECORDS, chunk_size=2, update_prefs=True))
+
+    assert imported == 4
+    assert _last_diaper(api, child_uid)["start"] == START + 7200
+    assert _last_sleep_start(api, child_uid) == START + 86400
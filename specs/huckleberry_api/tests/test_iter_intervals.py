@@ -0,0 +1,72 @@
+"""iter_intervals: start order across regular and multi-entry documents, paging."""
+import time
+
+import pytest
+
+DAYS = 30
+
+
+@pytest.fixture
+def window(backend, child_uid):
+    """A month of history, about 30% of it in multi-entry documents."""
+    end = time.time()
+    backend.seed_history(child_uid, days=DAYS, end=end, multi_fraction=0.3)
+    return int(end) - (DAYS + 1) * 86400, int(end) + 1
+
+
+@pytest.mark.parametrize("kind", ["sleep", "feed", "diaper"])
+@pytest.mark.parametrize("page_size", [7, 500])
+def test_matches_sorted_listing(api, child_uid, window, kind, page_size):
+    listing = {
+        "sleep": api.get_sleep_intervals,
+        "feed": api.get_feed_intervals,
+        "diaper": api.get_diaper_intervals,
+    }[kind](child_uid, *window)
+
+    streamed = list(api.iter_intervals(child_uid, kind, *window, page_size=page_size))
+
+    assert [item["start"] for item in streamed] == sorted(item["start"] for item in listing)
+    assert sorted(streamed, key=lambda item: item["start"]) == sorted(listing, key=lambda item: item["start"])
+
+
+def test_pages_through_the_range(api, backend, child_uid, window):
+    listing = api.get_feed_intervals(child_uid, *window)
+    regular = [item for item in listing if not item["is_multi_entry"]]
+    assert len(regular) < len(listing)  # Both document layouts are exercised
+    backend.reset_stats()
+
+    streamed = list(api.iter_intervals(child_uid, "feed", *window, page_size=50))
+
+    assert len(streamed) == len(listing)
+    assert backend.stats()["round_trips"] >= -(-len(regular) // 50)  # One request per page at least
+
+
+def test_reports_reads_once_exhausted(make_api, child_uid, window):
+    stats = []
+    api = make_api(hooks=[stats.append])
+
+    for _item in api.iter_feed_intervals(child_uid, *window):
+        pass
+
+    (reported,) = stats
+    assert reported.operation == "iter_feed_intervals"
+    assert reported.docs_read > 0
+    assert reported.error is None
+
+
+def test_early_close_is_not_an_error(make_api, child_uid, window):
+    stats = []
+    api = make_api(hooks=[stats.append])
+
+    iterator = api.iter_intervals(child_uid, "sleep", *window, page_size=5)
+    next(iterator)
+    iterator.close()
+
+    (reported,) = stats
+    assert reported.operation == "iter_intervals"
+    assert reported.error is None
+
+
+def test_rejects_empty_pages(api, child_uid, window):
+    with pytest.raises(ValueError):
+        next(api.iter_intervals(child_uid, "feed", *window, page_size=0))
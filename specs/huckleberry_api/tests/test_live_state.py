@@ -0,0 +1,53 @@
+"""Live state cache and listeners on transports without real-time listeners."""
+import logging
+
+import pytest
+
+from huckleberry_api.api import HuckleberryAPI
+from huckleberry_api.rest import RestFirestoreClient
+
+
+@pytest.fixture
+def listenerless_api(identity, offline_transports, child_uid):
+    """A signed-in client on the "rest" transport, which has no real-time listeners."""
+    api = HuckleberryAPI("parent@example.com", "secret", transport="rest")
+    api.authenticate()
+    yield api
+    api.close()
+
+
+def test_live_state_is_rejected_before_any_setup(listenerless_api, child_uid):
+    assert not listenerless_api.supports_listeners
+
+    with pytest.raises(ValueError, match="listeners"):
+        listenerless_api.enable_live_state(child_uid)
+
+    assert listenerless_api._live_paths == set()
+    assert listenerless_api._listeners == {}
+    listenerless_api.start_sleep(child_uid)  # Timer operations read from the server as usual
+
+
+def test_listener_setup_is_rejected(listenerless_api, child_uid):
+    with pytest.raises(ValueError, match="gRPC"):
+        listenerless_api.setup_realtime_listener(child_uid, lambda data: None)
+
+
+def test_rest_documents_have_no_snapshot_listeners():
+    client = RestFirestoreClient(credentials=None)
+
+    with pytest.raises(ValueError, match="gRPC"):
+        client.collection("sleep").document("child").on_snapshot(lambda *args: None)
+
+
+def test_mcp_live_state_on_rest_is_skipped(mcp_server, identity, offline_transports, child_uid, monkeypatch, caplog):
+    monkeypatch.setenv("HUCKLE_USER_ID", "parent@example.com")
+    monkeypatch.setenv("HUCKLE_PW", "secret")
+    monkeypatch.setenv("HUCKLEBERRY_TRANSPORT", "rest")
+    monkeypatch.setenv("HUCKLEBERRY_LIVE_STATE", "1")
+
+    with caplog.at_level(logging.WARNING):
+        mcp_server.init_huckleberry()
+
+    assert mcp_server.child_uid == child_uid
+    assert mcp_server.huckleberry_api._live_paths == set()
+    assert "live state is disabled" in caplog.text
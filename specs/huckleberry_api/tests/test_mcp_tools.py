@@ -0,0 +1,148 @@
+"""MCP tool calls: run off the event loop, per-tool concurrency limits, cancellation."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+class Gate:
+    """Wraps the server's run_tool: records calls and holds chosen tools until opened."""
+
+    def __init__(self, server, held=(), delay=0.0) -> None:
+        self.run_tool = server.run_tool
+        self.held = set(held)
+        self.delay = delay
+        self.opened = threading.Event()
+        self.lock = threading.Lock()
+        self.started: list[str] = []
+        self.running: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+
+    def __call__(self, name, arguments):
+        with self.lock:
+            self.started.append(name)
+            self.running[name] = self.running.get(name, 0) + 1
+            self.peak[name] = max(self.peak.get(name, 0), self.running[name])
+        try:
+            if name in self.held:
+                assert self.opened.wait(5)
+            time.sleep(self.delay)
+            return self.run_tool(name, arguments)
+        finally:
+            with self.lock:
+                self.running[name] -= 1
+
+
+@pytest.fixture
+def gate(signed_in_mcp_server, monkeypatch):
+    def install(**kwargs):
+        installed = Gate(signed_in_mcp_server, **kwargs)
+        monkeypatch.setattr(signed_in_mcp_server, "run_tool", installed)
+        return installed
+
+    return install
+
+
+def _text(result):
+    (content,) = result
+    return content.text
+
+
+async def _until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_slow_call_does_not_block_others(signed_in_mcp_server, gate):
+    server = signed_in_mcp_server
+    held = gate(held={"get_recent_activity"})
+
+    async def overlap():
+        summary = asyncio.create_task(server.call_tool("get_recent_activity", {"hours": 24}))
+        await _until(lambda: "get_recent_activity" in held.started)
+        logged = await server.call_tool("log_diaper", {"diaper_type": "wet"})
+        assert not summary.done()
+        held.opened.set()
+        return logged, await summary
+
+    logged, summary = asyncio.run(overlap())
+
+    assert _text(logged) == "Diaper change logged for Baby: pee"
+    assert "Error" not in _text(summary)
+
+
+def test_per_tool_concurrency(signed_in_mcp_server, gate):
+    server = signed_in_mcp_server
+    limits = gate(delay=0.05)
+
+    async def burst():
+        return await asyncio.gather(
+            *(server.call_tool("get_recent_activity", {"hours": hours}) for hours in (1, 2, 3, 4)),
+            *(server.call_tool("log_diaper", {"diaper_type": "wet", "notes": str(n)}) for n in range(3)),
+        )
+
+    asyncio.run(burst())
+
+    assert limits.peak == {"get_recent_activity": 2, "log_diaper": 1}
+
+
+def test_cancelled_queued_call_never_runs(signed_in_mcp_server, gate, monkeypatch):
+    server = signed_in_mcp_server
+    monkeypatch.setattr(server, "tool_executor", ThreadPoolExecutor(max_workers=1))
+    held = gate(held={"get_recent_activity"})
+
+    async def cancel_second():
+        first = asyncio.create_task(server.call_tool("get_recent_activity", {"hours": 1}))
+        await _until(lambda: held.started)
+        second = asyncio.create_task(server.call_tool("get_recent_activity", {"hours": 2}))
+        await asyncio.sleep(0.05)  # Queued behind the first on the single worker
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        held.opened.set()
+        return await first
+
+    try:
+        asyncio.run(cancel_second())
+    finally:
+        server.tool_executor.shutdown(wait=True)
+
+    assert held.started == ["get_recent_activity"]
+
+
+def test_cancelled_running_write_is_remembered(signed_in_mcp_server, gate, api, child_uid):
+    server = signed_in_mcp_server
+    held = gate(held={"log_diaper"})
+
+    async def cancel_then_repeat():
+        first = asyncio.create_task(server.call_tool("log_diaper", {"diaper_type": "poo"}))
+        await _until(lambda: held.started)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        held.opened.set()
+        return await server.call_tool("log_diaper", {"diaper_type": "poo"})  # Waits for the slot
+
+    repeat = asyncio.run(cancel_then_repeat())
+
+    assert _text(repeat) == "Diaper change logged for Baby: poo"
+    assert held.started == ["log_diaper"]
+    assert len(api.get_diaper_intervals(child_uid, 0, 2**31)) == 1
+
+
+def test_failures_are_returned_as_text(signed_in_mcp_server, monkeypatch):
+    server = signed_in_mcp_server
+
+    def broken(name, arguments):
+        raise RuntimeError("Firestore is down")
+
+    monkeypatch.setattr(server, "run_tool", broken)
+
+    result = asyncio.run(server.call_tool("log_diaper", {"diaper_type": "wet"}))
+
+    assert _text(result) == "Error: Firestore is down"
+    assert not server.tool_slots["log_diaper"].locked()  # Slot released
@@ -0,0 +1,167 @@
+"""Instrumentation hooks and the OpenMetrics exporter."""
+import asyncio
+import logging
+import time
+
+import pytest
+
+from huckleberry_api.instrumentation import OperationStats
+from huckleberry_api.metrics import MetricsCollector
+from huckleberry_api.rest import FirestoreRestError
+
+KINDS = ("sleep", "feed", "diaper")
+
+
+@pytest.fixture
+def window(backend, child_uid):
+    end = time.time()
+    backend.seed_history(child_uid, days=3, end=end, multi_fraction=0.3)
+    return int(end) - 4 * 86400, int(end) + 1
+
+
+@pytest.fixture
+def seen(api):
+    """OperationStats reported by the api fixture, in order."""
+    reported = []
+    api.hooks.append(reported.append)
+    return reported
+
+
+def _stats(operation, duration, error=None, **counters):
+    values = dict.fromkeys(("docs_read", "docs_written", "bytes_received", "retries", "cache_hits", "parked"), 0)
+    return OperationStats(operation, duration, **{**values, **counters}, error=error)
+
+
+# -- Hooks -------------------------------------------------------------------
+
+
+def test_one_report_per_operation(api, child_uid, window, seen):
+    api.start_sleep(child_uid)
+    api.complete_sleep(child_uid)
+    api.get_interval_frame(child_uid, "sleep", *window)  # Calls get_calendar_frames
+
+    assert [stats.operation for stats in seen] == ["start_sleep", "complete_sleep", "get_interval_frame"]
+    start, complete, frame = seen
+    assert (start.docs_written, start.error) == (1, None)
+    assert complete.docs_written == 2  # Interval and timer
+    assert frame.docs_read > 0 and frame.duration > 0
+
+
+def test_fanned_out_reads_count_toward_the_caller(api, child_uid, window, seen):
+    for kind in KINDS:
+        api.get_interval_frame(child_uid, kind, *window)  # Warm the multi-entry cache
+    seen.clear()
+    for kind in KINDS:
+        api.get_interval_frame(child_uid, kind, *window)
+    separate = sum(stats.docs_read for stats in seen)
+    seen.clear()
+
+    api.get_calendar_frames(child_uid, *window, kinds=KINDS)
+
+    (combined,) = seen
+    assert combined.docs_read == separate
+    assert combined.cache_hits == len(KINDS)
+
+
+def test_iterators_report_once_exhausted_or_closed(api, child_uid, window, seen):
+    assert list(api.iter_intervals(child_uid, "feed", *window))
+    assert len(seen) == 1 and seen[0].docs_read > 0
+
+    pages = api.iter_intervals(child_uid, "feed", *window)
+    next(pages)
+    assert len(seen) == 1
+    pages.close()
+
+    assert [stats.operation for stats in seen] == ["iter_intervals", "iter_intervals"]
+    assert seen[1].error is None
+
+
+def test_errors_are_reported(api, backend, child_uid, window, seen, monkeypatch):
+    def unavailable(_filters):
+        raise FirestoreRestError(503, "UNAVAILABLE", "try again")
+
+    monkeypatch.setattr(backend, "_check_aggregation_index", unavailable)
+
+    with pytest.raises(FirestoreRestError):
+        api.count_intervals(child_uid, "diaper", *window)
+
+    assert seen[-1].operation == "count_intervals"
+    assert seen[-1].error == "FirestoreRestError"
+
+
+def test_failing_hook_does_not_fail_the_operation(api, child_uid, window, seen, caplog):
+    def broken(_stats):
+        raise RuntimeError("boom")
+
+    api.hooks.insert(0, broken)
+
+    with caplog.at_level(logging.ERROR, logger="huckleberry_api.instrumentation"):
+        api.get_sleep_intervals(child_uid, *window)
+
+    assert "Instrumentation hook" in caplog.text
+    assert [stats.operation for stats in seen] == ["get_sleep_intervals"]
+
+
+def test_async_operations_are_reported(async_api, child_uid, window):
+    seen = []
+    async_api.hooks.append(seen.append)
+
+    asyncio.run(async_api.get_sleep_intervals(child_uid, *window))
+
+    (stats,) = seen
+    assert stats.operation == "get_sleep_intervals"
+    assert stats.docs_read > 0
+
+
+# -- MetricsCollector --------------------------------------------------------
+
+
+def test_collector_snapshot():
+    collector = MetricsCollector(buckets=(0.1, 1.0))
+    collector(_stats("get_children", 0.05, docs_read=1))
+    collector(_stats("get_children", 0.5, cache_hits=1))
+    collector(_stats("get_children", 5.0, error="Timeout"))
+
+    (snapshot,) = collector.snapshot().values()
+
+    assert snapshot["count"] == 3
+    assert snapshot["errors"] == 1
+    assert snapshot["sum_seconds"] == pytest.approx(5.55)
+    assert snapshot["buckets"] == {0.1: 1, 1.0: 1, float("inf"): 1}
+    assert (snapshot["docs_read"], snapshot["cache_hits"]) == (1, 1)
+    collector.reset()
+    assert collector.snapshot() == {}
+
+
+def test_collector_render():
+    collector = MetricsCollector(buckets=(0.1, 1.0), prefix="test")
+    collector(_stats("start_sleep", 0.05, docs_written=1))
+    collector(_stats("start_sleep", 0.5, docs_written=1))
+    collector(_stats('odd"name', 0.05))
+
+    lines = collector.render().splitlines()
+
+    assert lines[:3] == [
+        "# TYPE test_operation_duration_seconds histogram",
+        "# UNIT test_operation_duration_seconds seconds",
+        "# HELP test_operation_duration_seconds Client operation latency.",
+    ]
+    assert 'test_operation_duration_seconds_bucket{operation="start_sleep",le="0.1"} 1' in lines
+    assert 'test_operation_duration_seconds_bucket{operation="start_sleep",le="1.0"} 2' in lines
+    assert 'test_operation_duration_seconds_bucket{operation="start_sleep",le="+Inf"} 2' in lines
+    assert 'test_operation_duration_seconds_count{operation="start_sleep"} 2' in lines
+    assert 'test_operation_errors_total{operation="start_sleep"} 0' in lines
+    assert 'test_documents_written_total{operation="start_sleep"} 2' in lines
+    assert 'test_operation_duration_seconds_count{operation="odd\\"name"} 1' in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_collector_as_a_client_hook(api, child_uid, window):
+    collector = MetricsCollector()
+    api.hooks.append(collector)
+
+    api.get_sleep_intervals(child_uid, *window)
+    api.get_sleep_intervals(child_uid, *window)
+
+    assert collector.snapshot()["get_sleep_intervals"]["count"] == 2
+    assert 'huckleberry_operation_duration_seconds_count{operation="get_sleep_intervals"} 2' in collector.render()
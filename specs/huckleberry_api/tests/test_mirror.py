@@ -0,0 +1,106 @@
+"""Interval mirror: incremental syncs, client clock skew, projection."""
+import time
+
+import pytest
+
+from huckleberry_api.const import MIRROR_SYNC_SKEW
+from huckleberry_api.mirror import IntervalMirror
+
+DAYS = 14
+
+
+@pytest.fixture
+def window(backend, child_uid):
+    """Two weeks of history, some of it in multi-entry documents."""
+    end = time.time()
+    backend.seed_history(child_uid, days=DAYS, end=end, multi_fraction=0.3)
+    return int(end) - (DAYS + 1) * 86400, int(end) + 3600
+
+
+@pytest.fixture
+def mirror():
+    """An in-memory IntervalMirror."""
+    mirror = IntervalMirror()
+    yield mirror
+    mirror.close()
+
+
+@pytest.fixture
+def mirrored_api(make_api, mirror):
+    """A client that serves regular interval documents from mirror."""
+    return make_api(mirror=mirror)
+
+
+def _put_diaper(backend, child_uid, doc_id, start, last_updated, **extra):
+    """Store a diaper interval as another app would, stamped with its own lastUpdated."""
+    backend.put(
+        f"diaper/{child_uid}/intervals/{doc_id}",
+        {"start": start, "mode": "pee", "lastUpdated": last_updated, **extra},
+    )
+
+
+def test_mirror_matches_firestore(api, mirrored_api, mirror, child_uid, window):
+    def records(client, kind):
+        return sorted(client.get_interval_frame(child_uid, kind, *window).to_records(), key=lambda row: row["start"])
+
+    for kind in ("sleep", "feed", "diaper"):
+        assert records(mirrored_api, kind) == records(api, kind)
+
+    assert sorted(
+        item["start"] for item in mirrored_api.get_feed_intervals(child_uid, *window)
+    ) == sorted(item["start"] for item in api.get_feed_intervals(child_uid, *window))
+    assert all("start" in row for row in mirror.range(child_uid, "feed", *window))  # No multi-entry documents
+
+
+def test_first_sync_downloads_mirrored_fields(mirrored_api, mirror, backend, child_uid, window):
+    start = window[1] - 7200
+    _put_diaper(backend, child_uid, "annotated", start, start, notes="x" * 1000)
+
+    mirrored_api.sync_mirror(child_uid, kinds=("diaper",))
+
+    (row,) = [row for row in mirror.range(child_uid, "diaper", *window) if row["start"] == start]
+    assert "notes" not in row
+    assert mirror.watermark(child_uid, "diaper") <= time.time()
+
+
+def test_fields_outside_the_mirror_are_read_from_firestore(mirrored_api, backend, child_uid, window):
+    start = window[1] - 7200
+    _put_diaper(backend, child_uid, "annotated", start, start, notes="rash")
+
+    (event,) = [
+        event for event in mirrored_api.get_diaper_intervals(child_uid, *window, fields=["mode", "notes"])
+        if event["start"] == start
+    ]
+    assert event["notes"] == "rash"
+
+
+def test_write_from_a_slow_clock_is_mirrored(mirrored_api, mirror, backend, child_uid, window):
+    mirrored_api.sync_mirror(child_uid)
+    watermark = mirror.watermark(child_uid, "diaper")
+
+    # Written after the sync by a device whose clock runs five minutes behind
+    _put_diaper(backend, child_uid, "late-clock", watermark - 100, watermark - 300)
+
+    starts = [event["start"] for event in mirrored_api.get_diaper_intervals(child_uid, *window)]
+    assert watermark - 100 in starts
+
+
+def test_write_from_a_fast_clock_does_not_hide_later_writes(mirrored_api, mirror, backend, child_uid, window):
+    now = time.time()
+    _put_diaper(backend, child_uid, "fast-clock", now - 600, now + 3 * MIRROR_SYNC_SKEW)
+    mirrored_api.sync_mirror(child_uid, kinds=("diaper",))
+    assert mirror.watermark(child_uid, "diaper") <= time.time()
+
+    _put_diaper(backend, child_uid, "on-time", now - 300, time.time())
+
+    starts = [event["start"] for event in mirrored_api.get_diaper_intervals(child_uid, *window)]
+    assert now - 300 in starts
+
+
+def test_incremental_sync_reads_recent_changes_only(mirrored_api, backend, child_uid, window):
+    mirrored_api.sync_mirror(child_uid, kinds=("feed",))
+    backend.reset_stats()
+
+    mirrored_api.sync_mirror(child_uid, kinds=("feed",))
+
+    assert backend.stats()["docs_read"] <= 5  # Only what changed within the skew margin
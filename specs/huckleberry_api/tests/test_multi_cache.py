@@ -0,0 +1,93 @@
+"""Multi-entry document cache: update-time validation, window bounds, merge order."""
+import time
+
+import pytest
+
+from huckleberry_api.multi_cache import MultiEntryCache, index_multi_document
+
+PATH = "feed/c1/intervals"
+
+
+def _document(*starts):
+    return {"multi": True, "data": {f"e{start}": {"start": start} for start in starts}}
+
+
+def test_index_skips_malformed_entries():
+    document = index_multi_document("t1", {"multi": True, "data": {"a": {"start": 30}, "b": {}, "c": "x", "d": {"start": 10}}})
+
+    assert document.starts == [10.0, 30.0]
+    assert (document.min_start, document.max_start) == (10.0, 30.0)
+
+
+def test_entries_in_range_is_half_open():
+    cache = MultiEntryCache()
+    cache.store(PATH, "m1", "t1", _document(10, 20, 30))
+    cache.store(PATH, "m2", "t1", _document(100, 200))
+
+    assert sorted(entry["start"] for entry in cache.entries_in_range(PATH, 20, 100)) == [20, 30]
+    assert list(cache.entries_in_range(PATH, 31, 100)) == []
+
+
+def test_sorted_entries_merge_documents():
+    cache = MultiEntryCache()
+    cache.store(PATH, "m1", "t1", _document(10, 40, 70))
+    cache.store(PATH, "m2", "t1", _document(20, 50))
+
+    assert [entry["start"] for entry in cache.sorted_entries_in_range(PATH, 0, 60)] == [10, 20, 40, 50]
+
+
+def test_stale_ids_follow_update_times():
+    cache = MultiEntryCache()
+    cache.store(PATH, "m1", "t1", _document(10))
+    cache.store(PATH, "m2", "t1", _document(20))
+
+    assert cache.stale_ids(PATH, {"m1": "t1", "m2": "t2", "m3": "t1"}) == ["m2", "m3"]
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.stale_ids(PATH, {"m2": "t2"}) == ["m2"]  # Not stored since; m1 no longer listed
+    assert list(cache.entries_in_range(PATH, 0, 100)) == [{"start": 20}]  # m1 dropped
+
+
+@pytest.fixture
+def window(backend, child_uid):
+    """Two weeks of history, half of it in multi-entry documents."""
+    end = time.time()
+    backend.seed_history(child_uid, days=14, end=end, multi_fraction=0.5)
+    return int(end) - 15 * 86400, int(end) + 1
+
+
+def _multi_refs(api, child_uid):
+    intervals = api._get_firestore_client().collection("feed").document(child_uid).collection("intervals")
+    return {doc.id: doc.reference for doc in intervals.stream() if doc.to_dict().get("multi")}
+
+
+def test_repeat_reads_only_list_multi_documents(api, child_uid, window):
+    first = api.get_feed_intervals(child_uid, *window)
+    misses = api.multi_cache.misses
+    assert misses > 0
+
+    assert api.get_feed_intervals(child_uid, *window) == first
+    assert api.multi_cache.misses == misses
+
+
+def test_changed_document_is_downloaded_again(api, child_uid, window):
+    before = api.get_feed_intervals(child_uid, *window)
+    (_doc_id, changed), *_others = sorted(_multi_refs(api, child_uid).items())
+    entries = changed.get().to_dict()["data"]
+    dropped = next(iter(entries))
+    changed.update({f"data.{dropped}": api._transport.delete_field})
+    misses = api.multi_cache.misses
+
+    after = api.get_feed_intervals(child_uid, *window)
+
+    assert api.multi_cache.misses == misses + 1
+    assert len(after) == len(before) - 1
+
+
+def test_deleted_document_is_dropped(api, child_uid, window):
+    api.get_feed_intervals(child_uid, *window)
+    (_doc_id, ref), *_others = sorted(_multi_refs(api, child_uid).items())
+    entries = len(ref.get().to_dict()["data"])
+    total = len(api.get_feed_intervals(child_uid, *window))
+    ref.delete()
+
+    assert len(api.get_feed_intervals(child_uid, *window)) == total - entries
@@ -0,0 +1,72 @@
+"""Field projection on interval range reads."""
+import time
+
+import pytest
+
+from huckleberry_api.fake_firestore import FakeQuery
+
+DETAILS = {
+    "startSleepCondition": {"happy": True, "upset": False},
+    "sleepLocations": {"crib": True, "stroller": False},
+    "endSleepCondition": {"woke_up_child": True},
+}
+
+
+@pytest.fixture
+def window(backend, child_uid):
+    """One regular sleep document with the nested details start_sleep writes."""
+    start = int(time.time()) - 7200
+    backend.put(f"sleep/{child_uid}/intervals/nap", {
+        "start": start, "duration": 1800, "offset": -120.0, "end_offset": -120.0,
+        "lastUpdated": start + 1800, "details": DETAILS,
+    })
+    return start - 60, start + 60
+
+
+@pytest.fixture
+def selected(monkeypatch):
+    """Field lists passed to select(), in call order."""
+    calls = []
+    select = FakeQuery.select
+
+    def recording(query, field_paths):
+        calls.append(list(field_paths))
+        return select(query, field_paths)
+
+    monkeypatch.setattr(FakeQuery, "select", recording)
+    return calls
+
+
+def test_default_read_downloads_decoded_fields(api, child_uid, window, selected):
+    (nap,) = api.get_sleep_intervals(child_uid, *window)
+
+    assert nap == {"start": window[0] + 60, "duration": 1800}
+    assert ["start", "multi", "duration"] in selected
+    assert not any("details" in fields for fields in selected)
+
+
+def test_requested_fields_are_passed_through(api, child_uid, window, selected):
+    (nap,) = api.get_sleep_intervals(child_uid, *window, fields=["start", "duration", "details.sleepLocations"])
+
+    assert nap["details"] == {"sleepLocations": DETAILS["sleepLocations"]}
+    assert ["start", "multi", "duration", "details.sleepLocations"] in selected
+
+
+def test_fields_left_out_read_as_missing(api, child_uid, window):
+    (nap,) = api.get_sleep_intervals(child_uid, *window, fields=["start"])
+
+    assert nap == {"start": window[0] + 60, "duration": 0}
+
+
+def test_paged_reads_project_too(api, child_uid, window, selected):
+    (nap,) = api.iter_intervals(child_uid, "sleep", *window, fields=["details.endSleepCondition"])
+
+    assert nap["details"] == {"endSleepCondition": DETAILS["endSleepCondition"]}
+    assert ["start", "multi", "details.endSleepCondition"] in selected
+
+
+def test_frames_download_frame_columns(api, child_uid, window, selected):
+    frame = api.get_interval_frame(child_uid, "sleep", *window)
+
+    assert frame.total_duration() == 1800
+    assert ["start", "multi", "duration", "mode", "leftDuration", "rightDuration"] in selected
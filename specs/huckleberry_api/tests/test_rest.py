@@ -0,0 +1,265 @@
+"""REST transport: value encoding, query and commit bodies, cursors, error mapping."""
+import datetime as dt
+import json
+
+import pytest
+import requests
+
+from huckleberry_api.rest import (
+    DELETE_FIELD,
+    FirestoreRestError,
+    MissingIndex,
+    PreconditionFailed,
+    RestFirestoreClient,
+    Timestamp,
+    decode_value,
+    encode_value,
+    is_permanent_error,
+)
+from huckleberry_api.transport import RestTransport
+
+DOCUMENTS = "projects/simpleintervals/databases/(default)/documents"
+
+
+class Credentials:
+    token = "id-1"
+
+
+class RecordingSession:
+    """requests.Session stand-in: records each request and answers from replies."""
+
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, str, dict | list | None, dict]] = []  # (method, url, body or params, headers)
+        self.replies: list[tuple[int, object]] = []  # (status, JSON body); a success when empty
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        return self._reply("POST", url, json, headers)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self._reply("GET", url, params, headers)
+
+    def close(self) -> None:
+        pass
+
+    def _reply(self, method, url, body, headers):
+        self.sent.append((method, url, body, headers))
+        if self.replies:
+            status, payload = self.replies.pop(0)
+        elif url.endswith(":commit"):
+            status, payload = 200, {"writeResults": [{"updateTime": "2024-05-01T12:30:02Z"} for _write in body["writes"]]}
+        else:
+            status, payload = 200, []
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(payload).encode()
+        response.request = requests.Request(method, url).prepare()
+        return response
+
+
+@pytest.fixture
+def session():
+    return RecordingSession()
+
+
+@pytest.fixture
+def client(session):
+    client = RestFirestoreClient(Credentials())
+    client._session = session
+    return client
+
+
+def _error(status, message):
+    return [{"error": {"code": 400, "status": status, "message": message}}]
+
+
+# -- Values ------------------------------------------------------------------
+
+
+def test_values_round_trip():
+    value = {
+        "start": 1_700_000_000, "duration": 90.5, "active": False, "notes": None,
+        "raw": b"\x00\x01", "sides": ["left", {"seconds": 3}],
+    }
+
+    encoded = encode_value(value)
+
+    assert encoded["mapValue"]["fields"]["start"] == {"integerValue": "1700000000"}
+    assert encoded["mapValue"]["fields"]["active"] == {"booleanValue": False}
+    assert decode_value(encoded) == value
+
+
+def test_datetimes_encode_as_utc():
+    naive = dt.datetime(2024, 5, 1, 12, 30)
+    aware = dt.datetime(2024, 5, 1, 14, 30, tzinfo=dt.timezone(dt.timedelta(hours=2)))
+
+    assert encode_value(naive) == encode_value(aware) == {"timestampValue": "2024-05-01T12:30:00Z"}
+
+
+def test_timestamps_keep_nanoseconds():
+    earlier = Timestamp("2024-05-01T12:30:00.123456789Z")
+    later = Timestamp("2024-05-01T12:30:00.12345679Z")
+
+    assert earlier < later
+    assert Timestamp("2024-05-01T14:30:00.1+02:00") == Timestamp("2024-05-01T12:30:00.100Z")
+    assert encode_value(earlier) == {"timestampValue": "2024-05-01T12:30:00.123456789Z"}
+    with pytest.raises(ValueError):
+        Timestamp("yesterday")
+
+
+# -- Queries -----------------------------------------------------------------
+
+
+def _structured_query(session):
+    method, url, body, _headers = session.sent[-1]
+    assert method == "POST" and url.endswith(":runQuery")
+    return body["structuredQuery"]
+
+
+def test_query_body(client, session):
+    intervals = client.collection("feed/c1/intervals")
+
+    list(intervals.where("start", ">=", 10).where("start", "<", 20).order_by("start").select(
+        ["start", "data.my-field"]
+    ).limit(5).stream())
+
+    _method, url, _body, headers = session.sent[-1]
+    assert url.endswith(f"{DOCUMENTS}/feed/c1:runQuery")
+    assert headers == {"Authorization": "Bearer id-1"}
+    query = _structured_query(session)
+    assert query["from"] == [{"collectionId": "intervals"}]
+    assert [flt["fieldFilter"]["op"] for flt in query["where"]["compositeFilter"]["filters"]] == [
+        "GREATER_THAN_OR_EQUAL", "LESS_THAN",
+    ]
+    assert query["orderBy"] == [{"field": {"fieldPath": "start"}, "direction": "ASCENDING"}]
+    assert query["select"] == {"fields": [{"fieldPath": "start"}, {"fieldPath": "data.`my-field`"}]}
+    assert query["limit"] == 5
+
+
+def test_snapshot_cursor_breaks_ties_on_document_name(client, session):
+    session.replies.append((200, [{"document": {
+        "name": f"{DOCUMENTS}/feed/c1/intervals/doc-7",
+        "fields": {"start": {"integerValue": "15"}},
+        "updateTime": "2024-05-01T12:30:00.5Z",
+    }}, {"readTime": "2024-05-01T12:30:01Z"}]))
+    query = client.collection("feed/c1/intervals").order_by("start")
+    (last,) = query.stream()
+
+    list(query.start_after(last).stream())
+
+    body = _structured_query(session)
+    assert body["startAt"] == {
+        "values": [{"integerValue": "15"}, {"referenceValue": f"{DOCUMENTS}/feed/c1/intervals/doc-7"}],
+        "before": False,
+    }
+    assert [order["field"]["fieldPath"] for order in body["orderBy"]] == ["start", "__name__"]
+    assert last.id == "doc-7"
+    assert last.update_time == Timestamp("2024-05-01T12:30:00.500Z")
+
+
+def test_field_cursor(client, session):
+    list(client.collection("sleep/c1/intervals").order_by("start", "DESCENDING").start_after({"start": 30}).stream())
+
+    body = _structured_query(session)
+    assert body["startAt"] == {"values": [{"integerValue": "30"}], "before": False}
+    assert body["orderBy"] == [{"field": {"fieldPath": "start"}, "direction": "DESCENDING"}]
+
+
+def test_aggregation(client, session):
+    session.replies.append((200, [{
+        "result": {"aggregateFields": {"count": {"integerValue": "4"}, "duration": {"doubleValue": 120.5}}},
+        "readTime": "2024-05-01T12:30:01Z",
+    }]))
+
+    (row,) = client.collection("sleep/c1/intervals").count(alias="count").sum("duration", alias="duration").get()
+
+    assert {result.alias: result.value for result in row} == {"count": 4, "duration": 120.5}
+    _method, url, body, _headers = session.sent[-1]
+    assert url.endswith(":runAggregationQuery")
+    assert body["structuredAggregationQuery"]["aggregations"] == [
+        {"count": {}, "alias": "count"},
+        {"sum": {"field": {"fieldPath": "duration"}}, "alias": "duration"},
+    ]
+
+
+# -- Writes ------------------------------------------------------------------
+
+
+def _writes(session):
+    _method, url, body, _headers = session.sent[-1]
+    assert url.endswith(f"{DOCUMENTS}:commit")
+    return body["writes"]
+
+
+def test_update_body(client, session):
+    sleep = client.document("sleep/c1")
+    batch = client.batch()
+    batch.update(sleep, {"timer.paused": True, "timer.endTime": DELETE_FIELD})
+    batch.update(sleep, {"prefs.local_timestamp": 5}, option=client.write_option(
+        last_update_time=Timestamp("2024-05-01T12:30:00.5Z")
+    ))
+    batch.commit()
+
+    first, second = _writes(session)
+    assert first["update"] == {
+        "name": f"{DOCUMENTS}/sleep/c1",
+        "fields": {"timer": {"mapValue": {"fields": {"paused": {"booleanValue": True}}}}},
+    }
+    assert first["updateMask"] == {"fieldPaths": ["timer.paused", "timer.endTime"]}
+    assert first["currentDocument"] == {"exists": True}
+    assert second["currentDocument"] == {"updateTime": "2024-05-01T12:30:00.5Z"}
+
+
+def test_merge_set_masks_leaf_fields(client, session):
+    client.document("feed/c1").set({"timer": {"active": True, "side": "left"}, "prefs": {}}, merge=True)
+
+    (write,) = _writes(session)
+    assert write["updateMask"] == {"fieldPaths": ["timer.active", "timer.side", "prefs"]}
+
+
+def test_empty_batch_sends_nothing(client, session):
+    assert client.batch().commit() == []
+    assert session.sent == []
+
+
+# -- Errors ------------------------------------------------------------------
+
+
+def test_failed_commit_precondition(client, session):
+    session.replies.append((400, _error("FAILED_PRECONDITION", "the stored version does not match")))
+
+    with pytest.raises(PreconditionFailed) as caught:
+        client.document("sleep/c1").update({"timer.paused": True})
+
+    assert is_permanent_error(caught.value)
+    assert RestTransport().is_permanent_error(caught.value)
+
+
+def test_missing_index(client, session):
+    session.replies.append((400, _error("FAILED_PRECONDITION", "The query requires an index. Create it here")))
+
+    with pytest.raises(MissingIndex) as caught:
+        client.collection("diaper/c1/intervals").where("mode", "==", "pee").count().get()
+
+    assert RestTransport().is_missing_index(caught.value)
+
+
+@pytest.mark.parametrize(("status", "permanent"), [("INVALID_ARGUMENT", True), ("UNAVAILABLE", False)])
+def test_other_errors(client, session, status, permanent):
+    session.replies.append((400 if permanent else 503, _error(status, "nope")))
+
+    with pytest.raises(FirestoreRestError) as caught:
+        client.document("sleep/c1").set({"a": 1})
+
+    assert caught.value.status == status
+    assert not isinstance(caught.value, PreconditionFailed)
+    assert is_permanent_error(caught.value) is permanent
+
+
+def test_missing_document(client, session):
+    session.replies.append((404, _error("NOT_FOUND", "no such document")))
+
+    snapshot = client.document("sleep/c1").get(field_paths=["timer"])
+
+    assert not snapshot.exists
+    assert snapshot.to_dict() is None
+    assert session.sent[-1][2] == [("mask.fieldPaths", "timer")]
@@ -0,0 +1,47 @@
+"""Update-time preconditions on timer documents and the stale-state retry."""
+import pytest
+
+from huckleberry_api.rest import PreconditionFailed
+
+
+def _serve_stale_sleep_state(api, other, child_uid):
+    """Cache the sleep document in api's live state, then change it from other."""
+    sleep_ref = api._get_firestore_client().collection("sleep").document(child_uid)
+    snapshot = sleep_ref.get()
+    other.pause_sleep(child_uid)
+    api._live_state[sleep_ref.path] = (snapshot.to_dict(), snapshot.update_time)
+    return sleep_ref
+
+
+def test_timer_operation_retries_once_on_stale_state(make_api, child_uid):
+    stats = []
+    api = make_api(hooks=[stats.append])
+    other = make_api()
+    api.start_sleep(child_uid)
+    sleep_ref = _serve_stale_sleep_state(api, other, child_uid)
+
+    api.complete_sleep(child_uid)
+
+    assert sleep_ref.get().to_dict()["timer"]["active"] is False
+    assert stats[-1].operation == "complete_sleep"
+    assert stats[-1].retries == 1
+    assert stats[-1].cache_hits == 1  # The stale read; the retry went to the server
+    assert stats[-1].error is None
+
+
+def test_batched_timer_operation_is_not_retried(make_api, child_uid):
+    api = make_api()
+    other = make_api()
+    api.start_sleep(child_uid)
+    sleep_ref = _serve_stale_sleep_state(api, other, child_uid)
+
+    with pytest.raises(PreconditionFailed):
+        with api.batch():
+            api.complete_sleep(child_uid)
+
+    assert sleep_ref.get().to_dict()["timer"]["active"] is True  # Nothing written
+    assert sleep_ref.path not in api._live_state  # Stale copy dropped
+
+    with api.batch():
+        api.complete_sleep(child_uid)
+    assert sleep_ref.get().to_dict()["timer"]["active"] is False
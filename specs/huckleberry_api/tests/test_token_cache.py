@@ -0,0 +1,125 @@
+"""Token caches on their own, and session resumption through HuckleberryAPI.authenticate."""
+import json
+import os
+import time
+
+import pytest
+
+from huckleberry_api.api import HuckleberryAPI
+from huckleberry_api.token_cache import FileTokenCache, MemoryTokenCache, TokenCache
+
+CREDENTIALS = {
+    "email": "parent@example.com",
+    "user_uid": "user-1",
+    "id_token": "id",
+    "refresh_token": "refresh",
+    "token_expires_at": 2_000_000_000.0,
+}
+
+
+def test_token_cache_is_abstract():
+    class Incomplete(TokenCache):
+        def load(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_file_round_trip(tmp_path):
+    cache = FileTokenCache(tmp_path / "session.json")
+    assert cache.load() is None
+
+    cache.save(CREDENTIALS)
+
+    assert cache.load() == CREDENTIALS
+    assert os.stat(cache.path).st_mode & 0o777 == 0o600
+    cache.clear()
+    assert cache.load() is None
+    cache.clear()  # Already gone
+
+
+@pytest.mark.parametrize("content", [b"{not json", json.dumps({"email": "parent@example.com"}).encode(), b"[]"])
+def test_unreadable_file_is_a_miss(tmp_path, content):
+    path = tmp_path / "session.json"
+    path.write_bytes(content)
+
+    assert FileTokenCache(path).load() is None
+
+
+def test_encrypted_file(tmp_path):
+    fernet = pytest.importorskip("cryptography.fernet")
+    key = fernet.Fernet.generate_key()
+    path = tmp_path / "session.bin"
+
+    FileTokenCache(path, key=key).save(CREDENTIALS)
+
+    assert b"refresh" not in path.read_bytes()
+    assert FileTokenCache(path, key=key).load() == CREDENTIALS
+    assert FileTokenCache(path, key=fernet.Fernet.generate_key()).load() is None
+
+
+# -- HuckleberryAPI ----------------------------------------------------------
+
+
+@pytest.fixture
+def sign_in(identity, offline_transports, child_uid):
+    """Create and authenticate HuckleberryAPIs the way the apps do (closed after the test)."""
+    clients = []
+
+    def sign_in(token_cache, email="parent@example.com"):
+        client = HuckleberryAPI(email, "secret", token_cache=token_cache, transport="rest")
+        clients.append(client)
+        client.authenticate()
+        return client
+
+    yield sign_in
+    for client in clients:
+        client.close()
+
+
+def test_fresh_session_is_resumed_without_network(sign_in, identity):
+    cache = MemoryTokenCache()
+    first = sign_in(cache)
+
+    second = sign_in(cache)
+
+    assert identity.sign_ins == 1
+    assert identity.refreshes == 0
+    assert second.id_token == first.id_token
+    assert second.get_children() == first.get_children()
+
+
+def test_expiring_session_is_refreshed(sign_in, identity):
+    cache = MemoryTokenCache()
+    sign_in(cache)
+    cache.save({**cache.load(), "token_expires_at": time.time() + 10})
+
+    resumed = sign_in(cache)
+
+    assert (identity.sign_ins, identity.refreshes) == (1, 1)
+    assert resumed.id_token == "id-2"
+    assert cache.load()["refresh_token"] == "refresh-2"
+
+
+def test_rejected_refresh_token_falls_back_to_password(sign_in, identity):
+    cache = MemoryTokenCache()
+    sign_in(cache)
+    cache.save({**cache.load(), "token_expires_at": time.time() - 60})
+    identity.rejected_refresh_tokens.add("refresh-1")
+
+    resumed = sign_in(cache)
+
+    assert (identity.sign_ins, identity.refreshes) == (2, 1)
+    assert resumed.id_token == "id-2"
+    assert cache.load()["id_token"] == "id-2"
+
+
+def test_other_account_signs_in(sign_in, identity):
+    cache = MemoryTokenCache()
+    sign_in(cache)
+
+    sign_in(cache, email="other@example.com")
+
+    assert identity.sign_ins == 2
+    assert cache.load()["email"] == "other@example.com"
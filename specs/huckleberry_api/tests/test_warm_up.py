@@ -0,0 +1,95 @@
+"""Background warm-up of the MCP server's Huckleberry session."""
+import asyncio
+import logging
+
+import pytest
+
+from huckleberry_api.api import HuckleberryAPI
+
+
+@pytest.fixture
+def environment(identity, offline_transports, child_uid, monkeypatch):
+    """Credentials for init_huckleberry, signing in to the fake backend over REST."""
+    monkeypatch.setenv("HUCKLE_USER_ID", "parent@example.com")
+    monkeypatch.setenv("HUCKLE_PW", "secret")
+    monkeypatch.setenv("HUCKLEBERRY_TRANSPORT", "rest")
+
+
+def test_warm_up_signs_in_and_prefetches(mcp_server, environment, identity, child_uid, monkeypatch, caplog):
+    prefetched = []
+    prefetch = mcp_server.prefetch_recent_activity
+    monkeypatch.setattr(mcp_server, "prefetch_recent_activity", lambda: prefetched.append(prefetch()))
+
+    with caplog.at_level(logging.INFO):
+        asyncio.run(mcp_server.warm_up())
+
+    assert mcp_server.huckleberry_api is not None
+    assert mcp_server.child_uid == child_uid
+    assert prefetched == [None]
+    assert "Warm-up finished" in caplog.text
+    assert identity.sign_ins == 1
+
+
+def test_first_call_waits_for_the_warm_up(mcp_server, environment, identity):
+    identity.latency = 0.1  # Sign-in still in flight when the call arrives
+
+    async def call_during_warm_up():
+        warm_up = asyncio.create_task(mcp_server.warm_up())
+        await asyncio.sleep(0.02)
+        result = await mcp_server.call_tool("log_diaper", {"diaper_type": "wet"})
+        await warm_up
+        return result
+
+    (content,) = asyncio.run(call_during_warm_up())
+
+    assert content.text == "Diaper change logged for Abby: pee"
+    assert identity.sign_ins == 1
+
+
+def test_failed_warm_up_is_retried_by_the_first_call(mcp_server, environment, identity, monkeypatch, caplog):
+    monkeypatch.delenv("HUCKLE_PW")
+
+    async def warm_up_then_call():
+        await mcp_server.warm_up()
+        assert mcp_server.huckleberry_api is None
+        (failed,) = await mcp_server.call_tool("log_diaper", {"diaper_type": "wet"})
+        monkeypatch.setenv("HUCKLE_PW", "secret")
+        (logged,) = await mcp_server.call_tool("log_diaper", {"diaper_type": "wet"})
+        return failed, logged
+
+    with caplog.at_level(logging.WARNING):
+        failed, logged = asyncio.run(warm_up_then_call())
+
+    assert "Warm-up failed, retrying on the first tool call" in caplog.text
+    assert failed.text.startswith("ERROR: Unable to connect to Huckleberry API: Missing HUCKLE_USER_ID")
+    assert logged.text == "Diaper change logged for Abby: pee"
+    assert identity.sign_ins == 1
+
+
+def test_failed_prefetch_keeps_the_session(mcp_server, environment, monkeypatch, caplog):
+    def broken():
+        raise RuntimeError("Firestore is down")
+
+    monkeypatch.setattr(mcp_server, "prefetch_recent_activity", broken)
+
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(mcp_server.warm_up())
+
+    assert "Warm-up prefetch failed: Firestore is down" in caplog.text
+    assert mcp_server.huckleberry_api is not None
+
+
+def test_failed_initialization_stops_listeners(mcp_server, environment, backend, monkeypatch):
+    monkeypatch.setenv("HUCKLEBERRY_TRANSPORT", "grpc")
+    monkeypatch.setenv("HUCKLEBERRY_LIVE_STATE", "1")
+
+    def broken(self, child_uid):
+        raise RuntimeError("listen failed")
+
+    monkeypatch.setattr(HuckleberryAPI, "enable_live_state", broken)
+
+    with pytest.raises(RuntimeError):
+        mcp_server.init_huckleberry()
+
+    assert mcp_server.huckleberry_api is None
+    assert not any(backend._watches.values())  # The children cache watches are stopped
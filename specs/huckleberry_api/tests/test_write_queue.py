@@ -0,0 +1,103 @@
+"""Durable write queue: replay, parking of rejected writes, outages."""
+import logging
+
+import pytest
+
+from huckleberry_api.fake_firestore import NotFound
+from huckleberry_api.metrics import MetricsCollector
+from huckleberry_api.write_queue import WriteQueue
+
+
+@pytest.fixture
+def stats():
+    """OperationStats reported by queued_api."""
+    return []
+
+
+@pytest.fixture
+def metrics():
+    """MetricsCollector hooked into queued_api."""
+    return MetricsCollector()
+
+
+@pytest.fixture
+def queued_api(make_api, stats, metrics, monkeypatch):
+    """A client with an in-memory write queue, replayed only by flush_write_queue."""
+    api = make_api(write_queue=WriteQueue(max_attempts=2), hooks=[stats.append, metrics])
+    monkeypatch.setattr(api, "_wake_replayer", lambda: None)  # No background replay thread
+    return api
+
+
+def _diaper_count(api, child_uid):
+    return len(api.get_diaper_intervals(child_uid, 0, 2**31))
+
+
+def test_writes_wait_in_the_queue(queued_api, child_uid):
+    queued_api.log_diaper(child_uid, "pee")
+    queued_api.log_diaper(child_uid, "poo")
+
+    assert len(queued_api.write_queue) == 2
+    assert _diaper_count(queued_api, child_uid) == 0
+
+    assert queued_api.flush_write_queue() == 2
+    assert len(queued_api.write_queue) == 0
+    assert _diaper_count(queued_api, child_uid) == 2
+
+
+def test_outage_keeps_writes_queued(queued_api, backend, child_uid, monkeypatch):
+    queued_api.log_diaper(child_uid, "pee")
+
+    def unreachable(_writes):
+        raise ConnectionError("Firestore unreachable")
+
+    monkeypatch.setattr(backend, "_commit", unreachable)
+    for _attempt in range(3):  # More than max_attempts
+        with pytest.raises(ConnectionError):
+            queued_api.flush_write_queue()
+
+    (operation,) = queued_api.write_queue.pending(10)
+    assert operation.attempts == 0  # Outages never count against a write
+    assert queued_api.write_queue.failed() == []
+
+    monkeypatch.undo()
+    assert queued_api.flush_write_queue() == 1
+    assert _diaper_count(queued_api, child_uid) == 1
+
+
+def test_rejected_write_is_parked(queued_api, child_uid, stats, metrics, caplog):
+    queued_api.log_diaper("no-such-child", "pee")  # Its tracker document does not exist
+    queued_api.log_diaper(child_uid, "poo")
+
+    with pytest.raises(NotFound):
+        queued_api.flush_write_queue()  # First rejection: still queued
+    assert len(queued_api.write_queue) == 2
+
+    with caplog.at_level(logging.WARNING, logger="huckleberry_api.write_queue"):
+        assert queued_api.flush_write_queue() == 1  # Parked, the rest replays
+    flushed = stats[-1]
+
+    assert _diaper_count(queued_api, child_uid) == 1
+    assert len(queued_api.write_queue) == 0
+    ((parked, error),) = queued_api.write_queue.failed()
+    assert parked.attempts == 2
+    assert "diaper/no-such-child" in error
+    assert "Parked queued write" in caplog.text
+    assert flushed.operation == "flush_write_queue"
+    assert flushed.parked == 1
+    assert 'huckleberry_writes_parked_total{operation="flush_write_queue"} 1' in metrics.render()
+
+
+def test_requeued_writes_start_counting_again(queued_api):
+    queued_api.log_diaper("no-such-child", "pee")
+    for _attempt in range(2):
+        try:
+            queued_api.flush_write_queue()
+        except NotFound:
+            pass
+    assert len(queued_api.write_queue.failed()) == 1
+
+    assert queued_api.write_queue.requeue_failed() == 1
+    with pytest.raises(NotFound):
+        queued_api.flush_write_queue()
+    (operation,) = queued_api.write_queue.pending(10)
+    assert operation.attempts == 1
@@ -0,0 +1,141 @@
+"""Persistent credential caches for Huckleberry sessions."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import TypedDict
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CachedCredentials(TypedDict):
+    """Session tokens persisted between processes."""
+    email: str
+    user_uid: str
+    id_token: str
+    refresh_token: str
+    token_expires_at: float
+
+
+class TokenCache(ABC):
+    """Base class for pluggable credential caches.
+
+    Subclasses persist CachedCredentials somewhere (disk, secret store, ...)
+    so a new process can resume a session instead of signing in again.
+    """
+
+    @abstractmethod
+    def load(self) -> CachedCredentials | None:
+        """Return cached credentials, or None if nothing usable is stored."""
+
+    @abstractmethod
+    def save(self, credentials: CachedCredentials) -> None:
+        """Persist credentials."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget cached credentials."""
+
+
+class MemoryTokenCache(TokenCache):
+    """Process-local cache, mainly useful to share a session between clients."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._credentials: CachedCredentials | None = None
+
+    def load(self) -> CachedCredentials | None:
+        """Return cached credentials."""
+        return self._credentials
+
+    def save(self, credentials: CachedCredentials) -> None:
+        """Store credentials."""
+        self._credentials = credentials
+
+    def clear(self) -> None:
+        """Forget cached credentials."""
+        self._credentials = None
+
+
+class FileTokenCache(TokenCache):
+    """On-disk credential cache, optionally encrypted.
+
+    With a key the file is encrypted with Fernet (requires the optional
+    ``cryptography`` package); without one it is written as JSON readable
+    only by the owner. Writes are atomic. A corrupt, undecryptable or
+    foreign file is treated as a cache miss.
+    """
+
+    def __init__(self, path: str | os.PathLike, key: str | bytes | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Cache file location
+            key: Optional Fernet key (urlsafe base64, 32 bytes) used to encrypt the file
+        """
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._fernet = None
+        if key:
+            try:
+                from cryptography.fernet import Fernet
+            except ImportError as err:
+                raise ImportError(
+                    "Encrypted token cache requires cryptography. Install with: pip install cryptography"
+                ) from err
+            self._fernet = Fernet(key)
+
+    def load(self) -> CachedCredentials | None:
+        """Read and decrypt cached credentials."""
+        try:
+            with self._lock, open(self.path, "rb") as cache_file:
+                payload = cache_file.read()
+        except FileNotFoundError:
+            return None
+        except OSError as err:
+            _LOGGER.warning("Could not read token cache %s: %s", self.path, err)
+            return None
+
+        try:
+            if self._fernet is not None:
+                payload = self._fernet.decrypt(payload)
+            credentials = json.loads(payload)
+        except Exception as err:
+            _LOGGER.warning("Ignoring unreadable token cache %s: %s", self.path, err)
+            return None
+
+        if not isinstance(credentials, dict) or not all(key in credentials for key in CachedCredentials.__annotations__):
+            _LOGGER.warning("Ignoring incomplete token cache %s", self.path)
+            return None
+        return credentials  # type: ignore[return-value]
+
+    def save(self, credentials: CachedCredentials) -> None:
+        """Encrypt and atomically write credentials."""
+        payload = json.dumps(credentials).encode()
+        if self._fernet is not None:
+            payload = self._fernet.encrypt(payload)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".huckleberry-token-")
+            try:
+                os.chmod(tmp_path, 0o600)
+                with os.fdopen(fd, "wb") as cache_file:
+                    cache_file.write(payload)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def clear(self) -> None:
+        """Delete the cache file."""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
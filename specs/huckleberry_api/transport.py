@@ -0,0 +1,180 @@
+"""Firestore transports for HuckleberryAPI.
+
+``grpc`` (default) uses google-cloud-firestore and supports every feature,
+including real-time listeners. ``rest`` talks to the Firestore REST API
+over a pooled HTTP session: much faster to import and construct, no gRPC
+dependency at runtime, but no listeners (and so no live state cache).
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class FirestoreTransport(ABC):
+    """Builds the Firestore client and provides the matching helper types."""
+
+    name = ""
+    supports_listeners = False
+
+    @abstractmethod
+    def create_client(self, credentials, project: str, pool_size: int) -> Any:
+        """Return a client with the google-cloud-firestore Client surface."""
+
+    @property
+    @abstractmethod
+    def delete_field(self) -> Any:
+        """Sentinel that deletes a field in update()."""
+
+    @property
+    @abstractmethod
+    def field_filter(self) -> Any:
+        """FieldFilter class for where(filter=...)."""
+
+    @property
+    @abstractmethod
+    def precondition_errors(self) -> tuple[type[BaseException], ...]:
+        """Exceptions raised when a write precondition does not hold."""
+
+    def is_permanent_error(self, error: BaseException) -> bool:
+        """Return True if writing the same data again cannot succeed.
+
+        Invalid data and failed preconditions are permanent; network, server
+        and authentication errors are not, however long they last.
+        """
+        return isinstance(error, self.precondition_errors)
+
+    def is_missing_index(self, error: BaseException) -> bool:
+        """Return True if a query failed only for lack of a composite index.
+
+        Queries that do not need the index (e.g. reading the documents
+        instead of aggregating them) can still succeed.
+        """
+        return False
+
+
+class GrpcTransport(FirestoreTransport):
+    """google-cloud-firestore client (gRPC); imported on first use."""
+
+    name = "grpc"
+    supports_listeners = True
+
+    def create_client(self, credentials, project: str, pool_size: int) -> Any:
+        """Return a firestore.Client."""
+        from google.cloud import firestore
+
+        return firestore.Client(project=project, credentials=credentials)
+
+    @property
+    def delete_field(self) -> Any:
+        """firestore.DELETE_FIELD."""
+        from google.cloud import firestore
+
+        return firestore.DELETE_FIELD
+
+    @property
+    def field_filter(self) -> Any:
+        """firestore.FieldFilter."""
+        from google.cloud import firestore
+
+        return firestore.FieldFilter
+
+    @property
+    def precondition_errors(self) -> tuple[type[BaseException], ...]:
+        """FailedPrecondition from google.api_core."""
+        from google.api_core.exceptions import FailedPrecondition
+
+        return (FailedPrecondition,)
+
+    def is_permanent_error(self, error: BaseException) -> bool:
+        """Invalid argument, missing document and failed precondition errors."""
+        from google.api_core.exceptions import AlreadyExists, FailedPrecondition, InvalidArgument, NotFound, OutOfRange
+
+        return isinstance(error, (AlreadyExists, FailedPrecondition, InvalidArgument, NotFound, OutOfRange))
+
+    def is_missing_index(self, error: BaseException) -> bool:
+        """FailedPrecondition whose message asks for an index."""
+        return is_grpc_missing_index(error)
+
+
+class RestTransport(FirestoreTransport):
+    """Firestore REST API over a pooled requests.Session."""
+
+    name = "rest"
+
+    def __init__(self, base_url: str | None = None) -> None:
+        """Initialize the transport.
+
+        Args:
+            base_url: API root override, e.g. a Firestore emulator
+                (default https://firestore.googleapis.com/v1)
+        """
+        self.base_url = base_url
+
+    def create_client(self, credentials, project: str, pool_size: int) -> Any:
+        """Return a RestFirestoreClient."""
+        from .rest import RestFirestoreClient
+
+        if self.base_url:
+            return RestFirestoreClient(credentials, base_url=self.base_url, pool_size=pool_size)
+        return RestFirestoreClient(credentials, pool_size=pool_size)
+
+    @property
+    def delete_field(self) -> Any:
+        """rest.DELETE_FIELD."""
+        from .rest import DELETE_FIELD
+
+        return DELETE_FIELD
+
+    @property
+    def field_filter(self) -> Any:
+        """rest.FieldFilter."""
+        from .rest import FieldFilter
+
+        return FieldFilter
+
+    @property
+    def precondition_errors(self) -> tuple[type[BaseException], ...]:
+        """rest.PreconditionFailed."""
+        from .rest import PreconditionFailed
+
+        return (PreconditionFailed,)
+
+    def is_permanent_error(self, error: BaseException) -> bool:
+        """PreconditionFailed and API errors rejecting the request itself."""
+        from .rest import is_permanent_error
+
+        return is_permanent_error(error)
+
+    def is_missing_index(self, error: BaseException) -> bool:
+        """rest.MissingIndex."""
+        from .rest import MissingIndex
+
+        return isinstance(error, MissingIndex)
+
+
+def is_grpc_missing_index(error: BaseException) -> bool:
+    """Return True for a google.api_core FailedPrecondition asking for a composite index."""
+    from google.api_core.exceptions import FailedPrecondition
+
+    from .rest import is_missing_index_message
+
+    return isinstance(error, FailedPrecondition) and is_missing_index_message(str(error.message))
+
+
+_TRANSPORTS: dict[str, type[FirestoreTransport]] = {
+    GrpcTransport.name: GrpcTransport,
+    RestTransport.name: RestTransport,
+}
+
+
+def get_transport(transport: str | FirestoreTransport) -> FirestoreTransport:
+    """Resolve a transport name ("grpc" or "rest") or pass an instance through."""
+    if isinstance(transport, FirestoreTransport):
+        return transport
+    try:
+        return _TRANSPORTS[transport.lower()]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown Firestore transport {transport!r} (expected one of: {', '.join(_TRANSPORTS)})"
+        ) from None
@@ -0,0 +1,168 @@
+"""Durable local queue of Firestore writes awaiting replay."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Literal, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    writes TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    parked INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class QueuedWrite(NamedTuple):
+    """One document write: a full set or a field-path update."""
+
+    op: Literal["set", "update"]
+    path: str  # Document path, e.g. "diaper/<child>/intervals/<id>"
+    data: dict
+
+
+class QueuedOperation(NamedTuple):
+    """The writes of one client operation, committed together on replay."""
+
+    seq: int
+    key: str
+    writes: list[QueuedWrite]
+    attempts: int
+
+
+class WriteQueue:
+    """Write-ahead queue of client operations, stored in SQLite.
+
+    Each operation is keyed by an idempotency key (the interval document id
+    it creates), so enqueueing the same operation twice stores it once, and
+    replaying it after a crash between commit and removal rewrites the same
+    documents instead of duplicating them.
+
+    An operation that Firestore keeps rejecting on its own is parked after
+    max_attempts rejections rather than dropped: failed() lists parked
+    operations and requeue_failed() puts them back in line. Only permanent
+    errors are counted (the client decides which); an outage, however
+    long, leaves every operation queued.
+
+    Safe to share across threads; use a file path to survive restarts.
+    """
+
+    def __init__(self, path: str | os.PathLike = ":memory:", max_attempts: int = 5) -> None:
+        """Open (or create) the queue database at path.
+
+        Args:
+            path: SQLite database file (":memory:" keeps the queue in process)
+            max_attempts: Rejected replays of one operation before it is parked
+        """
+        self.path = os.fspath(path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        """Number of operations waiting for replay (parked ones excluded)."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM operations WHERE parked = 0").fetchone()[0]
+
+    def enqueue(self, key: str, writes: list[QueuedWrite]) -> bool:
+        """Store an operation durably.
+
+        Returns:
+            False if an operation with this key is already queued
+        """
+        return self.enqueue_many([(key, writes)]) > 0
+
+    def enqueue_many(self, operations: Iterable[tuple[str, list[QueuedWrite]]]) -> int:
+        """Store several (key, writes) operations in one transaction.
+
+        Returns:
+            Number of operations stored (keys already queued are skipped)
+        """
+        now = time.time()
+        rows = [(key, json.dumps([list(write) for write in writes]), now) for key, writes in operations]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO operations (key, writes, enqueued_at) VALUES (?, ?, ?)", rows
+            )
+            return self._conn.total_changes - before
+
+    def pending(self, max_writes: int) -> list[QueuedOperation]:
+        """Oldest queued operations, up to max_writes writes in total (at least one operation)."""
+        operations: list[QueuedOperation] = []
+        total = 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, key, writes, attempts FROM operations WHERE parked = 0 ORDER BY seq"
+            )
+            for seq, key, payload, attempts in rows:
+                writes = [QueuedWrite(*write) for write in json.loads(payload)]
+                if operations and total + len(writes) > max_writes:
+                    break
+                operations.append(QueuedOperation(seq, key, writes, attempts))
+                total += len(writes)
+        return operations
+
+    def remove(self, seqs: list[int]) -> None:
+        """Drop replayed operations."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM operations WHERE seq = ?", [(seq,) for seq in seqs])
+
+    def record_failure(self, seq: int, error: Exception) -> bool:
+        """Count a replay of one operation that was rejected with a permanent error.
+
+        Transient failures (network, server, auth) must not be recorded.
+
+        Returns:
+            True if the operation has now been parked
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE operations SET attempts = attempts + 1, last_error = ?, "
+                "parked = CASE WHEN attempts + 1 >= ? THEN 1 ELSE 0 END WHERE seq = ?",
+                (str(error), self.max_attempts, seq),
+            )
+            row = self._conn.execute("SELECT key, parked FROM operations WHERE seq = ?", (seq,)).fetchone()
+        if row is not None and row[1]:
+            _LOGGER.warning("Parked queued write %s after %d rejected replays: %s", row[0], self.max_attempts, error)
+            return True
+        return False
+
+    def failed(self) -> list[tuple[QueuedOperation, str | None]]:
+        """Parked operations with their last replay error."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, key, writes, attempts, last_error FROM operations WHERE parked = 1 ORDER BY seq"
+            ).fetchall()
+        return [
+            (QueuedOperation(seq, key, [QueuedWrite(*write) for write in json.loads(payload)], attempts), last_error)
+            for seq, key, payload, attempts, last_error in rows
+        ]
+
+    def requeue_failed(self) -> int:
+        """Put parked operations back in line (in their original order).
+
+        Returns:
+            Number of operations requeued
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute("UPDATE operations SET parked = 0, attempts = 0 WHERE parked = 1")
+        return cursor.rowcount
@@ -0,0 +1,49 @@
+"""Startup phase timing for the Python entry points.
+
+Set STARTUP_TIMING=1 to log how long each startup phase took:
+
+    _process_started = time.perf_counter()  # First statement of the entry point
+    ...
+    startup_timer = StartupTimer(_process_started)
+    startup_timer.mark("import fastapi")
+    ...
+    startup_timer.report(logger)
+
+Deliberately dependency-free, so importing it costs nothing measurable.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+
+class StartupTimer:
+    """Startup phases of one process, logged as a single report."""
+
+    def __init__(self, started: float) -> None:
+        """Start timing.
+
+        Args:
+            started: time.perf_counter() taken when the process started
+        """
+        self.started = started
+        self.enabled = os.getenv("STARTUP_TIMING", "").lower() in ("1", "true", "yes")
+        self.marks: list[tuple[str, float]] = []  # (phase, seconds since process start)
+
+    def mark(self, phase: str) -> None:
+        """Record the end of a startup phase."""
+        if self.enabled:
+            self.marks.append((phase, time.perf_counter() - self.started))
+
+    def report(self, logger: logging.Logger) -> None:
+        """Log the recorded phases with their own and cumulative times, then forget them."""
+        if not self.marks:
+            return
+        previous = 0.0
+        lines = []
+        for phase, elapsed in self.marks:
+            lines.append(f"   {phase:<24} +{(elapsed - previous) * 1000:7.1f}ms  {elapsed * 1000:7.1f}ms")
+            previous = elapsed
+        logger.info("Startup timing (phase, own, cumulative):\n" + "\n".join(lines))
+        self.marks.clear()